@@ -4,6 +4,7 @@ Versión 2.0 - Arquitectura Refactorizada
 """
 
 import logging
+import pandas as pd
 from dash import Dash, html
 
 # Configurar logging
@@ -14,10 +15,16 @@ logger = logging.getLogger(__name__)
 
 # Importar módulos de la aplicación
 from src.utils.config import Config
-from src.data import get_data_loader
+from src.data import DataLoader, get_data_loader
+from src.data.scheduler import start_refresh_scheduler
+from src.data.store import get_analytical_store
+from src.data.versioning import get_dataset_version
 from src.layouts import (
     create_header,
     create_footer,
+    create_accessibility_panel,
+    create_cross_filter_bar,
+    create_refresh_control,
     create_main_metrics,
     create_diagnostics_section,
     create_gender_analysis_section,
@@ -26,6 +33,7 @@ from src.layouts import (
     create_insights_section,
 )
 from src.callbacks import register_callbacks
+from src.routes import setup_export_routes
 
 # Configuración de la aplicación
 logger.info("Initializing Hospital Analytics Dashboard v2.0...")
@@ -61,117 +69,170 @@ app.index_string = """
 </html>
 """
 
-# Cargar datos al iniciar la aplicación
-logger.info("Loading data from ORDS...")
-data_loader = get_data_loader()
+# Configurar tema por defecto
+THEME = Config.DEFAULT_THEME
+
+
+def load_data():
+    """
+    Obtiene los datasets vigentes del DataLoader.
+
+    Returns:
+        Tuple: (nombre -> DataFrame, mensaje de error o None); si la carga
+        falla, DataFrames vacíos
+    """
+    try:
+        return get_data_loader().fetch_all_data(), None
+    except Exception as e:
+        logger.error(f"Error loading data: {e}")
+        return {name: pd.DataFrame() for name in DataLoader.DATASETS}, str(e)
 
-try:
-    data = data_loader.fetch_all_data()
+
+# Los procesos de los pools (forkserver) importan este script como __mp_main__
+# al ejecutarlo con `uv run app.py`: en ellos no se cargan datos ni se registra
+# nada de la aplicación (ver más abajo)
+POOL_PROCESS = __name__ == "__mp_main__"
+
+# Cargar datos al iniciar la aplicación
+if not POOL_PROCESS:
+    logger.info("Loading data from ORDS...")
+    data, data_load_error = load_data()
+    if data_load_error is None:
+        logger.info(f"Data loaded successfully:")
+        logger.info(f"  - Peso/Estancia: {len(data['peso_estancia'])} records")
+        logger.info(f"  - Diagnósticos: {len(data['diagnosticos'])} records")
+        logger.info(f"  - Diagnóstico/Sexo: {len(data['diagnostico_sexo'])} records")
+        logger.info(
+            f"  - Severidad/Mortalidad: {len(data['severidad_mortalidad'])} records"
+        )
+
+        # Réplica en el almacén analítico (no se reescribe si ya tiene esas versiones
+        # de los datasets)
+        analytical_store = get_analytical_store()
+        if analytical_store is not None:
+            analytical_store.mirror(get_data_loader().snapshot())
+    # Las páginas usan siempre los datos vigentes: no se retienen los del arranque
+    del data
+
+
+def serve_layout() -> html.Div:
+    """
+    Construye el layout de la aplicación con los datos vigentes.
+
+    Dash lo llama en cada carga de página: tras una actualización (o al
+    adoptar una generación publicada por otro worker) las páginas nuevas
+    muestran los datos y las versiones actuales. Las figuras y agregados se
+    cachean por versión, así que mientras los datos no cambian el layout se
+    construye sin recalcularlos.
+
+    Returns:
+        html.Div: Layout completo
+    """
+    data, data_load_error = load_data()
     df_peso_estancia = data["peso_estancia"]
     df_diagnosticos = data["diagnosticos"]
     df_diagnostico_sexo = data["diagnostico_sexo"]
     df_severidad_mortalidad = data["severidad_mortalidad"]
+    dataset_versions = (
+        {name: get_dataset_version(df) for name, df in data.items()}
+        if data_load_error is None
+        else {}
+    )
+
+    return html.Div(
+        [
+            # Header
+            create_header(),
+            # Error notification (if any)
+            html.Div(
+                (
+                    [
+                        html.Div(
+                            [
+                                html.Span(
+                                    "⚠️ ",
+                                    style={"fontSize": "1.5rem", "marginRight": "10px"},
+                                ),
+                                html.Span("Error al cargar datos: "),
+                                html.Span(
+                                    data_load_error or "Error desconocido",
+                                    style={"fontWeight": "bold"},
+                                ),
+                                html.Br(),
+                                html.Span(
+                                    "Mostrando dashboard con datos vacíos. Por favor, verifica la conexión a la base de datos.",
+                                    style={"fontSize": "0.9rem", "opacity": "0.9"},
+                                ),
+                            ],
+                            style={
+                                "backgroundColor": "#fef2f2",
+                                "border": "2px solid #fecaca",
+                                "borderLeft": "6px solid #dc2626",
+                                "borderRadius": "8px",
+                                "padding": "20px",
+                                "margin": "0 24px 24px 24px",
+                                "color": "#991b1b",
+                                "boxShadow": "0 4px 12px rgba(220, 38, 38, 0.1)",
+                            },
+                            role="alert",
+                        )
+                    ]
+                    if data_load_error
+                    else []
+                ),
+            ),
+            # Main content container
+            html.Div(
+                [
+                    # Actualización de datos en segundo plano
+                    create_refresh_control(),
+                    # Filtro cruzado entre secciones
+                    create_cross_filter_bar(dataset_versions),
+                    # KPIs principales
+                    create_main_metrics(
+                        df_diagnosticos=df_diagnosticos,
+                        df_peso_estancia=df_peso_estancia,
+                        df_severidad=df_severidad_mortalidad,
+                    ),
+                    # Sección 1: Diagnósticos y Demografía
+                    create_diagnostics_section(df=df_diagnosticos, theme=THEME),
+                    # Sección 2: Análisis por Sexo
+                    create_gender_analysis_section(df=df_diagnostico_sexo, theme=THEME),
+                    # Sección 3: Severidad y Mortalidad
+                    create_severity_section(df=df_severidad_mortalidad, theme=THEME),
+                    # Sección 4: Peso y Estancia
+                    create_weight_stay_section(df=df_peso_estancia, theme=THEME),
+                    # Sección 5: Insights
+                    create_insights_section(
+                        df_diagnosticos=df_diagnosticos,
+                        df_severidad=df_severidad_mortalidad,
+                        df_peso=df_peso_estancia,
+                    ),
+                ],
+                className="container",
+            ),
+            # Footer
+            create_footer(),
+            # Panel de accesibilidad (estado de presentación, en el navegador)
+            create_accessibility_panel(),
+        ]
+    )
 
-    logger.info(f"Data loaded successfully:")
-    logger.info(f"  - Peso/Estancia: {len(df_peso_estancia)} records")
-    logger.info(f"  - Diagnósticos: {len(df_diagnosticos)} records")
-    logger.info(f"  - Diagnóstico/Sexo: {len(df_diagnostico_sexo)} records")
-    logger.info(f"  - Severidad/Mortalidad: {len(df_severidad_mortalidad)} records")
-
-    data_load_error = None
-
-except Exception as e:
-    logger.error(f"Error loading data: {e}")
-    data_load_error = str(e)
-    # Crear DataFrames vacíos en caso de error
-    import pandas as pd
-
-    df_peso_estancia = pd.DataFrame()
-    df_diagnosticos = pd.DataFrame()
-    df_diagnostico_sexo = pd.DataFrame()
-    df_severidad_mortalidad = pd.DataFrame()
 
-# Configurar tema por defecto
-THEME = Config.DEFAULT_THEME
+# Los procesos de los pools no atienden peticiones: ni layout (Dash lo construye
+# al asignarlo, para validarlo), ni callbacks, ni rutas, ni planificador
+if not POOL_PROCESS:
+    # El layout se construye en cada carga de página
+    app.layout = serve_layout
 
-# Construir el layout de la aplicación
-logger.info("Building application layout...")
+    # Registrar callbacks
+    register_callbacks(app)
 
-app.layout = html.Div(
-    [
-        # Header
-        create_header(),
-        # Error notification (if any)
-        html.Div(
-            (
-                [
-                    html.Div(
-                        [
-                            html.Span(
-                                "⚠️ ",
-                                style={"fontSize": "1.5rem", "marginRight": "10px"},
-                            ),
-                            html.Span("Error al cargar datos: "),
-                            html.Span(
-                                data_load_error or "Error desconocido",
-                                style={"fontWeight": "bold"},
-                            ),
-                            html.Br(),
-                            html.Span(
-                                "Mostrando dashboard con datos vacíos. Por favor, verifica la conexión a la base de datos.",
-                                style={"fontSize": "0.9rem", "opacity": "0.9"},
-                            ),
-                        ],
-                        style={
-                            "backgroundColor": "#fef2f2",
-                            "border": "2px solid #fecaca",
-                            "borderLeft": "6px solid #dc2626",
-                            "borderRadius": "8px",
-                            "padding": "20px",
-                            "margin": "0 24px 24px 24px",
-                            "color": "#991b1b",
-                            "boxShadow": "0 4px 12px rgba(220, 38, 38, 0.1)",
-                        },
-                        role="alert",
-                    )
-                ]
-                if data_load_error
-                else []
-            ),
-        ),
-        # Main content container
-        html.Div(
-            [
-                # KPIs principales
-                create_main_metrics(
-                    df_diagnosticos=df_diagnosticos,
-                    df_peso_estancia=df_peso_estancia,
-                    df_severidad=df_severidad_mortalidad,
-                ),
-                # Sección 1: Diagnósticos y Demografía
-                create_diagnostics_section(df=df_diagnosticos, theme=THEME),
-                # Sección 2: Análisis por Sexo
-                create_gender_analysis_section(df=df_diagnostico_sexo, theme=THEME),
-                # Sección 3: Severidad y Mortalidad
-                create_severity_section(df=df_severidad_mortalidad, theme=THEME),
-                # Sección 4: Peso y Estancia
-                create_weight_stay_section(df=df_peso_estancia, theme=THEME),
-                # Sección 5: Insights
-                create_insights_section(
-                    df_diagnosticos=df_diagnosticos,
-                    df_severidad=df_severidad_mortalidad,
-                    df_peso=df_peso_estancia,
-                ),
-            ],
-            className="container",
-        ),
-        # Footer
-        create_footer(),
-    ]
-)
+    # Rutas de exportación de datos (CSV/Parquet)
+    setup_export_routes(server)
 
-# Registrar callbacks
-register_callbacks(app)
+    # Actualización periódica: un worker elegido descarga y publica para todos
+    start_refresh_scheduler()
 
 logger.info("Application initialization complete!")
 
@@ -0,0 +1,224 @@
+// Funciones de callbacks de cliente (dash_clientside.ui)
+// Estado de presentación (tema, accesibilidad, secciones y leyendas) que se
+// resuelve en el navegador, sin pasar por el servidor
+
+window.dash_clientside = window.dash_clientside || {};
+
+(function () {
+  // Tema con el que están pintadas las figuras (null = el del servidor)
+  let appliedTheme = null;
+
+  const THEME_BUTTON = {
+    dark: { icon: "☀️", title: "Cambiar a modo claro" },
+    light: { icon: "🌙", title: "Cambiar a modo oscuro" },
+  };
+
+  // Paletas de trazas por tipo de daltonismo
+  const COLORBLIND_PALETTES = {
+    protanopia: ["#0077bb", "#ee7733", "#009988", "#cc3311", "#33bbee"],
+    deuteranopia: ["#0077bb", "#ee7733", "#009988", "#cc3311", "#33bbee"],
+    tritanopia: ["#cc3311", "#009988", "#0077bb", "#ee7733", "#33bbee"],
+    achromatopsia: ["#1e293b", "#64748b", "#334155", "#0f172a", "#475569"],
+  };
+
+  const COLORBLIND_TYPES = Object.keys(COLORBLIND_PALETTES);
+  const FONT_SIZES = ["small", "normal", "large", "xlarge"];
+
+  // Filtro CSS de las gráficas según el tipo de daltonismo y la intensidad
+  function colorblindFilter(type, intensity) {
+    const value = intensity / 100;
+    switch (type) {
+      case "tritanopia":
+        return `contrast(${1 + 0.3 * value}) brightness(${1 + 0.1 * value})`;
+      case "achromatopsia":
+        return `grayscale(${0.7 * value}) contrast(${1 + 0.4 * value})`;
+      default:
+        return `contrast(${1 + 0.2 * value}) saturate(${1 + 0.3 * value})`;
+    }
+  }
+
+  // Aplica el estado de accesibilidad al documento (clases y filtros CSS)
+  function applyAccessibilityToDocument(state) {
+    const body = document.body;
+    const colorblindClasses = COLORBLIND_TYPES.map((t) => `colorblind-${t}`);
+
+    body.classList.remove("colorblind-mode", ...colorblindClasses);
+    const chartFilter = state.colorblind
+      ? colorblindFilter(state.colorblindType, state.intensity)
+      : "";
+    if (state.colorblind) {
+      body.classList.add("colorblind-mode", `colorblind-${state.colorblindType}`);
+    }
+    document.querySelectorAll(".js-plotly-plot, .chart-card").forEach((chart) => {
+      chart.style.filter = chartFilter;
+    });
+    if (state.colorblind && window.Plotly) {
+      const colors = COLORBLIND_PALETTES[state.colorblindType];
+      document.querySelectorAll(".js-plotly-plot").forEach((graph) => {
+        if (graph.data) {
+          window.Plotly.restyle(graph, {
+            "marker.color": colors,
+            "line.color": colors[0],
+          });
+        }
+      });
+    }
+
+    body.classList.toggle("high-contrast-mode", !!state.highContrast);
+    const container = document.querySelector(".container");
+    if (container) {
+      const value = state.contrast / 100;
+      container.style.filter = state.highContrast
+        ? `contrast(${1 + 0.8 * value}) brightness(${1 + 0.15 * value}) ` +
+          `saturate(${1 + 0.25 * value})`
+        : "";
+    }
+
+    body.classList.remove(...FONT_SIZES.map((size) => `font-${size}`));
+    body.classList.add(`font-${state.fontSize}`);
+  }
+
+  // Id del componente que disparó el callback de cliente
+  function triggeredId() {
+    const triggered = window.dash_clientside.callback_context.triggered;
+    if (!triggered || !triggered.length) {
+      return null;
+    }
+    return triggered[0].prop_id.split(".")[0];
+  }
+
+  window.dash_clientside.ui = Object.assign({}, window.dash_clientside.ui, {
+    // Alterna entre tema claro y oscuro
+    toggleTheme: function (nClicks, theme) {
+      return theme === "dark" ? "light" : "dark";
+    },
+
+    // Aplica el tema: variables CSS (clase del body), botón y template de
+    // cada figura. Solo se sustituye el template: las trazas no cambian.
+    applyTheme: function (theme, config) {
+      const figures = Array.prototype.slice.call(arguments, 2);
+      const noUpdate = window.dash_clientside.no_update;
+
+      config = config || {};
+      const templates = config.templates || {};
+      const current = appliedTheme || config.default;
+      if (!templates[theme]) {
+        theme = config.default || "light";
+      }
+
+      document.body.classList.toggle("dark-mode", theme === "dark");
+      const button = THEME_BUTTON[theme] || THEME_BUTTON.light;
+
+      let updates;
+      if (theme === current) {
+        updates = figures.map(() => noUpdate);
+      } else {
+        updates = figures.map((figure) =>
+          figure
+            ? Object.assign({}, figure, {
+                layout: Object.assign({}, figure.layout, {
+                  template: templates[theme],
+                }),
+              })
+            : noUpdate
+        );
+        appliedTheme = theme;
+      }
+
+      return [button.icon, button.title].concat(updates);
+    },
+
+    // Abre o cierra el panel de accesibilidad
+    togglePanel: function (nClicks, className) {
+      const open = !(className || "").split(" ").includes("visible");
+      if (open && window.setupFocusTrap) {
+        window.setupFocusTrap(document.getElementById("accessibility-panel"));
+      } else if (!open && window.removeFocusTrap) {
+        window.removeFocusTrap();
+      }
+      return [
+        open ? "accessibility-panel visible" : "accessibility-panel",
+        String(open),
+      ];
+    },
+
+    // Actualiza el estado de accesibilidad con el control que ha cambiado
+    updateAccessibility: function () {
+      const args = Array.prototype.slice.call(arguments);
+      const state = Object.assign({}, args[args.length - 1]);
+      const id = triggeredId();
+
+      if (id === "colorblind-toggle") {
+        state.colorblind = !state.colorblind;
+      } else if (id === "highcontrast-toggle") {
+        state.highContrast = !state.highContrast;
+      } else if (id === "intensity-slider") {
+        state.intensity = parseInt(args[2 + COLORBLIND_TYPES.length], 10);
+      } else if (id === "contrast-slider") {
+        state.contrast = parseInt(args[3 + COLORBLIND_TYPES.length], 10);
+      } else if (id && id.startsWith("colorblind-type-")) {
+        state.colorblindType = id.slice("colorblind-type-".length);
+      } else if (id && id.startsWith("font-size-")) {
+        state.fontSize = id.slice("font-size-".length);
+      } else {
+        return window.dash_clientside.no_update;
+      }
+      return state;
+    },
+
+    // Aplica el estado de accesibilidad: documento y controles del panel
+    applyAccessibility: function (state) {
+      state = state || {};
+      applyAccessibilityToDocument(state);
+
+      const toggleClass = (on) => (on ? "toggle-switch active" : "toggle-switch");
+      const display = (on) => ({ display: on ? "block" : "none" });
+      const option = (base, on) => (on ? `${base} active` : base);
+
+      return [
+        toggleClass(state.colorblind),
+        String(!!state.colorblind),
+        display(state.colorblind),
+        toggleClass(state.highContrast),
+        String(!!state.highContrast),
+        display(state.highContrast),
+        `${state.intensity}%`,
+        `${state.contrast}%`,
+      ]
+        .concat(
+          COLORBLIND_TYPES.map((t) =>
+            option("type-option", t === state.colorblindType)
+          )
+        )
+        .concat(FONT_SIZES.map((s) => option("size-option", s === state.fontSize)));
+    },
+
+    // Contrae o expande una sección (solo queda visible la cabecera)
+    toggleSection: function (nClicks, className) {
+      const classes = (className || "section-container").split(" ");
+      const collapsed = !classes.includes("collapsed");
+      const base = classes.filter((c) => c !== "collapsed");
+      return [
+        (collapsed ? base.concat("collapsed") : base).join(" "),
+        String(!collapsed),
+        collapsed ? "▸" : "▾",
+        collapsed ? "Expandir sección" : "Contraer sección",
+      ];
+    },
+
+    // Muestra u oculta la leyenda de un gráfico
+    toggleLegend: function (nClicks, figure) {
+      if (!figure) {
+        return [window.dash_clientside.no_update, window.dash_clientside.no_update];
+      }
+      const layout = figure.layout || {};
+      const visible = layout.showlegend === false;
+      return [
+        Object.assign({}, figure, {
+          layout: Object.assign({}, layout, { showlegend: visible }),
+        }),
+        String(visible),
+      ];
+    },
+  });
+})();
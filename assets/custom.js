@@ -9,7 +9,7 @@ document.addEventListener("DOMContentLoaded", function () {
   initializeMetricCards();
   initializeChartInteractions();
   addScrollEffects();
-  initializeAccessibilityPanel();
+  initializeAccessibilityShortcuts();
 });
 
 // Animaciones de entrada mejoradas para las tarjetas
@@ -184,460 +184,32 @@ function addScrollEffects() {
   });
 }
 
-// Inicializar panel de accesibilidad
-function initializeAccessibilityPanel() {
-  // Crear botón de accesibilidad (abre el panel) - LADO IZQUIERDO
-  const colorblindButton = document.createElement("button");
-  colorblindButton.id = "accessibility-toggle";
-  colorblindButton.innerHTML = "🎨";
-  colorblindButton.title = "Configuración de accesibilidad";
-  colorblindButton.style.cssText = `
-        position: fixed;
-        bottom: 30px;
-        left: 30px;
-        width: 60px;
-        height: 60px;
-        border-radius: 50%;
-        background: linear-gradient(135deg, #009988, #0077bb);
-        border: none;
-        color: white;
-        font-size: 28px;
-        cursor: pointer;
-        box-shadow: 0 4px 12px rgba(0, 119, 187, 0.3);
-        z-index: 1000;
-        transition: all 0.3s ease;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        animation: float 3s ease-in-out infinite;
-    `;
-
-  // Crear panel de configuración de accesibilidad
-  const panel = document.createElement("div");
-  panel.className = "accessibility-panel";
-  panel.innerHTML = `
-        <h3>Configuración de Accesibilidad</h3>
-        
-        <div class="panel-section">
-            <div class="toggle-switch" id="colorblind-toggle">
-                <span>Modo Daltónico</span>
-                <div class="switch"></div>
-            </div>
-        </div>
-        
-        <div class="panel-section" id="colorblind-options" style="display: none;">
-            <label>Tipo de Daltonismo</label>
-            <div class="colorblind-type-selector">
-                <div class="type-option active" data-type="protanopia">
-                    <span class="type-label">Protanopía</span>
-                    <span class="type-description">Rojo-Verde</span>
-                </div>
-                <div class="type-option" data-type="deuteranopia">
-                    <span class="type-label">Deuteranopía</span>
-                    <span class="type-description">Rojo-Verde</span>
-                </div>
-                <div class="type-option" data-type="tritanopia">
-                    <span class="type-label">Tritanopía</span>
-                    <span class="type-description">Azul-Amarillo</span>
-                </div>
-                <div class="type-option" data-type="achromatopsia">
-                    <span class="type-label">Acromatopsia</span>
-                    <span class="type-description">Sin color</span>
-                </div>
-            </div>
-            
-            <div class="intensity-slider-container">
-                <div class="intensity-value">
-                    <span>Intensidad del Ajuste</span>
-                    <span id="intensity-display">70%</span>
-                </div>
-                <input 
-                    type="range" 
-                    min="0" 
-                    max="100" 
-                    value="70" 
-                    class="intensity-slider" 
-                    id="intensity-slider"
-                >
-                <p class="info-text">Ajusta la intensidad de la corrección de color según tus necesidades</p>
-            </div>
-        </div>
-        
-        <div class="panel-section">
-            <div class="toggle-switch" id="highcontrast-toggle">
-                <span>Modo Alto Contraste</span>
-                <div class="switch"></div>
-            </div>
-        </div>
-        
-        <div class="panel-section" id="highcontrast-options" style="display: none;">
-            <label>Intensidad del Contraste</label>
-            <div class="intensity-slider-container">
-                <div class="intensity-value">
-                    <span>Nivel de Contraste</span>
-                    <span id="contrast-display">80%</span>
-                </div>
-                <input 
-                    type="range" 
-                    min="0" 
-                    max="100" 
-                    value="80" 
-                    class="intensity-slider contrast-slider" 
-                    id="contrast-slider"
-                >
-                <p class="info-text">Aumenta el contraste entre elementos para mejorar la legibilidad</p>
-            </div>
-            
-            <div class="contrast-preview">
-                <div class="preview-box" style="background: linear-gradient(135deg, #000000, #1e293b);">
-                    <span style="color: white;">Texto en alto contraste</span>
-                </div>
-            </div>
-        </div>
-        
-        <div class="panel-section">
-            <label>Tamaño de Letra</label>
-            <div class="font-size-selector">
-                <div class="size-option" data-size="small">
-                    <span class="size-icon" style="font-size: 14px;">A</span>
-                    <span class="size-label">Pequeño</span>
-                </div>
-                <div class="size-option active" data-size="normal">
-                    <span class="size-icon" style="font-size: 18px;">A</span>
-                    <span class="size-label">Normal</span>
-                </div>
-                <div class="size-option" data-size="large">
-                    <span class="size-icon" style="font-size: 22px;">A</span>
-                    <span class="size-label">Grande</span>
-                </div>
-                <div class="size-option" data-size="xlarge">
-                    <span class="size-icon" style="font-size: 26px;">A</span>
-                    <span class="size-label">Muy Grande</span>
-                </div>
-            </div>
-            <p class="info-text">Ajusta el tamaño del texto para mejorar la legibilidad</p>
-        </div>
-    `;
-
-  colorblindButton.addEventListener("mouseenter", function () {
-    this.style.transform = "scale(1.1) rotate(15deg)";
-  });
-
-  colorblindButton.addEventListener("mouseleave", function () {
-    this.style.transform = "scale(1) rotate(0deg)";
-  });
-
-  colorblindButton.addEventListener("click", function () {
-    panel.classList.toggle("visible");
-
-    // Animación de transición
-    this.style.transform = "scale(0.9) rotate(180deg)";
-    setTimeout(() => {
-      this.style.transform = "scale(1) rotate(0deg)";
-    }, 300);
-
-    // Manage focus trap
-    if (panel.classList.contains("visible")) {
-      setupFocusTrap(panel);
-    } else {
-      removeFocusTrap();
-    }
-  });
-
-  // Close panel with Escape key
+// Atajos de teclado del panel de accesibilidad (el panel y su estado los
+// gestionan los callbacks de cliente de clientside.js)
+function initializeAccessibilityShortcuts() {
+  // Cerrar el panel con Escape y devolver el foco al botón
   document.addEventListener("keydown", function (e) {
-    if (e.key === "Escape" && panel.classList.contains("visible")) {
-      panel.classList.remove("visible");
-      colorblindButton.focus(); // Return focus to trigger button
-    }
-  });
-
-  document.body.appendChild(colorblindButton);
-  document.body.appendChild(panel);
-
-  // Configurar interacciones del panel
-  setupAccessibilityPanel();
-}
-
-// Configurar el panel de accesibilidad
-function setupAccessibilityPanel() {
-  const colorblindToggle = document.getElementById("colorblind-toggle");
-  const colorblindOptions = document.getElementById("colorblind-options");
-  const highContrastToggle = document.getElementById("highcontrast-toggle");
-  const highContrastOptions = document.getElementById("highcontrast-options");
-  const typeOptions = document.querySelectorAll(".type-option");
-  const intensitySlider = document.getElementById("intensity-slider");
-  const intensityDisplay = document.getElementById("intensity-display");
-  const contrastSlider = document.getElementById("contrast-slider");
-  const contrastDisplay = document.getElementById("contrast-display");
-  const sizeOptions = document.querySelectorAll(".size-option");
-
-  let isColorblindMode = false;
-  let isHighContrastMode = false;
-  let currentType = "protanopia";
-  let currentIntensity = 70;
-  let currentContrast = 80;
-  let currentFontSize = "normal";
-
-  // Toggle del modo daltónico
-  colorblindToggle.addEventListener("click", function () {
-    const activeElement = document.activeElement;
-
-    this.classList.toggle("active");
-    isColorblindMode = !isColorblindMode;
-
-    if (isColorblindMode) {
-      colorblindOptions.style.display = "block";
-      applyColorblindMode(currentType, currentIntensity);
-    } else {
-      colorblindOptions.style.display = "none";
-      removeColorblindMode();
-    }
-
-    // Restore focus
-    setTimeout(() => {
-      if (activeElement && activeElement !== document.body) {
-        activeElement.focus();
-      }
-    }, 50);
-  });
-
-  // Toggle del modo alto contraste
-  highContrastToggle.addEventListener("click", function () {
-    const activeElement = document.activeElement;
-
-    this.classList.toggle("active");
-    isHighContrastMode = !isHighContrastMode;
-
-    if (isHighContrastMode) {
-      highContrastOptions.style.display = "block";
-      applyHighContrastMode(currentContrast);
-    } else {
-      highContrastOptions.style.display = "none";
-      removeHighContrastMode();
-    }
-
-    // Restore focus
-    setTimeout(() => {
-      if (activeElement && activeElement !== document.body) {
-        activeElement.focus();
-      }
-    }, 50);
-  });
-
-  // Selección de tipo de daltonismo
-  typeOptions.forEach((option) => {
-    option.addEventListener("click", function () {
-      typeOptions.forEach((opt) => opt.classList.remove("active"));
-      this.classList.add("active");
-      currentType = this.dataset.type;
-
-      if (isColorblindMode) {
-        applyColorblindMode(currentType, currentIntensity);
-      }
-    });
-  });
-
-  // Slider de intensidad daltonismo
-  intensitySlider.addEventListener("input", function () {
-    currentIntensity = parseInt(this.value);
-    intensityDisplay.textContent = currentIntensity + "%";
-
-    // Actualizar el fondo del slider
-    this.style.setProperty("--slider-value", currentIntensity + "%");
-
-    if (isColorblindMode) {
-      applyColorblindMode(currentType, currentIntensity);
-    }
-  });
-
-  // Inicializar el valor del slider
-  intensitySlider.style.setProperty("--slider-value", "70%");
-
-  // Slider de intensidad alto contraste
-  contrastSlider.addEventListener("input", function () {
-    currentContrast = parseInt(this.value);
-    contrastDisplay.textContent = currentContrast + "%";
-
-    // Actualizar el fondo del slider
-    this.style.setProperty("--slider-value", currentContrast + "%");
-
-    if (isHighContrastMode) {
-      applyHighContrastMode(currentContrast);
-    }
-  });
-
-  // Inicializar el valor del slider
-  contrastSlider.style.setProperty("--slider-value", "80%");
-
-  // Selección de tamaño de letra
-  sizeOptions.forEach((option) => {
-    option.addEventListener("click", function () {
-      sizeOptions.forEach((opt) => opt.classList.remove("active"));
-      this.classList.add("active");
-      currentFontSize = this.dataset.size;
-      applyFontSize(currentFontSize);
-    });
-  });
-}
-
-// Aplicar modo daltónico con tipo e intensidad
-function applyColorblindMode(type, intensity) {
-  // Remover clases previas
-  document.body.classList.remove(
-    "colorblind-protanopia",
-    "colorblind-deuteranopia",
-    "colorblind-tritanopia",
-    "colorblind-achromatopsia"
-  );
-
-  // Añadir clase específica
-  document.body.classList.add("colorblind-mode", `colorblind-${type}`);
-
-  // Aplicar intensidad mediante CSS filters
-  const intensityValue = intensity / 100; // Convertir de 0-100 a 0-1
-  const charts = document.querySelectorAll(".js-plotly-plot, .chart-card");
-
-  charts.forEach((chart) => {
-    // Calcular valores de filtro basados en el tipo y la intensidad
-    let filterValue = "";
-
-    switch (type) {
-      case "protanopia":
-      case "deuteranopia":
-        // Rojo-Verde: ajustar contraste y saturación
-        const contrast = 1 + 0.2 * intensityValue;
-        const saturate = 1 + 0.3 * intensityValue;
-        filterValue = `contrast(${contrast}) saturate(${saturate})`;
-        break;
-
-      case "tritanopia":
-        // Azul-Amarillo: ajustar contraste y brillo
-        const contrastT = 1 + 0.3 * intensityValue;
-        const brightness = 1 + 0.1 * intensityValue;
-        filterValue = `contrast(${contrastT}) brightness(${brightness})`;
-        break;
-
-      case "achromatopsia":
-        // Sin color: escala de grises con contraste
-        const grayscale = 0.7 * intensityValue;
-        const contrastA = 1 + 0.4 * intensityValue;
-        filterValue = `grayscale(${grayscale}) contrast(${contrastA})`;
-        break;
+    const panel = document.getElementById("accessibility-panel");
+    const button = document.getElementById("accessibility-toggle");
+    if (e.key === "Escape" && panel && panel.classList.contains("visible")) {
+      button.click();
+      button.focus();
     }
-
-    chart.style.filter = filterValue;
   });
 
-  // Actualizar colores de gráficos si es posible
-  updateChartsForColorblind(type, intensity);
-
-  console.log(`✓ Modo daltónico activado: ${type} al ${intensity}%`);
-}
-
-// Remover modo daltónico
-function removeColorblindMode() {
-  document.body.classList.remove(
-    "colorblind-mode",
-    "colorblind-protanopia",
-    "colorblind-deuteranopia",
-    "colorblind-tritanopia",
-    "colorblind-achromatopsia"
-  );
-
-  // Remover filtros aplicados
-  const charts = document.querySelectorAll(".js-plotly-plot, .chart-card");
-  charts.forEach((chart) => {
-    chart.style.filter = "";
-  });
-
-  resetChartColors();
-  console.log("✓ Modo daltónico desactivado");
-}
-
-// Actualizar colores de gráficos para modo daltónico
-function updateChartsForColorblind(type, intensity) {
-  // Define color palettes for each type
-  const colorPalettes = {
-    protanopia: ["#0077bb", "#ee7733", "#009988", "#cc3311", "#33bbee"],
-    deuteranopia: ["#0077bb", "#ee7733", "#009988", "#cc3311", "#33bbee"],
-    tritanopia: ["#cc3311", "#009988", "#0077bb", "#ee7733", "#33bbee"],
-    achromatopsia: ["#1e293b", "#64748b", "#334155", "#0f172a", "#475569"],
-  };
-
-  const colors = colorPalettes[type];
-  const graphs = document.querySelectorAll(".js-plotly-plot");
-
-  graphs.forEach((graph, index) => {
-    if (graph && graph.data) {
-      try {
-        // Intentar actualizar con Plotly si está disponible
-        if (window.Plotly) {
-          const update = {
-            "marker.color": colors,
-            "line.color": colors[0],
-          };
-          window.Plotly.restyle(graph, update);
-        }
-      } catch (e) {
-        console.log("Gráfico se actualizará en la próxima interacción");
-      }
+  // Activar interruptores y opciones con Enter o Espacio
+  document.addEventListener("keydown", function (e) {
+    if (e.key !== "Enter" && e.key !== " ") return;
+    const control = e.target.closest(
+      ".accessibility-panel .toggle-switch, .type-option, .size-option"
+    );
+    if (control) {
+      e.preventDefault();
+      control.click();
     }
   });
 }
 
-// Restablecer colores originales
-function resetChartColors() {
-  console.log("✓ Colores originales restaurados");
-}
-
-// Aplicar modo alto contraste
-function applyHighContrastMode(intensity) {
-  document.body.classList.add("high-contrast-mode");
-
-  // Aplicar intensidad mediante CSS filters
-  const intensityValue = intensity / 100;
-  const contrast = 1 + 0.8 * intensityValue; // De 1.0 a 1.8
-  const brightness = 1 + 0.15 * intensityValue; // De 1.0 a 1.15
-  const saturate = 1 + 0.25 * intensityValue; // De 1.0 a 1.25
-
-  const container = document.querySelector(".container");
-  if (container) {
-    container.style.filter = `contrast(${contrast}) brightness(${brightness}) saturate(${saturate})`;
-  }
-
-  console.log(`✓ Modo alto contraste activado: ${intensity}%`);
-}
-
-// Remover modo alto contraste
-function removeHighContrastMode() {
-  document.body.classList.remove("high-contrast-mode");
-
-  // Remover filtros aplicados
-  const container = document.querySelector(".container");
-  if (container) {
-    container.style.filter = "";
-  }
-
-  console.log("✓ Modo alto contraste desactivado");
-}
-
-// Aplicar tamaño de letra
-function applyFontSize(size) {
-  // Remover clases previas
-  document.body.classList.remove(
-    "font-small",
-    "font-normal",
-    "font-large",
-    "font-xlarge"
-  );
-
-  // Añadir nueva clase
-  document.body.classList.add(`font-${size}`);
-
-  console.log(`✓ Tamaño de letra ajustado: ${size}`);
-}
-
 // Añadir contador animado a los valores de las métricas
 function animateValue(element, start, end, duration) {
   let startTimestamp = null;
@@ -662,13 +234,6 @@ const graphObserver = new MutationObserver((mutations) => {
           // Asegurar que el gráfico sea visible
           node.style.opacity = "1";
           node.style.transform = "translateY(0)";
-
-          // Aplicar tema oscuro si está activado
-          if (document.body.classList.contains("dark-mode")) {
-            setTimeout(() => {
-              updateAllChartsTheme("dark");
-            }, 100);
-          }
         }
       });
     }
@@ -699,48 +264,6 @@ function addTooltips() {
 // Ejecutar tooltips después de que el DOM se cargue
 setTimeout(addTooltips, 500);
 
-// Setup external dark mode toggle button
-function setupDarkModeButton() {
-  const darkModeBtn = document.getElementById("dark-mode-toggle-btn");
-  if (!darkModeBtn) {
-    console.log("Dark mode button not found, retrying...");
-    return;
-  }
-
-  let isDarkMode = false;
-
-  // Update button icon based on theme
-  function updateButtonIcon() {
-    darkModeBtn.textContent = isDarkMode ? "☀️" : "🌙";
-    darkModeBtn.title = isDarkMode
-      ? "Cambiar a modo claro"
-      : "Cambiar a modo oscuro";
-  }
-
-  // Toggle dark mode
-  darkModeBtn.addEventListener("click", function (e) {
-    e.preventDefault();
-    e.stopPropagation();
-
-    isDarkMode = !isDarkMode;
-
-    if (isDarkMode) {
-      applyDarkMode();
-    } else {
-      removeDarkMode();
-    }
-
-    updateButtonIcon();
-
-    console.log("✓ Dark mode toggled:", isDarkMode ? "ON" : "OFF");
-  });
-
-  // Initialize icon
-  updateButtonIcon();
-
-  console.log("✓ Dark mode button initialized");
-}
-
 // Añadir indicador de carga
 window.addEventListener("load", function () {
   // Ocultar cualquier indicador de carga si existe
@@ -807,149 +330,6 @@ function removeFocusTrap() {
   }
 }
 
-// ===================================
-// DARK MODE FUNCTIONS
-// ===================================
-
-function applyDarkMode() {
-  // Aplicar clase dark-mode al body
-  document.body.classList.add("dark-mode");
-
-  // Actualizar todos los gráficos de Plotly con tema oscuro
-  updateAllChartsTheme("dark");
-
-  console.log("✓ Modo oscuro activado");
-}
-
-function removeDarkMode() {
-  // Remover clase dark-mode del body
-  document.body.classList.remove("dark-mode");
-
-  // Restaurar todos los gráficos de Plotly con tema claro
-  updateAllChartsTheme("light");
-
-  console.log("✓ Modo oscuro desactivado");
-}
-
-function updateAllChartsTheme(theme) {
-  const graphs = document.querySelectorAll(".js-plotly-plot");
-
-  if (!window.Plotly) {
-    console.log(
-      "Plotly no está disponible aún, los gráficos se actualizarán en la próxima recarga"
-    );
-    return;
-  }
-
-  graphs.forEach((graph) => {
-    try {
-      if (graph && graph.data && graph.layout) {
-        const isDark = theme === "dark";
-
-        // Colores del tema
-        const colors = {
-          background: isDark ? "rgba(30, 41, 59, 0)" : "rgba(255,255,255,0)",
-          plot_bg: isDark ? "rgba(15, 23, 42, 0.3)" : "rgba(248,250,252,0.5)",
-          text: isDark ? "#cbd5e1" : "#1e293b",
-          title: isDark ? "#f1f5f9" : "#0f172a",
-          grid: isDark ? "rgba(71, 85, 105, 0.3)" : "#e2e8f0",
-          legend_bg: isDark ? "rgba(30, 41, 59, 0.9)" : "rgba(255,255,255,0.9)",
-          legend_border: isDark ? "#475569" : "#e2e8f0",
-        };
-
-        // Actualizar layout del gráfico
-        const layoutUpdate = {
-          paper_bgcolor: colors.background,
-          plot_bgcolor: colors.plot_bg,
-          font: {
-            color: colors.text,
-            family: "system-ui, -apple-system, sans-serif",
-            size: 11,
-          },
-          title: {
-            font: {
-              color: colors.title,
-              size: 14,
-              family: "system-ui, -apple-system, sans-serif",
-            },
-          },
-          xaxis: {
-            gridcolor: colors.grid,
-            color: colors.text,
-          },
-          yaxis: {
-            gridcolor: colors.grid,
-            color: colors.text,
-          },
-          legend: {
-            bgcolor: colors.legend_bg,
-            bordercolor: colors.legend_border,
-            font: {
-              color: colors.text,
-            },
-          },
-          hoverlabel: {
-            bgcolor: isDark ? "#1e293b" : "white",
-            font: {
-              color: isDark ? "#e2e8f0" : "#1e293b",
-              size: 11,
-              family: "system-ui, -apple-system, sans-serif",
-            },
-          },
-        };
-
-        // Aplicar actualización
-        window.Plotly.relayout(graph, layoutUpdate);
-
-        // Actualizar ejes si existen múltiples
-        const axisUpdates = {};
-        Object.keys(graph.layout).forEach((key) => {
-          if (key.startsWith("xaxis") || key.startsWith("yaxis")) {
-            axisUpdates[key + ".gridcolor"] = colors.grid;
-            axisUpdates[key + ".color"] = colors.text;
-          }
-        });
-
-        if (Object.keys(axisUpdates).length > 0) {
-          window.Plotly.relayout(graph, axisUpdates);
-        }
-      }
-    } catch (e) {
-      console.log("Error actualizando gráfico:", e);
-    }
-  });
-
-  console.log(`✓ ${graphs.length} gráficos actualizados al tema ${theme}`);
-}
-
-// Initialize dark mode button when DOM is ready
-function initDarkModeWithRetry() {
-  let attempts = 0;
-  const maxAttempts = 10;
-
-  function trySetup() {
-    attempts++;
-    const btn = document.getElementById("dark-mode-toggle-btn");
-
-    if (btn) {
-      setupDarkModeButton();
-    } else if (attempts < maxAttempts) {
-      console.log(`Waiting for dark mode button... (attempt ${attempts})`);
-      setTimeout(trySetup, 200);
-    } else {
-      console.log("Dark mode button not found after max attempts");
-    }
-  }
-
-  trySetup();
-}
-
-// Start initialization
-if (document.readyState === "loading") {
-  document.addEventListener("DOMContentLoaded", initDarkModeWithRetry);
-} else {
-  // DOM already loaded, try immediately
-  setTimeout(initDarkModeWithRetry, 100);
-}
+// El modo oscuro lo gestiona el motor de temas de cliente (clientside.js)
 
 console.log("✅ Dashboard JavaScript inicializado correctamente");
@@ -0,0 +1,148 @@
+"""
+Benchmark: motores de cálculo pandas, Arrow y Polars sobre datos sintéticos.
+
+Para cada tamaño (1M y 10M filas por defecto) y cada motor instalado mide:
+
+- carga: procesamiento de las páginas de ORDS (registros JSON de 20000
+  filas) con el `PageSpec` de diagnóstico vs sexo, en filas por segundo; las
+  páginas se generan al vuelo y su generación no se cuenta
+- conteo: `count_categories` de diagnóstico × sexo sobre el DataFrame en
+  memoria
+- troceado: el mismo conteo y la media de una columna numérica sobre el
+  dataset troceado en Parquet (modo fuera de memoria)
+
+Uso:
+    uv run python benchmarks/bench_compute_backends.py [filas ...]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# La configuración se valida al importar; el benchmark no contacta con ORDS
+for var in ("ORDS_BASE_URL", "ORDS_USERNAME", "ORDS_PASSWORD"):
+    os.environ.setdefault(var, "benchmark")
+os.environ["SPILL_DIR"] = tempfile.mkdtemp(prefix="spill-bench-")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data import backends  # noqa: E402
+from src.data.aggregations import count_categories  # noqa: E402
+from src.data.backends import (  # noqa: E402
+    COMPUTE_BACKENDS,
+    PageSpec,
+    backend_available,
+    create_backend,
+)
+from src.data.spill import SpilledDataset, register_spilled  # noqa: E402
+from src.data.versioning import register_dataset  # noqa: E402
+
+PAGE_ROWS = 20000
+DIAGNOSTICOS = np.array([f"DIAGNÓSTICO {i:03d}" for i in range(300)], dtype=object)
+
+SPEC = PageSpec(
+    numeric=["sexo"],
+    labels={"sexo_label": ("sexo", {1: "Masculino", 2: "Femenino"})},
+    required=["diagnostico_principal", "sexo"],
+)
+
+
+def _pages(rows: int, seed: int = 0):
+    """Páginas de registros como las de ORDS (con algún sexo nulo o inválido)"""
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, PAGE_ROWS):
+        size = min(PAGE_ROWS, rows - start)
+        sexo = rng.choice([1, 2, 3, None], size, p=[0.49, 0.49, 0.01, 0.01])
+        yield start, [
+            {"diagnostico_principal": d, "sexo": s, "peso_espanol_apr": p}
+            for d, s, p in zip(
+                DIAGNOSTICOS[rng.integers(0, len(DIAGNOSTICOS), size)].tolist(),
+                sexo.tolist(),
+                rng.gamma(2.0, 0.5, size).round(4).tolist(),
+            )
+        ]
+
+
+def _frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """DataFrame ya procesado (las cadenas se comparten entre filas)"""
+    rng = np.random.default_rng(seed)
+    sexo = rng.integers(1, 3, rows).astype(np.float64)
+    df = pd.DataFrame(
+        {
+            "diagnostico_principal": DIAGNOSTICOS[rng.integers(0, 300, rows)],
+            "sexo": sexo,
+            "sexo_label": np.array([None, "Masculino", "Femenino"], dtype=object)[
+                sexo.astype(np.intp)
+            ],
+            "peso_espanol_apr": rng.gamma(2.0, 0.5, rows).round(4),
+        }
+    )
+    register_dataset(df, f"benchmark-{rows}")
+    return df
+
+
+def _spill(df: pd.DataFrame) -> pd.DataFrame:
+    """Trocea un DataFrame en Parquet y devuelve su muestra versionada"""
+    spilled = SpilledDataset.create("benchmark")
+    for start in range(0, len(df), PAGE_ROWS):
+        spilled.append(df.iloc[start : start + PAGE_ROWS], 64 * 1024 * 1024)
+    spilled.finish()
+    sample = df.iloc[:PAGE_ROWS].copy()
+    register_dataset(sample, f"benchmark-spilled-{len(df)}", spilled.fingerprint)
+    register_spilled(sample, spilled)
+    return sample
+
+
+def _timed(func) -> float:
+    """Segundos de una llamada"""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _load(backend, rows: int) -> float:
+    """Segundos de procesar todas las páginas (sin contar su generación)"""
+    return sum(
+        _timed(lambda: backend.process_page(items, SPEC, start))
+        for start, items in _pages(rows)
+    )
+
+
+def main(sizes=(1_000_000, 10_000_000)):
+    names = [name for name in COMPUTE_BACKENDS if backend_available(name)]
+    missing = sorted(set(COMPUTE_BACKENDS) - set(names))
+    if missing:
+        print(f"motores no instalados: {', '.join(missing)}")
+
+    header = f"{'filas':>12} {'motor':<8}{'carga (filas/s)':>17}"
+    print(header + f"{'conteo (ms)':>13}{'troceado (ms)':>15}{'media (ms)':>12}")
+    for rows in sizes:
+        df = _frame(rows)
+        sample = _spill(df)
+        for name in names:
+            # count_categories usa el motor global (column_stats se cachea
+            # por versión, así que se llama al motor directamente)
+            backend = backends._backend_instance = create_backend(name)
+            load = rows / _load(backend, rows)
+            count = _timed(
+                lambda: count_categories(df, "diagnostico_principal", "sexo_label")
+            )
+            spilled = _timed(
+                lambda: count_categories(sample, "diagnostico_principal", "sexo_label")
+            )
+            mean = _timed(lambda: backend.column_stats(sample, "peso_espanol_apr"))
+            print(
+                f"{rows:>12,} {name:<8}{load:>17,.0f}"
+                f"{count * 1000:>13.1f}{spilled * 1000:>15.1f}{mean * 1000:>12.1f}"
+            )
+
+    shutil.rmtree(os.environ["SPILL_DIR"], ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or (1_000_000, 10_000_000))
@@ -0,0 +1,149 @@
+"""
+Microbenchmark: tamaño de las respuestas del filtro cruzado con figuras
+completas frente a parches parciales (`dash.Patch`).
+
+Aplica una secuencia de clics de filtro cruzado sobre datasets sintéticos y
+mide, para cada paso, los bytes JSON que se enviarían al navegador con las
+figuras completas y con los parches que solo sustituyen los arrays de datos
+que cambian.
+
+Uso:
+    uv run python benchmarks/bench_cross_filter_patch.py [filas]
+"""
+
+import json
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+# La configuración se valida al importar; el benchmark no contacta con ORDS
+for var in ("ORDS_BASE_URL", "ORDS_USERNAME", "ORDS_PASSWORD"):
+    os.environ.setdefault(var, "benchmark")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plotly.utils import PlotlyJSONEncoder  # noqa: E402
+
+from src.callbacks.cross_filter import (  # noqa: E402
+    SECTIONS,
+    _with_theme,
+    compute_section,
+    figure_update,
+)
+from src.data import get_data_loader  # noqa: E402
+
+DIAGNOSTICOS = [f"DIAGNÓSTICO {i:02d}" for i in range(40)]
+EDADES = ["0-17", "18-34", "35-49", "50-64", "65-79", "+80"]
+
+
+def _frames(rows: int, seed: int = 0) -> dict:
+    """DataFrames sintéticos con las columnas ya procesadas de cada vista"""
+    rng = np.random.default_rng(seed)
+    weights = rng.dirichlet(np.ones(len(DIAGNOSTICOS)))
+
+    diagnosticos = pd.DataFrame(
+        {
+            "nombre_enc": np.arange(rows).astype(str),
+            "rango_de_edad": rng.choice(EDADES, rows),
+            "diagnostico_principal": rng.choice(DIAGNOSTICOS, rows, p=weights),
+            "mes_de_ingreso": rng.choice([f"2024-{m:02d}" for m in range(1, 13)], rows),
+        }
+    )
+    sexo = pd.DataFrame(
+        {
+            "diagnostico_principal": rng.choice(DIAGNOSTICOS, rows, p=weights),
+            "sexo": rng.integers(1, 3, rows),
+        }
+    )
+    sexo["sexo_label"] = sexo["sexo"].map({1: "Masculino", 2: "Femenino"})
+    severidad = pd.DataFrame(
+        {
+            "nivel_severidad_apr": rng.integers(1, 5, rows),
+            "riesgo_mortalidad_apr": rng.integers(1, 5, rows),
+        }
+    )
+    severidad["severidad_label"] = severidad["nivel_severidad_apr"].map(
+        {1: "Leve", 2: "Moderado", 3: "Grave", 4: "Extremo"}
+    )
+    severidad["mortalidad_label"] = severidad["riesgo_mortalidad_apr"].map(
+        {1: "Bajo", 2: "Moderado", 3: "Alto", 4: "Extremo"}
+    )
+    peso = pd.DataFrame({"peso_espanol_apr": rng.gamma(2.0, 0.5, rows).round(4)})
+    peso["estancia_dias"] = rng.integers(1, 60, rows)
+
+    # Claves del caché del DataLoader (endpoint de cada vista)
+    return {
+        "endpoint_vista_muy_interesante": diagnosticos,
+        "endpoint_diagnostico principal vs sexo": sexo,
+        "endpoint_severidad_apr vs mortadilad_apr": severidad,
+        "endpoint_peso_vs_estancia": peso,
+    }
+
+
+def _size(outputs: list) -> int:
+    return len(json.dumps(outputs, cls=PlotlyJSONEncoder))
+
+
+def _responses(previous: dict, filters: dict, theme: str):
+    """Figuras completas y actualizaciones parciales de un paso"""
+    full, partial = [], []
+    for section in SECTIONS:
+        figures = compute_section(section, filters)[0]
+        before = compute_section(section, previous)[0]
+        full += [_with_theme(figure, theme) for figure in figures]
+        partial += [
+            figure_update(old, new, theme) for old, new in zip(before, figures)
+        ]
+    return full, partial
+
+
+def main(rows: int = 100_000, theme: str = "dark"):
+    get_data_loader().install(_frames(rows))
+
+    top = DIAGNOSTICOS[0]
+    steps = [
+        {"diagnostico_principal": [top]},
+        {"diagnostico_principal": [top], "severidad_label": ["Grave"]},
+        {"severidad_label": ["Grave"]},
+        {"severidad_label": ["Grave"], "sexo_label": ["Femenino"]},
+        {},
+    ]
+
+    print(f"{rows:,} filas, tema {theme}")
+    print(f"{'paso':<6}{'completo (B)':>14}{'parche (B)':>12}{'reducción':>12}")
+    previous: dict = {}
+    total_full = total_patch = 0
+    for number, filters in enumerate(steps, 1):
+        full, partial = _responses(previous, filters, theme)
+        full_size, patch_size = _size(full), _size(partial)
+        total_full += full_size
+        total_patch += patch_size
+        print(
+            f"{number:<6}{full_size:>14,}{patch_size:>12,}"
+            f"{full_size / patch_size:>11.1f}x"
+        )
+        previous = filters
+
+    print(
+        f"{'total':<6}{total_full:>14,}{total_patch:>12,}"
+        f"{total_full / total_patch:>11.1f}x"
+    )
+
+    # Coste de calcular el parche con las secciones ya en caché
+    ms = (
+        min(
+            timeit.repeat(
+                lambda: _responses(steps[0], steps[1], theme), number=10, repeat=3
+            )
+        )
+        / 10
+        * 1000
+    )
+    print(f"cálculo del parche (secciones en caché): {ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,103 @@
+"""
+Microbenchmark: plotly express frente a los constructores rápidos de figuras.
+
+Mide el tiempo por figura de `px.bar`, `px.pie` y `px.line` frente a
+`bar_figure`, `pie_figure` y `line_figure` sobre DataFrames agregados del
+tamaño que usa el dashboard.
+
+Uso:
+    uv run python benchmarks/bench_fast_charts.py
+"""
+
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+# La configuración se valida al importar; el benchmark no contacta con ORDS
+for var in ("ORDS_BASE_URL", "ORDS_USERNAME", "ORDS_PASSWORD"):
+    os.environ.setdefault(var, "benchmark")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.components.fast_charts import bar_figure, line_figure, pie_figure  # noqa: E402
+
+
+def _frames(seed: int = 0):
+    rng = np.random.default_rng(seed)
+    top = pd.DataFrame(
+        {
+            "diagnostico_principal": [f"DIAGNÓSTICO {i:02d}" for i in range(10)],
+            "count": np.sort(rng.integers(100, 5000, 10))[::-1],
+        }
+    )
+    edad = pd.DataFrame(
+        {
+            "rango_de_edad": [f"{i * 5}-{i * 5 + 4}" for i in range(18)],
+            "count": rng.integers(100, 5000, 18),
+        }
+    )
+    meses = pd.DataFrame(
+        {
+            "mes_de_ingreso": [f"2024-{m:02d}" for m in range(1, 13)],
+            "count": rng.integers(100, 5000, 12),
+        }
+    )
+    return top, edad, meses
+
+
+def main(number: int = 50):
+    top, edad, meses = _frames()
+    ages = list(edad["rango_de_edad"])
+
+    cases = {
+        "bar": (
+            lambda: px.bar(
+                top,
+                x="count",
+                y="diagnostico_principal",
+                orientation="h",
+                color="diagnostico_principal",
+            ),
+            lambda: bar_figure(
+                top,
+                x="count",
+                y="diagnostico_principal",
+                orientation="h",
+                color="diagnostico_principal",
+            ),
+        ),
+        "pie": (
+            lambda: px.pie(
+                edad,
+                values="count",
+                names="rango_de_edad",
+                hole=0.4,
+                category_orders={"rango_de_edad": ages},
+            ),
+            lambda: pie_figure(
+                edad,
+                values="count",
+                names="rango_de_edad",
+                hole=0.4,
+                category_orders={"rango_de_edad": ages},
+            ),
+        ),
+        "line": (
+            lambda: px.line(meses, x="mes_de_ingreso", y="count", markers=True),
+            lambda: line_figure(meses, x="mes_de_ingreso", y="count", markers=True),
+        ),
+    }
+
+    print(f"{'figura':<8}{'px (ms)':>12}{'rápido (ms)':>14}{'aceleración':>14}")
+    for name, (slow, fast) in cases.items():
+        slow_ms = min(timeit.repeat(slow, number=number, repeat=3)) / number * 1000
+        fast_ms = min(timeit.repeat(fast, number=number, repeat=3)) / number * 1000
+        print(f"{name:<8}{slow_ms:>12.3f}{fast_ms:>14.3f}{slow_ms / fast_ms:>13.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Microbenchmark: filtros de DataTable con pandas frente al compilador vectorizado.
+
+Mide el tiempo por consulta de expresiones `filter_query` típicas de la tabla
+de peso/estancia sobre un dataset sintético (un millón de filas por defecto),
+con los índices de columna ya construidos, frente a la máscara equivalente
+escrita a mano con pandas.
+
+Uso:
+    uv run python benchmarks/bench_filter_query.py [filas]
+"""
+
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+# La configuración se valida al importar; el benchmark no contacta con ORDS
+for var in ("ORDS_BASE_URL", "ORDS_USERNAME", "ORDS_PASSWORD"):
+    os.environ.setdefault(var, "benchmark")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data.filter_query import filter_mask  # noqa: E402
+from src.data.versioning import register_dataset  # noqa: E402
+
+
+def _frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "peso_espanol_apr": rng.gamma(2.0, 0.5, rows).round(4),
+            "estancia_dias": rng.integers(0, 60, rows),
+            "sexo_label": rng.choice(["Masculino", "Femenino"], rows),
+        }
+    )
+    register_dataset(df, "benchmark")
+    return df
+
+
+def main(rows: int = 1_000_000, number: int = 20):
+    df = _frame(rows)
+
+    cases = {
+        "rango": (
+            "{estancia_dias} > 30 && {peso_espanol_apr} < 1",
+            lambda: (df["estancia_dias"] > 30) & (df["peso_espanol_apr"] < 1),
+        ),
+        "igualdad": (
+            "{sexo_label} = Femenino",
+            lambda: df["sexo_label"] == "Femenino",
+        ),
+        "mixto": (
+            "{estancia_dias} >= 45 || ({sexo_label} = Masculino && {peso_espanol_apr} ge 2)",
+            lambda: (df["estancia_dias"] >= 45)
+            | ((df["sexo_label"] == "Masculino") & (df["peso_espanol_apr"] >= 2)),
+        ),
+    }
+
+    print(f"{rows:,} filas")
+    print(f"{'filtro':<10}{'pandas (ms)':>14}{'compilado (ms)':>17}{'aceleración':>14}")
+    for name, (query, pandas_mask) in cases.items():
+        # Primera evaluación: compila la expresión y construye los índices
+        assert (filter_mask(df, query) == pandas_mask().to_numpy()).all()
+
+        slow_ms = min(timeit.repeat(pandas_mask, number=number, repeat=3)) / number * 1000
+        fast_ms = (
+            min(timeit.repeat(lambda: filter_mask(df, query), number=number, repeat=3))
+            / number
+            * 1000
+        )
+        print(f"{name:<10}{slow_ms:>14.3f}{fast_ms:>17.3f}{slow_ms / fast_ms:>13.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
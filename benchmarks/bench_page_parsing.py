@@ -0,0 +1,130 @@
+"""
+Benchmark: decodificación de páginas de ORDS en el worker frente al pool.
+
+Decodifica páginas JSON sintéticas de 20000 filas (como las de la vista de
+diagnósticos) desde tantos hilos como procesos tenga el pool, simulando
+descargas en paralelo, y mide:
+
+- páginas/s y filas/s: rendimiento total según el número de procesos
+- bloqueo: la mayor espera de un hilo que solo duerme 1 ms (lo que tardaría
+  en atenderse otra petición del mismo worker mientras se decodifica)
+
+La fila "worker" decodifica en el propio proceso (`PARSE_WORKERS=0`).
+
+Uso:
+    uv run python benchmarks/bench_page_parsing.py [páginas] [procesos_max]
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# La configuración se valida al importar; el benchmark no contacta con ORDS
+for var in ("ORDS_BASE_URL", "ORDS_USERNAME", "ORDS_PASSWORD"):
+    os.environ.setdefault(var, "benchmark")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data import page_parser  # noqa: E402
+from src.data.page_parser import parse_page  # noqa: E402
+from src.utils.config import Config  # noqa: E402
+
+PAGE_ROWS = 20000
+EDADES = ["0-17", "18-34", "35-49", "50-64", "65-79", "+80"]
+
+
+def _pages(count: int, seed: int = 0):
+    """Cuerpos JSON de páginas de la vista de diagnósticos"""
+    rng = np.random.default_rng(seed)
+    pages = []
+    for page in range(count):
+        start = page * PAGE_ROWS
+        items = [
+            {
+                "nombre_enc": f"ENC{start + i:08d}",
+                "rango_de_edad": EDADES[edad],
+                "diagnostico_principal": f"DIAGNÓSTICO {diagnostico:03d}",
+                "mes_de_ingreso": f"2024-{mes:02d}",
+            }
+            for i, (edad, diagnostico, mes) in enumerate(
+                zip(
+                    rng.integers(0, len(EDADES), PAGE_ROWS).tolist(),
+                    rng.integers(0, 300, PAGE_ROWS).tolist(),
+                    rng.integers(1, 13, PAGE_ROWS).tolist(),
+                )
+            )
+        ]
+        body = {"items": items, "hasMore": page < count - 1}
+        pages.append(json.dumps(body).encode())
+    return pages
+
+
+class Heartbeat(threading.Thread):
+    """Hilo que duerme 1 ms en bucle y registra su mayor retraso"""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.stop = threading.Event()
+        self.worst = 0.0
+
+    def run(self):
+        while not self.stop.is_set():
+            start = time.perf_counter()
+            time.sleep(0.001)
+            self.worst = max(self.worst, time.perf_counter() - start - 0.001)
+
+
+def _run(pages, workers: int, threads: int):
+    """Decodifica todas las páginas; devuelve (segundos, mayor bloqueo)"""
+    Config.PARSE_WORKERS = workers
+    page_parser._discard_executor()
+    parse_page(pages[0])  # arranca el pool fuera de la medida
+
+    heartbeat = Heartbeat()
+    heartbeat.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        rows = sum(len(page) for page in pool.map(parse_page, pages))
+    elapsed = time.perf_counter() - start
+    heartbeat.stop.set()
+    heartbeat.join()
+
+    assert rows == len(pages) * PAGE_ROWS
+    return elapsed, heartbeat.worst
+
+
+def main(count: int = 32, max_workers: int = 0):
+    max_workers = max_workers or os.cpu_count() or 1
+    pages = _pages(count)
+    size = sum(len(page) for page in pages) / len(pages) / 2**20
+    print(f"{count} páginas de {PAGE_ROWS:,} filas (~{size:.1f} MB)", end=", ")
+    print(f"{os.cpu_count()} CPU")
+
+    counts = sorted({1, max_workers} | {2**i for i in range(8) if 2**i < max_workers})
+    modes = [("worker", 0, 1)] + [(f"pool x{n}", n, n) for n in counts]
+
+    header = f"{'modo':<10}{'páginas/s':>11}{'filas/s':>13}{'bloqueo (ms)':>15}"
+    print(header + f"{'escalado':>10}")
+    base = None
+    for name, workers, threads in modes:
+        elapsed, worst = _run(pages, workers, threads)
+        rate = count / elapsed
+        base = base or rate
+        print(
+            f"{name:<10}{rate:>11.1f}{rate * PAGE_ROWS:>13,.0f}"
+            f"{worst * 1000:>15.1f}{rate / base:>9.2f}x"
+        )
+
+    page_parser._discard_executor()
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 32,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 0,
+    )
@@ -0,0 +1,183 @@
+"""
+Comprobación: el modo fuera de memoria respeta el límite de memoria por worker.
+
+Descarga con un cliente ORDS sintético (las páginas se generan al vuelo, sin
+guardar el dataset) una vista de diagnósticos y otra de peso y estancia con
+`OUT_OF_CORE` activado, calcula los agregados de las secciones, una vista del
+filtro cruzado y una exportación filtrada, y mide el pico de memoria del
+proceso durante todo el recorrido: asignaciones de Python y NumPy
+(tracemalloc) más el pool de memoria de Arrow. Falla si el pico supera
+`WORKER_MEMORY_MB` o si algún agregado no coincide con los conteos exactos
+acumulados al generar las páginas.
+
+Uso:
+    uv run python benchmarks/check_out_of_core_memory.py [filas] [límite_mb]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+import numpy as np
+
+# La configuración se valida al importar; la comprobación no contacta con ORDS
+for var in ("ORDS_BASE_URL", "ORDS_USERNAME", "ORDS_PASSWORD"):
+    os.environ.setdefault(var, "benchmark")
+
+# El modo y el límite se leen al importar la configuración
+LIMIT_MB = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+os.environ["OUT_OF_CORE"] = "true"
+os.environ["WORKER_MEMORY_MB"] = str(LIMIT_MB)
+os.environ["SPILL_DIR"] = tempfile.mkdtemp(prefix="spill-check-")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyarrow as pa  # noqa: E402
+
+from src.data.aggregations import column_stats, count_cube  # noqa: E402
+from src.data.data_loader import DataLoader  # noqa: E402
+from src.data.exports import iter_view  # noqa: E402
+from src.data.quantiles import WEIGHT_BAND_LABELS, WEIGHT_BANDS  # noqa: E402
+from src.data.quantiles import stay_by_weight_band  # noqa: E402
+from src.data.spill import dataset_rows, filter_spilled, get_spilled  # noqa: E402
+from src.data.table_queries import query_table  # noqa: E402
+
+DIAGNOSTICOS = [f"DIAGNÓSTICO {i:03d}" for i in range(300)]
+EDADES = ["0-17", "18-34", "35-49", "50-64", "65-79", "+80"]
+MESES = [f"2024-{m:02d}" for m in range(1, 13)]
+
+
+class SyntheticClient:
+    """Cliente ORDS que genera páginas al vuelo y acumula los conteos exactos"""
+
+    def __init__(self, rows: int, seed: int = 0):
+        self.rows = rows
+        self.seed = seed
+        self.expected: dict = {}
+
+    def iter_pages(self, endpoint: str, limit: int = 20000, max_records=None):
+        rng = np.random.default_rng(self.seed)
+        expected = self.expected.setdefault(
+            endpoint,
+            {
+                "edad": Counter(),
+                "mes": Counter(),
+                "edad_mes": Counter(),
+                "bandas": Counter(),
+            },
+        )
+        expected.update(estancia_suma=0.0, estancia_casos=0)
+        for start in range(0, self.rows, limit):
+            size = min(limit, self.rows - start)
+            if endpoint == "vista_muy_interesante":
+                page = {
+                    "nombre_enc": np.arange(start, start + size).astype(str),
+                    "rango_de_edad": rng.choice(EDADES, size),
+                    "diagnostico_principal": rng.choice(DIAGNOSTICOS, size),
+                    "mes_de_ingreso": rng.choice(MESES, size),
+                }
+                expected["edad"].update(page["rango_de_edad"].tolist())
+                expected["mes"].update(page["mes_de_ingreso"].tolist())
+                expected["edad_mes"].update(
+                    zip(page["rango_de_edad"].tolist(), page["mes_de_ingreso"].tolist())
+                )
+            else:
+                weights = rng.gamma(2.0, 0.5, size).round(4)
+                stays = rng.integers(1, 60, size)
+                page = {"peso_espanol_apr": weights, "estancia_dias": stays}
+                expected["estancia_suma"] += float(stays.sum())
+                expected["estancia_casos"] += size
+                bands = np.searchsorted(WEIGHT_BANDS, weights, side="right") - 1
+                expected["bandas"].update(bands.tolist())
+            columns = list(page)
+            yield [dict(zip(columns, row)) for row in zip(*page.values())]
+
+
+def _arrow_peak() -> int:
+    """Pico del pool de memoria de Arrow (0 si el pool no lo registra)"""
+    return max(pa.default_memory_pool().max_memory() or 0, 0)
+
+
+def main(rows: int = 1_000_000):
+    client = SyntheticClient(rows)
+    loader = DataLoader(client=client)
+    limit = LIMIT_MB * 1024 * 1024
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+
+    diagnosticos = loader.fetch_dataset("diagnosticos")
+    peso = loader.fetch_dataset("peso_estancia")
+    edades = count_cube(diagnosticos, "rango_de_edad").value_counts()
+    meses = count_cube(diagnosticos, "mes_de_ingreso").value_counts()
+    top = count_cube(diagnosticos, "diagnostico_principal").top_counts(10)
+    estancia = column_stats(peso, "estancia_dias")
+    bandas = stay_by_weight_band(peso).summary(order=WEIGHT_BAND_LABELS)
+    pagina, paginas = query_table(
+        diagnosticos,
+        3,
+        25,
+        [{"column_id": "diagnostico_principal", "direction": "desc"}],
+        "{rango_de_edad} = 18-34",
+    )
+
+    # Filtro cruzado y exportación filtrada, sobre todas las filas
+    vista = filter_spilled(diagnosticos, {"rango_de_edad": ["18-34"]})
+    meses_vista = count_cube(vista, "mes_de_ingreso").value_counts()
+    exportadas = sum(
+        len(chunk)
+        for chunk in iter_view(diagnosticos, filter_query="{rango_de_edad} = 18-34")
+    )
+
+    elapsed = time.perf_counter() - start
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    peak = python_peak - baseline + _arrow_peak()
+
+    # Tamaño que ocuparía el dataset completo en memoria (según la muestra)
+    sample = diagnosticos.memory_usage(index=False, deep=True).sum()
+    full_size = sample / len(diagnosticos) * dataset_rows(diagnosticos)
+    spilled = get_spilled(diagnosticos)
+
+    print(f"{rows:,} filas por vista, límite {LIMIT_MB} MB por worker")
+    print(f"fragmentos en disco (diagnósticos): {len(spilled.files)}")
+    print(f"filas residentes (diagnósticos): {len(diagnosticos):,}")
+    print(f"diagnósticos completos en memoria: ~{full_size / 2**20:,.0f} MB")
+    print(f"pico medido: {peak / 2**20:,.1f} MB ({elapsed:.1f} s)")
+    print(f"top diagnóstico: {top.iloc[0, 0]} ({top.iloc[0, 1]:,} casos)")
+    print(f"página 4 del filtro: {len(pagina)} filas de {paginas:,} páginas")
+
+    expected = client.expected
+    diag = expected["vista_muy_interesante"]
+    stay = expected["peso_vs_estancia"]
+    checks = {
+        "filas": dataset_rows(diagnosticos) == rows == dataset_rows(peso),
+        "edades": dict(zip(edades["rango_de_edad"], edades["count"]))
+        == dict(diag["edad"]),
+        "meses": dict(zip(meses["mes_de_ingreso"], meses["count"]))
+        == dict(diag["mes"]),
+        "estancia media": estancia["count"] == stay["estancia_casos"]
+        and np.isclose(estancia["mean"], stay["estancia_suma"] / rows),
+        "bandas de peso": dict(zip(bandas["grupo"], bandas["casos"]))
+        == {WEIGHT_BAND_LABELS[b]: n for b, n in stay["bandas"].items()},
+        "filtro cruzado": dataset_rows(vista) == diag["edad"]["18-34"]
+        and dict(zip(meses_vista["mes_de_ingreso"], meses_vista["count"]))
+        == {mes: n for (edad, mes), n in diag["edad_mes"].items() if edad == "18-34"},
+        "exportación filtrada": exportadas == diag["edad"]["18-34"],
+        "límite de memoria": peak <= limit,
+    }
+    for name, ok in checks.items():
+        print(f"  {'ok ' if ok else 'ERR'} {name}")
+
+    shutil.rmtree(os.environ["SPILL_DIR"], ignore_errors=True)
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,192 @@
+"""
+Comprobación: un único worker elegido actualiza los datos para todos.
+
+Arranca varios procesos que, como los workers de gunicorn, ejecutan el
+planificador de actualizaciones y consultan sus datasets con un DataLoader
+propio. El cliente ORDS es sintético: cada descarga queda anotada con el
+proceso y el hilo que la hace. A mitad de la prueba mata (SIGKILL) al líder y
+mide cuánto tarda otro worker en tomar el relevo. Falla si:
+
+- en algún momento descargan dos workers, o descarga un DataLoader de las
+  peticiones en lugar del planificador
+- el relevo tarda más que la caducidad del arrendamiento más una
+  comprobación
+- el tiempo entre dos descargas de un dataset se sale de su intervalo con
+  la fluctuación configurada (más una comprobación y la propia descarga)
+
+Uso:
+    uv run python benchmarks/check_refresh_leader.py [workers] [segundos]
+"""
+
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+# La configuración se valida al importar; la comprobación no contacta con ORDS
+for var in ("ORDS_BASE_URL", "ORDS_USERNAME", "ORDS_PASSWORD"):
+    os.environ.setdefault(var, "benchmark")
+os.environ["REFRESH_DIR"] = tempfile.mkdtemp(prefix="leader-check-")
+os.environ["REFRESH_SCHEDULER"] = "true"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data.data_loader import DataLoader  # noqa: E402
+from src.data.ords_client import ORDSClient  # noqa: E402
+from src.data.refresh import read_published  # noqa: E402
+from src.data.scheduler import (  # noqa: E402
+    LEASE_FILE,
+    RefreshLease,
+    RefreshScheduler,
+    parse_intervals,
+)
+from src.utils.config import Config  # noqa: E402
+
+LEASE_SECONDS = 3.0
+TICK = LEASE_SECONDS / 3
+JITTER = 0.1
+INTERVALS = parse_intervals("diagnosticos=2,peso_estancia=4", default=6)
+ENDPOINTS = {
+    "vista_muy_interesante": "diagnosticos",
+    "peso_vs_estancia": "peso_estancia",
+    "diagnostico principal vs sexo": "diagnostico_sexo",
+    "severidad_apr vs mortadilad_apr": "severidad_mortalidad",
+}
+DOWNLOADS = os.path.join(Config.REFRESH_DIR, "downloads.log")
+
+
+def _synthetic_pages(self, endpoint, limit=20000, max_records=None):
+    """Páginas sintéticas; anota quién descarga (proceso, hilo, dataset)"""
+    entry = {
+        "pid": os.getpid(),
+        "thread": threading.current_thread().name,
+        "dataset": ENDPOINTS[endpoint],
+        "at": time.time(),
+    }
+    with open(DOWNLOADS, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+    for page in range(2):
+        time.sleep(0.05)
+        yield [
+            {
+                "nombre_enc": f"ENC{page}{i}",
+                "rango_de_edad": "18-34",
+                "diagnostico_principal": f"DIAGNÓSTICO {i % 7}",
+                "mes_de_ingreso": "2024-01",
+                "sexo": 1 + i % 2,
+                "peso_espanol_apr": 0.5 + i / 100,
+                "estancia_dias": 1 + i % 9,
+                "nivel_severidad_apr": 1 + i % 4,
+                "riesgo_mortalidad_apr": 1 + i % 4,
+            }
+            for i in range(100)
+        ]
+
+
+def _worker(stop_at: float):
+    """Worker: planificador en su hilo y consultas periódicas a los datos"""
+    ORDSClient.iter_pages = _synthetic_pages
+    lease = RefreshLease(os.path.join(Config.REFRESH_DIR, LEASE_FILE), LEASE_SECONDS)
+    scheduler = RefreshScheduler(lease, INTERVALS, JITTER, tick=TICK)
+    scheduler.start()
+
+    loader = DataLoader()
+    while time.time() < stop_at:
+        # Las peticiones empiezan con la primera generación publicada
+        if read_published() is not None:
+            for name in DataLoader.DATASETS:
+                loader.fetch_dataset(name)
+        time.sleep(0.2)
+    scheduler.stop()
+
+
+def _leader_pid():
+    """Proceso dueño del arrendamiento vigente (None si no hay)"""
+    try:
+        with open(os.path.join(Config.REFRESH_DIR, LEASE_FILE)) as f:
+            lease = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if lease.get("expires", 0) <= time.time():
+        return None
+    return int(lease["owner"].split(":")[1])
+
+
+def main(workers: int = 4, seconds: float = 30.0):
+    print(f"{workers} workers, {seconds:.0f} s, arrendamiento {LEASE_SECONDS:.0f} s")
+    print("intervalos: " + ", ".join(f"{n}={s:.0f}s" for n, s in INTERVALS.items()))
+
+    context = multiprocessing.get_context("fork")
+    start = time.time()
+    processes = [
+        context.Process(target=_worker, args=(start + seconds,))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    # A mitad de la prueba muere el líder (sin soltar el arrendamiento)
+    time.sleep(seconds / 2)
+    killed = _leader_pid()
+    killed_at = time.time()
+    os.kill(killed, signal.SIGKILL)
+    successor = None
+    while successor in (None, killed) and time.time() - killed_at < 3 * LEASE_SECONDS:
+        time.sleep(0.05)
+        successor = _leader_pid()
+    takeover = time.time() - killed_at
+
+    for process in processes:
+        process.join()
+
+    with open(DOWNLOADS) as f:
+        downloads = [json.loads(line) for line in f]
+    before = {d["pid"] for d in downloads if d["at"] < killed_at}
+    after = {d["pid"] for d in downloads if d["at"] >= killed_at}
+    from_requests = [d for d in downloads if d["thread"] != "refresh-scheduler"]
+
+    times = defaultdict(list)
+    for download in downloads:
+        times[download["dataset"]].append(download["at"])
+    gaps_ok = True
+    print(f"{'dataset':<22}{'descargas':>10}{'intervalo':>11}{'separación (s)':>22}")
+    for name, interval in INTERVALS.items():
+        # La separación que cruza la muerte del líder incluye el relevo
+        gaps = [
+            b - a
+            for a, b in zip(times[name], times[name][1:])
+            if not a < killed_at <= b
+        ]
+        low, high = interval * (1 - JITTER), interval * (1 + JITTER) + TICK + 0.5
+        gaps_ok &= all(low <= gap <= high for gap in gaps)
+        span = f"{min(gaps):.2f}-{max(gaps):.2f}" if gaps else "-"
+        print(f"{name:<22}{len(times[name]):>10}{interval:>10.0f}s{span:>22}")
+
+    print(f"líder inicial {killed}, relevo {successor} en {takeover:.2f} s")
+    checks = {
+        "un único worker descarga antes de la caída": len(before) == 1,
+        "un único worker descarga tras la caída": after == {successor},
+        "ninguna descarga desde las peticiones": not from_requests,
+        "relevo dentro del arrendamiento": successor not in (None, killed)
+        and takeover <= LEASE_SECONDS + TICK + 0.5,
+        "separaciones dentro del intervalo": gaps_ok,
+    }
+    for name, ok in checks.items():
+        print(f"  {'ok ' if ok else 'ERR'} {name}")
+
+    shutil.rmtree(Config.REFRESH_DIR, ignore_errors=True)
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 4,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 30.0,
+    )
@@ -0,0 +1,208 @@
+"""
+Comprobación: los workers comparten los datasets publicados en lugar de copiarlos.
+
+Publica una generación sintética (diagnósticos, peso y estancia, severidad y
+mortalidad) y arranca varios procesos que, como los workers de gunicorn,
+adoptan la generación publicada con un DataLoader propio y recorren todas sus
+columnas. Para cada modo (copia en el fichero de la generación y
+`SHARED_DATASETS`) mide con /proc/<pid>/smaps_rollup (solo Linux):
+
+- RSS: memoria residente de cada worker (cuenta entera la compartida)
+- PSS: memoria proporcional (la compartida se reparte entre quienes la usan);
+  su suma es lo que ocupan de verdad todos los workers juntos
+
+descontando un worker que no adopta ningún dato. Después publica una segunda
+generación, los workers la adoptan y comprueba que los segmentos de la
+primera se han borrado. Falla si la suma de PSS con memoria compartida
+supera 1,5 veces la de un único worker con copia.
+
+Uso:
+    uv run python benchmarks/check_shared_datasets.py [filas] [workers]
+"""
+
+import gc
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# La configuración se valida al importar; la comprobación no contacta con ORDS
+for var in ("ORDS_BASE_URL", "ORDS_USERNAME", "ORDS_PASSWORD"):
+    os.environ.setdefault(var, "benchmark")
+os.environ["REFRESH_DIR"] = tempfile.mkdtemp(prefix="shared-check-")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data import shared_frames  # noqa: E402
+from src.data.data_loader import DataLoader  # noqa: E402
+from src.data.refresh import publish_generation, read_published  # noqa: E402
+from src.data.versioning import register_dataset  # noqa: E402
+from src.utils.config import Config  # noqa: E402
+
+DIAGNOSTICOS = np.array([f"DIAGNÓSTICO {i:03d}" for i in range(300)], dtype=object)
+EDADES = np.array(["0-17", "18-34", "35-49", "50-64", "65-79", "+80"], dtype=object)
+NIVELES = np.array([None, "Menor", "Moderado", "Mayor", "Extremo"], dtype=object)
+
+
+def _frames(rows: int, seed: int) -> dict:
+    """Generación sintética con un objeto por celda de texto, como la de ORDS"""
+    rng = np.random.default_rng(seed)
+    severidad = rng.integers(1, 5, rows)
+    mortalidad = rng.integers(1, 5, rows)
+
+    def texts(values) -> list:
+        # json.loads crea una cadena por celda, como al decodificar las páginas
+        return json.loads(json.dumps(list(values)))
+
+    frames = {
+        "endpoint_vista_muy_interesante": pd.DataFrame(
+            {
+                "nombre_enc": texts(f"ENC{i:08d}" for i in range(rows)),
+                "rango_de_edad": texts(EDADES[rng.integers(0, 6, rows)]),
+                "diagnostico_principal": texts(
+                    DIAGNOSTICOS[rng.integers(0, 300, rows)]
+                ),
+                "mes_de_ingreso": texts(
+                    f"2024-{m:02d}" for m in rng.integers(1, 13, rows)
+                ),
+            }
+        ),
+        "endpoint_peso_vs_estancia": pd.DataFrame(
+            {
+                "peso_espanol_apr": rng.gamma(2.0, 0.5, rows).round(4),
+                "estancia_dias": rng.integers(1, 60, rows),
+            }
+        ),
+        "endpoint_severidad_apr vs mortadilad_apr": pd.DataFrame(
+            {
+                "nivel_severidad_apr": severidad,
+                "riesgo_mortalidad_apr": mortalidad,
+                "severidad_label": texts(NIVELES[severidad]),
+                "mortalidad_label": texts(NIVELES[mortalidad]),
+            }
+        ),
+    }
+    versions = {key: register_dataset(df, key) for key, df in frames.items()}
+    return frames, versions
+
+
+def _publish(rows: int, seed: int) -> dict:
+    """Publica una generación sin conservar sus DataFrames en este proceso"""
+    frames, versions = _frames(rows, seed)
+    manifest = publish_generation(frames, versions)
+    del frames
+    gc.collect()
+    return manifest
+
+
+def _memory() -> dict:
+    """RSS y PSS del proceso actual, en bytes"""
+    memory = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in ("Rss", "Pss"):
+                memory[name] = int(value.split()[0]) * 1024
+    return memory
+
+
+def _worker(conn, adopt: bool):
+    """Worker: adopta la generación publicada cuando se le pide y mide"""
+    loader = DataLoader(client=object())
+    while conn.recv():
+        if adopt:
+            loader._adopt_published()
+            for entry in loader._cache.values():
+                df = entry["data"]
+                # Recorre todas las columnas (cada página se lee al menos una vez)
+                for column in df.columns:
+                    df[column].nunique()
+        gc.collect()
+        conn.send(_memory())
+    conn.close()
+
+
+def _round(conns) -> list:
+    """Pide a todos los workers que adopten y midan; devuelve sus medidas"""
+    for conn in conns:
+        conn.send(True)
+    return [conn.recv() for conn in conns]
+
+
+def _run(rows: int, workers: int, shared: bool):
+    """Mide un modo; devuelve (medidas por worker, línea base, segmentos)"""
+    Config.SHARED_DATASETS = shared
+    context = multiprocessing.get_context("fork")
+    conns, processes = [], []
+    for adopt in [False] + [True] * workers:
+        parent, child = context.Pipe()
+        process = context.Process(target=_worker, args=(child, adopt))
+        process.start()
+        conns.append(parent)
+        processes.append(process)
+
+    manifest = _publish(rows, seed=0)
+    baseline, *measures = _round(conns)
+
+    # Segunda generación: los segmentos de la primera se sueltan y se borran
+    first = {info["segment"] for info in manifest.get("shared", {}).values()}
+    _publish(rows, seed=1)
+    _round(conns)
+    # En el primer acceso los DataFrames antiguos aún estaban en uso; el
+    # siguiente suelta sus segmentos
+    _round(conns)
+    leftover = {name for name in first if os.path.exists(f"/dev/shm/{name}")}
+
+    for conn, process in zip(conns, processes):
+        conn.send(False)
+        process.join()
+    return measures, baseline, leftover
+
+
+def main(rows: int = 1_000_000, workers: int = 4):
+    print(f"{rows:,} filas por dataset, {workers} workers, {os.cpu_count()} CPU")
+    print(f"{'modo':<10}{'RSS/worker (MB)':>17}{'PSS/worker (MB)':>17}", end="")
+    print(f"{'PSS total (MB)':>16}")
+
+    totals = {}
+    for name, shared in (("copia", False), ("compartido", True)):
+        measures, baseline, leftover = _run(rows, workers, shared)
+        rss = [m["Rss"] - baseline["Rss"] for m in measures]
+        pss = [m["Pss"] - baseline["Pss"] for m in measures]
+        totals[name] = (sum(pss), leftover)
+        print(
+            f"{name:<10}{np.mean(rss) / 2**20:>17,.1f}{np.mean(pss) / 2**20:>17,.1f}"
+            f"{sum(pss) / 2**20:>16,.1f}"
+        )
+
+    manifest = read_published()
+    segments = [info["segment"] for info in manifest["shared"].values()]
+    size = sum(os.path.getsize(f"/dev/shm/{name}") for name in segments)
+    print(f"segmentos publicados: {len(segments)} ({size / 2**20:,.1f} MB)")
+
+    single = totals["copia"][0] / workers
+    checks = {
+        "PSS total compartido <= 1,5x un worker con copia": totals["compartido"][0]
+        <= 1.5 * single,
+        "segmentos de la generación anterior borrados": not totals["compartido"][1],
+    }
+    for name, ok in checks.items():
+        print(f"  {'ok ' if ok else 'ERR'} {name}")
+
+    # Retira también la generación actual (ya no hay workers que la usen)
+    shared_frames.retire_generations(set())
+    shutil.rmtree(os.environ["REFRESH_DIR"], ignore_errors=True)
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 4,
+    )
@@ -0,0 +1,137 @@
+"""
+Callbacks de cliente (se ejecutan en el navegador, sin ida y vuelta al servidor).
+Las funciones JavaScript viven en `assets/clientside.js`, en el espacio de
+nombres `dash_clientside.ui`, reservado al estado de presentación (tema,
+accesibilidad, secciones contraídas y leyendas). Los callbacks de datos se
+registran aparte y nunca escriben en este espacio de nombres.
+"""
+
+import logging
+
+from dash import MATCH, ClientsideFunction, Dash, Input, Output, State
+
+from ..components.controls import LEGEND_TOGGLE_SUFFIX
+from ..layouts import GRAPH_IDS, LEGEND_GRAPH_IDS
+from ..layouts.accessibility import COLORBLIND_TYPES, FONT_SIZES
+
+logger = logging.getLogger(__name__)
+
+# Espacio de nombres de `window.dash_clientside` para el estado de interfaz
+UI_NAMESPACE = "ui"
+
+
+def _register_accessibility_callbacks(app: Dash) -> None:
+    """Panel de accesibilidad: apertura, estado y aplicación al documento"""
+    type_ids = [f"colorblind-type-{type_id}" for type_id, _, _ in COLORBLIND_TYPES]
+    size_ids = [f"font-size-{size_id}" for size_id, _, _ in FONT_SIZES]
+
+    app.clientside_callback(
+        ClientsideFunction(namespace=UI_NAMESPACE, function_name="togglePanel"),
+        Output("accessibility-panel", "className"),
+        Output("accessibility-toggle", "aria-expanded"),
+        Input("accessibility-toggle", "n_clicks"),
+        State("accessibility-panel", "className"),
+        prevent_initial_call=True,
+    )
+
+    # Controles del panel -> estado (persistido en localStorage)
+    app.clientside_callback(
+        ClientsideFunction(
+            namespace=UI_NAMESPACE, function_name="updateAccessibility"
+        ),
+        Output("accessibility-store", "data"),
+        Input("colorblind-toggle", "n_clicks"),
+        Input("highcontrast-toggle", "n_clicks"),
+        *[Input(type_id, "n_clicks") for type_id in type_ids],
+        Input("intensity-slider", "value"),
+        Input("contrast-slider", "value"),
+        *[Input(size_id, "n_clicks") for size_id in size_ids],
+        State("accessibility-store", "data"),
+        prevent_initial_call=True,
+    )
+
+    # Estado -> documento y controles (también al cargar, con el estado guardado)
+    app.clientside_callback(
+        ClientsideFunction(namespace=UI_NAMESPACE, function_name="applyAccessibility"),
+        Output("colorblind-toggle", "className"),
+        Output("colorblind-toggle", "aria-checked"),
+        Output("colorblind-options", "style"),
+        Output("highcontrast-toggle", "className"),
+        Output("highcontrast-toggle", "aria-checked"),
+        Output("highcontrast-options", "style"),
+        Output("intensity-display", "children"),
+        Output("contrast-display", "children"),
+        *[Output(type_id, "className") for type_id in type_ids],
+        *[Output(size_id, "className") for size_id in size_ids],
+        Input("accessibility-store", "data"),
+    )
+
+
+def _register_layout_callbacks(app: Dash) -> None:
+    """Secciones contraíbles y botones de leyenda de los gráficos"""
+    app.clientside_callback(
+        ClientsideFunction(namespace=UI_NAMESPACE, function_name="toggleSection"),
+        Output({"type": "section", "index": MATCH}, "className"),
+        Output({"type": "section-toggle", "index": MATCH}, "aria-expanded"),
+        Output({"type": "section-toggle", "index": MATCH}, "children"),
+        Output({"type": "section-toggle", "index": MATCH}, "title"),
+        Input({"type": "section-toggle", "index": MATCH}, "n_clicks"),
+        State({"type": "section", "index": MATCH}, "className"),
+        prevent_initial_call=True,
+    )
+
+    # Ids declarados por las secciones: registrar no construye el layout (que
+    # cargaría los datos)
+    for graph_id in LEGEND_GRAPH_IDS:
+        button_id = f"{graph_id}{LEGEND_TOGGLE_SUFFIX}"
+        app.clientside_callback(
+            ClientsideFunction(namespace=UI_NAMESPACE, function_name="toggleLegend"),
+            Output(graph_id, "figure", allow_duplicate=True),
+            Output(button_id, "aria-pressed"),
+            Input(button_id, "n_clicks"),
+            State(graph_id, "figure"),
+            prevent_initial_call=True,
+        )
+
+
+def register_clientside_callbacks(app: Dash) -> None:
+    """
+    Registra los callbacks de cliente de la aplicación.
+
+    El cambio de tema es íntegramente del navegador: el servidor solo envía las
+    figuras del tema por defecto y los templates compilados de cada tema, y el
+    cliente intercambia el template de las figuras y las variables CSS. Lo
+    mismo ocurre con la accesibilidad, las secciones contraídas y las leyendas.
+
+    Args:
+        app: Instancia de la aplicación Dash
+
+    Returns:
+        None
+    """
+    # Botón de tema -> tema seleccionado (persistido en localStorage)
+    app.clientside_callback(
+        ClientsideFunction(namespace=UI_NAMESPACE, function_name="toggleTheme"),
+        Output("theme-store", "data"),
+        Input("dark-mode-toggle-btn", "n_clicks"),
+        State("theme-store", "data"),
+        prevent_initial_call=True,
+    )
+
+    # Tema seleccionado -> clase del body, botón y template de cada figura
+    graph_ids = GRAPH_IDS
+    app.clientside_callback(
+        ClientsideFunction(namespace=UI_NAMESPACE, function_name="applyTheme"),
+        Output("dark-mode-toggle-btn", "children"),
+        Output("dark-mode-toggle-btn", "title"),
+        *[Output(graph_id, "figure", allow_duplicate=True) for graph_id in graph_ids],
+        Input("theme-store", "data"),
+        State("theme-templates", "data"),
+        *[State(graph_id, "figure") for graph_id in graph_ids],
+        prevent_initial_call="initial_duplicate",
+    )
+
+    _register_accessibility_callbacks(app)
+    _register_layout_callbacks(app)
+
+    logger.info(f"Clientside callbacks registered ({len(graph_ids)} themed graphs)")
@@ -0,0 +1,544 @@
+"""
+Callbacks de filtro cruzado entre secciones.
+
+Un clic en una categoría de un gráfico añade (o quita) ese valor al filtro
+cruzado. Cada sección se recalcula solo con las filas seleccionadas, que se
+obtienen con índices bitmap por columna (un AND de bitsets por filtro) o, en
+los datasets troceados en disco, recorriendo sus fragmentos (ver
+`spill.filter_spilled`). Un gráfico no se filtra por sus propias dimensiones,
+para que siga mostrando todas sus categorías y se pueda cambiar la selección
+desde él.
+"""
+
+import functools
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from dash import Dash, Input, Output, Patch, State, ctx, html, no_update
+
+from ..data import get_data_loader
+from ..data.bitmap_index import select_rows
+from ..data.spill import filter_spilled, get_spilled
+from ..data.versioning import get_dataset_version
+from ..layouts.diagnostics import create_diagnostics_figures
+from ..layouts.gender_analysis import create_gender_figures, create_gender_table
+from ..layouts.main_metrics import MAIN_METRICS, compute_main_metric_values
+from ..layouts.severity import create_severity_figures, create_severity_table
+from ..utils.config import Config
+from ..utils.themes import get_theme_templates
+from .memoize import canonical_state, memoize_callback
+
+logger = logging.getLogger(__name__)
+
+# Gráfico -> dimensiones que aporta al filtro: (columna, clave del punto clicado)
+CLICK_DIMENSIONS: Dict[str, List[Tuple[str, str]]] = {
+    "grafico-diagnosticos": [("diagnostico_principal", "y")],
+    "grafico-edad": [("rango_de_edad", "label")],
+    "grafico-temporal": [("mes_de_ingreso", "x")],
+    "grafico-sexo-general": [("sexo_label", "label")],
+    "grafico-diagnosticos-sexo": [("diagnostico_principal", "x")],
+    "grafico-severidad-dist": [("severidad_label", "label")],
+    "grafico-mortalidad-dist": [("mortalidad_label", "label")],
+    "grafico-severidad-mortalidad-heatmap": [
+        ("severidad_label", "x"),
+        ("mortalidad_label", "y"),
+    ],
+}
+
+# Claves de una traza que contienen datos (las que se envían en los parches)
+TRACE_DATA_KEYS = (
+    "x",
+    "y",
+    "z",
+    "labels",
+    "values",
+    "text",
+    "customdata",
+    "ids",
+    "hovertext",
+)
+
+# Etiquetas de las columnas filtrables
+FILTER_LABELS = {
+    "diagnostico_principal": "Diagnóstico",
+    "rango_de_edad": "Edad",
+    "mes_de_ingreso": "Mes",
+    "sexo_label": "Sexo",
+    "severidad_label": "Severidad",
+    "mortalidad_label": "Mortalidad",
+}
+
+
+class _Section:
+    """Sección recalculable: dataset, gráficos y tabla resumen (opcional)"""
+
+    def __init__(
+        self,
+        dataset: str,
+        build_figures: Callable,
+        graph_ids: List[str],
+        table_id: Optional[str] = None,
+        build_table: Optional[Callable] = None,
+    ):
+        self.dataset = dataset
+        self.build_figures = build_figures
+        self.graph_ids = graph_ids
+        self.table_id = table_id
+        self.build_table = build_table
+
+
+SECTIONS = [
+    _Section(
+        "diagnosticos",
+        create_diagnostics_figures,
+        ["grafico-diagnosticos", "grafico-edad", "grafico-temporal"],
+    ),
+    _Section(
+        "diagnostico_sexo",
+        create_gender_figures,
+        ["grafico-sexo-general", "grafico-diagnosticos-sexo"],
+        "tabla-comparativa-sexo",
+        create_gender_table,
+    ),
+    _Section(
+        "severidad_mortalidad",
+        create_severity_figures,
+        [
+            "grafico-severidad-dist",
+            "grafico-mortalidad-dist",
+            "grafico-severidad-mortalidad-heatmap",
+        ],
+        "tabla-contingencia-severidad",
+        create_severity_table,
+    ),
+]
+
+
+def toggle_filter(
+    filters: Dict[str, list], graph_id: str, point: dict
+) -> Dict[str, list]:
+    """
+    Aplica el clic sobre un punto de un gráfico al filtro cruzado.
+
+    Seleccionar un valor ya seleccionado lo quita del filtro.
+
+    Args:
+        filters: Filtro actual (columna -> valores)
+        graph_id: Gráfico clicado
+        point: Punto de `clickData`
+
+    Returns:
+        Dict: Nuevo filtro
+    """
+    filters = dict(filters or {})
+    for column, key in CLICK_DIMENSIONS.get(graph_id, []):
+        value = point.get(key)
+        if value is None:
+            continue
+        if filters.get(column) == [value]:
+            filters.pop(column)
+        else:
+            filters[column] = [value]
+    return filters
+
+
+@functools.lru_cache(maxsize=None)
+def _template_json(theme: str) -> dict:
+    """Template compilado de un tema en formato JSON"""
+    return get_theme_templates()[theme]
+
+
+def _with_theme(figure, theme: str):
+    """Sustituye el template de una figura del tema por defecto por el del cliente"""
+    if theme == Config.DEFAULT_THEME or theme not in get_theme_templates():
+        return figure
+    if hasattr(figure, "to_plotly_json"):
+        figure = figure.to_plotly_json()
+    layout = {**figure["layout"], "template": _template_json(theme)}
+    return {**figure, "layout": layout}
+
+
+def filter_frame(df, filters: Dict[str, list]):
+    """
+    Filas de un dataset que cumplen el filtro cruzado.
+
+    Args:
+        df: DataFrame cacheado (o muestra residente de un dataset troceado)
+        filters: Columna -> valores admitidos
+
+    Returns:
+        DataFrame filtrado (el mismo si ningún filtro aplica)
+    """
+    applicable = {c: v for c, v in filters.items() if c in df.columns}
+    if not applicable:
+        return df
+    if get_spilled(df) is not None:
+        return filter_spilled(df, applicable)
+    return df.iloc[select_rows(df, applicable)]
+
+
+# Caché LRU de secciones calculadas: (versión, filtro canónico) -> resultado
+_SECTION_CACHE_SIZE = 64
+_section_cache: "OrderedDict[Tuple[str, str], tuple]" = OrderedDict()
+_section_lock = threading.Lock()
+
+# Caché LRU de métricas principales: (versiones, filtro canónico) -> textos
+_kpi_cache: "OrderedDict[Tuple[tuple, str], Dict[str, str]]" = OrderedDict()
+
+
+def _compute_section(df, section: _Section, filters: Dict[str, list]):
+    """Calcula las figuras y la tabla de una sección (sin caché)"""
+    applicable = {c: v for c, v in filters.items() if c in df.columns}
+    frames: Dict[frozenset, object] = {}
+
+    def frame_for(columns: Dict[str, list]):
+        # Un DataFrame por combinación de filtros (los gráficos la comparten)
+        key = frozenset(columns)
+        if key not in frames:
+            frames[key] = filter_frame(df, columns)
+        return frames[key]
+
+    figures = []
+    built: Dict[frozenset, dict] = {}
+    for graph_id in section.graph_ids:
+        own = {column for column, _ in CLICK_DIMENSIONS.get(graph_id, [])}
+        columns = {c: v for c, v in applicable.items() if c not in own}
+        key = frozenset(columns)
+        if key not in built:
+            built[key] = section.build_figures(
+                frame_for(columns), theme=Config.DEFAULT_THEME
+            )
+        figures.append(built[key][graph_id])
+
+    if section.build_table is None:
+        return figures, None, None
+    table = section.build_table(frame_for(applicable), theme=Config.DEFAULT_THEME)
+    return figures, table.data, table.columns
+
+
+def compute_section(section: _Section, filters: Dict[str, list]):
+    """
+    Recalcula las figuras y la tabla de una sección con el filtro cruzado.
+
+    Las figuras se construyen en el tema por defecto; el resultado se cachea
+    por versión del dataset y filtro, de modo que el estado anterior de un
+    cliente (con el que se calcula el parche) suele estar ya calculado.
+
+    Args:
+        section: Sección a recalcular
+        filters: Filtro cruzado (columna -> valores)
+
+    Returns:
+        Tuple: (figuras en el orden de `graph_ids`, datos de la tabla o None,
+            columnas de la tabla o None)
+    """
+    df = get_data_loader().fetch_dataset(section.dataset)
+    version = get_dataset_version(df)
+    if version is None:
+        return _compute_section(df, section, filters)
+
+    key = (version, json.dumps(canonical_state(filters), sort_keys=True))
+    with _section_lock:
+        if key in _section_cache:
+            _section_cache.move_to_end(key)
+            return _section_cache[key]
+
+    result = _compute_section(df, section, filters)
+
+    with _section_lock:
+        _section_cache[key] = result
+        while len(_section_cache) > _SECTION_CACHE_SIZE:
+            _section_cache.popitem(last=False)
+
+    return result
+
+
+def _split_trace(trace: dict) -> Tuple[dict, Dict[tuple, Any]]:
+    """
+    Separa una traza en su estructura (tipo, estilo, nombres) y sus arrays.
+
+    Args:
+        trace: Traza de una figura (JSON)
+
+    Returns:
+        Tuple: (traza sin arrays de datos, ruta -> array)
+    """
+    structure = dict(trace)
+    arrays = {(key,): structure.pop(key) for key in TRACE_DATA_KEYS if key in trace}
+
+    marker = structure.get("marker")
+    if isinstance(marker, dict):
+        marker = dict(marker)
+        for key in ("color", "colors"):
+            # Colores por punto (no el color fijo de la traza)
+            if isinstance(marker.get(key), (list, dict)):
+                arrays[("marker", key)] = marker.pop(key)
+        structure["marker"] = marker
+
+    return structure, arrays
+
+
+def _layout_leaves(layout: dict, prefix: tuple = ()) -> Dict[tuple, Any]:
+    """Valores hoja del layout por ruta (sin el template, que es del cliente)"""
+    leaves = {}
+    for key, value in layout.items():
+        if not prefix and key == "template":
+            continue
+        if isinstance(value, dict) and value:
+            leaves.update(_layout_leaves(value, prefix + (key,)))
+        else:
+            leaves[prefix + (key,)] = value
+    return leaves
+
+
+def _assign(patch: Patch, path: tuple, value: Any):
+    """Asigna un valor en una ruta de un Patch"""
+    target = patch
+    for part in path[:-1]:
+        target = target[part]
+    target[path[-1]] = value
+
+
+def figure_update(previous: Optional[dict], figure: dict, theme: str):
+    """
+    Calcula la actualización mínima de un gráfico respecto a lo que muestra
+    el cliente.
+
+    Si la estructura de la figura no cambia (mismas trazas y mismas claves
+    de layout) se envía un `Patch` que solo sustituye los arrays de datos y
+    las claves de layout que cambian; el template no se toca, así que se
+    conserva el tema aplicado en el navegador. Si la estructura cambia, se
+    envía la figura completa.
+
+    Args:
+        previous: Figura que muestra el cliente, en el tema por defecto
+            (None si no se conoce)
+        figure: Figura nueva, en el tema por defecto
+        theme: Tema activo en el cliente
+
+    Returns:
+        Patch, figura completa o `no_update` si no hay cambios
+    """
+    if previous is None or len(previous["data"]) != len(figure["data"]):
+        return _with_theme(figure, theme)
+
+    patch = Patch()
+    changed = False
+    for index, (old_trace, new_trace) in enumerate(
+        zip(previous["data"], figure["data"])
+    ):
+        old_structure, old_arrays = _split_trace(old_trace)
+        new_structure, new_arrays = _split_trace(new_trace)
+        if old_structure != new_structure or old_arrays.keys() != new_arrays.keys():
+            return _with_theme(figure, theme)
+        for path, value in new_arrays.items():
+            if old_arrays[path] != value:
+                _assign(patch["data"][index], path, value)
+                changed = True
+
+    old_layout = _layout_leaves(previous.get("layout", {}))
+    new_layout = _layout_leaves(figure.get("layout", {}))
+    if old_layout.keys() != new_layout.keys():
+        return _with_theme(figure, theme)
+    for path, value in new_layout.items():
+        if old_layout[path] != value:
+            _assign(patch["layout"], path, value)
+            changed = True
+
+    return patch if changed else no_update
+
+
+def _compute_kpis(frames: list, filters: Dict[str, list]) -> Dict[str, str]:
+    """Calcula las métricas principales (sin caché)"""
+    diagnosticos, peso_estancia, severidad_mortalidad = frames
+    return compute_main_metric_values(
+        filter_frame(diagnosticos, filters),
+        peso_estancia,
+        filter_frame(severidad_mortalidad, filters),
+    )
+
+
+def compute_kpis(filters: Dict[str, list]) -> Dict[str, str]:
+    """
+    Calcula las métricas principales con el filtro cruzado.
+
+    Como las secciones, se cachean por versión de los datasets y filtro: las
+    del filtro anterior (con las que se decide qué métricas reenviar) ya
+    están calculadas.
+
+    Args:
+        filters: Filtro cruzado (columna -> valores)
+
+    Returns:
+        Dict: Id del valor -> texto
+    """
+    loader = get_data_loader()
+    frames = [
+        loader.fetch_dataset(name)
+        for name in ("diagnosticos", "peso_estancia", "severidad_mortalidad")
+    ]
+    versions = tuple(get_dataset_version(frame) for frame in frames)
+    if None in versions:
+        return _compute_kpis(frames, filters)
+
+    key = (versions, json.dumps(canonical_state(filters), sort_keys=True))
+    with _section_lock:
+        if key in _kpi_cache:
+            _kpi_cache.move_to_end(key)
+            return _kpi_cache[key]
+
+    result = _compute_kpis(frames, filters)
+
+    with _section_lock:
+        _kpi_cache[key] = result
+        while len(_kpi_cache) > _SECTION_CACHE_SIZE:
+            _kpi_cache.popitem(last=False)
+
+    return result
+
+
+def _if_changed(previous: Any, value: Any) -> Any:
+    """El valor nuevo, o `no_update` si el cliente ya muestra ese mismo"""
+    return no_update if previous is not None and previous == value else value
+
+
+def dataset_versions() -> Dict[str, Optional[str]]:
+    """Versión actual de los datasets que dependen del filtro cruzado"""
+    loader = get_data_loader()
+    names = [section.dataset for section in SECTIONS] + ["peso_estancia"]
+    return {name: get_dataset_version(loader.fetch_dataset(name)) for name in names}
+
+
+def _filter_chips(filters: Dict[str, list]) -> list:
+    """Etiquetas de los filtros activos"""
+    if not filters:
+        return [
+            html.Span(
+                "Haz clic en un gráfico para filtrar el resto de secciones",
+                className="cross-filter-empty",
+            )
+        ]
+    return [
+        html.Span(
+            f"{FILTER_LABELS.get(column, column)}: {', '.join(map(str, values))}",
+            className="cross-filter-chip",
+        )
+        for column, values in filters.items()
+    ]
+
+
+def register_cross_filter_callbacks(app: Dash) -> None:
+    """
+    Registra los callbacks del filtro cruzado.
+
+    Args:
+        app: Instancia de la aplicación Dash
+
+    Returns:
+        None
+    """
+    graph_ids = list(CLICK_DIMENSIONS)
+
+    @app.callback(
+        Output("cross-filter-store", "data"),
+        *[Input(graph_id, "clickData") for graph_id in graph_ids],
+        Input("cross-filter-clear", "n_clicks"),
+        State("cross-filter-store", "data"),
+        prevent_initial_call=True,
+    )
+    def update_cross_filter(*args):
+        """Actualiza el filtro cruzado con el clic en un gráfico"""
+        filters = args[-1] or {}
+        trigger = ctx.triggered_id
+        if trigger == "cross-filter-clear":
+            return {}
+
+        click = dict(zip(graph_ids, args[: len(graph_ids)])).get(trigger)
+        if not click or not click.get("points"):
+            return filters
+        return toggle_filter(filters, trigger, click["points"][0])
+
+    outputs = []
+    for section in SECTIONS:
+        outputs += [
+            Output(graph_id, "figure", allow_duplicate=True)
+            for graph_id in section.graph_ids
+        ]
+        if section.table_id:
+            outputs += [
+                Output(section.table_id, "data"),
+                Output(section.table_id, "columns"),
+            ]
+    for value_id, *_ in MAIN_METRICS:
+        outputs += [
+            Output(value_id, "children"),
+            Output(f"{value_id}-sr", "children"),
+        ]
+
+    @app.callback(
+        *outputs,
+        Output("cross-filter-chips", "children"),
+        Output("cross-filter-applied", "data"),
+        Input("cross-filter-store", "data"),
+        State("theme-store", "data"),
+        State("cross-filter-applied", "data"),
+        prevent_initial_call=True,
+    )
+    @memoize_callback(
+        [section.dataset for section in SECTIONS] + ["peso_estancia"],
+        normalize=canonical_state,
+    )
+    def apply_cross_filter(filters, theme, applied):
+        """Recalcula las secciones con las filas seleccionadas"""
+        filters = filters or {}
+        theme = theme or Config.DEFAULT_THEME
+        versions = dataset_versions()
+
+        # Lo que muestra el cliente solo se conoce si los datos no han cambiado
+        previous_filters = None
+        if applied and applied.get("versions") == versions:
+            previous_filters = applied.get("filters") or {}
+
+        # Solo se envía lo que cambia respecto a lo que muestra el cliente: las
+        # figuras como parches y las tablas y métricas iguales como no_update
+        results = []
+        for section in SECTIONS:
+            figures, table_data, table_columns = compute_section(section, filters)
+            if previous_filters is not None:
+                old_figures, old_data, old_columns = compute_section(
+                    section, previous_filters
+                )
+            else:
+                old_figures, old_data, old_columns = [None] * len(figures), None, None
+            results += [
+                figure_update(old, new, theme)
+                for old, new in zip(old_figures, figures)
+            ]
+            if section.table_id:
+                results += [
+                    _if_changed(old_data, table_data),
+                    _if_changed(old_columns, table_columns),
+                ]
+
+        kpis = compute_kpis(filters)
+        old_kpis = (
+            compute_kpis(previous_filters) if previous_filters is not None else {}
+        )
+        for value_id, title, subtitle, *_ in MAIN_METRICS:
+            changed = _if_changed(old_kpis.get(value_id), kpis[value_id])
+            results += [
+                changed,
+                no_update
+                if changed is no_update
+                else f"{title}: {kpis[value_id]}, {subtitle}",
+            ]
+
+        logger.info(f"Cross-filter applied: {filters}")
+        return (
+            *results,
+            _filter_chips(filters),
+            {"filters": filters, "versions": versions},
+        )
@@ -2,10 +2,22 @@
 Callbacks de Dash para funcionalidad interactiva
 """
 
-from dash import Dash, Input, Output, State, html, dcc
+from dash import Dash, Input, Output, Patch, State, html, dcc, no_update
 import logging
 
 from ..data import get_data_loader
+from ..data.outliers import detect_outliers
+from ..data.table_queries import query_table
+from ..layouts.weight_stay import (
+    OUTLIER_LAYER_INDEX,
+    create_outlier_layer,
+    create_regression_summary,
+    create_trendline,
+)
+from .clientside import register_clientside_callbacks
+from .cross_filter import register_cross_filter_callbacks
+from .memoize import memoize_callback
+from .refresh import register_refresh_callbacks
 
 logger = logging.getLogger(__name__)
 
@@ -20,24 +32,73 @@ def register_callbacks(app: Dash) -> None:
     Returns:
         None
     """
-    # Placeholder para futuros callbacks
-    # Por ahora, la funcionalidad es principalmente estática
-    # pero esta estructura permite añadir interactividad fácilmente
+    # Estado de interfaz (tema) resuelto en el navegador
+    register_clientside_callbacks(app)
 
-    logger.info("Callbacks registered successfully")
+    # Filtro cruzado entre secciones
+    register_cross_filter_callbacks(app)
+
+    # Actualización de datos en segundo plano
+    register_refresh_callbacks(app)
+
+    @app.callback(
+        Output("tabla-peso-estancia", "data"),
+        Output("tabla-peso-estancia", "page_count"),
+        Input("tabla-peso-estancia", "page_current"),
+        Input("tabla-peso-estancia", "page_size"),
+        Input("tabla-peso-estancia", "sort_by"),
+        Input("tabla-peso-estancia", "filter_query"),
+        prevent_initial_call=True,
+    )
+    @memoize_callback(["peso_estancia"])
+    def page_peso_estancia(page_current, page_size, sort_by, filter_query):
+        """Sirve una página de la tabla de peso/estancia desde el caché"""
+        df = get_data_loader().fetch_peso_estancia_data()
+        return query_table(df, page_current, page_size, sort_by, filter_query)
+
+    @app.callback(
+        Output("grafico-peso-estancia", "figure"),
+        Output("tabla-estancias-atipicas", "page_current"),
+        Input("metodo-atipicos", "value"),
+        prevent_initial_call=True,
+    )
+    def select_outlier_method(method):
+        """Sustituye la capa de atípicos del gráfico y vuelve a la primera página"""
+        df = get_data_loader().fetch_peso_estancia_data()
+        patched = Patch()
+        if not df.empty:
+            patched["data"][OUTLIER_LAYER_INDEX] = create_outlier_layer(df, method)
+        return patched, 0
 
-    # Ejemplo de callback para refrescar datos (descomentar o usar cuando sea necesario):
-    # @app.callback(
-    #     Output('refresh-status', 'children'),
-    #     Input('refresh-button', 'n_clicks'),
-    #     prevent_initial_call=True
-    # )
-    # def refresh_data(n_clicks):
-    #     """Refresca los datos del dashboard"""
-    #     try:
-    #         data_loader = get_data_loader()
-    #         data_loader.clear_cache()
-    #         return "✅ Datos actualizados"
-    #     except Exception as e:
-    #         logger.error(f"Error refreshing data: {e}")
-    #         return f"❌ Error: {str(e)}"
+    @app.callback(
+        Output("grafico-peso-estancia", "figure", allow_duplicate=True),
+        Output("resumen-regresion", "children"),
+        Input("resumen-regresion", "id"),
+        prevent_initial_call="initial_duplicate",
+    )
+    def load_regression(_):
+        """Añade la recta ajustada y el resumen de la regresión tras la carga"""
+        df = get_data_loader().fetch_peso_estancia_data()
+        traces = create_trendline(df)
+        patched = Patch()
+        patched["data"].extend(traces)
+        return (patched if traces else no_update), create_regression_summary(df)
+
+    @app.callback(
+        Output("tabla-estancias-atipicas", "data"),
+        Output("tabla-estancias-atipicas", "page_count"),
+        Input("tabla-estancias-atipicas", "page_current"),
+        Input("tabla-estancias-atipicas", "page_size"),
+        Input("tabla-estancias-atipicas", "sort_by"),
+        Input("tabla-estancias-atipicas", "filter_query"),
+        Input("metodo-atipicos", "value"),
+        prevent_initial_call=True,
+    )
+    @memoize_callback(["peso_estancia"])
+    def page_outliers(page_current, page_size, sort_by, filter_query, method):
+        """Sirve una página de la tabla de estancias atípicas"""
+        df = get_data_loader().fetch_peso_estancia_data()
+        outliers = detect_outliers(df, method)
+        return query_table(outliers, page_current, page_size, sort_by, filter_query)
+
+    logger.info("Callbacks registered successfully")
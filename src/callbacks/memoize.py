@@ -0,0 +1,266 @@
+"""
+Memorización de resultados de callbacks.
+
+Los resultados se indexan por un hash canónico del estado de entrada (los
+argumentos del callback) y la versión de los datasets que usa, y se guardan
+serializados en un diskcache en `Config.REFRESH_DIR` compartido por todos los
+workers (`dash[diskcache]`, como los trabajos en segundo plano). Sin diskcache
+se usa la caché de figuras, que es de cada proceso.
+
+Las peticiones idénticas que llegan mientras otra está calculando esperan su
+resultado en lugar de repetir el cálculo: dentro de un worker con un evento y
+entre workers con un cerrojo en el diskcache.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from plotly.utils import PlotlyJSONEncoder
+
+from ..components.figure_cache import get_figure_cache
+from ..data import get_data_loader
+from ..data.versioning import get_dataset_version
+from ..utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """Cálculo en curso de una clave, compartido por las peticiones idénticas"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.payload: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+
+# Clave -> cálculo en curso
+_flights: Dict[str, _Flight] = {}
+_flights_lock = threading.Lock()
+
+# Segundos que vive el cerrojo de un cálculo en el diskcache (si el worker que
+# lo tiene muere, otro lo calcula al caducar) e intervalo de sondeo de espera
+_LOCK_TIMEOUT = 60
+_POLL_INTERVAL = 0.05
+
+# Instancia global del diskcache (singleton pattern); False = no disponible
+_store_instance = None
+_store_lock = threading.Lock()
+
+
+def get_callback_store() -> Optional[object]:
+    """
+    Obtiene el diskcache compartido de resultados de callbacks.
+
+    Returns:
+        diskcache.Cache o None si falta diskcache
+    """
+    global _store_instance
+
+    if _store_instance is None:
+        with _store_lock:
+            if _store_instance is None:
+                try:
+                    import diskcache
+
+                    _store_instance = diskcache.Cache(
+                        os.path.join(Config.REFRESH_DIR, "callbacks")
+                    )
+                except ImportError:  # pragma: no cover - dependencia opcional
+                    logger.warning(
+                        "Callback results cached per process: install "
+                        '"dash[diskcache]" to share them between workers'
+                    )
+                    _store_instance = False
+
+    # Un Cache vacío es falso (tiene `__len__`): comparar con False
+    return None if _store_instance is False else _store_instance
+
+
+def _sort_key(item: Any) -> tuple:
+    """Clave de orden que distingue tipos (1 y "1" no son el mismo valor)"""
+    return type(item).__name__, json.dumps(item, sort_keys=True, default=repr)
+
+
+def canonical_state(value: Any) -> Any:
+    """
+    Normaliza un estado de filtros para que sea independiente del orden.
+
+    Las claves de los diccionarios se ordenan al serializar; además, las
+    listas de valores de un filtro (columna -> valores) se ordenan, ya que
+    seleccionar A y B equivale a seleccionar B y A. Los valores conservan su
+    tipo, así que `[1]` y `["1"]` siguen siendo estados distintos.
+
+    Args:
+        value: Estado de filtros (columna -> valores)
+
+    Returns:
+        Estado equivalente con las listas de valores ordenadas
+    """
+    if isinstance(value, dict):
+        return {
+            key: sorted(v, key=_sort_key) if isinstance(v, list) else v
+            for key, v in value.items()
+        }
+    return value
+
+
+def make_callback_key(
+    name: str, versions: Iterable[str], args: tuple, normalize: Optional[Callable]
+) -> str:
+    """
+    Construye la clave de un resultado memorizado.
+
+    Args:
+        name: Nombre cualificado del callback
+        versions: Versiones de los datasets usados
+        args: Argumentos del callback
+        normalize: Función que canoniza cada argumento (opcional)
+
+    Returns:
+        str: Clave hexadecimal
+    """
+    if normalize is not None:
+        args = tuple(normalize(arg) for arg in args)
+    state = json.dumps(
+        [list(versions), args], sort_keys=True, separators=(",", ":"), default=repr
+    )
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(name.encode())
+    digest.update(state.encode())
+    return f"callback:{digest.hexdigest()}"
+
+
+def _dataset_versions(datasets: Iterable[str]) -> Optional[list]:
+    """Versiones actuales de los datasets (None si alguno no está versionado)"""
+    loader = get_data_loader()
+    versions = []
+    for name in datasets:
+        version = get_dataset_version(loader.fetch_dataset(name))
+        if version is None:
+            return None
+        versions.append(version)
+    return versions
+
+
+def _compute(
+    store: Optional[Any], key: str, func: Callable, args: tuple, ttl: float
+) -> str:
+    """
+    Calcula, serializa y guarda el resultado de un callback.
+
+    Con diskcache, solo un worker calcula cada clave: el que consigue el
+    cerrojo; los demás esperan a que el resultado aparezca (o a que el
+    cerrojo se libere sin él, si el cálculo falló, y lo intentan ellos).
+
+    Args:
+        store: diskcache compartido (None = caché de figuras del proceso)
+        key: Clave del resultado
+        func: Callback original
+        args: Argumentos del callback
+        ttl: Segundos de validez del resultado
+
+    Returns:
+        str: Resultado serializado
+    """
+    if store is None:
+        payload = json.dumps(func(*args), cls=PlotlyJSONEncoder)
+        get_figure_cache().put(key, payload, ttl=ttl)
+        return payload
+
+    lock_key = f"{key}:lock"
+    while not store.add(lock_key, os.getpid(), expire=_LOCK_TIMEOUT):
+        payload = store.get(key)
+        if payload is not None:
+            return payload
+        time.sleep(_POLL_INTERVAL)
+
+    try:
+        # Puede haberlo terminado otro worker justo antes de soltar el cerrojo
+        payload = store.get(key)
+        if payload is None:
+            payload = json.dumps(func(*args), cls=PlotlyJSONEncoder)
+            store.set(key, payload, expire=ttl)
+        return payload
+    finally:
+        store.delete(lock_key)
+
+
+def memoize_callback(
+    datasets: Iterable[str],
+    ttl: Optional[float] = None,
+    normalize: Optional[Callable] = None,
+) -> Callable:
+    """
+    Decorador que memoriza un callback de Dash.
+
+    Las salidas se serializan con el codificador de Plotly (figuras, arrays
+    de numpy y componentes) y se devuelven deserializadas; Dash las envía al
+    navegador igual que las originales. El callback no debe depender de
+    `dash.ctx`, porque el contexto no forma parte de la clave.
+
+    Args:
+        datasets: Nombres de los datasets que lee el callback
+        ttl: Segundos de validez de un resultado (None = Config.CALLBACK_CACHE_TTL)
+        normalize: Función que canoniza cada argumento antes de calcular la
+            clave (p. ej. `canonical_state` para estados de filtros)
+
+    Returns:
+        Callable: Decorador
+    """
+    datasets = list(datasets)
+    ttl = Config.CALLBACK_CACHE_TTL if ttl is None else ttl
+
+    def decorator(func: Callable) -> Callable:
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            versions = _dataset_versions(datasets)
+            if versions is None:
+                # Datos sin versión: no se pueden identificar, se calcula sin caché
+                return func(*args)
+
+            store = get_callback_store()
+            key = make_callback_key(name, versions, args, normalize)
+            if store is not None:
+                payload = store.get(key)
+            else:
+                payload = get_figure_cache().get(key)
+            if payload is not None:
+                return json.loads(payload)
+
+            with _flights_lock:
+                flight = _flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = _flights[key] = _Flight()
+
+            if not leader:
+                flight.done.wait()
+                if flight.error is not None:
+                    raise flight.error
+                logger.debug(f"Coalesced callback {name}")
+                return json.loads(flight.payload)
+
+            try:
+                flight.payload = _compute(store, key, func, args, ttl)
+            except BaseException as error:
+                flight.error = error
+                raise
+            finally:
+                with _flights_lock:
+                    del _flights[key]
+                flight.done.set()
+
+            return json.loads(flight.payload)
+
+        return wrapper
+
+    return decorator
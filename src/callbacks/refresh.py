@@ -0,0 +1,67 @@
+"""
+Callback de actualización de datos en segundo plano.
+
+La descarga desde ORDS se ejecuta como callback en segundo plano (un proceso
+del gestor de trabajos), así que no ocupa un worker web. Al terminar se
+publica una nueva generación de datos y se vuelve a aplicar el filtro
+cruzado, lo que hace que el worker que responde adopte los datos nuevos.
+"""
+
+import logging
+from datetime import datetime
+
+from dash import Dash, Input, Output, State, no_update
+
+from ..data.refresh import refresh_all
+from ..utils.jobs import get_background_manager
+
+logger = logging.getLogger(__name__)
+
+
+def register_refresh_callbacks(app: Dash) -> None:
+    """
+    Registra el callback de actualización (si hay gestor de trabajos).
+
+    Args:
+        app: Instancia de la aplicación Dash
+
+    Returns:
+        None
+    """
+    manager = get_background_manager()
+    if manager is None:
+        return
+
+    @app.callback(
+        Output("refresh-status", "children"),
+        Output("cross-filter-store", "data", allow_duplicate=True),
+        Input("refresh-button", "n_clicks"),
+        State("cross-filter-store", "data"),
+        background=True,
+        manager=manager,
+        running=[(Output("refresh-button", "disabled"), True, False)],
+        progress=[
+            Output("refresh-progress", "value"),
+            Output("refresh-progress", "max"),
+            Output("refresh-progress-label", "children"),
+        ],
+        prevent_initial_call=True,
+    )
+    def refresh_data(set_progress, n_clicks, filters):
+        """Descarga de nuevo los datos y publica la nueva generación"""
+
+        def progress(done, total, name, detail=None):
+            label = f"Descargando {name} ({done + 1}/{total})" if name else ""
+            if name and detail:
+                label += f": {detail}"
+            set_progress((str(done), str(total), label))
+
+        try:
+            manifest = refresh_all(progress)
+        except Exception as e:
+            logger.error(f"Error refreshing data: {e}")
+            return f"❌ Error: {str(e)}", no_update
+
+        updated = datetime.fromtimestamp(manifest["published_at"])
+        # Reaplicar el filtro cruzado redibuja las secciones con los datos nuevos
+        return f"✅ Datos actualizados ({updated:%H:%M:%S})", filters or {}
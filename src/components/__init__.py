@@ -10,8 +10,12 @@ from .charts import (
     create_line_chart,
     create_heatmap,
     create_scatter_chart,
+    create_trendline_traces,
     create_histogram,
+    create_quantile_box_chart,
 )
+from .controls import create_legend_toggle, create_section_toggle, section_id
+from .figure_cache import FigureCache, cached_figure, get_figure_cache
 from .tables import create_data_table, create_comparison_table, create_crosstab_table
 
 __all__ = [
@@ -24,7 +28,15 @@ __all__ = [
     "create_line_chart",
     "create_heatmap",
     "create_scatter_chart",
+    "create_trendline_traces",
     "create_histogram",
+    "create_quantile_box_chart",
+    "create_legend_toggle",
+    "create_section_toggle",
+    "section_id",
+    "FigureCache",
+    "cached_figure",
+    "get_figure_cache",
     "create_data_table",
     "create_comparison_table",
     "create_crosstab_table",
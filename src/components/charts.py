@@ -1,18 +1,50 @@
 """
 Funciones para crear gráficos de Plotly reutilizables
+
+Los constructores públicos están memorizados con `cached_figure`: devuelven el
+diccionario de la figura (listo para `dcc.Graph`) y una llamada repetida con los
+mismos datos, parámetros y tema se sirve desde la caché de figuras.
 """
 
 import plotly.express as px
 import plotly.graph_objects as go
+import numpy as np
 import pandas as pd
-from typing import Optional
+from typing import List, Optional
 
+from ..data.aggregations import count_categories, crosstab_counts
+from ..data.quantiles import grouped_quantiles
+from ..data.regression import METHOD_LABELS, fit_regression
 from ..utils.themes import apply_theme
+from .fast_charts import _default_colorway, bar_figure, line_figure, pie_figure
+from .figure_cache import cached_figure
+
+# Puntos del eje X con los que se dibuja una recta ajustada y su banda
+_TRENDLINE_POINTS = 100
+
+
+def _apply_category_order(values, order: Optional[list] = None) -> list:
+    """
+    Ordena categorías: primero las de `order` y después el resto.
+
+    Args:
+        values: Categorías presentes
+        order: Orden preferido (opcional)
+
+    Returns:
+        list: Categorías ordenadas
+    """
+    values = list(values)
+    if not order:
+        return values
+    preferred = [value for value in order if value in values]
+    return preferred + [value for value in values if value not in preferred]
 
 
+@cached_figure
 def create_empty_chart(
     message: str = "No hay datos disponibles", height: int = 400, theme: str = "light"
-) -> go.Figure:
+) -> dict:
     """
     Crea un gráfico vacío con un mensaje.
 
@@ -22,7 +54,7 @@ def create_empty_chart(
         theme: Tema (dark/light)
 
     Returns:
-        go.Figure: Figura vacía con mensaje
+        dict: Figura vacía con mensaje
     """
     fig = go.Figure()
     fig.add_annotation(
@@ -43,6 +75,7 @@ def create_empty_chart(
     return apply_theme(fig, theme)
 
 
+@cached_figure
 def create_bar_chart(
     df: pd.DataFrame,
     x: str,
@@ -54,7 +87,8 @@ def create_bar_chart(
     color_continuous_scale: str = "Blues",
     height: int = 400,
     theme: str = "light",
-) -> go.Figure:
+    single_trace: bool = False,
+) -> dict:
     """
     Crea un gráfico de barras.
 
@@ -69,22 +103,24 @@ def create_bar_chart(
         color_continuous_scale: Escala de colores
         height: Altura del gráfico
         theme: Tema (dark/light)
+        single_trace: Color discreto en una sola traza (ver `bar_figure`)
 
     Returns:
-        go.Figure: Gráfico de barras
+        dict: Figura del gráfico de barras
     """
     if df.empty:
         return create_empty_chart(height=height, theme=theme)
 
-    fig = px.bar(
+    fig = bar_figure(
         df,
         x=x,
         y=y,
         orientation=orientation,
         title=title,
-        labels=labels or {},
+        labels=labels,
         color=color or y if orientation == "h" else x,
         color_continuous_scale=color_continuous_scale,
+        single_trace=single_trace,
     )
 
     fig.update_layout(
@@ -95,22 +131,10 @@ def create_bar_chart(
         hovermode="closest",
     )
 
-    fig.update_xaxes(
-        showgrid=True,
-        gridwidth=1,
-        gridcolor="rgba(203, 213, 225, 0.3)",
-        tickfont=dict(size=10),
-    )
-    fig.update_yaxes(
-        showgrid=True,
-        gridwidth=1,
-        gridcolor="rgba(203, 213, 225, 0.3)",
-        tickfont=dict(size=10),
-    )
-
     return apply_theme(fig, theme)
 
 
+@cached_figure
 def create_pie_chart(
     df: pd.DataFrame,
     values: str,
@@ -121,7 +145,7 @@ def create_pie_chart(
     category_orders: Optional[dict] = None,
     height: int = 400,
     theme: str = "light",
-) -> go.Figure:
+) -> dict:
     """
     Crea un gráfico de pastel/donut.
 
@@ -137,19 +161,19 @@ def create_pie_chart(
         theme: Tema (dark/light)
 
     Returns:
-        go.Figure: Gráfico de pastel
+        dict: Figura del gráfico de pastel
     """
     if df.empty:
         return create_empty_chart(height=height, theme=theme)
 
-    fig = px.pie(
+    fig = pie_figure(
         df,
         values=values,
         names=names,
         title=title,
         hole=hole,
         color_discrete_sequence=color_discrete_sequence or px.colors.qualitative.Set3,
-        category_orders=category_orders or {},
+        category_orders=category_orders,
     )
 
     fig.update_traces(
@@ -159,13 +183,6 @@ def create_pie_chart(
         marker=dict(line=dict(color="#f8fafc", width=1.5)),
     )
 
-    # Configuración de la leyenda según el tema
-    legend_bgcolor = (
-        "rgba(30, 41, 59, 0.9)" if theme == "dark" else "rgba(255,255,255,0.9)"
-    )
-    legend_bordercolor = "#475569" if theme == "dark" else "#e2e8f0"
-    legend_font_color = "#e2e8f0" if theme == "dark" else "#1e293b"
-
     fig.update_layout(
         height=height,
         showlegend=True,
@@ -176,9 +193,7 @@ def create_pie_chart(
             y=0.5,
             xanchor="left",
             x=1.02,
-            font=dict(size=9, color=legend_font_color),
-            bgcolor=legend_bgcolor,
-            bordercolor=legend_bordercolor,
+            font=dict(size=9),
             borderwidth=1,
         ),
     )
@@ -186,6 +201,7 @@ def create_pie_chart(
     return apply_theme(fig, theme)
 
 
+@cached_figure
 def create_line_chart(
     df: pd.DataFrame,
     x: str,
@@ -196,7 +212,7 @@ def create_line_chart(
     line_color: str = "#60a5fa",
     height: int = 350,
     theme: str = "light",
-) -> go.Figure:
+) -> dict:
     """
     Crea un gráfico de líneas.
 
@@ -212,17 +228,17 @@ def create_line_chart(
         theme: Tema (dark/light)
 
     Returns:
-        go.Figure: Gráfico de líneas
+        dict: Figura del gráfico de líneas
     """
     if df.empty:
         return create_empty_chart(height=height, theme=theme)
 
-    fig = px.line(
+    fig = line_figure(
         df,
         x=x,
         y=y,
         title=title,
-        labels=labels or {},
+        labels=labels,
         markers=markers,
     )
 
@@ -234,16 +250,13 @@ def create_line_chart(
     fig.update_layout(
         height=height,
         margin=dict(l=40, r=20, t=40 if title else 10, b=80),
-        xaxis=dict(tickangle=-45, tickfont=dict(size=10)),
-        yaxis=dict(tickfont=dict(size=10)),
+        xaxis=dict(tickangle=-45),
     )
 
-    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor="rgba(203, 213, 225, 0.3)")
-    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor="rgba(203, 213, 225, 0.3)")
-
     return apply_theme(fig, theme)
 
 
+@cached_figure
 def create_heatmap(
     df: pd.DataFrame,
     x: str,
@@ -254,9 +267,12 @@ def create_heatmap(
     category_orders: Optional[dict] = None,
     height: int = 500,
     theme: str = "light",
-) -> go.Figure:
+) -> dict:
     """
-    Crea un mapa de calor.
+    Crea un mapa de calor de conteos entre dos columnas categóricas.
+
+    La matriz se calcula en el servidor a partir de la tabla cruzada cacheada,
+    por lo que la figura solo contiene la matriz y no las filas crudas.
 
     Args:
         df: DataFrame con los datos
@@ -270,21 +286,54 @@ def create_heatmap(
         theme: Tema (dark/light)
 
     Returns:
-        go.Figure: Mapa de calor
+        dict: Figura del mapa de calor
     """
     if df.empty:
         return create_empty_chart(height=height, theme=theme)
 
-    fig = px.density_heatmap(
-        df,
-        x=x,
-        y=y,
+    labels = labels or {}
+    category_orders = category_orders or {}
+
+    # Matriz agregada en el servidor (compartida con la tabla de contingencia)
+    matrix = crosstab_counts(df, row=x, col=y).T
+    x_values = _apply_category_order(matrix.columns, category_orders.get(x))
+    y_values = _apply_category_order(matrix.index, category_orders.get(y))
+    matrix = matrix.loc[y_values, x_values]
+
+    x_label = labels.get(x, x)
+    y_label = labels.get(y, y)
+
+    fig = go.Figure(
+        go.Heatmap(
+            z=matrix.to_numpy(),
+            x=x_values,
+            y=y_values,
+            coloraxis="coloraxis",
+            name="",
+            hovertemplate=(
+                f"{x_label}=%{{x}}<br>{y_label}=%{{y}}<br>count=%{{z}}<extra></extra>"
+            ),
+        )
+    )
+
+    fig.update_layout(
         title=title,
-        labels=labels or {},
-        color_continuous_scale=color_continuous_scale,
-        category_orders=category_orders or {},
+        xaxis=dict(title_text=x_label),
+        yaxis=dict(title_text=y_label),
+        coloraxis=dict(
+            colorscale=color_continuous_scale, colorbar=dict(title_text="count")
+        ),
+        legend=dict(tracegroupgap=0),
     )
 
+    # Igual que plotly express: el eje Y se invierte para leer de arriba abajo
+    if x in category_orders:
+        fig.update_xaxes(categoryorder="array", categoryarray=category_orders[x])
+    if y in category_orders:
+        fig.update_yaxes(
+            categoryorder="array", categoryarray=list(reversed(category_orders[y]))
+        )
+
     fig.update_layout(
         height=height,
         margin=dict(l=40, r=20, t=40 if title else 10, b=80),
@@ -295,6 +344,61 @@ def create_heatmap(
     return apply_theme(fig, theme)
 
 
+def create_trendline_traces(
+    df: pd.DataFrame, method: str, x: str, y: str
+) -> List[dict]:
+    """
+    Crea las trazas de una recta ajustada con su banda de confianza del 95%.
+
+    Args:
+        df: DataFrame con los datos
+        method: Método de ajuste ("ols", "theil_sen" o "quantile")
+        x: Columna explicativa
+        y: Columna respuesta
+
+    Returns:
+        list: Trazas (límites de la banda y recta); vacía si no hay filas
+        suficientes
+    """
+    fit = fit_regression(df, method, x=x, y=y) if not df.empty else None
+    if fit is None:
+        return []
+
+    grid = np.linspace(df[x].min(), df[x].max(), _TRENDLINE_POINTS)
+    lower, upper = fit.band(grid)
+    name = METHOD_LABELS[method]
+    traces = [
+        go.Scatter(
+            x=grid,
+            y=lower,
+            mode="lines",
+            line=dict(width=0),
+            hoverinfo="skip",
+            showlegend=False,
+        ),
+        go.Scatter(
+            x=grid,
+            y=upper,
+            mode="lines",
+            line=dict(width=0),
+            fill="tonexty",
+            fillcolor="rgba(239, 68, 68, 0.2)",
+            name=f"IC 95% ({name})",
+            hoverinfo="skip",
+        ),
+        go.Scatter(
+            x=grid,
+            y=fit.predict(grid),
+            mode="lines",
+            line=dict(color="#ef4444", width=2),
+            name=name,
+            hovertemplate=f"{name}: %{{y:.1f}}<extra></extra>",
+        ),
+    ]
+    return [trace.to_plotly_json() for trace in traces]
+
+
+@cached_figure
 def create_scatter_chart(
     df: pd.DataFrame,
     x: str,
@@ -305,9 +409,10 @@ def create_scatter_chart(
     size: Optional[str] = None,
     color_continuous_scale: str = "Viridis",
     hover_data: Optional[dict] = None,
+    trendline: Optional[str] = None,
     height: int = 400,
     theme: str = "light",
-) -> go.Figure:
+) -> dict:
     """
     Crea un gráfico de dispersión.
 
@@ -321,11 +426,13 @@ def create_scatter_chart(
         size: Columna para tamaño de puntos
         color_continuous_scale: Escala de colores
         hover_data: Datos adicionales al pasar el mouse
+        trendline: Método de la recta ajustada ("ols", "theil_sen" o
+            "quantile"), dibujada con su banda de confianza del 95%
         height: Altura del gráfico
         theme: Tema (dark/light)
 
     Returns:
-        go.Figure: Gráfico de dispersión
+        dict: Figura del gráfico de dispersión
     """
     if df.empty:
         return create_empty_chart(height=height, theme=theme)
@@ -342,19 +449,18 @@ def create_scatter_chart(
         hover_data=hover_data or {},
     )
 
+    if trendline:
+        fig.add_traces(create_trendline_traces(df, trendline, x, y))
+
     fig.update_layout(
         height=height,
         margin=dict(l=40, r=20, t=40 if title else 10, b=60),
-        xaxis=dict(tickfont=dict(size=10)),
-        yaxis=dict(tickfont=dict(size=10)),
     )
 
-    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor="rgba(203, 213, 225, 0.3)")
-    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor="rgba(203, 213, 225, 0.3)")
-
     return apply_theme(fig, theme)
 
 
+@cached_figure
 def create_histogram(
     df: pd.DataFrame,
     x: str,
@@ -364,11 +470,15 @@ def create_histogram(
     labels: Optional[dict] = None,
     color_discrete_map: Optional[dict] = None,
     category_orders: Optional[dict] = None,
+    categories: Optional[List] = None,
     height: int = 400,
     theme: str = "light",
-) -> go.Figure:
+) -> dict:
     """
-    Crea un histograma.
+    Crea un histograma de categorías a partir de conteos agregados.
+
+    Los conteos se calculan en el servidor y se dibujan como barras, por lo que
+    la figura no incluye las filas crudas del DataFrame.
 
     Args:
         df: DataFrame con los datos
@@ -379,34 +489,167 @@ def create_histogram(
         labels: Diccionario de etiquetas
         color_discrete_map: Mapeo de colores
         category_orders: Orden de categorías
+        categories: Categorías de x que se dibujan (None = todas); filtrar
+            los conteos permite usar el DataFrame cacheado en lugar de un
+            subconjunto sin versión
         height: Altura del gráfico
         theme: Tema (dark/light)
 
     Returns:
-        go.Figure: Histograma
+        dict: Figura del histograma
     """
     if df.empty:
         return create_empty_chart(height=height, theme=theme)
 
-    fig = px.histogram(
-        df,
-        x=x,
-        color=color,
+    labels = labels or {}
+    color_discrete_map = dict(color_discrete_map or {})
+    category_orders = category_orders or {}
+
+    # Conteos agregados en el servidor: la figura no transporta filas crudas
+    counts = count_categories(df, x=x, color=color, category_orders=category_orders)
+    if categories is not None:
+        counts = counts[counts[x].isin(categories)]
+
+    x_label = labels.get(x, x)
+    fig = go.Figure()
+
+    groups = counts.groupby(color, sort=False) if color else [(None, counts)]
+    sequence = _default_colorway()
+
+    for value, group in groups:
+        if color:
+            if value not in color_discrete_map:
+                color_discrete_map[value] = sequence[
+                    len(color_discrete_map) % len(sequence)
+                ]
+            name = str(value)
+            hovertemplate = (
+                f"{labels.get(color, color)}={value}<br>"
+                f"{x_label}=%{{x}}<br>count=%{{y}}<extra></extra>"
+            )
+        else:
+            name = ""
+            hovertemplate = f"{x_label}=%{{x}}<br>count=%{{y}}<extra></extra>"
+
+        fig.add_trace(
+            go.Bar(
+                x=group[x].to_numpy(),
+                y=group["count"].to_numpy(),
+                name=name,
+                legendgroup=name,
+                offsetgroup=name if barmode == "group" else None,
+                alignmentgroup="True" if barmode == "group" else None,
+                marker=dict(
+                    color=color_discrete_map[value] if color else sequence[0],
+                    pattern=dict(shape=""),
+                ),
+                orientation="v",
+                showlegend=bool(color),
+                hovertemplate=hovertemplate,
+            )
+        )
+
+    fig.update_layout(
         barmode=barmode,
         title=title,
-        labels=labels or {},
-        color_discrete_map=color_discrete_map or {},
-        category_orders=category_orders or {},
+        xaxis=dict(title_text=x_label),
+        yaxis=dict(title_text="count"),
+        legend=dict(
+            title_text=labels.get(color, color) if color else None, tracegroupgap=0
+        ),
     )
 
+    if x in category_orders:
+        fig.update_xaxes(categoryorder="array", categoryarray=category_orders[x])
+
     fig.update_layout(
         height=height,
         margin=dict(l=40, r=20, t=40 if title else 10, b=80),
-        xaxis=dict(tickangle=-45 if barmode != "stack" else 0, tickfont=dict(size=10)),
-        yaxis=dict(tickfont=dict(size=10)),
+        xaxis=dict(tickangle=-45 if barmode != "stack" else 0),
     )
 
-    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor="rgba(203, 213, 225, 0.3)")
-    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor="rgba(203, 213, 225, 0.3)")
+    return apply_theme(fig, theme)
+
+
+@cached_figure
+def create_quantile_box_chart(
+    df: pd.DataFrame,
+    value: str,
+    group: Optional[str] = None,
+    bins: Optional[list] = None,
+    bin_labels: Optional[list] = None,
+    title: Optional[str] = None,
+    labels: Optional[dict] = None,
+    height: int = 400,
+    theme: str = "light",
+) -> dict:
+    """
+    Crea un diagrama de cajas por grupo a partir de resúmenes de cuantiles.
+
+    Las cajas se dibujan con estadísticos precalculados (t-digest), así que
+    la figura no incluye las filas crudas: caja p25-p75, mediana, bigotes
+    p1-p99 y un marcador en el p90.
+
+    Args:
+        df: DataFrame con los datos
+        value: Columna numérica a resumir
+        group: Columna de agrupación (None = una sola caja)
+        bins: Límites de bandas para agrupar una columna numérica (opcional)
+        bin_labels: Etiquetas de las bandas
+        title: Título del gráfico
+        labels: Diccionario de etiquetas
+        height: Altura del gráfico
+        theme: Tema (dark/light)
+
+    Returns:
+        dict: Figura del diagrama de cajas
+    """
+    if df.empty:
+        return create_empty_chart(height=height, theme=theme)
+
+    labels = labels or {}
+    summary = grouped_quantiles(df, value, group, bins, bin_labels).summary(
+        quantiles=(0.01, 0.25, 0.5, 0.75, 0.9, 0.99), order=bin_labels
+    )
+    groups = summary["grupo"].astype(str).to_numpy()
+    color = _default_colorway()[0]
+
+    fig = go.Figure()
+    fig.add_trace(
+        go.Box(
+            x=groups,
+            q1=summary["p25"].to_numpy(),
+            median=summary["p50"].to_numpy(),
+            q3=summary["p75"].to_numpy(),
+            lowerfence=summary["p1"].to_numpy(),
+            upperfence=summary["p99"].to_numpy(),
+            mean=summary["media"].to_numpy(),
+            name=labels.get(value, value),
+            marker=dict(color=color),
+            boxpoints=False,
+            showlegend=False,
+        )
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=groups,
+            y=summary["p90"].to_numpy(),
+            customdata=summary["casos"].to_numpy(),
+            mode="markers",
+            name="P90",
+            marker=dict(symbol="diamond", size=9, color=color),
+            hovertemplate="%{x}<br>P90=%{y:.1f}<br>casos=%{customdata:,}"
+            "<extra></extra>",
+        )
+    )
+
+    fig.update_layout(
+        title=title,
+        height=height,
+        margin=dict(l=40, r=20, t=40 if title else 10, b=60),
+        xaxis=dict(title_text=labels.get(group, group) if group else None),
+        yaxis=dict(title_text=labels.get(value, value)),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, x=0),
+    )
 
     return apply_theme(fig, theme)
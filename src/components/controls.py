@@ -0,0 +1,60 @@
+"""
+Controles de presentación (contraer secciones, mostrar leyendas).
+Su estado se resuelve íntegramente en el navegador (callbacks de cliente).
+"""
+
+from dash import html
+
+# Sufijo del id de los botones de leyenda: "<id del gráfico>-legend-toggle"
+LEGEND_TOGGLE_SUFFIX = "-legend-toggle"
+
+
+def section_id(name: str) -> dict:
+    """
+    Id (pattern-matching) del contenedor de una sección contraíble.
+
+    Args:
+        name: Nombre de la sección
+
+    Returns:
+        dict: Id del contenedor
+    """
+    return {"type": "section", "index": name}
+
+
+def create_section_toggle(name: str) -> html.Button:
+    """
+    Crea el botón que contrae o expande una sección.
+
+    Args:
+        name: Nombre de la sección (el mismo que en `section_id`)
+
+    Returns:
+        html.Button: Botón de contraer/expandir
+    """
+    return html.Button(
+        "▾",
+        id={"type": "section-toggle", "index": name},
+        className="section-toggle",
+        title="Contraer sección",
+        **{"aria-expanded": "true", "aria-label": "Contraer o expandir sección"},
+    )
+
+
+def create_legend_toggle(graph_id: str) -> html.Button:
+    """
+    Crea el botón que muestra u oculta la leyenda de un gráfico.
+
+    Args:
+        graph_id: Id del `dcc.Graph`
+
+    Returns:
+        html.Button: Botón de leyenda
+    """
+    return html.Button(
+        "Leyenda",
+        id=f"{graph_id}{LEGEND_TOGGLE_SUFFIX}",
+        className="legend-toggle",
+        title="Mostrar u ocultar la leyenda",
+        **{"aria-pressed": "true"},
+    )
@@ -0,0 +1,352 @@
+"""
+Constructores rápidos de figuras con plotly.graph_objects.
+
+Producen la misma figura que plotly express para los casos que usa el
+dashboard (barras, pastel y líneas sobre DataFrames ya agregados), pero
+construyen las trazas directamente desde arrays de numpy y, para entradas de
+confianza, sin la validación de propiedades de plotly.
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.colors as pcolors
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+from typing import Dict, List, Optional
+
+
+def _default_colorway() -> list:
+    """
+    Obtiene la secuencia de colores discreta que usa plotly express por defecto.
+
+    Returns:
+        list: Secuencia de colores del template por defecto
+    """
+    template = pio.templates[pio.templates.default]
+    return list(template.layout.colorway or px.colors.qualitative.Plotly)
+
+
+def _hovertemplate(fields: Dict[str, str]) -> str:
+    """
+    Construye el hovertemplate con el formato de plotly express.
+
+    Args:
+        fields: Etiqueta -> valor o referencia (%{x}, %{y}, ...)
+
+    Returns:
+        str: Hovertemplate
+    """
+    body = "<br>".join(f"{label}={value}" for label, value in fields.items())
+    return f"{body}<extra></extra>"
+
+
+def _ordered_codes(values: np.ndarray, order: Optional[List] = None):
+    """
+    Factoriza valores en orden de aparición, priorizando `order`.
+
+    Args:
+        values: Array de valores
+        order: Orden preferido (opcional)
+
+    Returns:
+        Tuple: (códigos por fila, categorías ordenadas)
+    """
+    codes, uniques = pd.factorize(values)
+    uniques = list(uniques)
+    if not order:
+        return codes, uniques
+
+    preferred = {value: i for i, value in enumerate(order)}
+    ordered = sorted(
+        range(len(uniques)),
+        key=lambda i: (0, preferred[uniques[i]])
+        if uniques[i] in preferred
+        else (1, i),
+    )
+    rank = np.empty(len(uniques), dtype=np.intp)
+    rank[ordered] = np.arange(len(uniques))
+    return np.where(codes >= 0, rank[codes], -1), [uniques[i] for i in ordered]
+
+
+def _single_bar_trace(
+    df: pd.DataFrame,
+    x: str,
+    y: str,
+    color: str,
+    labels: dict,
+    orientation: str,
+    codes: np.ndarray,
+    sequence: list,
+) -> dict:
+    """Traza única de barras con color discreto por barra (ver `bar_figure`)"""
+    # El hover es el de las trazas por categoría: la categoría, x e y
+    if color in (x, y):
+        reference = "%{x}" if color == x else "%{y}"
+    else:
+        reference = "%{customdata}"
+    fields = {labels.get(color, color): reference}
+    fields[labels.get(x, x)] = "%{x}"
+    fields[labels.get(y, y)] = "%{y}"
+    trace = {
+        "type": "bar",
+        "hovertemplate": _hovertemplate(fields),
+        "legendgroup": "",
+        "marker": {
+            "color": [sequence[code % len(sequence)] for code in codes],
+            "pattern": {"shape": ""},
+        },
+        "name": "",
+        "orientation": orientation,
+        "showlegend": False,
+        "textposition": "auto",
+        "x": df[x].to_numpy(),
+        "y": df[y].to_numpy(),
+        "xaxis": "x",
+        "yaxis": "y",
+    }
+    if reference == "%{customdata}":
+        trace["customdata"] = df[color].to_numpy()
+    return trace
+
+
+def bar_figure(
+    df: pd.DataFrame,
+    x: str,
+    y: str,
+    orientation: str = "v",
+    color: Optional[str] = None,
+    title: Optional[str] = None,
+    labels: Optional[dict] = None,
+    color_continuous_scale: str = "Blues",
+    single_trace: bool = False,
+    validate: bool = False,
+) -> go.Figure:
+    """
+    Construye un gráfico de barras equivalente a `px.bar`.
+
+    Args:
+        df: DataFrame agregado
+        x: Columna para eje X
+        y: Columna para eje Y
+        orientation: 'v' (vertical) o 'h' (horizontal)
+        color: Columna para colorear (numérica = escala continua)
+        title: Título del gráfico
+        labels: Diccionario de etiquetas
+        color_continuous_scale: Escala de colores continua
+        single_trace: Con color discreto, una sola traza con el color de cada
+            barra en lugar de una por categoría (sin leyenda, pero se puede
+            actualizar con un parche aunque cambien las categorías)
+        validate: Validar propiedades (False para entradas de confianza)
+
+    Returns:
+        go.Figure: Gráfico de barras
+    """
+    labels = labels or {}
+    x_values = df[x].to_numpy()
+    y_values = df[y].to_numpy()
+    layout = {
+        "xaxis": {"title": {"text": labels.get(x, x)}},
+        "yaxis": {"title": {"text": labels.get(y, y)}},
+        "legend": {"tracegroupgap": 0},
+        "margin": {"t": 60},
+        "barmode": "relative",
+    }
+    if title:
+        layout["title"] = {"text": title}
+
+    traces = []
+    color_values = df[color].to_numpy() if color else None
+
+    if color and not pd.api.types.is_numeric_dtype(df[color]):
+        # Color discreto: una traza por categoría, en orden de aparición (o una
+        # sola con el color de cada barra)
+        codes, categories = _ordered_codes(color_values)
+        sequence = _default_colorway()
+        if single_trace:
+            traces.append(
+                _single_bar_trace(df, x, y, color, labels, orientation, codes, sequence)
+            )
+        else:
+            for code, category in enumerate(categories):
+                mask = codes == code
+                fields = {labels.get(color, color): category}
+                fields[labels.get(x, x)] = "%{x}"
+                fields[labels.get(y, y)] = "%{y}"
+                traces.append(
+                    {
+                        "type": "bar",
+                        "hovertemplate": _hovertemplate(fields),
+                        "legendgroup": category,
+                        "marker": {
+                            "color": sequence[code % len(sequence)],
+                            "pattern": {"shape": ""},
+                        },
+                        "name": category,
+                        "orientation": orientation,
+                        "showlegend": True,
+                        "textposition": "auto",
+                        "x": x_values[mask],
+                        "y": y_values[mask],
+                        "xaxis": "x",
+                        "yaxis": "y",
+                    }
+                )
+            layout["legend"]["title"] = {"text": labels.get(color, color)}
+
+        # La columna de color que coincide con un eje fija el orden de ese eje
+        if color == x:
+            layout["xaxis"].update(categoryorder="array", categoryarray=categories)
+        if color == y:
+            layout["yaxis"].update(
+                categoryorder="array", categoryarray=list(reversed(categories))
+            )
+    else:
+        fields = {labels.get(x, x): "%{x}", labels.get(y, y): "%{y}"}
+        marker = {"pattern": {"shape": ""}}
+        if color:
+            fields[labels.get(color, color)] = "%{marker.color}"
+            marker.update(color=color_values, coloraxis="coloraxis")
+            layout["coloraxis"] = {
+                "colorbar": {"title": {"text": labels.get(color, color)}},
+                "colorscale": pcolors.get_colorscale(color_continuous_scale),
+            }
+        else:
+            marker["color"] = _default_colorway()[0]
+        traces.append(
+            {
+                "type": "bar",
+                "hovertemplate": _hovertemplate(fields),
+                "legendgroup": "",
+                "marker": marker,
+                "name": "",
+                "orientation": orientation,
+                "showlegend": False,
+                "textposition": "auto",
+                "x": x_values,
+                "y": y_values,
+                "xaxis": "x",
+                "yaxis": "y",
+            }
+        )
+
+    return go.Figure(data=traces, layout=layout, _validate=validate)
+
+
+def pie_figure(
+    df: pd.DataFrame,
+    values: str,
+    names: str,
+    title: Optional[str] = None,
+    hole: float = 0.4,
+    color_discrete_sequence: Optional[list] = None,
+    category_orders: Optional[dict] = None,
+    validate: bool = False,
+) -> go.Figure:
+    """
+    Construye un gráfico de pastel equivalente a `px.pie`.
+
+    Args:
+        df: DataFrame agregado
+        values: Columna con los valores
+        names: Columna con los nombres
+        title: Título del gráfico
+        hole: Tamaño del agujero central
+        color_discrete_sequence: Secuencia de colores
+        category_orders: Orden de categorías para la leyenda
+        validate: Validar propiedades (False para entradas de confianza)
+
+    Returns:
+        go.Figure: Gráfico de pastel
+    """
+    name_values = df[names].to_numpy()
+    value_values = df[values].to_numpy()
+
+    # Igual que plotly express: las filas siguen `category_orders` (orden estable)
+    order = (category_orders or {}).get(names)
+    if order:
+        codes, _ = _ordered_codes(name_values, order)
+        sort_index = np.argsort(codes, kind="stable")
+        name_values = name_values[sort_index]
+        value_values = value_values[sort_index]
+
+    layout = {
+        "legend": {"tracegroupgap": 0},
+        "margin": {"t": 60},
+        "piecolorway": list(color_discrete_sequence or _default_colorway()),
+    }
+    if title:
+        layout["title"] = {"text": title}
+
+    trace = {
+        "type": "pie",
+        "domain": {"x": [0.0, 1.0], "y": [0.0, 1.0]},
+        "hole": hole,
+        "hovertemplate": _hovertemplate(
+            {names: "%{label}", values: "%{value}"}
+        ),
+        "labels": name_values,
+        "legendgroup": "",
+        "name": "",
+        "showlegend": True,
+        "values": value_values,
+    }
+    if order:
+        trace.update(sort=False, direction="clockwise")
+
+    return go.Figure(data=[trace], layout=layout, _validate=validate)
+
+
+def line_figure(
+    df: pd.DataFrame,
+    x: str,
+    y: str,
+    title: Optional[str] = None,
+    labels: Optional[dict] = None,
+    markers: bool = True,
+    validate: bool = False,
+) -> go.Figure:
+    """
+    Construye un gráfico de líneas equivalente a `px.line`.
+
+    Args:
+        df: DataFrame agregado
+        x: Columna para eje X
+        y: Columna para eje Y
+        title: Título del gráfico
+        labels: Diccionario de etiquetas
+        markers: Mostrar marcadores en los puntos
+        validate: Validar propiedades (False para entradas de confianza)
+
+    Returns:
+        go.Figure: Gráfico de líneas
+    """
+    labels = labels or {}
+    layout = {
+        "xaxis": {"title": {"text": labels.get(x, x)}},
+        "yaxis": {"title": {"text": labels.get(y, y)}},
+        "legend": {"tracegroupgap": 0},
+        "margin": {"t": 60},
+    }
+    if title:
+        layout["title"] = {"text": title}
+
+    trace = {
+        "type": "scatter",
+        "hovertemplate": _hovertemplate(
+            {labels.get(x, x): "%{x}", labels.get(y, y): "%{y}"}
+        ),
+        "legendgroup": "",
+        "line": {"color": _default_colorway()[0], "dash": "solid"},
+        "marker": {"symbol": "circle"},
+        "mode": "lines+markers" if markers else "lines",
+        "name": "",
+        "orientation": "v",
+        "showlegend": False,
+        "x": df[x].to_numpy(),
+        "y": df[y].to_numpy(),
+        "xaxis": "x",
+        "yaxis": "y",
+    }
+
+    return go.Figure(data=[trace], layout=layout, _validate=validate)
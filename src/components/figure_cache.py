@@ -0,0 +1,234 @@
+"""
+Caché de figuras versionada para la factoría de gráficos.
+Memoriza el JSON serializado de cada figura, indexado por la versión de los
+datos, los parámetros del constructor y el tema (las figuras de DataFrames sin
+versión no se cachean). La misma caché guarda los
+resultados memorizados de los callbacks (con caducidad opcional por entrada).
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+import plotly.io as pio
+
+from ..data.versioning import get_dataset_version
+from ..utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class FigureCache:
+    """Caché LRU de JSON serializado con caducidad opcional y métricas de aciertos"""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Inicializa la caché.
+
+        Args:
+            max_entries: Número máximo de figuras almacenadas
+            max_bytes: Tamaño máximo total del JSON almacenado
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._expires: Dict[str, float] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _discard(self, key: str):
+        """Elimina una entrada (debe llamarse con el lock adquirido)"""
+        payload = self._entries.pop(key, None)
+        if payload is not None:
+            self._bytes -= len(payload)
+        self._expires.pop(key, None)
+
+    def _purge_expired(self, now: float):
+        """Elimina las entradas caducadas (debe llamarse con el lock adquirido)"""
+        for key in [k for k, expires in self._expires.items() if expires <= now]:
+            self._discard(key)
+            self.expirations += 1
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Obtiene el JSON de una figura y la marca como usada recientemente.
+
+        Args:
+            key: Clave de la figura
+
+        Returns:
+            str o None si no está en caché
+        """
+        with self._lock:
+            payload = self._entries.get(key)
+            expires = self._expires.get(key)
+            if expires is not None and expires <= time.monotonic():
+                self._discard(key)
+                self.expirations += 1
+                payload = None
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key: str, payload: str, ttl: Optional[float] = None):
+        """
+        Guarda un JSON, expulsando las entradas menos usadas si hace falta.
+
+        Args:
+            key: Clave de la entrada
+            payload: JSON serializado
+            ttl: Segundos de validez de la entrada (None = sin caducidad)
+        """
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            self._purge_expired(now)
+            self._discard(key)
+
+            self._entries[key] = payload
+            self._bytes += size
+            if ttl is not None:
+                self._expires[key] = now + ttl
+
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                evicted, _ = next(iter(self._entries.items()))
+                self._discard(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        """Vacía la caché (las métricas se conservan)"""
+        with self._lock:
+            self._entries.clear()
+            self._expires.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Obtiene las métricas de la caché.
+
+        Returns:
+            dict: Aciertos, fallos, expulsiones, caducadas, ocupación y tasa
+                de aciertos
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hit_rate": self.hits / requests if requests else 0.0,
+            }
+
+
+def make_figure_key(builder: Callable, *args, **kwargs) -> Optional[str]:
+    """
+    Construye la clave de caché de una llamada a un constructor de figuras.
+
+    Los DataFrames se identifican por su versión registrada. Los que no la
+    tienen (filtrados o agregados sin versión) no tienen una clave estable
+    sin recorrer todas sus filas, así que la llamada no se cachea.
+
+    Args:
+        builder: Función constructora
+        *args: Argumentos posicionales de la llamada
+        **kwargs: Argumentos con nombre de la llamada
+
+    Returns:
+        str: Clave hexadecimal, o None si algún DataFrame no tiene versión
+    """
+    bound = inspect.signature(builder).bind(*args, **kwargs)
+    bound.apply_defaults()
+    params = {}
+    for name, value in bound.arguments.items():
+        if isinstance(value, pd.DataFrame):
+            version = get_dataset_version(value)
+            if version is None:
+                return None
+            value = {"df": version}
+        params[name] = value
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(builder.__qualname__.encode())
+    digest.update(json.dumps(params, sort_keys=True, default=repr).encode())
+    return digest.hexdigest()
+
+
+# Instancia global de la caché (singleton pattern)
+_figure_cache_instance: Optional[FigureCache] = None
+
+
+def get_figure_cache() -> FigureCache:
+    """
+    Obtiene la instancia global de la caché de figuras.
+
+    Returns:
+        FigureCache: Caché de figuras
+    """
+    global _figure_cache_instance
+
+    if _figure_cache_instance is None:
+        _figure_cache_instance = FigureCache(
+            max_entries=Config.FIGURE_CACHE_MAX_ENTRIES,
+            max_bytes=Config.FIGURE_CACHE_MAX_BYTES,
+        )
+
+    return _figure_cache_instance
+
+
+def cached_figure(builder: Callable) -> Callable:
+    """
+    Decorador que memoriza un constructor de figuras.
+
+    La figura se guarda como JSON ya serializado; una petición repetida no
+    vuelve a construirla ni a validarla con Plotly y recibe el diccionario de
+    la figura, que `dcc.Graph` acepta directamente. Cada acierto decodifica
+    el JSON y Dash lo vuelve a codificar en la respuesta: lo que se ahorra es
+    la construcción de la figura, no su serialización. Las llamadas con
+    DataFrames sin versión no se cachean.
+
+    Los constructores decorados se anotan con lo que recibe quien los llama
+    (`dict`), aunque su cuerpo devuelva una `go.Figure`.
+
+    Args:
+        builder: Función constructora (create_*_chart)
+
+    Returns:
+        Callable: Constructor memorizado
+    """
+
+    @functools.wraps(builder)
+    def wrapper(*args, **kwargs) -> dict:
+        cache = get_figure_cache()
+        key = make_figure_key(builder, *args, **kwargs)
+
+        payload = cache.get(key) if key is not None else None
+        if payload is None:
+            payload = pio.to_json(builder(*args, **kwargs), validate=False)
+            if key is not None:
+                cache.put(key, payload)
+
+        return json.loads(payload)
+
+    return wrapper
@@ -14,6 +14,7 @@ def create_metric_card(
     color: str = "#2563eb",
     background: str = "#eff6ff",
     border: str = "#bfdbfe",
+    value_id: Optional[str] = None,
 ) -> html.Div:
     """
     Crea una tarjeta de métrica (KPI) individual.
@@ -26,12 +27,15 @@ def create_metric_card(
         color: Color del valor
         background: Color de fondo
         border: Color del borde
+        value_id: Id del valor (para actualizarlo desde un callback)
 
     Returns:
         html.Div: Componente de tarjeta de métrica
     """
     # Crear un ID único para el título basado en el título
     title_id = f"metric-title-{title.lower().replace(' ', '-')}"
+    value_ids = {"id": value_id} if value_id else {}
+    sr_ids = {"id": f"{value_id}-sr"} if value_id else {}
 
     return html.Div(
         [
@@ -63,6 +67,7 @@ def create_metric_card(
                     html.H2(
                         value,
                         className="metric-value",
+                        **value_ids,
                         style={
                             "color": color,
                             "marginBottom": "12px",
@@ -92,6 +97,7 @@ def create_metric_card(
             html.Span(
                 f"{title}: {value}, {subtitle}",
                 className="sr-only",
+                **sr_ids,
             ),
         ],
         className="metric-card",
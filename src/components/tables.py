@@ -6,12 +6,16 @@ from dash import dash_table
 import pandas as pd
 from typing import Optional, List, Dict, Any, Literal, cast
 
+from ..data.aggregations import count_cube, crosstab_counts
+from ..data.table_queries import query_table
+
 
 def create_data_table(
     df: pd.DataFrame,
     columns: Optional[List[Dict[str, Any]]] = None,
     page_size: int = 10,
     sort_action: Literal["native", "custom", "none"] = "native",
+    page_action: Literal["native", "custom", "none"] = "native",
     style_table: Optional[Dict[str, Any]] = None,
     style_header: Optional[Dict[str, Any]] = None,
     style_cell: Optional[Dict[str, Any]] = None,
@@ -28,6 +32,9 @@ def create_data_table(
         columns: Lista de diccionarios con definición de columnas
         page_size: Número de filas por página
         sort_action: Tipo de ordenamiento ('native', 'custom', None)
+        page_action: Tipo de paginación ('native', 'custom', None). Con
+            'custom' solo se envía la primera página y el resto las sirve un
+            callback del servidor (ver `src.data.table_queries`)
         style_table: Estilos para la tabla completa
         style_header: Estilos para el encabezado
         style_cell: Estilos para las celdas
@@ -99,10 +106,20 @@ def create_data_table(
         else default_style_data_conditional
     )
 
+    # Paginación en el servidor: el layout solo transporta la primera página,
+    # obtenida como las demás (de un dataset troceado, no de su muestra)
+    if page_action == "custom":
+        data, page_count = query_table(df, 0, page_size)
+        kwargs.setdefault("page_current", 0)
+        kwargs.setdefault("page_count", page_count)
+    else:
+        data = df.to_dict("records") if not df.empty else []
+
     return dash_table.DataTable(
         columns=columns,  # type: ignore[arg-type]
-        data=df.to_dict("records") if not df.empty else [],  # type: ignore[arg-type]
+        data=data,  # type: ignore[arg-type]
         page_size=page_size,
+        page_action=page_action,
         sort_action=sort_action,
         sort_mode="multi",
         style_table=final_style_table,
@@ -141,16 +158,21 @@ def create_comparison_table(
         dash_table.DataTable: Tabla comparativa
     """
     if df.empty:
-        return create_data_table(pd.DataFrame(), theme=theme)
+        return create_data_table(pd.DataFrame(), theme=theme, **kwargs)
 
-    # Crear tabla pivot
-    pivot_df = df.groupby(index_col)[value_col].value_counts().unstack(fill_value=0)
+    # Tabla pivot: corte del cubo de conteos cacheado (sin recorrer filas)
+    pivot_df = count_cube(df, row=index_col, col=value_col).frame.copy()
+    pivot_df.columns = list(pivot_df.columns)
 
     # Añadir columna total
     pivot_df["Total"] = pivot_df.sum(axis=1)
 
     # Ordenar y tomar top N
-    pivot_df = pivot_df.sort_values("Total", ascending=False).head(top_n).reset_index()
+    pivot_df = (
+        pivot_df.sort_values("Total", ascending=False, kind="stable")
+        .head(top_n)
+        .reset_index()
+    )
 
     # Definir columnas
     columns = [{"name": col, "id": col} for col in pivot_df.columns]
@@ -228,12 +250,15 @@ def create_crosstab_table(
         dash_table.DataTable: Tabla de tabulación cruzada
     """
     if df.empty:
-        return create_data_table(pd.DataFrame(), theme=theme)
+        return create_data_table(pd.DataFrame(), theme=theme, **kwargs)
 
-    # Crear crosstab
-    crosstab_df = pd.crosstab(
-        df[row_col], df[col_col], margins=margins, margins_name=margins_name
-    )
+    # Matriz de conteos cacheada (la misma que usa el mapa de calor)
+    crosstab_df = crosstab_counts(df, row=row_col, col=col_col).copy()
+
+    # Añadir totales marginales
+    if margins:
+        crosstab_df[margins_name] = crosstab_df.sum(axis=1)
+        crosstab_df.loc[margins_name] = crosstab_df.sum(axis=0)
 
     # Resetear índice para tener como columna
     crosstab_df = crosstab_df.rename_axis("index").reset_index().fillna(0)
@@ -0,0 +1,493 @@
+"""
+Agregaciones vectorizadas sobre códigos categóricos.
+Calculan en el servidor los conteos que los gráficos necesitan, de forma que
+las figuras transporten O(categorías × grupos) valores en lugar de filas crudas.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .backends import get_compute_backend
+from .spill import get_spilled
+from .store import get_analytical_store
+from .versioning import get_dataset_version, register_dataset
+
+# Caché LRU de cubos de conteo: (versión, fila, columna) -> CountCube
+_CUBE_CACHE_SIZE = 32
+_cube_cache: "OrderedDict[Tuple[str, str, Optional[str]], CountCube]" = OrderedDict()
+_cube_lock = threading.Lock()
+
+# Caché LRU de estadísticos de columna: (versión, columna) -> estadísticos
+_STATS_CACHE_SIZE = 32
+_stats_cache: "OrderedDict[Tuple[str, str], Dict[str, float]]" = OrderedDict()
+_stats_lock = threading.Lock()
+
+
+def _ordered_categories(
+    uniques: Sequence, order: Optional[Sequence] = None
+) -> Tuple[np.ndarray, List]:
+    """
+    Ordena categorías siguiendo `category_orders` al estilo de plotly express.
+
+    Las categorías presentes en `order` van primero (en ese orden) y el resto
+    conserva su orden de aparición.
+
+    Args:
+        uniques: Categorías en orden de aparición
+        order: Orden preferido (opcional)
+
+    Returns:
+        Tuple: (rango de cada categoría original, categorías ordenadas)
+    """
+    uniques = list(uniques)
+    if not order:
+        return np.arange(len(uniques)), uniques
+
+    preferred = {value: i for i, value in enumerate(order)}
+    ordered = sorted(
+        range(len(uniques)),
+        key=lambda i: (0, preferred[uniques[i]])
+        if uniques[i] in preferred
+        else (1, i),
+    )
+
+    rank = np.empty(len(uniques), dtype=np.intp)
+    rank[ordered] = np.arange(len(uniques))
+    return rank, [uniques[i] for i in ordered]
+
+
+def count_categories(
+    df: pd.DataFrame,
+    x: str,
+    color: Optional[str] = None,
+    category_orders: Optional[dict] = None,
+) -> pd.DataFrame:
+    """
+    Cuenta filas por categoría (y grupo de color) usando códigos categóricos.
+
+    El resultado reproduce el orden que usaría `px.histogram`: los grupos de
+    color en orden de aparición (o según `category_orders`) y, dentro de cada
+    grupo, las categorías en el orden en que aparecen en sus filas. Las filas
+    con valores nulos se descartan, igual que en plotly.
+
+    Args:
+        df: DataFrame con filas crudas
+        x: Columna categórica a contar
+        color: Columna de agrupación (opcional)
+        category_orders: Orden de categorías por columna
+
+    Returns:
+        DataFrame con columnas: x, color (si aplica), count
+    """
+    category_orders = category_orders or {}
+    columns = [x] + ([color] if color else [])
+
+    store = get_analytical_store()
+    table = store.serves(df) if store is not None else None
+    if table is not None:
+        counts = store.count_by(table, columns).to_pandas()
+        return _order_counts(counts, x, color, category_orders)
+
+    # Datasets troceados y motores perezosos: conteos del motor de cálculo
+    backend = get_compute_backend()
+    if backend.lazy or get_spilled(df) is not None:
+        counts = backend.count_by(df, columns)
+        return _order_counts(counts, x, color, category_orders)
+
+    x_codes, x_uniques = pd.factorize(df[x])
+    valid = x_codes >= 0
+
+    if color:
+        color_codes, color_uniques = pd.factorize(df[color])
+        valid &= color_codes >= 0
+    else:
+        color_codes, color_uniques = np.zeros(len(df), dtype=np.intp), [None]
+
+    if not valid.any():
+        return pd.DataFrame(columns=columns + ["count"])
+
+    x_codes = x_codes[valid]
+    color_rank, color_values = _ordered_categories(
+        color_uniques, category_orders.get(color) if color else None
+    )
+    color_codes = color_rank[color_codes[valid]]
+
+    # Clave combinada grupo × categoría: un único bincount cuenta todo
+    n_x = len(x_uniques)
+    keys = color_codes * n_x + x_codes
+    counts = np.bincount(keys, minlength=len(color_values) * n_x)
+    present, first_seen = np.unique(keys, return_index=True)
+
+    # Orden final: grupo, luego primera aparición dentro del grupo
+    order = np.lexsort((first_seen, present // n_x))
+    present = present[order]
+
+    result = {x: np.asarray(x_uniques, dtype=object)[present % n_x]}
+    if color:
+        result[color] = np.asarray(color_values, dtype=object)[present // n_x]
+    result["count"] = counts[present]
+
+    return pd.DataFrame(result, columns=columns + ["count"])
+
+
+def _order_counts(
+    counts: pd.DataFrame, x: str, color: Optional[str], category_orders: dict
+) -> pd.DataFrame:
+    """
+    Ordena los conteos del almacén analítico (o del motor de cálculo) como
+    `count_categories`.
+
+    Args:
+        counts: Conteos por combinación, ordenados por primera aparición
+        x: Columna categórica
+        color: Columna de agrupación (opcional)
+        category_orders: Orden de categorías por columna
+
+    Returns:
+        DataFrame con columnas: x, color (si aplica), count
+    """
+    columns = [x] + ([color] if color else [])
+    if color and not counts.empty:
+        # Grupos en orden de primera aparición (o según `category_orders`) y,
+        # dentro de cada grupo, categorías por primera aparición
+        color_codes, color_uniques = pd.factorize(counts[color])
+        color_rank, _ = _ordered_categories(color_uniques, category_orders.get(color))
+        order = np.lexsort((counts["primera"].to_numpy(), color_rank[color_codes]))
+        counts = counts.iloc[order]
+    return counts[columns + ["count"]].reset_index(drop=True)
+
+
+class CountCube:
+    """
+    Cubo de conteos de un par de dimensiones (o de una sola dimensión).
+
+    Las categorías se guardan en orden de primera aparición y los conteos en
+    una matriz filas × columnas, de modo que tablas cruzadas, tablas
+    comparativas y rankings top-N se obtienen cortando la matriz sin volver a
+    recorrer las filas crudas.
+    """
+
+    def __init__(
+        self,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        counts: np.ndarray,
+        row_name: str,
+        col_name: Optional[str] = None,
+    ):
+        self.rows = rows
+        self.cols = cols
+        self.counts = counts
+        self.row_name = row_name
+        self.col_name = col_name
+        self._frame: Optional[pd.DataFrame] = None
+        # Versión de los datos del cubo (None = sin versión, sin caché)
+        self.version: Optional[str] = None
+
+    def _versioned(self, frame: pd.DataFrame, variant: str) -> pd.DataFrame:
+        """
+        Registra un agregado de un cubo versionado con una versión derivada
+        (sin recorrer sus filas), para que las figuras que lo usan se cacheen.
+        """
+        if self.version is not None:
+            register_dataset(frame, f"{self.version}:{self.row_name}", variant)
+        return frame
+
+    def row_totals(self) -> np.ndarray:
+        """Total de conteos por categoría de fila"""
+        return self.counts.sum(axis=1)
+
+    def top_rows(self, n: int) -> List:
+        """
+        Obtiene las `n` categorías de fila con más conteos.
+
+        Los empates se resuelven por orden de primera aparición, igual que
+        `Series.value_counts()`.
+
+        Args:
+            n: Número de categorías
+
+        Returns:
+            list: Categorías ordenadas de mayor a menor conteo
+        """
+        return list(self.top_counts(n)[self.row_name])
+
+    def top_counts(self, n: int) -> pd.DataFrame:
+        """
+        Obtiene el ranking top-N de la dimensión de filas.
+
+        Args:
+            n: Número de categorías
+
+        Returns:
+            DataFrame con columnas: fila, count (como `value_counts().head(n)`)
+        """
+        totals = self.row_totals()
+        order = np.argsort(-totals, kind="stable")
+        order = order[totals[order] > 0][:n]
+        counts = pd.DataFrame({self.row_name: self.rows[order], "count": totals[order]})
+        return self._versioned(counts, f"top{n}")
+
+    def value_counts(self, by_category: bool = False) -> pd.DataFrame:
+        """
+        Conteos de todas las categorías de fila.
+
+        Args:
+            by_category: Ordenar por categoría en lugar de por conteo
+
+        Returns:
+            DataFrame con columnas: fila, count (como
+            `value_counts().reset_index()`)
+        """
+        counts = self.top_counts(len(self.rows))
+        if not by_category:
+            return counts
+        counts = counts.sort_values(self.row_name, kind="stable", ignore_index=True)
+        return self._versioned(counts, "categorias")
+
+    def mode(self, default: str = "N/A") -> str:
+        """
+        Categoría de fila más frecuente (como `get_mode_value`).
+
+        Los empates se resuelven por el menor valor, igual que
+        `Series.mode()`.
+
+        Args:
+            default: Valor si no hay conteos
+
+        Returns:
+            str: Moda o valor por defecto
+        """
+        totals = self.row_totals()
+        if not len(totals) or totals.max() == 0:
+            return default
+        tied = pd.Index(self.rows[totals == totals.max()]).sort_values()
+        return str(tied[0])
+
+    def distinct(self) -> int:
+        """Categorías de fila con algún conteo (como `nunique()`)"""
+        return int((self.row_totals() > 0).sum())
+
+    def count_where(self, predicate: Callable[[object], bool]) -> int:
+        """
+        Total de las categorías de fila que cumplen una condición.
+
+        Args:
+            predicate: Condición sobre el valor de la categoría
+
+        Returns:
+            int: Número de filas
+        """
+        mask = np.fromiter(
+            (bool(predicate(value)) for value in self.rows),
+            dtype=bool,
+            count=len(self.rows),
+        )
+        return int(self.row_totals()[mask].sum())
+
+    def distinct_rows(self, col_value) -> int:
+        """
+        Categorías de fila distintas observadas junto a una categoría de columna.
+
+        Args:
+            col_value: Categoría de la dimensión de columnas
+
+        Returns:
+            int: Categorías de fila distintas (como `nunique()` del subconjunto)
+        """
+        match = np.fromiter(
+            (value == col_value for value in self.cols),
+            dtype=bool,
+            count=len(self.cols),
+        )
+        return int((self.counts[:, match].sum(axis=1) > 0).sum())
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """
+        Matriz de conteos como DataFrame (categorías observadas y ordenadas,
+        como `pd.crosstab`). No modificar: puede ser compartido.
+        """
+        if self._frame is None:
+            rows_seen = np.flatnonzero(self.counts.sum(axis=1) > 0)
+            cols_seen = np.flatnonzero(self.counts.sum(axis=0) > 0)
+            rows_seen = rows_seen[pd.Index(self.rows[rows_seen]).argsort()]
+            cols_seen = cols_seen[pd.Index(self.cols[cols_seen]).argsort()]
+            self._frame = pd.DataFrame(
+                self.counts[np.ix_(rows_seen, cols_seen)],
+                index=pd.Index(self.rows[rows_seen], name=self.row_name),
+                columns=pd.Index(self.cols[cols_seen], name=self.col_name),
+            )
+        return self._frame
+
+
+def _build_cube(df: pd.DataFrame, row: str, col: Optional[str]) -> CountCube:
+    """
+    Construye el cubo de conteos con un único bincount sobre códigos.
+
+    Args:
+        df: DataFrame con filas crudas
+        row: Columna para las filas
+        col: Columna para las columnas (None = una sola dimensión)
+
+    Returns:
+        CountCube: Cubo de conteos
+    """
+    columns = [row] + ([col] if col else [])
+    store = get_analytical_store()
+    table = store.serves(df) if store is not None else None
+    if table is not None:
+        return _cube_from_counts(store.count_by(table, columns).to_pandas(), row, col)
+
+    backend = get_compute_backend()
+    if backend.lazy or get_spilled(df) is not None:
+        return _cube_from_counts(backend.count_by(df, columns), row, col)
+
+    row_codes, row_uniques = pd.factorize(df[row])
+    if col is None:
+        col_codes, col_uniques = np.zeros(len(df), dtype=np.intp), np.array([None])
+    else:
+        col_codes, col_uniques = pd.factorize(df[col])
+    valid = (row_codes >= 0) & (col_codes >= 0)
+
+    n_cols = len(col_uniques)
+    counts = np.bincount(
+        row_codes[valid] * n_cols + col_codes[valid],
+        minlength=len(row_uniques) * n_cols,
+    ).reshape(len(row_uniques), n_cols)
+
+    return CountCube(
+        rows=np.asarray(row_uniques, dtype=object),
+        cols=np.asarray(col_uniques, dtype=object),
+        counts=counts,
+        row_name=row,
+        col_name=col,
+    )
+
+
+def _cube_from_counts(
+    counts: pd.DataFrame, row: str, col: Optional[str]
+) -> CountCube:
+    """
+    Construye el cubo a partir de los conteos del almacén analítico (o del
+    motor de cálculo).
+
+    Args:
+        counts: Conteos por combinación, ordenados por primera aparición
+        row: Columna para las filas
+        col: Columna para las columnas (None = una sola dimensión)
+
+    Returns:
+        CountCube: Cubo de conteos
+    """
+    # Conteos ordenados por primera aparición: factorize conserva ese orden
+    row_codes, row_uniques = pd.factorize(counts[row])
+    if col is None:
+        col_codes, col_uniques = np.zeros(len(counts), dtype=np.intp), np.array([None])
+    else:
+        col_codes, col_uniques = pd.factorize(counts[col])
+
+    matrix = np.zeros((len(row_uniques), len(col_uniques)), dtype=np.int64)
+    matrix[row_codes, col_codes] = counts["count"].to_numpy()
+
+    return CountCube(
+        rows=np.asarray(row_uniques, dtype=object),
+        cols=np.asarray(col_uniques, dtype=object),
+        counts=matrix,
+        row_name=row,
+        col_name=col,
+    )
+
+
+def count_cube(df: pd.DataFrame, row: str, col: Optional[str] = None) -> CountCube:
+    """
+    Obtiene el cubo de conteos de un par de dimensiones, cacheado por versión.
+
+    Se construye una vez por versión de los datos; las tablas cruzadas,
+    tablas comparativas y rankings top-N se obtienen cortándolo. Los
+    DataFrames sin versión (derivados o filtrados) se calculan sin caché.
+
+    Args:
+        df: DataFrame con filas crudas
+        row: Columna para las filas
+        col: Columna para las columnas (None = una sola dimensión)
+
+    Returns:
+        CountCube: Cubo de conteos (no modificar: puede ser compartido)
+    """
+    version = get_dataset_version(df)
+    if version is None:
+        return _build_cube(df, row, col)
+
+    key = (version, row, col)
+    with _cube_lock:
+        if key in _cube_cache:
+            _cube_cache.move_to_end(key)
+            return _cube_cache[key]
+
+    cube = _build_cube(df, row, col)
+    cube.version = version
+
+    with _cube_lock:
+        _cube_cache[key] = cube
+        while len(_cube_cache) > _CUBE_CACHE_SIZE:
+            _cube_cache.popitem(last=False)
+
+    return cube
+
+
+def crosstab_counts(df: pd.DataFrame, row: str, col: str) -> pd.DataFrame:
+    """
+    Obtiene la tabla cruzada de conteos a partir del cubo cacheado.
+
+    El mapa de calor y la tabla de contingencia comparten el mismo cubo, de
+    modo que la matriz se calcula una sola vez por versión de los datos.
+
+    Args:
+        df: DataFrame con filas crudas
+        row: Columna para las filas
+        col: Columna para las columnas
+
+    Returns:
+        DataFrame de conteos (no modificar: puede ser compartido)
+    """
+    return count_cube(df, row, col).frame
+
+
+def column_stats(df: pd.DataFrame, column: str) -> Dict[str, float]:
+    """
+    Obtiene el conteo, la media, el mínimo y el máximo de una columna
+    numérica, cacheados por versión.
+
+    Si el dataset está troceado en disco, se calculan sobre todas sus filas
+    y no sobre la muestra residente.
+
+    Args:
+        df: DataFrame con filas crudas
+        column: Columna numérica
+
+    Returns:
+        dict: count, mean, min y max (NaN si no hay valores)
+    """
+    version = get_dataset_version(df)
+    if version is None:
+        return get_compute_backend().column_stats(df, column)
+
+    key = (version, column)
+    with _stats_lock:
+        if key in _stats_cache:
+            _stats_cache.move_to_end(key)
+            return _stats_cache[key]
+
+    stats = get_compute_backend().column_stats(df, column)
+
+    with _stats_lock:
+        _stats_cache[key] = stats
+        while len(_stats_cache) > _STATS_CACHE_SIZE:
+            _stats_cache.popitem(last=False)
+
+    return stats
@@ -0,0 +1,571 @@
+"""
+Motores de cálculo del pipeline de carga y agregación.
+
+El procesamiento de cada vista de ORDS se describe con un `PageSpec`
+declarativo (columnas numéricas, etiquetas y columnas obligatorias) en lugar
+de una función de pandas, de modo que el mismo pipeline puede ejecutarse con
+varios motores, elegidos con `COMPUTE_BACKEND`:
+
+- pandas: el motor por defecto, sin dependencias adicionales
+- arrow: pyarrow.compute sobre tablas Arrow y escaneos de `pyarrow.dataset`
+- polars: planes perezosos de Polars (extra `polars`)
+
+Arrow y Polars convierten, tipan, etiquetan y filtran cada página en su
+propio formato (multihilo) y recorren los datasets troceados en disco con
+escaneos que solo leen las columnas necesarias (proyección) y descartan los
+nulos durante la lectura (predicado). Todos los motores devuelven pandas:
+la conversión se hace una vez, al entregar la página al caché o el agregado
+a los gráficos, y el resto de la aplicación no cambia.
+
+Si un motor no puede tipar una página o un fragmento (tipos mezclados en una
+columna), esa operación se resuelve con pandas.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ..utils.config import Config
+from .page_parser import ParsedPage
+from .spill import SpilledDataset, get_spilled, iter_chunks
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - dependencia opcional
+    pa = None
+
+try:
+    import polars as pl
+except ImportError:  # pragma: no cover - dependencia opcional
+    pl = None
+
+logger = logging.getLogger(__name__)
+
+# Motores disponibles
+COMPUTE_BACKENDS = ("pandas", "arrow", "polars")
+
+# Columna auxiliar con la posición de cada fila durante el procesamiento
+_POSITION = "__fila"
+
+# Página de ORDS: registros o columnas ya decodificadas
+Page = Union[List[Dict], ParsedPage]
+
+
+class PageSpec:
+    """Procesamiento declarativo de las páginas de una vista de ORDS"""
+
+    def __init__(
+        self,
+        numeric: Sequence[str] = (),
+        labels: Optional[Dict[str, Tuple[str, Dict[Any, str]]]] = None,
+        required: Optional[Sequence[str]] = None,
+    ):
+        """
+        Describe el procesamiento de una página.
+
+        Args:
+            numeric: Columnas que se convierten a número (los valores no
+                numéricos pasan a nulos, como `pd.to_numeric(errors="coerce")`)
+            labels: Columna nueva -> (columna origen, valor -> etiqueta); los
+                valores sin etiqueta quedan nulos
+            required: Columnas sin nulos (None = todas)
+        """
+        self.numeric = list(numeric)
+        self.labels = labels or {}
+        self.required = list(required) if required is not None else None
+
+
+def _labels_as_nan(df: pd.DataFrame, spec: PageSpec) -> pd.DataFrame:
+    """Etiquetas ausentes como NaN (igual que `Series.map`)"""
+    for column in spec.labels:
+        missing = df[column].isna()
+        if missing.any():
+            df[column] = df[column].astype(object).where(~missing, np.nan)
+    return df
+
+
+def _merge_counts(parts: List[pd.DataFrame], columns: List[str]) -> pd.DataFrame:
+    """
+    Combina conteos parciales (de fragmentos o páginas).
+
+    Args:
+        parts: DataFrames con las columnas de agrupación, count y primera
+        columns: Columnas de agrupación
+
+    Returns:
+        DataFrame con las columnas de agrupación, count y primera, ordenado
+        por primera aparición (como `AnalyticalStore.count_by`)
+    """
+    parts = [part for part in parts if not part.empty]
+    if not parts:
+        return pd.DataFrame(columns=columns + ["count", "primera"])
+    if len(parts) == 1:
+        counts = parts[0]
+    else:
+        counts = (
+            pd.concat(parts)
+            .groupby(columns, sort=False)
+            .agg({"count": "sum", "primera": "min"})
+            .reset_index()
+        )
+    # Polars cuenta en UInt32: todos los motores devuelven int64, como pandas
+    counts = counts[columns + ["count", "primera"]].astype({"count": np.int64})
+    return counts.sort_values("primera", kind="stable").reset_index(drop=True)
+
+
+def _fragments(spilled: SpilledDataset) -> List[Tuple[str, int]]:
+    """Ruta y posición de la primera fila de cada fragmento de un dataset"""
+    fragments, offset = [], 0
+    for path in spilled.paths():
+        fragments.append((path, offset))
+        offset += pq.ParquetFile(path).metadata.num_rows
+    return fragments
+
+
+def _empty_stats() -> Dict[str, float]:
+    """Estadísticos de una columna sin valores"""
+    return {"count": 0, "mean": np.nan, "min": np.nan, "max": np.nan}
+
+
+def _combine_stats(parts: List[Tuple[int, float, float, float]]) -> Dict[str, float]:
+    """
+    Combina estadísticos parciales.
+
+    Args:
+        parts: (conteo, suma, mínimo, máximo) de cada fragmento
+
+    Returns:
+        dict: count, mean, min y max (NaN si no hay valores)
+    """
+    parts = [part for part in parts if part[0]]
+    if not parts:
+        return _empty_stats()
+    count = sum(part[0] for part in parts)
+    total = sum(part[1] for part in parts)
+    return {
+        "count": count,
+        "mean": total / count,
+        "min": min(part[2] for part in parts),
+        "max": max(part[3] for part in parts),
+    }
+
+
+class ComputeBackend:
+    """Motor de cálculo con pandas (el motor por defecto)"""
+
+    name = "pandas"
+
+    # Si el motor resuelve también los agregados de DataFrames en memoria
+    # (pandas usa los códigos categóricos de `aggregations`)
+    lazy = False
+
+    def process_page(
+        self, items: Page, spec: Optional[PageSpec], start: int
+    ) -> pd.DataFrame:
+        """
+        Convierte los registros de una página de ORDS en un DataFrame procesado.
+
+        Args:
+            items: Registros de la página (lista de dicts o página decodificada)
+            spec: Procesamiento de la vista (None = sin procesar)
+            start: Posición de la primera fila en el dataset
+
+        Returns:
+            DataFrame con índice de posiciones globales
+        """
+        index = pd.RangeIndex(start, start + len(items))
+        if isinstance(items, ParsedPage):
+            df = items.to_frame(index)
+        else:
+            df = pd.DataFrame(items, index=index)
+        if spec is None or df.empty:
+            return df
+
+        for column in spec.numeric:
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+        for column, (source, mapping) in spec.labels.items():
+            df[column] = df[source].map(mapping)
+        return df.dropna(subset=spec.required)
+
+    def count_by(self, df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        """
+        Cuenta filas por combinación de categorías, fragmento a fragmento.
+
+        Args:
+            df: DataFrame (o muestra residente de un dataset troceado)
+            columns: Columnas de agrupación (se descartan las filas con nulos)
+
+        Returns:
+            DataFrame con las columnas de agrupación, count y primera (fila en
+            la que aparece la combinación por primera vez), ordenado por
+            primera aparición
+        """
+        parts, offset = [], 0
+        for chunk in iter_chunks(df, columns):
+            positions = pd.Series(np.arange(offset, offset + len(chunk)))
+            offset += len(chunk)
+            grouped = positions.groupby(
+                [chunk[c].reset_index(drop=True) for c in columns], sort=False
+            )
+            part = pd.DataFrame({"count": grouped.size(), "primera": grouped.min()})
+            parts.append(part.reset_index())
+        for part in parts:
+            part.columns = columns + ["count", "primera"]
+        return _merge_counts(parts, columns)
+
+    def column_stats(self, df: pd.DataFrame, column: str) -> Dict[str, float]:
+        """
+        Conteo, media, mínimo y máximo de una columna numérica en una pasada.
+
+        Args:
+            df: DataFrame (o muestra residente de un dataset troceado)
+            column: Columna numérica
+
+        Returns:
+            dict: count, mean, min y max (NaN si no hay valores)
+        """
+        parts = []
+        for chunk in iter_chunks(df, [column]):
+            values = pd.to_numeric(chunk[column], errors="coerce").to_numpy(np.float64)
+            values = values[~np.isnan(values)]
+            if len(values):
+                parts.append(
+                    (
+                        len(values),
+                        float(values.sum()),
+                        float(values.min()),
+                        float(values.max()),
+                    )
+                )
+        return _combine_stats(parts)
+
+
+class ArrowBackend(ComputeBackend):
+    """Motor de cálculo con pyarrow.compute y escaneos de pyarrow.dataset"""
+
+    name = "arrow"
+    lazy = True
+
+    # Errores de tipado que devuelven la operación a pandas
+    _ERRORS = (
+        (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError)
+        if pa is not None
+        else ()
+    )
+
+    @staticmethod
+    def _numeric(column: "pa.ChunkedArray") -> "pa.ChunkedArray":
+        """Convierte una columna a número (enteros con nulos, a float)"""
+        kind = column.type
+        if pa.types.is_null(kind):
+            return column.cast(pa.float64())
+        if pa.types.is_integer(kind):
+            # Como pandas: una página con nulos queda en float aunque se
+            # descarten después
+            return column.cast(pa.float64()) if column.null_count else column
+        if pa.types.is_floating(kind):
+            return column
+        values = pd.to_numeric(column.to_pandas(), errors="coerce")
+        return pa.chunked_array([pa.array(values, from_pandas=True)])
+
+    @staticmethod
+    def _not_null(table: "pa.Table", columns: Sequence[str]) -> "pa.Array":
+        """Máscara de filas sin nulos (ni NaN) en las columnas dadas"""
+        mask = None
+        for name in columns:
+            column = table[name]
+            valid = pc.is_valid(column)
+            if pa.types.is_floating(column.type):
+                valid = pc.and_(valid, pc.invert(pc.is_nan(column)))
+            mask = valid if mask is None else pc.and_(mask, valid)
+        return mask
+
+    def process_page(
+        self, items: Page, spec: Optional[PageSpec], start: int
+    ) -> pd.DataFrame:
+        if spec is None or not items:
+            return super().process_page(items, spec, start)
+        try:
+            if isinstance(items, ParsedPage):
+                table = pa.table(
+                    {
+                        name: pa.array(values, from_pandas=True)
+                        for name, values in items.columns.items()
+                    }
+                )
+            else:
+                table = pa.Table.from_pylist(items)
+            for name in spec.numeric:
+                index = table.schema.get_field_index(name)
+                table = table.set_column(index, name, self._numeric(table[name]))
+            for name, (source, mapping) in spec.labels.items():
+                column = table[source]
+                keys = pa.array(list(mapping)).cast(column.type)
+                codes = pc.index_in(column, value_set=keys)
+                table = table.append_column(
+                    name, pc.take(pa.array(list(mapping.values())), codes)
+                )
+        except self._ERRORS:
+            return super().process_page(items, spec, start)
+
+        table = table.append_column(
+            _POSITION, pa.array(np.arange(start, start + len(items)))
+        )
+        required = spec.required or [
+            name for name in table.column_names if name != _POSITION
+        ]
+        table = table.filter(self._not_null(table, required))
+
+        df = table.to_pandas(split_blocks=True)
+        df.index = pd.Index(df.pop(_POSITION).to_numpy())
+        return _labels_as_nan(df, spec)
+
+    @staticmethod
+    def _group(table: "pa.Table", columns: List[str]) -> pd.DataFrame:
+        """Conteo y primera posición por combinación de una tabla Arrow"""
+        grouped = table.group_by(columns).aggregate(
+            [([], "count_all"), (_POSITION, "min")]
+        )
+        names = {"count_all": "count", f"{_POSITION}_min": "primera"}
+        grouped = grouped.rename_columns(
+            [names.get(name, name) for name in grouped.column_names]
+        )
+        return grouped.select(columns + ["count", "primera"]).to_pandas()
+
+    def count_by(self, df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        try:
+            spilled = get_spilled(df)
+            if spilled is None:
+                table = pa.Table.from_pandas(df[columns], preserve_index=False)
+                table = table.append_column(_POSITION, pa.array(np.arange(len(df))))
+                table = table.filter(self._not_null(table, columns))
+                return _merge_counts([self._group(table, columns)], columns)
+
+            # Cada fragmento se escanea leyendo solo las columnas agrupadas y
+            # descartando los nulos durante la lectura. Las posiciones se
+            # numeran tras el filtro: conservan el orden de primera aparición
+            parts = []
+            valid = None
+            for column in columns:
+                expression = ds.field(column).is_valid()
+                valid = expression if valid is None else valid & expression
+            for path, offset in _fragments(spilled):
+                table = ds.dataset(path, format="parquet").to_table(
+                    columns=columns, filter=valid
+                )
+                table = table.filter(self._not_null(table, columns))
+                table = table.append_column(
+                    _POSITION, pa.array(np.arange(offset, offset + len(table)))
+                )
+                parts.append(self._group(table, columns))
+            return _merge_counts(parts, columns)
+        except self._ERRORS:
+            return super().count_by(df, columns)
+
+    def column_stats(self, df: pd.DataFrame, column: str) -> Dict[str, float]:
+        spilled = get_spilled(df)
+        if spilled is None:
+            return super().column_stats(df, column)
+
+        parts = []
+        try:
+            for path, _ in _fragments(spilled):
+                values = ds.dataset(path, format="parquet").to_table(
+                    columns=[column], filter=ds.field(column).is_valid()
+                )[column]
+                values = self._numeric(values).cast(pa.float64())
+                values = values.filter(pc.invert(pc.is_nan(values))).drop_null()
+                if len(values):
+                    bounds = pc.min_max(values)
+                    parts.append(
+                        (
+                            len(values),
+                            pc.sum(values).as_py(),
+                            bounds["min"].as_py(),
+                            bounds["max"].as_py(),
+                        )
+                    )
+        except self._ERRORS:
+            return super().column_stats(df, column)
+        return _combine_stats(parts)
+
+
+class PolarsBackend(ComputeBackend):
+    """Motor de cálculo con planes perezosos de Polars"""
+
+    name = "polars"
+    lazy = True
+
+    # Errores de tipado que devuelven la operación a pandas
+    _ERRORS = (
+        (pl.exceptions.PolarsError, TypeError, ValueError) if pl is not None else ()
+    )
+
+    def process_page(
+        self, items: Page, spec: Optional[PageSpec], start: int
+    ) -> pd.DataFrame:
+        if spec is None or not items:
+            return super().process_page(items, spec, start)
+        try:
+            if isinstance(items, ParsedPage):
+                frame = pl.from_pandas(items.to_frame())
+            else:
+                frame = pl.from_dicts(items, infer_schema_length=None)
+            floats, casts = set(), []
+            for name in spec.numeric:
+                kind = frame.schema[name]
+                if kind.is_integer() and frame[name].null_count():
+                    # Como pandas: una página con nulos queda en float
+                    casts.append(pl.col(name).cast(pl.Float64))
+                elif not kind.is_numeric():
+                    casts.append(pl.col(name).cast(pl.Float64, strict=False))
+                if not kind.is_integer() or frame[name].null_count():
+                    floats.add(name)
+
+            plan = frame.lazy().with_row_index(_POSITION, offset=start)
+            if casts:
+                plan = plan.with_columns(casts)
+            for name, (source, mapping) in spec.labels.items():
+                if source in floats or frame.schema[source].is_float():
+                    mapping = {float(key): value for key, value in mapping.items()}
+                plan = plan.with_columns(
+                    pl.col(source)
+                    .replace_strict(mapping, default=None, return_dtype=pl.String)
+                    .alias(name)
+                )
+
+            required = spec.required or frame.columns + list(spec.labels)
+            plan = plan.drop_nulls(required)
+            not_nan = [pl.col(name).is_not_nan() for name in required if name in floats]
+            if not_nan:
+                plan = plan.filter(pl.all_horizontal(not_nan))
+            df = plan.collect().to_pandas()
+        except self._ERRORS:
+            return super().process_page(items, spec, start)
+
+        df.index = pd.Index(df.pop(_POSITION).to_numpy(np.int64))
+        return _labels_as_nan(df, spec)
+
+    @staticmethod
+    def _group(plan: "pl.LazyFrame", columns: List[str]) -> pd.DataFrame:
+        """Conteo y primera posición por combinación de un plan"""
+        grouped = (
+            plan.drop_nulls(columns)
+            .group_by(columns)
+            .agg(pl.len().alias("count"), pl.col(_POSITION).min().alias("primera"))
+            .collect()
+        )
+        return grouped.select(columns + ["count", "primera"]).to_pandas()
+
+    def count_by(self, df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        try:
+            spilled = get_spilled(df)
+            if spilled is None:
+                plan = pl.from_pandas(df[columns]).lazy().with_row_index(_POSITION)
+                return _merge_counts([self._group(plan, columns)], columns)
+
+            # Un plan por fragmento: el optimizador lleva la proyección y el
+            # descarte de nulos a la lectura del Parquet
+            parts = [
+                self._group(
+                    pl.scan_parquet(
+                        path, row_index_name=_POSITION, row_index_offset=offset
+                    ).select([_POSITION] + columns),
+                    columns,
+                )
+                for path, offset in _fragments(spilled)
+            ]
+            return _merge_counts(parts, columns)
+        except self._ERRORS:
+            return super().count_by(df, columns)
+
+    def column_stats(self, df: pd.DataFrame, column: str) -> Dict[str, float]:
+        spilled = get_spilled(df)
+        if spilled is None:
+            return super().column_stats(df, column)
+
+        value = pl.col(column).cast(pl.Float64, strict=False)
+        parts = []
+        try:
+            for path, _ in _fragments(spilled):
+                stats = (
+                    pl.scan_parquet(path)
+                    .select(value)
+                    .drop_nulls()
+                    .filter(pl.col(column).is_not_nan())
+                    .select(
+                        pl.len().alias("count"),
+                        pl.col(column).sum().alias("sum"),
+                        pl.col(column).min().alias("min"),
+                        pl.col(column).max().alias("max"),
+                    )
+                    .collect()
+                    .row(0)
+                )
+                if stats[0]:
+                    parts.append(tuple(stats))
+        except self._ERRORS:
+            return super().column_stats(df, column)
+        return _combine_stats(parts)
+
+
+def backend_available(name: str) -> bool:
+    """Indica si las dependencias de un motor están instaladas"""
+    if name == "arrow":
+        return pa is not None
+    if name == "polars":
+        return pl is not None and pa is not None
+    return name == "pandas"
+
+
+def create_backend(name: str) -> ComputeBackend:
+    """
+    Crea un motor de cálculo por nombre.
+
+    Args:
+        name: Motor ("pandas", "arrow" o "polars")
+
+    Returns:
+        ComputeBackend: Motor
+
+    Raises:
+        ValueError: Si el motor no existe
+        ImportError: Si faltan sus dependencias
+    """
+    if name not in COMPUTE_BACKENDS:
+        raise ValueError(f"Motor de cálculo desconocido: {name}")
+    if not backend_available(name):
+        raise ImportError(f'Install "{name}" to use the {name} compute backend')
+    return {"pandas": ComputeBackend, "arrow": ArrowBackend, "polars": PolarsBackend}[
+        name
+    ]()
+
+
+# Instancia global del motor (singleton pattern)
+_backend_instance: Optional[ComputeBackend] = None
+
+
+def get_compute_backend() -> ComputeBackend:
+    """
+    Obtiene el motor de cálculo configurado.
+
+    Returns:
+        ComputeBackend: El de `COMPUTE_BACKEND`, o pandas si no existe o
+        faltan sus dependencias
+    """
+    global _backend_instance
+
+    if _backend_instance is None:
+        name = Config.COMPUTE_BACKEND
+        try:
+            _backend_instance = create_backend(name)
+        except (ValueError, ImportError) as e:
+            logger.warning(f"Compute backend {name!r} unavailable, using pandas: {e}")
+            _backend_instance = ComputeBackend()
+
+    return _backend_instance
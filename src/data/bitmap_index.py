@@ -0,0 +1,128 @@
+"""
+Índices bitmap por columna categórica.
+
+Cada valor de una columna tiene un bitset empaquetado (un bit por fila, 8
+filas por byte) que se construye la primera vez que se consulta. Un filtro
+compuesto es un OR de bitsets dentro de cada columna y un AND entre columnas,
+operaciones que recorren n/8 bytes en lugar de n filas.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .versioning import get_dataset_version
+
+# Caché LRU de índices: (versión, columna) -> BitmapIndex
+_BITMAP_CACHE_SIZE = 32
+_bitmap_cache: "OrderedDict[Tuple[str, str], BitmapIndex]" = OrderedDict()
+_bitmap_lock = threading.Lock()
+
+
+class BitmapIndex:
+    """Bitsets empaquetados por valor de una columna categórica"""
+
+    def __init__(self, series: pd.Series):
+        self.codes, uniques = pd.factorize(series)
+        self.size = len(series)
+        self._value_codes = {value: code for code, value in enumerate(uniques)}
+        self._bitmaps: Dict[int, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def bitmap(self, value) -> np.ndarray:
+        """
+        Obtiene el bitset de las filas con un valor.
+
+        Args:
+            value: Valor de la columna
+
+        Returns:
+            np.ndarray: Bitset empaquetado (uint8, ceil(n/8) bytes)
+        """
+        code = self._value_codes.get(value)
+        if code is None:
+            return np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+        with self._lock:
+            bits = self._bitmaps.get(code)
+        if bits is None:
+            bits = np.packbits(self.codes == code)
+            with self._lock:
+                self._bitmaps[code] = bits
+        return bits
+
+    def union(self, values: Iterable) -> np.ndarray:
+        """
+        Obtiene el bitset de las filas con cualquiera de los valores.
+
+        Args:
+            values: Valores de la columna
+
+        Returns:
+            np.ndarray: Bitset empaquetado
+        """
+        result = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        for value in values:
+            result |= self.bitmap(value)
+        return result
+
+
+def get_bitmap_index(df: pd.DataFrame, column: str) -> BitmapIndex:
+    """
+    Obtiene el índice bitmap de una columna, cacheado por versión del dataset.
+
+    Args:
+        df: DataFrame
+        column: Columna categórica
+
+    Returns:
+        BitmapIndex: Índice de la columna
+    """
+    version = get_dataset_version(df)
+    if version is None:
+        return BitmapIndex(df[column])
+
+    key = (version, column)
+    with _bitmap_lock:
+        if key in _bitmap_cache:
+            _bitmap_cache.move_to_end(key)
+            return _bitmap_cache[key]
+
+    index = BitmapIndex(df[column])
+
+    with _bitmap_lock:
+        _bitmap_cache[key] = index
+        while len(_bitmap_cache) > _BITMAP_CACHE_SIZE:
+            _bitmap_cache.popitem(last=False)
+
+    return index
+
+
+def select_rows(
+    df: pd.DataFrame, filters: Dict[str, Sequence]
+) -> Optional[np.ndarray]:
+    """
+    Calcula las filas que cumplen un filtro cruzado.
+
+    Args:
+        df: DataFrame (cacheado)
+        filters: Columna -> valores admitidos. Las columnas que el DataFrame
+            no tiene se ignoran.
+
+    Returns:
+        np.ndarray con las posiciones seleccionadas, o None si ningún filtro
+        aplica al DataFrame
+    """
+    bits = None
+    for column, values in filters.items():
+        if column not in df.columns:
+            continue
+        column_bits = get_bitmap_index(df, column).union(values)
+        bits = column_bits if bits is None else bits & column_bits
+
+    if bits is None:
+        return None
+    return np.flatnonzero(np.unpackbits(bits, count=len(df)))
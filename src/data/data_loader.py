@@ -5,10 +5,23 @@ Obtiene datos desde ORDS y los procesa en DataFrames.
 
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Optional, Dict
+from typing import Callable, Optional, Dict, Set
 import logging
+import pickle
 
+from .backends import PageSpec, get_compute_backend
 from .ords_client import ORDSClient
+from .refresh import load_generation, published_mtime, read_published
+from .shared_frames import release_segments, release_unused
+from .sketches import StreamSummary
+from .spill import (
+    MemoryBudget,
+    RowSample,
+    SpilledDataset,
+    register_spilled,
+    spill_available,
+)
+from .versioning import register_dataset
 from ..utils.config import Config
 
 logger = logging.getLogger(__name__)
@@ -17,21 +30,61 @@ logger = logging.getLogger(__name__)
 class DataLoader:
     """Gestor de carga de datos con caché en memoria"""
 
-    def __init__(self, client: Optional[ORDSClient] = None):
+    # Nombre público de cada dataset -> método que lo obtiene
+    DATASETS = {
+        "peso_estancia": "fetch_peso_estancia_data",
+        "diagnosticos": "fetch_diagnosticos_data",
+        "diagnostico_sexo": "fetch_diagnostico_sexo_data",
+        "severidad_mortalidad": "fetch_severidad_mortalidad_data",
+    }
+
+    # Endpoint -> columnas que se resumen en streaming durante la descarga (el
+    # resumen solo llega a `on_page`, para el avance de la actualización)
+    SKETCH_COLUMNS = {
+        "vista_muy_interesante": ["diagnostico_principal"],
+    }
+
+    def __init__(
+        self,
+        client: Optional[ORDSClient] = None,
+        on_page: Optional[Callable[[str, int, Optional[StreamSummary]], None]] = None,
+        adopt_published: bool = True,
+    ):
         """
         Inicializa el cargador de datos.
 
         Args:
             client: Cliente ORDS (si no se proporciona, se crea uno nuevo)
+            on_page: Función llamada como on_page(endpoint, filas, resumen)
+                tras recibir cada página (opcional)
+            adopt_published: Si adopta las generaciones publicadas (False en
+                los cargadores que las producen)
         """
         if client is None:
             ords_config = Config.get_ords_config()
             client = ORDSClient(**ords_config)
 
         self.client = client
+        self.backend = get_compute_backend()
         self._cache: Dict[str, Dict] = {}
         self.cache_timeout = Config.CACHE_TIMEOUT
 
+        # Generación publicada adoptada (actualización en segundo plano); con
+        # el planificador activo, sus entradas no caducan por CACHE_TIMEOUT
+        self.adopt_published = adopt_published
+        self.scheduled = Config.REFRESH_SCHEDULER and adopt_published
+        self._generation: Optional[str] = None
+        self._published_mtime: Optional[int] = None
+        # Segmentos compartidos de la generación adoptada
+        self._segments: Set[str] = set()
+
+        self.on_page = on_page
+
+        # Modo fuera de memoria: páginas troceadas en disco
+        self.out_of_core = Config.OUT_OF_CORE and spill_available()
+        if Config.OUT_OF_CORE and not self.out_of_core:
+            logger.warning('Out-of-core mode disabled: install "pyarrow" to enable it')
+
     def _is_cache_valid(self, key: str) -> bool:
         """
         Verifica si el caché para una clave es válido.
@@ -51,6 +104,10 @@ class DataLoader:
         if timestamp is None:
             return False
 
+        # Las entradas publicadas las renueva el planificador de actualizaciones
+        if self.scheduled and cache_entry.get("generation") is not None:
+            return True
+
         age = (datetime.now() - timestamp).total_seconds()
         return age < self.cache_timeout
 
@@ -69,16 +126,186 @@ class DataLoader:
             return self._cache[key]["data"]
         return None
 
-    def _save_to_cache(self, key: str, data: pd.DataFrame):
+    @staticmethod
+    def _make_entry(
+        key: str,
+        df: pd.DataFrame,
+        timestamp: datetime,
+        spilled: Optional[SpilledDataset] = None,
+        fingerprint: Optional[str] = None,
+        generation: Optional[str] = None,
+    ) -> Dict:
         """
-        Guarda datos en el caché.
+        Prepara una entrada del caché y versiona su DataFrame.
+
+        Si el dataset está troceado en disco, `df` es su muestra residente y
+        recibe la versión del dataset completo.
+
+        Args:
+            key: Clave del caché
+            df: DataFrame (o muestra residente)
+            timestamp: Momento de obtención de los datos
+            spilled: Dataset troceado del que `df` es la muestra (opcional)
+            fingerprint: Huella ya calculada del DataFrame (opcional)
+            generation: Generación publicada de la que procede (opcional)
+
+        Returns:
+            dict: Entrada del caché
+        """
+        if spilled is not None:
+            fingerprint = spilled.fingerprint
+        entry = {
+            "data": df,
+            "version": register_dataset(df, key, fingerprint),
+            "timestamp": timestamp,
+            "spilled": spilled,
+            "generation": generation,
+        }
+        if spilled is not None:
+            register_spilled(df, spilled)
+        return entry
+
+    def _save_to_cache(
+        self,
+        key: str,
+        data: pd.DataFrame,
+        spilled: Optional[SpilledDataset] = None,
+    ) -> pd.DataFrame:
+        """
+        Guarda datos en el caché y les asigna una versión.
 
         Args:
             key: Clave del caché
             data: DataFrame a guardar
+            spilled: Dataset troceado del que `data` es la muestra (opcional)
+
+        Returns:
+            DataFrame: Copia guardada (la instancia versionada)
+        """
+        # La muestra de un dataset troceado ya es una copia propia
+        cached = data.copy() if spilled is None else data
+        self._cache[key] = self._make_entry(key, cached, datetime.now(), spilled)
+        logger.debug(f"Saved to cache: {key} ({self._cache[key]['version']})")
+        return cached
+
+    def get_version(self, key: str) -> Optional[str]:
+        """
+        Obtiene la versión de los datos en caché para una clave.
+
+        Args:
+            key: Clave del caché
+
+        Returns:
+            str o None si no hay datos válidos en caché
+        """
+        if not self._is_cache_valid(key):
+            return None
+        return self._cache[key].get("version")
+
+    def snapshot(self) -> Dict[str, pd.DataFrame]:
+        """
+        Obtiene los DataFrames válidos del caché.
+
+        Returns:
+            Dict: Clave del caché -> DataFrame
+        """
+        return {
+            key: entry["data"]
+            for key, entry in self._cache.items()
+            if self._is_cache_valid(key)
+        }
+
+    def spilled_directories(self) -> Dict[str, str]:
+        """
+        Obtiene los directorios de los datasets válidos troceados en disco.
+
+        Returns:
+            Dict: Clave del caché -> directorio del dataset troceado
+        """
+        return {
+            key: entry["spilled"].directory
+            for key, entry in self._cache.items()
+            if self._is_cache_valid(key) and entry.get("spilled") is not None
+        }
+
+    def install(
+        self,
+        frames: Dict[str, pd.DataFrame],
+        timestamp: Optional[datetime] = None,
+        spilled: Optional[Dict[str, SpilledDataset]] = None,
+        fingerprints: Optional[Dict[str, str]] = None,
+        generation: Optional[str] = None,
+    ):
+        """
+        Sustituye de una vez las entradas del caché por nuevos DataFrames.
+
+        Las entradas se preparan (y versionan) antes del intercambio, que es
+        una única asignación: las peticiones concurrentes ven todos los datos
+        antiguos o todos los nuevos.
+
+        Args:
+            frames: Clave del caché -> DataFrame (o muestra residente)
+            timestamp: Momento de obtención de los datos (None = ahora)
+            spilled: Clave del caché -> dataset troceado del que el DataFrame
+                es la muestra (opcional)
+            fingerprints: Clave del caché -> huella ya calculada (opcional)
+            generation: Generación publicada de la que proceden (opcional)
         """
-        self._cache[key] = {"data": data.copy(), "timestamp": datetime.now()}
-        logger.debug(f"Saved to cache: {key}")
+        timestamp = timestamp or datetime.now()
+        spilled = spilled or {}
+        fingerprints = fingerprints or {}
+        entries = {
+            key: self._make_entry(
+                key, df, timestamp, spilled.get(key), fingerprints.get(key), generation
+            )
+            for key, df in frames.items()
+        }
+        self._cache = {**self._cache, **entries}
+        logger.info(f"Installed {len(entries)} datasets")
+
+    def _adopt_published(self):
+        """Adopta la última generación publicada en segundo plano"""
+        # Segmentos de generaciones anteriores que han dejado de usarse
+        release_unused()
+
+        if not self.adopt_published:
+            return
+        mtime = published_mtime()
+        if mtime is None or mtime == self._published_mtime:
+            return
+        self._published_mtime = mtime
+
+        manifest = read_published()
+        if manifest is None or manifest["generation"] == self._generation:
+            return
+
+        try:
+            frames = load_generation(manifest)
+            spilled = {
+                key: SpilledDataset.open(directory)
+                for key, directory in manifest.get("spilled", {}).items()
+            }
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError) as e:
+            logger.warning(f"Could not load data generation: {e}")
+            return
+
+        # Los DataFrames compartidos llevan la versión calculada al publicar
+        shared = manifest.get("shared", {})
+        fingerprints = {
+            key: info["version"].rsplit("@", 1)[1]
+            for key, info in shared.items()
+            if info.get("version")
+        }
+        published_at = datetime.fromtimestamp(manifest["published_at"])
+        generation = manifest["generation"]
+        self.install(frames, published_at, spilled, fingerprints, generation)
+        self._generation = generation
+
+        # Los segmentos sustituidos se sueltan cuando no quedan vistas suyas
+        segments = {info["segment"] for info in shared.values()}
+        release_segments(self._segments - segments)
+        self._segments = segments
+        logger.info(f"Adopted data generation {self._generation}")
 
     def clear_cache(self, key: Optional[str] = None):
         """
@@ -94,42 +321,78 @@ class DataLoader:
             del self._cache[key]
             logger.info(f"Cleared cache for: {key}")
 
-    def _fetch_and_process(self, endpoint: str, processor_func=None) -> pd.DataFrame:
+    def _fetch_and_process(
+        self, endpoint: str, spec: Optional[PageSpec] = None
+    ) -> pd.DataFrame:
         """
         Obtiene datos de un endpoint y opcionalmente los procesa.
 
         Args:
             endpoint: Nombre del endpoint
-            processor_func: Función para procesar el DataFrame (opcional)
+            spec: Procesamiento de las páginas (opcional)
 
         Returns:
             DataFrame procesado
         """
-        # Verificar caché
+        # Verificar caché (adoptando antes una generación recién publicada)
+        self._adopt_published()
         cache_key = f"endpoint_{endpoint}"
         cached_data = self._get_from_cache(cache_key)
 
         if cached_data is not None:
             return cached_data
 
-        # Obtener datos desde ORDS
-        items = self.client.fetch_endpoint(endpoint, limit=Config.DEFAULT_LIMIT)
-
-        if not items:
+        # Obtener datos desde ORDS, procesando y resumiendo cada página al llegar
+        columns = self.SKETCH_COLUMNS.get(endpoint)
+        summary = StreamSummary(columns) if columns else None
+        pages = []
+        rows = 0
+
+        # Fuera de memoria: las páginas se trocean en disco y solo queda en
+        # memoria una muestra de tamaño acotado
+        budget = MemoryBudget() if self.out_of_core else None
+        spilled = SpilledDataset.create(cache_key) if self.out_of_core else None
+        sample: Optional[RowSample] = None
+
+        for items in self.client.iter_pages(endpoint, limit=Config.DEFAULT_LIMIT):
+            # El procesamiento trabaja fila a fila, así que se aplica por página
+            # (con índice continuo entre páginas, igual que un único DataFrame)
+            page = self.backend.process_page(items, spec, rows)
+            rows += len(items)
+            if spilled is None:
+                pages.append(page)
+            else:
+                spilled.append(page, budget.chunk_bytes)
+                if not page.empty:
+                    if sample is None:
+                        sample = RowSample(budget.sample_rows(page))
+                    sample.update(page)
+
+            if summary is not None:
+                summary.update(page)
+            if self.on_page is not None:
+                self.on_page(endpoint, rows, summary)
+
+        if spilled is not None:
+            spilled.finish()
+            if spilled.rows == 0:
+                spilled.remove()
+                spilled = None
+            else:
+                pages = [sample.result()]
+                logger.info(
+                    f"Spilled {spilled.rows:,} rows of {endpoint} to "
+                    f"{len(spilled.files)} chunks ({len(pages[0]):,} rows resident)"
+                )
+
+        if not pages:
             logger.warning(f"No data returned from {endpoint}")
             return pd.DataFrame()
 
-        # Convertir a DataFrame
-        df = pd.DataFrame(items)
+        df = pages[0] if len(pages) == 1 else pd.concat(pages)
 
-        # Aplicar procesador si existe
-        if processor_func is not None:
-            df = processor_func(df)
-
-        # Guardar en caché
-        self._save_to_cache(cache_key, df)
-
-        return df
+        # Guardar en caché (se devuelve la instancia versionada)
+        return self._save_to_cache(cache_key, df, spilled)
 
     # ========== Métodos específicos para cada endpoint ==========
 
@@ -140,23 +403,10 @@ class DataLoader:
         Returns:
             DataFrame con columnas: peso_espanol_apr, estancia_dias
         """
+        # Convertir tipos de datos y eliminar filas con valores nulos
+        spec = PageSpec(numeric=["peso_espanol_apr", "estancia_dias"])
 
-        def process(df: pd.DataFrame) -> pd.DataFrame:
-            if df.empty:
-                return df
-
-            # Convertir tipos de datos
-            df["peso_espanol_apr"] = pd.to_numeric(
-                df["peso_espanol_apr"], errors="coerce"
-            )
-            df["estancia_dias"] = pd.to_numeric(df["estancia_dias"], errors="coerce")
-
-            # Eliminar filas con valores nulos
-            df = df.dropna()
-
-            return df
-
-        return self._fetch_and_process("peso_vs_estancia", process)
+        return self._fetch_and_process("peso_vs_estancia", spec)
 
     def fetch_diagnosticos_data(self) -> pd.DataFrame:
         """
@@ -165,19 +415,12 @@ class DataLoader:
         Returns:
             DataFrame con columnas: nombre_enc, rango_de_edad, diagnostico_principal, mes_de_ingreso
         """
+        # Limpiar datos eliminando filas con valores nulos en columnas críticas
+        spec = PageSpec(
+            required=["rango_de_edad", "diagnostico_principal", "mes_de_ingreso"]
+        )
 
-        def process(df: pd.DataFrame) -> pd.DataFrame:
-            if df.empty:
-                return df
-
-            # Limpiar datos eliminando filas con valores nulos en columnas críticas
-            df = df.dropna(
-                subset=["rango_de_edad", "diagnostico_principal", "mes_de_ingreso"]
-            )
-
-            return df
-
-        return self._fetch_and_process("vista_muy_interesante", process)
+        return self._fetch_and_process("vista_muy_interesante", spec)
 
     def fetch_diagnostico_sexo_data(self) -> pd.DataFrame:
         """
@@ -186,23 +429,15 @@ class DataLoader:
         Returns:
             DataFrame con columnas: diagnostico_principal, sexo, sexo_label
         """
+        # Convertir sexo a numérico, mapear 1=Masculino, 2=Femenino y
+        # eliminar filas con valores nulos
+        spec = PageSpec(
+            numeric=["sexo"],
+            labels={"sexo_label": ("sexo", {1: "Masculino", 2: "Femenino"})},
+            required=["diagnostico_principal", "sexo"],
+        )
 
-        def process(df: pd.DataFrame) -> pd.DataFrame:
-            if df.empty:
-                return df
-
-            # Convertir sexo a numérico
-            df["sexo"] = pd.to_numeric(df["sexo"], errors="coerce")
-
-            # Mapear 1=Masculino, 2=Femenino
-            df["sexo_label"] = df["sexo"].map({1: "Masculino", 2: "Femenino"})
-
-            # Eliminar filas con valores nulos
-            df = df.dropna(subset=["diagnostico_principal", "sexo"])
-
-            return df
-
-        return self._fetch_and_process("diagnostico principal vs sexo", process)
+        return self._fetch_and_process("diagnostico principal vs sexo", spec)
 
     def fetch_severidad_mortalidad_data(self) -> pd.DataFrame:
         """
@@ -212,32 +447,20 @@ class DataLoader:
             DataFrame con columnas: nivel_severidad_apr, riesgo_mortalidad_apr,
                                     severidad_label, mortalidad_label
         """
-
-        def process(df: pd.DataFrame) -> pd.DataFrame:
-            if df.empty:
-                return df
-
-            # Convertir a numérico
-            df["nivel_severidad_apr"] = pd.to_numeric(
-                df["nivel_severidad_apr"], errors="coerce"
-            )
-            df["riesgo_mortalidad_apr"] = pd.to_numeric(
-                df["riesgo_mortalidad_apr"], errors="coerce"
-            )
-
-            # Mapear niveles a etiquetas descriptivas
-            severidad_map = {1: "Leve", 2: "Moderado", 3: "Grave", 4: "Extremo"}
-            df["severidad_label"] = df["nivel_severidad_apr"].map(severidad_map)
-
-            mortalidad_map = {1: "Bajo", 2: "Moderado", 3: "Alto", 4: "Extremo"}
-            df["mortalidad_label"] = df["riesgo_mortalidad_apr"].map(mortalidad_map)
-
+        # Convertir a numérico y mapear niveles a etiquetas descriptivas
+        severidad_map = {1: "Leve", 2: "Moderado", 3: "Grave", 4: "Extremo"}
+        mortalidad_map = {1: "Bajo", 2: "Moderado", 3: "Alto", 4: "Extremo"}
+        spec = PageSpec(
+            numeric=["nivel_severidad_apr", "riesgo_mortalidad_apr"],
+            labels={
+                "severidad_label": ("nivel_severidad_apr", severidad_map),
+                "mortalidad_label": ("riesgo_mortalidad_apr", mortalidad_map),
+            },
             # Eliminar filas con valores nulos
-            df = df.dropna(subset=["nivel_severidad_apr", "riesgo_mortalidad_apr"])
-
-            return df
+            required=["nivel_severidad_apr", "riesgo_mortalidad_apr"],
+        )
 
-        return self._fetch_and_process("severidad_apr vs mortadilad_apr", process)
+        return self._fetch_and_process("severidad_apr vs mortadilad_apr", spec)
 
     def fetch_all_data(self) -> Dict[str, pd.DataFrame]:
         """
@@ -248,12 +471,24 @@ class DataLoader:
         """
         logger.info("Fetching all datasets...")
 
-        return {
-            "peso_estancia": self.fetch_peso_estancia_data(),
-            "diagnosticos": self.fetch_diagnosticos_data(),
-            "diagnostico_sexo": self.fetch_diagnostico_sexo_data(),
-            "severidad_mortalidad": self.fetch_severidad_mortalidad_data(),
-        }
+        return {name: self.fetch_dataset(name) for name in self.DATASETS}
+
+    def fetch_dataset(self, name: str) -> pd.DataFrame:
+        """
+        Obtiene un dataset por su nombre público.
+
+        Args:
+            name: Nombre del dataset (claves de `DATASETS`)
+
+        Returns:
+            DataFrame del dataset (la instancia cacheada y versionada)
+
+        Raises:
+            KeyError: Si el dataset no existe
+        """
+        if name not in self.DATASETS:
+            raise KeyError(f"Dataset desconocido: {name}")
+        return getattr(self, self.DATASETS[name])()
 
 
 # Instancia global del data loader (singleton pattern)
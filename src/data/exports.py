@@ -0,0 +1,259 @@
+"""
+Serialización en streaming de datasets a CSV y Parquet.
+Los generadores recorren el DataFrame cacheado por bloques de filas, de modo
+que la memoria usada es proporcional al tamaño del bloque y no al del fichero.
+Los datasets troceados en disco se exportan completos: desde el almacén
+analítico si los replica o recorriendo sus fragmentos.
+"""
+
+import io
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .filter_query import filter_mask
+from .spill import SpilledDataset, get_spilled
+from .store import get_analytical_store
+from .table_queries import select_positions
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - dependencia opcional
+    pa = None
+    pq = None
+
+# Formatos de exportación -> tipo MIME
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def parquet_available() -> bool:
+    """Indica si pyarrow está instalado (necesario para exportar a Parquet)"""
+    return pq is not None
+
+
+def _iter_chunks(
+    df: pd.DataFrame,
+    positions: Optional[np.ndarray],
+    columns: Optional[List[str]],
+    chunk_rows: int,
+) -> Iterator[pd.DataFrame]:
+    """
+    Recorre las filas seleccionadas por bloques.
+
+    Args:
+        df: DataFrame completo (cacheado)
+        positions: Posiciones de fila de la vista (None = todas, en orden)
+        columns: Columnas a exportar (None = todas)
+        chunk_rows: Filas por bloque
+
+    Yields:
+        DataFrame con un bloque de filas
+    """
+    frame = df[columns] if columns else df
+    total = len(frame) if positions is None else len(positions)
+    for start in range(0, total, chunk_rows):
+        if positions is None:
+            yield frame.iloc[start : start + chunk_rows]
+        else:
+            yield frame.iloc[positions[start : start + chunk_rows]]
+
+
+def _iter_spilled(
+    spilled: SpilledDataset,
+    filter_query: Optional[str],
+    columns: Optional[List[str]],
+) -> Iterator[pd.DataFrame]:
+    """Recorre un dataset troceado filtrando cada fragmento al leerlo"""
+    for chunk in spilled.iter_chunks():
+        mask = filter_mask(chunk, filter_query)
+        if mask is not None:
+            chunk = chunk[mask]
+        yield chunk[columns] if columns else chunk
+
+
+def iter_view(
+    df: pd.DataFrame,
+    sort_by: Optional[List[Dict[str, str]]] = None,
+    filter_query: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    chunk_rows: int = 50000,
+) -> Iterator[pd.DataFrame]:
+    """
+    Recorre por bloques una vista filtrada y ordenada de un dataset.
+
+    Args:
+        df: DataFrame cacheado (o muestra residente de un dataset troceado)
+        sort_by: Ordenación de DataTable
+        filter_query: Filtro de DataTable
+        columns: Columnas a exportar (None = todas)
+        chunk_rows: Filas por bloque
+
+    Returns:
+        Iterador de DataFrames con un bloque de filas cada uno
+
+    Raises:
+        ValueError: Si se pide ordenar un dataset troceado que no está
+            replicado en el almacén analítico
+    """
+    spilled = get_spilled(df)
+    if spilled is None:
+        positions = select_positions(df, sort_by, filter_query)
+        return _iter_chunks(df, positions, columns, chunk_rows)
+
+    store = get_analytical_store()
+    table = store.serves(df) if store is not None else None
+    if table is not None:
+        return store.iter_rows(table, sort_by, filter_query, columns, chunk_rows)
+    if sort_by:
+        raise ValueError(
+            "Ordenar un dataset fuera de memoria requiere el almacén analítico"
+        )
+    return _iter_spilled(spilled, filter_query, columns)
+
+
+def iter_csv(
+    df: pd.DataFrame,
+    chunks: Iterable[pd.DataFrame],
+    columns: Optional[List[str]] = None,
+) -> Iterator[bytes]:
+    """
+    Serializa a CSV los bloques de una vista.
+
+    Args:
+        df: DataFrame cacheado (para la cabecera)
+        chunks: Bloques de filas (ver `iter_view`)
+        columns: Columnas exportadas (None = todas)
+
+    Yields:
+        bytes: Fragmento CSV (la cabecera va en el primero)
+    """
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header).encode("utf-8")
+        header = False
+
+    # Vista vacía: solo la cabecera
+    if header:
+        yield pd.DataFrame(columns=columns or list(df.columns)).to_csv(
+            index=False
+        ).encode("utf-8")
+
+
+class _StreamSink(io.RawIOBase):
+    """Destino de escritura que acumula bytes hasta que se vacía"""
+
+    def __init__(self):
+        super().__init__()
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+# Tipo inferido por pandas (valores no nulos) -> tipo de Arrow para columnas object
+_OBJECT_ARROW_TYPES = {
+    "string": "string",
+    "integer": "int64",
+    "floating": "float64",
+    "mixed-integer-float": "float64",
+    "boolean": "bool_",
+}
+
+
+def _parquet_schema(frame: pd.DataFrame):
+    """
+    Obtiene el esquema de Arrow de un DataFrame sin convertir sus filas.
+
+    Las columnas object se tipan por sus valores no nulos, de modo que un
+    bloque sin valores no fija un tipo nulo para todo el fichero.
+
+    Args:
+        frame: DataFrame a exportar
+
+    Returns:
+        pa.Schema: Esquema del fichero Parquet
+    """
+    schema = pa.Schema.from_pandas(frame.iloc[:0], preserve_index=False)
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            inferred = pd.api.types.infer_dtype(frame[field.name], skipna=True)
+            arrow_type = getattr(pa, _OBJECT_ARROW_TYPES.get(inferred, "string"))()
+            schema = schema.set(i, field.with_type(arrow_type))
+    return schema
+
+
+def iter_parquet(
+    df: pd.DataFrame,
+    chunks: Iterable[pd.DataFrame],
+    columns: Optional[List[str]] = None,
+) -> Iterator[bytes]:
+    """
+    Serializa a Parquet los bloques de una vista, un row group por bloque.
+
+    Args:
+        df: DataFrame cacheado (para el esquema)
+        chunks: Bloques de filas (ver `iter_view`)
+        columns: Columnas exportadas (None = todas)
+
+    Yields:
+        bytes: Fragmento del fichero Parquet
+
+    Raises:
+        RuntimeError: Si pyarrow no está instalado
+    """
+    if not parquet_available():
+        raise RuntimeError("La exportación a Parquet requiere pyarrow")
+
+    frame = df[columns] if columns else df
+    schema = _parquet_schema(frame)
+    sink = _StreamSink()
+
+    with pq.ParquetWriter(sink, schema, compression="snappy") as writer:
+        for chunk in chunks:
+            writer.write_table(
+                pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            )
+            yield sink.drain()
+
+    # Pie del fichero (metadatos) al cerrar el writer
+    yield sink.drain()
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """
+    Comprime en gzip un flujo de fragmentos sin acumularlo en memoria.
+
+    Args:
+        chunks: Fragmentos sin comprimir
+        level: Nivel de compresión (1-9)
+
+    Yields:
+        bytes: Fragmentos comprimidos
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,645 @@
+"""
+Compilador de expresiones `filter_query` de DataTable a máscaras vectorizadas.
+
+Una expresión como `{estancia_dias} > 30 && {peso_espanol_apr} < 1` (también
+con `and`/`or` y prefijos de mayúsculas `i`/`s`, como en `{banda} i= "< 0.5"`)
+se compila una sola vez (caché de expresiones) a un árbol de predicados que se
+evalúa con numpy sobre índices por columna:
+
+- Índice ordenado (valores ordenados + permutación) para los predicados de
+  rango sobre columnas numéricas: dos `searchsorted` delimitan las filas.
+- Índice de códigos categóricos (`pd.factorize`) para igualdad y operadores de
+  texto: el predicado se evalúa sobre las categorías únicas y se proyecta a
+  las filas con una tabla de consulta.
+
+Los índices se cachean por versión del dataset, así que solo se construyen una
+vez por cada carga de datos.
+"""
+
+import functools
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .versioning import get_dataset_version
+
+logger = logging.getLogger(__name__)
+
+# Caché LRU de índices de columna: (versión, columna, tipo) -> índice
+_INDEX_CACHE_SIZE = 64
+_index_cache: "OrderedDict[Tuple[str, str, str], Any]" = OrderedDict()
+_index_lock = threading.Lock()
+
+# Operadores relacionales: símbolo o palabra de DataTable -> nombre canónico
+_RELATIONAL = {
+    "=": "eq",
+    "eq": "eq",
+    "!=": "ne",
+    "ne": "ne",
+    "<": "lt",
+    "lt": "lt",
+    "<=": "le",
+    "le": "le",
+    ">": "gt",
+    "gt": "gt",
+    ">=": "ge",
+    "ge": "ge",
+    "contains": "contains",
+    "datestartswith": "datestartswith",
+}
+_IS_KINDS = ("nil", "blank", "num", "str")
+
+# Comparaciones vectorizadas equivalentes a los tramos del índice ordenado
+_COMPARE = {
+    "eq": np.equal,
+    "lt": np.less,
+    "le": np.less_equal,
+    "gt": np.greater,
+    "ge": np.greater_equal,
+}
+# Por encima de 1/N de las filas, el tramo se resuelve comparando valores
+_SCATTER_FRACTION = 16
+
+_TOKEN_RE = re.compile(
+    r"""
+    \s*(?:
+        (?P<column>\{(?:[^{}\\]|\\.)*\})
+      | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|`(?:[^`\\]|\\.)*`)
+      | (?P<op>&&|\|\||[is]?(?:!=|>=|<=|[<>=])|[!()])
+      | (?P<word>[^\s(){}<>=!&|"'`]+)
+    )
+    """,
+    re.VERBOSE,
+)
+
+# Conectores lógicos: símbolo o palabra (en minúsculas) -> símbolo
+_CONNECTIVES = {"&&": "&&", "and": "&&", "||": "||", "or": "||"}
+
+# Nodo compilado: recibe el contexto de evaluación y devuelve una máscara
+Predicate = Callable[["_Context"], np.ndarray]
+
+
+# ========== Índices de columna ==========
+
+
+class SortedIndex:
+    """Valores numéricos ordenados y su permutación (ordenación estable)"""
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+        self.order = np.argsort(values, kind="stable")
+        self.sorted = values[self.order]
+        self.size = len(values)
+        # Los NaN quedan al final: se excluyen de las búsquedas de rango
+        self.valid = len(self.sorted) - int(np.isnan(self.sorted).sum())
+        self._order_desc: Optional[np.ndarray] = None
+
+    def ordering(self, ascending: bool = True) -> np.ndarray:
+        """
+        Obtiene la permutación que ordena la columna (estable, NaN al final).
+
+        Args:
+            ascending: Orden ascendente o descendente
+
+        Returns:
+            np.ndarray: Posiciones de fila ordenadas
+        """
+        if ascending:
+            return self.order
+        if self._order_desc is None:
+            self._order_desc = np.argsort(-self.values, kind="stable")
+        return self._order_desc
+
+    def range_mask(self, operator: str, value: float) -> np.ndarray:
+        """
+        Obtiene la máscara de filas que cumplen `columna <operador> valor`.
+
+        Args:
+            operator: eq, lt, le, gt o ge
+            value: Valor de comparación
+
+        Returns:
+            np.ndarray: Máscara booleana por fila
+        """
+        values = self.sorted[: self.valid]
+        left = np.searchsorted(values, value, side="left")
+        right = np.searchsorted(values, value, side="right")
+        start, stop = {
+            "eq": (left, right),
+            "lt": (0, left),
+            "le": (0, right),
+            "gt": (right, self.valid),
+            "ge": (left, self.valid),
+        }[operator]
+
+        # Rangos selectivos: se marcan solo las filas del tramo. Si el tramo
+        # es amplio, una comparación directa es más barata que la dispersión
+        if stop - start > self.size // _SCATTER_FRACTION:
+            return _COMPARE[operator](self.values, value)
+
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.order[start:stop]] = True
+        return mask
+
+
+class CategoryIndex:
+    """Códigos categóricos por fila y categorías únicas de una columna"""
+
+    def __init__(self, series: pd.Series):
+        self.codes, uniques = pd.factorize(series)
+        self.uniques = np.asarray(uniques, dtype=object)
+
+    def lookup(self, hits: np.ndarray, missing: bool = False) -> np.ndarray:
+        """
+        Proyecta un predicado evaluado sobre las categorías a las filas.
+
+        Args:
+            hits: Resultado del predicado para cada categoría única
+            missing: Resultado para las filas nulas (código -1)
+
+        Returns:
+            np.ndarray: Máscara booleana por fila
+        """
+        # El código -1 (nulo) indexa la última posición de la tabla
+        table = np.append(np.asarray(hits, dtype=bool), missing)
+        return table[self.codes]
+
+
+def _build_index(df: pd.DataFrame, column: str, kind: str):
+    """Construye un índice de columna del tipo indicado"""
+    if kind == "sorted":
+        return SortedIndex(df[column].to_numpy(dtype=float, na_value=np.nan))
+    return CategoryIndex(df[column])
+
+
+def get_column_index(df: pd.DataFrame, column: str, kind: str):
+    """
+    Obtiene el índice de una columna, cacheado por versión del dataset.
+
+    Args:
+        df: DataFrame
+        column: Columna a indexar
+        kind: "sorted" (numérico ordenado) o "category" (códigos)
+
+    Returns:
+        SortedIndex o CategoryIndex
+    """
+    version = get_dataset_version(df)
+    if version is None:
+        return _build_index(df, column, kind)
+
+    key = (version, column, kind)
+    with _index_lock:
+        if key in _index_cache:
+            _index_cache.move_to_end(key)
+            return _index_cache[key]
+
+    index = _build_index(df, column, kind)
+
+    with _index_lock:
+        _index_cache[key] = index
+        while len(_index_cache) > _INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+
+    return index
+
+
+class _Context:
+    """Contexto de evaluación: DataFrame e índices usados en una consulta"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._indexes: Dict[Tuple[str, str], Any] = {}
+
+    def index(self, column: str, kind: str):
+        key = (column, kind)
+        if key not in self._indexes:
+            self._indexes[key] = get_column_index(self.df, column, kind)
+        return self._indexes[key]
+
+    def is_numeric(self, column: str) -> bool:
+        return pd.api.types.is_numeric_dtype(self.df[column]) and not (
+            pd.api.types.is_bool_dtype(self.df[column])
+        )
+
+    def empty(self, value: bool = False) -> np.ndarray:
+        return np.full(len(self.df), value, dtype=bool)
+
+
+# ========== Predicados ==========
+
+
+def _compare_values(values: np.ndarray, operator: str, value: Any) -> np.ndarray:
+    """Aplica un operador relacional sobre valores únicos (tolerando tipos mixtos)"""
+    result = np.zeros(len(values), dtype=bool)
+    for i, item in enumerate(values):
+        try:
+            if operator == "eq":
+                result[i] = item == value
+            elif operator == "ne":
+                result[i] = item != value
+            elif operator == "lt":
+                result[i] = item < value
+            elif operator == "le":
+                result[i] = item <= value
+            elif operator == "gt":
+                result[i] = item > value
+            elif operator == "ge":
+                result[i] = item >= value
+        except TypeError:
+            result[i] = operator == "ne"
+    return result
+
+
+def _relational(column: str, operator: str, value: Any, insensitive: bool) -> Predicate:
+    """Compila un predicado `{columna} <operador> valor`"""
+
+    def evaluate(ctx: _Context) -> np.ndarray:
+        if column not in ctx.df.columns:
+            return ctx.empty()
+
+        # Rango/igualdad numérica: índice ordenado
+        if isinstance(value, float) and ctx.is_numeric(column):
+            index = ctx.index(column, "sorted")
+            if operator == "ne":
+                return ~index.range_mask("eq", value)
+            return index.range_mask(operator, value)
+
+        # Resto: el predicado se evalúa sobre las categorías únicas
+        index = ctx.index(column, "category")
+        uniques = index.uniques
+        target = value
+        if insensitive and isinstance(value, str):
+            uniques = np.array(
+                [u.lower() if isinstance(u, str) else u for u in uniques], dtype=object
+            )
+            target = value.lower()
+        if not isinstance(target, str) and not ctx.is_numeric(column):
+            # Valor numérico sobre columna de texto: se compara su representación
+            target = _format_number(target)
+        hits = _compare_values(uniques, operator, target)
+        return index.lookup(hits, missing=operator == "ne")
+
+    return evaluate
+
+
+def _text(column: str, operator: str, value: Any, insensitive: bool) -> Predicate:
+    """Compila `contains` y `datestartswith` (sobre la representación en texto)"""
+    needle = value if isinstance(value, str) else _format_number(value)
+    if insensitive:
+        needle = needle.lower()
+
+    def evaluate(ctx: _Context) -> np.ndarray:
+        if column not in ctx.df.columns:
+            return ctx.empty()
+
+        index = ctx.index(column, "category")
+        texts = [str(u).lower() if insensitive else str(u) for u in index.uniques]
+        if operator == "contains":
+            hits = [needle in text for text in texts]
+        else:
+            hits = [text.startswith(needle) for text in texts]
+        return index.lookup(np.array(hits, dtype=bool))
+
+    return evaluate
+
+
+def _is(column: str, kind: str) -> Predicate:
+    """Compila `{columna} is nil|blank|num|str`"""
+
+    def evaluate(ctx: _Context) -> np.ndarray:
+        if column not in ctx.df.columns:
+            return ctx.empty()
+
+        index = ctx.index(column, "category")
+        uniques = index.uniques
+        if kind == "nil":
+            return index.lookup(np.zeros(len(uniques), dtype=bool), missing=True)
+        if kind == "blank":
+            hits = [isinstance(u, str) and not u.strip() for u in uniques]
+            return index.lookup(np.array(hits, dtype=bool), missing=True)
+        if kind == "num":
+            hits = [
+                isinstance(u, (int, float, np.number)) and not isinstance(u, bool)
+                for u in uniques
+            ]
+            return index.lookup(np.array(hits, dtype=bool))
+        hits = [isinstance(u, str) for u in uniques]
+        return index.lookup(np.array(hits, dtype=bool))
+
+    return evaluate
+
+
+def _format_number(value: float) -> str:
+    """Representación en texto de un número del filtro (3.0 -> '3')"""
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+# ========== Analizador ==========
+
+
+def _tokenize(query: str) -> List[Tuple[str, str]]:
+    """Divide la expresión en tokens (tipo, texto)"""
+    tokens = []
+    position = 0
+    query = query.strip()
+    while position < len(query):
+        match = _TOKEN_RE.match(query, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Token no reconocido en la posición {position}: {query!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+        while position < len(query) and query[position].isspace():
+            position += 1
+    return tokens
+
+
+def _unquote(token: str) -> str:
+    """Elimina comillas (o llaves) y secuencias de escape"""
+    return re.sub(r"\\(.)", r"\1", token[1:-1])
+
+
+def _parse_value(kind: str, text: str) -> Any:
+    """Convierte el token de valor (cadena entre comillas o literal)"""
+    if kind == "string":
+        return _unquote(text)
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+class _Parser:
+    """Analizador descendente: || < && < ! < comparación"""
+
+    def __init__(self, tokens: List[Tuple[str, str]]):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> Tuple[Optional[str], Optional[str]]:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None, None
+
+    def take(self) -> Tuple[str, str]:
+        token = self.peek()
+        if token[0] is None:
+            raise ValueError("Expresión incompleta")
+        self.position += 1
+        return token  # type: ignore[return-value]
+
+    def parse(self) -> Predicate:
+        node = self.parse_or()
+        if self.position != len(self.tokens):
+            raise ValueError(f"Token inesperado: {self.peek()[1]!r}")
+        return node
+
+    def connective(self) -> Optional[str]:
+        """Conector lógico siguiente (`&&`/`and` o `||`/`or`), si lo hay"""
+        kind, text = self.peek()
+        if kind in ("op", "word"):
+            return _CONNECTIVES.get(text.lower())
+        return None
+
+    def parse_or(self) -> Predicate:
+        nodes = [self.parse_and()]
+        while self.connective() == "||":
+            self.take()
+            nodes.append(self.parse_and())
+        return nodes[0] if len(nodes) == 1 else self.any_of(nodes)
+
+    def parse_and(self) -> Predicate:
+        nodes = [self.parse_unary()]
+        while self.connective() == "&&":
+            self.take()
+            nodes.append(self.parse_unary())
+        return nodes[0] if len(nodes) == 1 else self.all_of(nodes)
+
+    def parse_unary(self) -> Predicate:
+        kind, text = self.take()
+        if (kind, text) == ("op", "!"):
+            return self.negate(self.parse_unary())
+        if (kind, text) == ("op", "("):
+            node = self.parse_or()
+            if self.take() != ("op", ")"):
+                raise ValueError("Falta ')'")
+            return node
+        if kind == "column":
+            return self.parse_comparison(_unquote(text))
+        raise ValueError(f"Se esperaba una columna: {text!r}")
+
+    def parse_comparison(self, column: str) -> Predicate:
+        kind, text = self.take()
+        operator = text.lower()
+
+        if kind == "word" and operator == "is":
+            _, target = self.take()
+            if target.lower() not in _IS_KINDS:
+                raise ValueError(f"Tipo desconocido en 'is': {target!r}")
+            return self.is_kind(column, target.lower())
+
+        # Prefijo de sensibilidad a mayúsculas: i (insensible) / s (sensible),
+        # tanto en palabras (icontains) como en símbolos (i=, s>)
+        insensitive = False
+        if (
+            kind in ("word", "op")
+            and operator not in _RELATIONAL
+            and operator[:1] in ("i", "s")
+        ):
+            insensitive = operator[0] == "i"
+            operator = operator[1:]
+        if operator not in _RELATIONAL:
+            raise ValueError(f"Operador desconocido: {text!r}")
+        operator = _RELATIONAL[operator]
+
+        value = _parse_value(*self.take())
+        if operator in ("contains", "datestartswith"):
+            return self.text(column, operator, value, insensitive)
+        return self.relational(column, operator, value, insensitive)
+
+    # Constructores de nodos (las subclases los sustituyen para compilar la
+    # expresión a otra representación)
+
+    def any_of(self, nodes: List[Predicate]) -> Predicate:
+        return lambda ctx: np.logical_or.reduce([node(ctx) for node in nodes])
+
+    def all_of(self, nodes: List[Predicate]) -> Predicate:
+        return lambda ctx: np.logical_and.reduce([node(ctx) for node in nodes])
+
+    def negate(self, node: Predicate) -> Predicate:
+        return lambda ctx: ~node(ctx)
+
+    def is_kind(self, column: str, kind: str) -> Predicate:
+        return _is(column, kind)
+
+    def text(self, column: str, operator: str, value: Any, insensitive: bool):
+        return _text(column, operator, value, insensitive)
+
+    def relational(self, column: str, operator: str, value: Any, insensitive: bool):
+        return _relational(column, operator, value, insensitive)
+
+
+@functools.lru_cache(maxsize=256)
+def compile_filter_query(filter_query: str) -> Predicate:
+    """
+    Compila una expresión `filter_query` (cacheada por texto de la expresión).
+
+    Args:
+        filter_query: Expresión en la sintaxis de filtros de DataTable
+
+    Returns:
+        Predicate: Función contexto -> máscara booleana
+
+    Raises:
+        ValueError: Si la expresión no es válida
+    """
+    return _Parser(_tokenize(filter_query)).parse()
+
+
+def filter_mask(df: pd.DataFrame, filter_query: Optional[str]) -> Optional[np.ndarray]:
+    """
+    Evalúa una expresión `filter_query` sobre un DataFrame.
+
+    Args:
+        df: DataFrame a filtrar
+        filter_query: Expresión de DataTable
+
+    Returns:
+        np.ndarray: Máscara booleana por fila, o None si no hay filtro (o la
+        expresión no es válida, en cuyo caso se ignora como hace DataTable)
+    """
+    if not filter_query or not filter_query.strip():
+        return None
+
+    try:
+        predicate = compile_filter_query(filter_query.strip())
+    except ValueError as e:
+        logger.warning(f"Invalid filter query ignored: {e}")
+        return None
+
+    return predicate(_Context(df))
+
+
+# ========== Traducción a SQL ==========
+
+# Operadores relacionales canónicos -> SQL
+_SQL_OPERATORS = {"eq": "=", "lt": "<", "le": "<=", "gt": ">", "ge": ">="}
+
+
+def quote_identifier(name: str) -> str:
+    """Cita un identificador SQL (columna o tabla)"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+class _SqlParser(_Parser):
+    """
+    Compila la expresión a una condición SQL parametrizada con la misma
+    semántica que las máscaras: cada comparación es verdadera o falsa (nunca
+    NULL) y `!=` incluye los nulos.
+    """
+
+    def __init__(self, tokens: List[Tuple[str, str]], numeric: Dict[str, bool]):
+        super().__init__(tokens)
+        self.numeric = numeric
+        self.params: List[Any] = []
+
+    def leaf(self, sql: str, *params: Any) -> str:
+        self.params.extend(params)
+        return f"COALESCE({sql}, FALSE)"
+
+    def any_of(self, nodes):
+        return "(" + " OR ".join(nodes) + ")"
+
+    def all_of(self, nodes):
+        return "(" + " AND ".join(nodes) + ")"
+
+    def negate(self, node):
+        return f"(NOT {node})"
+
+    def is_kind(self, column, kind):
+        if column not in self.numeric:
+            return "FALSE"
+        name = quote_identifier(column)
+        numeric = self.numeric[column]
+        if kind == "nil" or (kind == "blank" and numeric):
+            return f"({name} IS NULL)"
+        if kind == "blank":
+            return self.leaf(f"{name} IS NULL OR trim(CAST({name} AS VARCHAR)) = ''")
+        if (kind == "num") == numeric:
+            return f"({name} IS NOT NULL)"
+        return "FALSE"
+
+    def text(self, column, operator, value, insensitive):
+        if column not in self.numeric:
+            return "FALSE"
+        needle = value if isinstance(value, str) else _format_number(value)
+        text = f"CAST({quote_identifier(column)} AS VARCHAR)"
+        if insensitive:
+            text, needle = f"lower({text})", needle.lower()
+        function = "contains" if operator == "contains" else "starts_with"
+        return self.leaf(f"{function}({text}, ?)", needle)
+
+    def relational(self, column, operator, value, insensitive):
+        if column not in self.numeric:
+            return "FALSE"
+        name = quote_identifier(column)
+        numeric = self.numeric[column]
+
+        if isinstance(value, float) and numeric:
+            target: Any = value
+        elif numeric:
+            # Texto sobre columna numérica: no es comparable (como en las máscaras)
+            return "TRUE" if operator == "ne" else "FALSE"
+        else:
+            target = value if isinstance(value, str) else _format_number(value)
+            name = f"CAST({name} AS VARCHAR)"
+            if insensitive:
+                name, target = f"lower({name})", target.lower()
+
+        if operator == "ne":
+            return self.leaf(f"{name} IS DISTINCT FROM ?", target)
+        return self.leaf(f"{name} {_SQL_OPERATORS[operator]} ?", target)
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_filter_sql(
+    filter_query: str, numeric: Tuple[Tuple[str, bool], ...]
+) -> Tuple[str, Tuple[Any, ...]]:
+    """Compila una expresión a SQL (cacheada por expresión y esquema)"""
+    parser = _SqlParser(_tokenize(filter_query), dict(numeric))
+    condition = parser.parse()
+    return condition, tuple(parser.params)
+
+
+def filter_sql(
+    filter_query: Optional[str], numeric: Dict[str, bool]
+) -> Optional[Tuple[str, List[Any]]]:
+    """
+    Traduce una expresión `filter_query` a una condición SQL parametrizada.
+
+    Args:
+        filter_query: Expresión de DataTable
+        numeric: Columnas de la tabla -> si son numéricas
+
+    Returns:
+        Tuple: (condición WHERE, parámetros), o None si no hay filtro (o la
+        expresión no es válida, en cuyo caso se ignora como hace DataTable)
+    """
+    if not filter_query or not filter_query.strip():
+        return None
+
+    try:
+        condition, params = _compile_filter_sql(
+            filter_query.strip(), tuple(sorted(numeric.items()))
+        )
+    except ValueError as e:
+        logger.warning(f"Invalid filter query ignored: {e}")
+        return None
+
+    return condition, list(params)
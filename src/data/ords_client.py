@@ -5,9 +5,11 @@ Maneja la comunicación HTTP y paginación.
 
 import requests
 from requests.auth import HTTPBasicAuth
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 import logging
 
+from .page_parser import ParsedPage, parse_page
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,22 +29,26 @@ class ORDSClient:
         self.auth = HTTPBasicAuth(username, password)
         self.headers = {"Content-Type": "application/json"}
 
-    def fetch_endpoint(
+    def iter_pages(
         self, endpoint: str, limit: int = 20000, max_records: Optional[int] = None
-    ) -> List[Dict]:
+    ) -> Iterator[ParsedPage]:
         """
-        Obtiene datos de un endpoint de ORDS con paginación automática.
+        Recorre las páginas de un endpoint de ORDS a medida que llegan.
+
+        Permite procesar (y resumir) cada página sin esperar al resto de la
+        descarga. Las páginas grandes se decodifican en el pool de procesos
+        de `page_parser`. Los errores se registran y terminan la iteración.
 
         Args:
             endpoint: Nombre del endpoint (ej: "peso_vs_estancia")
             limit: Registros por página (default: 20000)
             max_records: Máximo total de registros a obtener (None = todos)
 
-        Returns:
-            List[Dict]: Lista de todos los registros obtenidos
+        Yields:
+            ParsedPage: Registros de cada página, en columnas tipadas
         """
         url = f"{self.base_url}/{endpoint}/"
-        all_items = []
+        total = 0
         offset = 0
         has_more = True
 
@@ -66,45 +72,55 @@ class ORDSClient:
                     )
                     break
 
-                data = response.json()
+                items = parse_page(response.content)
 
                 # Verificar si hay items en la respuesta
-                if "items" not in data or len(data["items"]) == 0:
+                if len(items) == 0:
                     has_more = False
-                    if len(all_items) == 0:
+                    if total == 0:
                         logger.warning(f"No items found in response from {endpoint}")
                     break
 
-                # Añadir items
-                items = data["items"]
-                all_items.extend(items)
-
-                logger.debug(
-                    f"  → Fetched {len(items)} records " f"(Total: {len(all_items)})"
-                )
-
                 # Verificar si hemos alcanzado el límite
-                if max_records and len(all_items) >= max_records:
-                    all_items = all_items[:max_records]
+                if max_records and total + len(items) >= max_records:
+                    items = items.head(max_records - total)
                     has_more = False
                     logger.info(f"Reached max_records limit: {max_records}")
-                    break
+                else:
+                    # Verificar si hay más datos
+                    has_more = items.has_more
 
-                # Verificar si hay más datos
-                has_more = data.get("hasMore", False)
+                total += len(items)
+                logger.debug(f"  → Fetched {len(items)} records " f"(Total: {total})")
+                yield items
 
                 if has_more:
                     offset += limit
-                else:
-                    logger.info(
-                        f"✓ Completed: {len(all_items)} total records from {endpoint}"
-                    )
+                elif not max_records or total < max_records:
+                    logger.info(f"✓ Completed: {total} total records from {endpoint}")
 
         except requests.exceptions.RequestException as e:
             logger.error(f"Request exception for {endpoint}: {e}")
         except Exception as e:
             logger.error(f"Unexpected error fetching {endpoint}: {e}")
 
+    def fetch_endpoint(
+        self, endpoint: str, limit: int = 20000, max_records: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Obtiene datos de un endpoint de ORDS con paginación automática.
+
+        Args:
+            endpoint: Nombre del endpoint (ej: "peso_vs_estancia")
+            limit: Registros por página (default: 20000)
+            max_records: Máximo total de registros a obtener (None = todos)
+
+        Returns:
+            List[Dict]: Lista de todos los registros obtenidos
+        """
+        all_items = []
+        for items in self.iter_pages(endpoint, limit=limit, max_records=max_records):
+            all_items.extend(items)
         return all_items
 
     def test_connection(self) -> bool:
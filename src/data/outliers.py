@@ -0,0 +1,330 @@
+"""
+Detección de estancias atípicas en peso APR-GRD frente a estancia.
+
+Marca las estancias muy por encima de lo que predice el peso, con tres
+criterios:
+
+- iqr: por encima de Q3 + k·IQR de su banda de peso (Tukey)
+- mad: z robusta (mediana y MAD de su banda de peso) mayor que el umbral
+- residual: residuo respecto a la recta de Theil–Sen, en unidades de MAD
+  de los residuos, mayor que el umbral
+
+Las estadísticas de cada banda se precalculan (t-digest) y se asignan a las
+filas con un único `searchsorted`, así que todo el cálculo es vectorizado y
+lineal en el número de filas. Los resultados se cachean por versión.
+
+Un dataset troceado (`OUT_OF_CORE`) se recorre por fragmentos: se marcan las
+filas de todo el dataset, no solo las de su muestra residente.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..utils.config import Config
+from .quantiles import (
+    WEIGHT_BAND_LABELS,
+    WEIGHT_BANDS,
+    GroupedQuantiles,
+    TDigest,
+    stay_by_weight_band,
+)
+from .regression import RegressionFit, fit_regression
+from .spill import get_spilled
+from .versioning import get_dataset_version, register_dataset
+
+# Criterios de detección disponibles
+OUTLIER_METHODS = ("iqr", "mad", "residual")
+
+OUTLIER_METHOD_LABELS = {
+    "iqr": "Rango intercuartílico por banda",
+    "mad": "Z robusta (MAD) por banda",
+    "residual": "Residuo sobre la recta de Theil–Sen",
+}
+
+# Factor que convierte la MAD en una estimación de la desviación típica
+_MAD_SCALE = 1.4826
+
+# Columnas que se leen de cada fragmento
+_COLUMNS = ["peso_espanol_apr", "estancia_dias"]
+
+# Caché LRU: (versión, tipo, ...) -> estadísticas por banda o filas marcadas
+_OUTLIER_CACHE_SIZE = 16
+_outlier_cache: "OrderedDict[Tuple, pd.DataFrame]" = OrderedDict()
+_outlier_lock = threading.Lock()
+
+
+def _cached(key: Tuple, build) -> pd.DataFrame:
+    """Devuelve el resultado cacheado de `key` o lo construye con `build`"""
+    with _outlier_lock:
+        if key in _outlier_cache:
+            _outlier_cache.move_to_end(key)
+            return _outlier_cache[key]
+
+    result = build()
+
+    with _outlier_lock:
+        _outlier_cache[key] = result
+        while len(_outlier_cache) > _OUTLIER_CACHE_SIZE:
+            _outlier_cache.popitem(last=False)
+
+    return result
+
+
+def _weight_bands(weights: np.ndarray) -> np.ndarray:
+    """Código de banda de peso de cada fila (-1 si el peso es nulo)"""
+    codes = np.searchsorted(WEIGHT_BANDS, weights, side="right") - 1
+    codes[np.isnan(weights) | (codes >= len(WEIGHT_BAND_LABELS))] = -1
+    return codes
+
+
+def _columns(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Peso y estancia como arrays float"""
+    weights = pd.to_numeric(df["peso_espanol_apr"], errors="coerce")
+    stays = pd.to_numeric(df["estancia_dias"], errors="coerce")
+    return weights.to_numpy(np.float64), stays.to_numpy(np.float64)
+
+
+def _chunks(df: pd.DataFrame) -> Iterator[Tuple[int, pd.DataFrame]]:
+    """
+    Recorre el dataset completo: el propio DataFrame si está en memoria o los
+    fragmentos de un dataset troceado.
+
+    Yields:
+        Tuple: (posición de la primera fila en el dataset, fragmento)
+    """
+    spilled = get_spilled(df)
+    if spilled is None:
+        yield 0, df
+        return
+    offset = 0
+    for chunk in spilled.iter_chunks(_COLUMNS):
+        yield offset, chunk
+        offset += len(chunk)
+
+
+def _build_band_statistics(df: pd.DataFrame) -> pd.DataFrame:
+    """Estadísticas de estancia por banda de peso (sin caché)"""
+    digests = stay_by_weight_band(df).digests
+    stats = pd.DataFrame(
+        np.nan, index=WEIGHT_BAND_LABELS, columns=["casos", "q1", "mediana", "q3"]
+    )
+    for label, digest in digests.items():
+        stats.loc[label] = [digest.count, *digest.quantile([0.25, 0.5, 0.75])]
+
+    # MAD: mediana de las desviaciones absolutas respecto a la mediana de la
+    # banda, resumida con otro t-digest por banda
+    medians = stats["mediana"].to_numpy()
+    deviations = GroupedQuantiles()
+    for _, chunk in _chunks(df):
+        weights, stays = _columns(chunk)
+        codes = _weight_bands(weights)
+        valid = codes >= 0
+        deviations.update(
+            codes[valid], np.abs(stays[valid] - medians[codes[valid]])
+        )
+    stats["mad"] = np.nan
+    for code, digest in deviations.digests.items():
+        stats.iloc[code, stats.columns.get_loc("mad")] = digest.quantile(0.5)[0]
+
+    stats["iqr"] = stats["q3"] - stats["q1"]
+    stats.index.name = "banda"
+    return stats
+
+
+def band_statistics(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Estadísticas de estancia por banda de peso, cacheadas por versión.
+
+    Args:
+        df: DataFrame de peso y estancia
+
+    Returns:
+        DataFrame indexado por banda con columnas: casos, q1, mediana, q3,
+        mad, iqr (no modificar: puede ser compartido)
+    """
+    version = get_dataset_version(df)
+    if version is None:
+        return _build_band_statistics(df)
+    return _cached((version, "bands"), lambda: _build_band_statistics(df))
+
+
+def _threshold(method: str, threshold: Optional[float]) -> float:
+    """Umbral por defecto de cada criterio"""
+    if threshold is not None:
+        return threshold
+    if method == "iqr":
+        return Config.OUTLIER_IQR_FACTOR
+    return Config.OUTLIER_Z_THRESHOLD
+
+
+def _residual_spread(df: pd.DataFrame, fit: RegressionFit) -> float:
+    """
+    Dispersión de los residuos sobre la recta (MAD escalada).
+
+    En memoria es exacta; en un dataset troceado se resume con un t-digest
+    por fragmentos.
+    """
+    if get_spilled(df) is None:
+        weights, stays = _columns(df)
+        valid = (_weight_bands(weights) >= 0) & ~np.isnan(stays)
+        residuals = stays[valid] - fit.predict(weights[valid])
+        return _MAD_SCALE * np.nanmedian(np.abs(residuals))
+
+    digest = TDigest()
+    for _, chunk in _chunks(df):
+        weights, stays = _columns(chunk)
+        valid = (_weight_bands(weights) >= 0) & ~np.isnan(stays)
+        digest.update(np.abs(stays[valid] - fit.predict(weights[valid])))
+    if digest.count == 0:
+        return np.nan
+    return _MAD_SCALE * digest.quantile(0.5)[0]
+
+
+def _flag_chunk(
+    chunk: pd.DataFrame, offset: int, method: str, threshold: float, reference
+) -> pd.DataFrame:
+    """
+    Marca las estancias atípicas de un fragmento.
+
+    Args:
+        chunk: Fragmento de peso y estancia
+        offset: Posición de su primera fila en el dataset
+        method: Criterio ("iqr", "mad" o "residual")
+        threshold: Factor del IQR o umbral de z
+        reference: Estadísticas por banda, o (recta, dispersión) con "residual"
+
+    Returns:
+        DataFrame con las filas marcadas del fragmento (sin ordenar)
+    """
+    weights, stays = _columns(chunk)
+    codes = _weight_bands(weights)
+    valid = (codes >= 0) & ~np.isnan(stays)
+
+    if method == "residual":
+        fit, spread = reference
+        expected = fit.predict(weights)
+        limit = expected + threshold * spread
+        score = (stays - expected) / spread
+    else:
+        # Estadísticas de la banda de cada fila; la banda -1 toma la fila
+        # extra de NaN. Una dispersión nula (banda casi constante) no marca
+        # nada en lugar de marcar todo lo que supere la mediana
+        stats = reference
+        lookup = np.vstack(
+            [stats.to_numpy(np.float64), np.full(len(stats.columns), np.nan)]
+        )
+        for name in ("iqr", "mad"):
+            spread = lookup[:, stats.columns.get_loc(name)]
+            spread[spread == 0] = np.nan
+        row = lookup[codes]
+        column = {name: i for i, name in enumerate(stats.columns)}
+        expected = row[:, column["mediana"]]
+        if method == "iqr":
+            iqr = row[:, column["iqr"]]
+            limit = row[:, column["q3"]] + threshold * iqr
+            with np.errstate(divide="ignore", invalid="ignore"):
+                score = (stays - row[:, column["q3"]]) / iqr
+        else:
+            spread = _MAD_SCALE * row[:, column["mad"]]
+            limit = expected + threshold * spread
+            with np.errstate(divide="ignore", invalid="ignore"):
+                score = (stays - expected) / spread
+
+    flagged = np.flatnonzero(valid & (stays > limit))
+    labels = np.asarray(WEIGHT_BAND_LABELS, dtype=object)
+    return pd.DataFrame(
+        {
+            "fila": offset + flagged,
+            "peso_espanol_apr": weights[flagged],
+            "estancia_dias": stays[flagged],
+            "banda": labels[codes[flagged]],
+            "esperado": expected[flagged].round(1),
+            "limite": limit[flagged].round(1),
+            "exceso": (stays[flagged] - limit[flagged]).round(1),
+            "puntuacion": score[flagged].round(2),
+        }
+    )
+
+
+def _build_outliers(df: pd.DataFrame, method: str, threshold: float) -> pd.DataFrame:
+    """Marca las estancias atípicas de un criterio (sin caché)"""
+    if method == "residual":
+        fit = fit_regression(df, "theil_sen")
+        if fit is None:
+            return _empty_outliers()
+        spread = _residual_spread(df, fit)
+        if not spread > 0:
+            return _empty_outliers()
+        reference = (fit, spread)
+    else:
+        reference = band_statistics(df)
+
+    parts = [
+        _flag_chunk(chunk, offset, method, threshold, reference)
+        for offset, chunk in _chunks(df)
+    ]
+    result = parts[0] if len(parts) == 1 else pd.concat(parts, ignore_index=True)
+    # Las más extremas primero
+    result = result.sort_values("puntuacion", ascending=False, kind="stable")
+    return result.reset_index(drop=True)
+
+
+def _empty_outliers() -> pd.DataFrame:
+    """Resultado sin estancias atípicas"""
+    return pd.DataFrame(
+        columns=[
+            "fila",
+            "peso_espanol_apr",
+            "estancia_dias",
+            "banda",
+            "esperado",
+            "limite",
+            "exceso",
+            "puntuacion",
+        ]
+    )
+
+
+def detect_outliers(
+    df: pd.DataFrame, method: str = "mad", threshold: Optional[float] = None
+) -> pd.DataFrame:
+    """
+    Obtiene las estancias atípicas de un criterio, cacheadas por versión.
+
+    El resultado se registra como dataset derivado, de modo que sus tablas
+    paginadas reutilizan los índices de columna entre peticiones.
+
+    Args:
+        df: DataFrame de peso y estancia
+        method: Criterio ("iqr", "mad" o "residual")
+        threshold: Factor del IQR o umbral de z (por defecto, los de Config)
+
+    Returns:
+        DataFrame con columnas: fila (posición en el dataset completo, también
+        si está troceado), peso_espanol_apr, estancia_dias, banda, esperado,
+        limite, exceso y puntuacion, ordenado de más a menos extremo (no
+        modificar: puede ser compartido)
+
+    Raises:
+        ValueError: Si el criterio no existe
+    """
+    if method not in OUTLIER_METHODS:
+        raise ValueError(f"Criterio de atípicos desconocido: {method}")
+    if df.empty:
+        return _empty_outliers()
+
+    threshold = _threshold(method, threshold)
+    version = get_dataset_version(df)
+    if version is None:
+        return _build_outliers(df, method, threshold)
+
+    def build() -> pd.DataFrame:
+        result = _build_outliers(df, method, threshold)
+        register_dataset(result, f"{version}:atipicos:{method}")
+        return result
+
+    return _cached((version, "outliers", method, threshold), build)
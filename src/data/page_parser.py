@@ -0,0 +1,290 @@
+"""
+Decodificación de las páginas de ORDS en un pool de procesos.
+
+Decodificar una página de 20000 filas (`json.loads` y su conversión a
+columnas tipadas) es trabajo de CPU que retiene el GIL: mientras dura, el
+resto de hilos del worker (otras peticiones, otras descargas) esperan. Con
+`PARSE_WORKERS` > 0, las páginas grandes se decodifican en un pool de
+procesos. Cada proceso deja las columnas de la página en un segmento de
+memoria compartida (los números como arrays y los textos codificados como
+diccionario: códigos más las cadenas distintas en UTF-8) y devuelve solo su
+descripción, de modo que el worker copia unos pocos buffers en lugar de
+deserializar un objeto por celda.
+
+El resultado es una `ParsedPage` con las mismas columnas y tipos que
+`pd.DataFrame(items)`, que los motores de cálculo procesan directamente.
+"""
+
+import atexit
+import json
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..utils.config import Config
+from ..utils.processes import pool_context
+
+logger = logging.getLogger(__name__)
+
+# Las páginas menores se decodifican en el propio worker (el viaje al pool
+# costaría más que la decodificación)
+_INLINE_BYTES = 256 * 1024
+
+# Alineación de los buffers dentro del segmento compartido
+_ALIGNMENT = 8
+
+# Pool de procesos de decodificación (singleton, se crea al primer uso)
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+class ParsedPage:
+    """Página de ORDS decodificada en columnas tipadas"""
+
+    def __init__(self, columns: Dict[str, np.ndarray], rows: int, has_more: bool):
+        """
+        Crea una página decodificada.
+
+        Args:
+            columns: Columna -> valores (como `pd.DataFrame(items)`)
+            rows: Número de registros
+            has_more: Si ORDS indica que hay más páginas
+        """
+        self.columns = columns
+        self.rows = rows
+        self.has_more = has_more
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Registros de la página (con los tipos de sus columnas)"""
+        return iter(self.to_frame().to_dict("records"))
+
+    def head(self, n: int) -> "ParsedPage":
+        """Primeros `n` registros de la página"""
+        columns = {name: values[:n] for name, values in self.columns.items()}
+        return ParsedPage(columns, min(n, self.rows), self.has_more)
+
+    def to_frame(self, index: Optional[pd.Index] = None) -> pd.DataFrame:
+        """
+        Página como DataFrame.
+
+        Args:
+            index: Índice de las filas (opcional)
+
+        Returns:
+            DataFrame con las columnas de la página
+        """
+        if index is None:
+            index = pd.RangeIndex(self.rows)
+        return pd.DataFrame(self.columns, index=index)
+
+
+def _load(content: bytes) -> Tuple[pd.DataFrame, bool]:
+    """Registros de una respuesta de ORDS como DataFrame, y si hay más"""
+    data = json.loads(content)
+    items = (data.get("items") if isinstance(data, dict) else None) or []
+    return pd.DataFrame(items), bool(items) and bool(data.get("hasMore", False))
+
+
+def decode_page(content: bytes) -> ParsedPage:
+    """
+    Decodifica una página en el proceso actual.
+
+    Args:
+        content: Cuerpo JSON de la respuesta de ORDS
+
+    Returns:
+        ParsedPage: Página decodificada
+    """
+    frame, has_more = _load(content)
+    columns = {name: frame[name].to_numpy() for name in frame.columns}
+    return ParsedPage(columns, len(frame), has_more)
+
+
+def _encode(frame: pd.DataFrame) -> Tuple[List[Tuple], List[np.ndarray]]:
+    """
+    Describe las columnas de una página como buffers planos.
+
+    Returns:
+        Tuple: (descripción de cada columna, buffers a copiar)
+    """
+    layout, buffers = [], []
+
+    def add(array: np.ndarray) -> int:
+        buffers.append(np.ascontiguousarray(array))
+        return len(buffers) - 1
+
+    for name in frame.columns:
+        values = frame[name].to_numpy()
+        if values.dtype != object:
+            layout.append((name, "array", [add(values)], None))
+            continue
+        try:
+            codes, uniques = pd.factorize(values)
+        except TypeError:
+            # Valores no hashables (listas, objetos JSON): se envían tal cual
+            layout.append((name, "objects", [], values))
+            continue
+        codes = codes.astype(np.int32)
+        if all(isinstance(value, str) for value in uniques):
+            encoded = [value.encode() for value in uniques]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(value) for value in encoded], out=offsets[1:])
+            text = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+            spans = [add(codes), add(offsets), add(text)]
+            layout.append((name, "strings", spans, None))
+        else:
+            layout.append((name, "codes", [add(codes)], list(uniques)))
+    return layout, buffers
+
+
+def _decode_shared(content: bytes) -> Dict[str, Any]:
+    """
+    Decodifica una página en un proceso del pool.
+
+    Las columnas se escriben en un segmento de memoria compartida nuevo, que
+    el proceso que las recibe libera tras copiarlas.
+
+    Returns:
+        dict: Nombre del segmento, filas, hasMore, columnas y posición,
+        tipo y longitud de cada buffer
+    """
+    frame, has_more = _load(content)
+    layout, buffers = _encode(frame)
+
+    spans, size = [], 0
+    for array in buffers:
+        size += -size % _ALIGNMENT
+        spans.append((size, array.dtype.str, len(array)))
+        size += array.nbytes
+
+    name = None
+    if size:
+        segment = shared_memory.SharedMemory(create=True, size=size)
+        try:
+            for array, (offset, _, _) in zip(buffers, spans):
+                target = np.ndarray(
+                    array.shape, dtype=array.dtype, buffer=segment.buf, offset=offset
+                )
+                target[:] = array
+                del target
+        finally:
+            segment.close()
+        name = segment.name
+
+    return {
+        "segment": name,
+        "rows": len(frame),
+        "has_more": has_more,
+        "layout": layout,
+        "spans": spans,
+    }
+
+
+def _attach(result: Dict[str, Any]) -> ParsedPage:
+    """Copia las columnas del segmento compartido de una página y lo libera"""
+    segment = None
+    if result["segment"] is not None:
+        segment = shared_memory.SharedMemory(name=result["segment"])
+
+    def read(index: int) -> np.ndarray:
+        offset, dtype, count = result["spans"][index]
+        return np.frombuffer(
+            segment.buf, dtype=dtype, count=count, offset=offset
+        ).copy()
+
+    columns = {}
+    try:
+        for name, kind, buffers, values in result["layout"]:
+            if kind == "array":
+                columns[name] = read(buffers[0])
+                continue
+            if kind == "objects":
+                columns[name] = values
+                continue
+            codes = read(buffers[0])
+            if kind == "strings":
+                offsets, text = read(buffers[1]), read(buffers[2]).tobytes()
+                values = [
+                    text[start:end].decode()
+                    for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())
+                ]
+            # Los códigos -1 (nulos) toman el último elemento: None
+            lookup = np.empty(len(values) + 1, dtype=object)
+            for i, value in enumerate(values):
+                lookup[i] = value
+            columns[name] = lookup[codes]
+    finally:
+        if segment is not None:
+            segment.close()
+            segment.unlink()
+
+    return ParsedPage(columns, result["rows"], result["has_more"])
+
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    """Pool de procesos de decodificación (None si está desactivado)"""
+    global _executor
+
+    if Config.PARSE_WORKERS <= 0:
+        return None
+
+    with _executor_lock:
+        if _executor is None:
+            # Los procesos comparten el rastreador de segmentos del worker (el
+            # forkserver y spawn les pasan el suyo si ya está en marcha): si el
+            # worker muere, los segmentos pendientes se liberan igualmente
+            resource_tracker.ensure_running()
+            # Sin fork: el worker tiene hilos (ver `pool_context`)
+            _executor = ProcessPoolExecutor(
+                max_workers=Config.PARSE_WORKERS, mp_context=pool_context(__name__)
+            )
+            atexit.register(_executor.shutdown, wait=False, cancel_futures=True)
+        return _executor
+
+
+def _discard_executor():
+    """Descarta un pool roto (se vuelve a crear en el siguiente uso)"""
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def parse_page(content: bytes) -> ParsedPage:
+    """
+    Decodifica una página de ORDS, en el pool si es grande.
+
+    Mientras el pool decodifica, el hilo que espera libera el GIL. Si el pool
+    no está disponible, la página se decodifica en el proceso actual.
+
+    Args:
+        content: Cuerpo JSON de la respuesta de ORDS
+
+    Returns:
+        ParsedPage: Página decodificada
+
+    Raises:
+        ValueError: Si el cuerpo no es JSON válido
+    """
+    executor = _get_executor()
+    if executor is None or len(content) < _INLINE_BYTES:
+        return decode_page(content)
+
+    try:
+        result = executor.submit(_decode_shared, content).result()
+    except (BrokenProcessPool, OSError) as e:
+        logger.warning(f"Parse pool unavailable, decoding inline: {e}")
+        _discard_executor()
+        return decode_page(content)
+    return _attach(result)
@@ -0,0 +1,313 @@
+"""
+Resúmenes de cuantiles (t-digest) por grupo.
+
+Un t-digest resume una distribución en unos pocos cientos de centroides, más
+finos en las colas, así que los percentiles altos (p90, p99) son precisos
+aunque el resumen ocupe lo mismo con mil filas que con decenas de millones.
+Se construyen en una sola pasada por fragmentos (leídos de disco si el
+dataset está troceado), se combinan con `merge` y se cachean por versión de
+los datos.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .spill import iter_chunks
+from .versioning import get_dataset_version
+
+# Caché LRU de resúmenes: (versión, valor, grupo, bandas) -> GroupedQuantiles
+_QUANTILE_CACHE_SIZE = 32
+_quantile_cache: "OrderedDict[Tuple, GroupedQuantiles]" = OrderedDict()
+_quantile_lock = threading.Lock()
+
+# Bandas de peso APR-GRD: límites (cerrados por la izquierda) y etiquetas
+WEIGHT_BANDS = [0, 0.5, 1, 2, 4, np.inf]
+WEIGHT_BAND_LABELS = ["< 0.5", "0.5 - 1", "1 - 2", "2 - 4", "≥ 4"]
+
+
+class TDigest:
+    """
+    t-digest de tipo "merging" con compresión vectorizada.
+
+    Los valores se ordenan junto a los centroides existentes y se agrupan por
+    el entero de la función de escala k1 en su cuantil, de modo que cada
+    centroide abarca como mucho una unidad de k (pocos puntos en las colas,
+    muchos en el centro).
+    """
+
+    def __init__(self, compression: int = 200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self) -> float:
+        """Número de valores resumidos"""
+        return float(self.weights.sum())
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        """Agrupa centroides ordenados según la función de escala k1"""
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+
+        cumulative = np.cumsum(weights)
+        quantile = (cumulative - weights / 2) / cumulative[-1]
+        scale = self.compression / (2 * np.pi) * np.arcsin(2 * quantile - 1)
+        cluster = np.floor(scale - scale[0]).astype(np.int64)
+
+        starts = np.flatnonzero(np.r_[True, np.diff(cluster) != 0])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def update(self, values: Iterable):
+        """
+        Añade un lote de valores.
+
+        Args:
+            values: Valores observados (los nulos se ignoran)
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self._compress(
+            np.concatenate([self.means, values]),
+            np.concatenate([self.weights, np.ones(len(values))]),
+        )
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        """
+        Fusiona con otro t-digest (por ejemplo, de otro fragmento o worker).
+
+        Args:
+            other: Resumen a fusionar
+
+        Returns:
+            TDigest: Resumen de la unión
+        """
+        merged = TDigest(self.compression)
+        merged.min = min(self.min, other.min)
+        merged.max = max(self.max, other.max)
+        if len(self.means) or len(other.means):
+            merged._compress(
+                np.concatenate([self.means, other.means]),
+                np.concatenate([self.weights, other.weights]),
+            )
+        return merged
+
+    def quantile(self, q) -> np.ndarray:
+        """
+        Estima cuantiles interpolando entre los centros de los centroides.
+
+        Args:
+            q: Cuantil o cuantiles en [0, 1]
+
+        Returns:
+            np.ndarray: Valores estimados (NaN si el resumen está vacío)
+        """
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        if len(self.means) == 0:
+            return np.full(len(q), np.nan)
+
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return np.interp(
+            q * total,
+            np.r_[0.0, centers, total],
+            np.r_[self.min, self.means, self.max],
+        )
+
+    def mean(self) -> float:
+        """Media exacta de los valores resumidos"""
+        if len(self.means) == 0:
+            return float("nan")
+        return float(np.dot(self.means, self.weights) / self.weights.sum())
+
+
+class GroupedQuantiles:
+    """Un t-digest por grupo, actualizable por fragmentos"""
+
+    def __init__(self, compression: int = 200):
+        self.compression = compression
+        self.digests: Dict[object, TDigest] = {}
+
+    def update(self, groups: np.ndarray, values: np.ndarray):
+        """
+        Añade un fragmento de valores con su grupo.
+
+        Args:
+            groups: Grupo de cada valor (los nulos se ignoran)
+            values: Valores
+        """
+        codes, uniques = pd.factorize(groups)
+        values = np.asarray(values, dtype=np.float64)
+        valid = codes >= 0
+        codes, values = codes[valid], values[valid]
+
+        # Un único ordenamiento reparte el fragmento entre los grupos
+        order = np.argsort(codes, kind="stable")
+        bounds = np.flatnonzero(np.diff(codes[order])) + 1
+        for part in np.split(order, bounds):
+            if len(part) == 0:
+                continue
+            group = uniques[codes[part[0]]]
+            if group not in self.digests:
+                self.digests[group] = TDigest(self.compression)
+            self.digests[group].update(values[part])
+
+    def merge(self, other: "GroupedQuantiles") -> "GroupedQuantiles":
+        """
+        Fusiona con los resúmenes de otro fragmento.
+
+        Args:
+            other: Resúmenes a fusionar
+
+        Returns:
+            GroupedQuantiles: Resúmenes de la unión
+        """
+        merged = GroupedQuantiles(self.compression)
+        merged.digests = dict(self.digests)
+        for group, digest in other.digests.items():
+            own = merged.digests.get(group)
+            merged.digests[group] = digest if own is None else own.merge(digest)
+        return merged
+
+    def summary(
+        self,
+        quantiles: Sequence[float] = (0.5, 0.9, 0.99),
+        order: Optional[Sequence] = None,
+    ) -> pd.DataFrame:
+        """
+        Tabla de percentiles por grupo.
+
+        Args:
+            quantiles: Cuantiles a estimar
+            order: Orden de los grupos (por defecto, el de aparición)
+
+        Returns:
+            DataFrame con columnas: grupo, casos, media, min, max y p<N> por
+            cuantil
+        """
+        groups: List = [g for g in (order or self.digests) if g in self.digests]
+        rows = []
+        for group in groups:
+            digest = self.digests[group]
+            values = digest.quantile(quantiles)
+            row = {
+                "grupo": group,
+                "casos": int(digest.count),
+                "media": digest.mean(),
+                "min": digest.min,
+                "max": digest.max,
+            }
+            row.update({f"p{round(q * 100):g}": v for q, v in zip(quantiles, values)})
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+
+def _group_values(
+    chunk: pd.DataFrame,
+    group: Optional[str],
+    bins: Optional[Sequence[float]],
+    labels: Optional[Sequence[str]],
+) -> np.ndarray:
+    """Grupo de cada fila de un fragmento (columna, banda o "Total")"""
+    if group is None:
+        return np.full(len(chunk), "Total", dtype=object)
+    if bins is None:
+        return chunk[group].to_numpy()
+    return pd.cut(chunk[group], bins=bins, labels=labels, right=False).to_numpy()
+
+
+def _build_quantiles(
+    df: pd.DataFrame,
+    value: str,
+    group: Optional[str],
+    bins: Optional[Sequence[float]],
+    labels: Optional[Sequence[str]],
+) -> GroupedQuantiles:
+    """Construye los resúmenes en una pasada por fragmentos (sin caché)"""
+    result = GroupedQuantiles()
+    for chunk in iter_chunks(df, [value] + ([group] if group else [])):
+        result.update(
+            _group_values(chunk, group, bins, labels),
+            pd.to_numeric(chunk[value], errors="coerce").to_numpy(np.float64),
+        )
+    return result
+
+
+def grouped_quantiles(
+    df: pd.DataFrame,
+    value: str,
+    group: Optional[str] = None,
+    bins: Optional[Sequence[float]] = None,
+    labels: Optional[Sequence[str]] = None,
+) -> GroupedQuantiles:
+    """
+    Obtiene los resúmenes de cuantiles de una columna por grupo, cacheados
+    por versión.
+
+    Los DataFrames sin versión (derivados o filtrados) se resumen sin caché.
+
+    Args:
+        df: DataFrame con filas crudas
+        value: Columna numérica a resumir
+        group: Columna de agrupación (None = un único grupo "Total")
+        bins: Límites de bandas para agrupar una columna numérica (opcional)
+        labels: Etiquetas de las bandas
+
+    Returns:
+        GroupedQuantiles: Resúmenes (no modificar: pueden ser compartidos)
+    """
+    version = get_dataset_version(df)
+    if version is None:
+        return _build_quantiles(df, value, group, bins, labels)
+
+    key = (
+        version,
+        value,
+        group,
+        tuple(bins) if bins is not None else None,
+        tuple(labels) if labels is not None else None,
+    )
+    with _quantile_lock:
+        if key in _quantile_cache:
+            _quantile_cache.move_to_end(key)
+            return _quantile_cache[key]
+
+    result = _build_quantiles(df, value, group, bins, labels)
+
+    with _quantile_lock:
+        _quantile_cache[key] = result
+        while len(_quantile_cache) > _QUANTILE_CACHE_SIZE:
+            _quantile_cache.popitem(last=False)
+
+    return result
+
+
+def stay_by_weight_band(df: pd.DataFrame) -> GroupedQuantiles:
+    """
+    Resúmenes de la estancia por banda de peso APR-GRD.
+
+    Args:
+        df: DataFrame de peso y estancia
+
+    Returns:
+        GroupedQuantiles: Un t-digest de `estancia_dias` por banda
+    """
+    return grouped_quantiles(
+        df,
+        "estancia_dias",
+        group="peso_espanol_apr",
+        bins=WEIGHT_BANDS,
+        labels=WEIGHT_BAND_LABELS,
+    )
@@ -0,0 +1,329 @@
+"""
+Actualización de datos fuera del proceso web.
+
+Un trabajo en segundo plano descarga todos los datasets con un DataLoader
+propio, los guarda en disco como una nueva generación y la publica
+reemplazando atómicamente `current.json`. Cada worker adopta la generación
+publicada la próxima vez que accede a los datos y sustituye todas sus
+entradas de caché de una vez, de modo que nunca mezcla datasets de dos
+descargas distintas.
+
+Con `SHARED_DATASETS` activado, los DataFrames de la generación se publican
+en segmentos de memoria compartida (ver `shared_frames`) y los workers se
+conectan a ellos en lugar de cargar cada uno su copia.
+"""
+
+import json
+import logging
+import os
+import pickle
+import shutil
+import time
+import uuid
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from ..utils.config import Config
+from .shared_frames import (
+    attach_frame,
+    release_segments,
+    retire_generations,
+    share_frames,
+    shared_available,
+)
+from .store import get_analytical_store
+from .versioning import get_dataset_version, register_dataset
+
+logger = logging.getLogger(__name__)
+
+# Manifiesto de la generación publicada
+PUBLISHED_FILE = "current.json"
+
+# Generaciones que se conservan en disco (la actual y la anterior, que algún
+# worker puede estar leyendo todavía)
+_KEEP_GENERATIONS = 2
+
+
+def _refresh_dir() -> str:
+    """Directorio de generaciones (se crea si no existe)"""
+    os.makedirs(Config.REFRESH_DIR, exist_ok=True)
+    return Config.REFRESH_DIR
+
+
+def _write_atomic(path: str, data: bytes):
+    """Escribe un fichero completo y lo hace visible con un único rename"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _prune_generations(current: str):
+    """Elimina las generaciones antiguas, conservando las más recientes"""
+    directory = _refresh_dir()
+    files = sorted(
+        (
+            entry
+            for entry in os.scandir(directory)
+            if entry.name.startswith("generation-") and entry.name.endswith(".pkl")
+        ),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in files[_KEEP_GENERATIONS:]:
+        if entry.name != current:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def publish_generation(
+    frames: Dict[str, pd.DataFrame],
+    versions: Dict[str, str],
+    spilled: Optional[Dict[str, str]] = None,
+    fetched_at: Optional[Dict[str, float]] = None,
+) -> Dict:
+    """
+    Guarda una generación de datos y la publica como la actual.
+
+    Los datasets troceados en disco se publican por su directorio (el
+    DataFrame guardado es su muestra residente). El manifiesto recuerda los
+    directorios de la generación anterior, y al publicar se borran los de la
+    previa a esa, igual que sus ficheros de generación.
+
+    Con `SHARED_DATASETS`, los DataFrames que se pueden compartir se escriben
+    en segmentos de memoria compartida (con su versión en el manifiesto) y
+    se retiran los segmentos de las generaciones anteriores.
+
+    Args:
+        frames: Clave de caché -> DataFrame
+        versions: Nombre del dataset -> versión
+        spilled: Clave de caché -> directorio del dataset troceado (opcional)
+        fetched_at: Nombre del dataset -> momento de su descarga (None = ahora)
+
+    Returns:
+        dict: Manifiesto publicado
+    """
+    directory = _refresh_dir()
+    generation = uuid.uuid4().hex[:12]
+    filename = f"generation-{generation}.pkl"
+    previous = read_published() or {}
+
+    sharing = Config.SHARED_DATASETS and shared_available()
+    segments = share_frames(frames, generation) if sharing else {}
+    copied = {key: df for key, df in frames.items() if key not in segments}
+
+    _write_atomic(
+        os.path.join(directory, filename),
+        pickle.dumps(copied, protocol=pickle.HIGHEST_PROTOCOL),
+    )
+    published_at = time.time()
+    manifest = {
+        "generation": generation,
+        "file": filename,
+        "published_at": published_at,
+        "versions": versions,
+        "fetched_at": fetched_at or {name: published_at for name in versions},
+        "spilled": spilled or {},
+        "retired": previous.get("spilled", {}),
+        "shared": {
+            key: {"segment": name, "version": get_dataset_version(frames[key])}
+            for key, name in segments.items()
+        },
+    }
+    _write_atomic(
+        os.path.join(directory, PUBLISHED_FILE), json.dumps(manifest).encode()
+    )
+    _prune_generations(filename)
+    if sharing:
+        retire_generations({generation})
+
+    keep = set(manifest["spilled"].values()) | set(manifest["retired"].values())
+    for path in previous.get("retired", {}).values():
+        if path not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+    logger.info(f"Published data generation {generation}: {versions}")
+    return manifest
+
+
+def published_mtime() -> Optional[int]:
+    """Marca de modificación del manifiesto publicado (None si no hay)"""
+    try:
+        return os.stat(os.path.join(Config.REFRESH_DIR, PUBLISHED_FILE)).st_mtime_ns
+    except OSError:
+        return None
+
+
+def read_published() -> Optional[Dict]:
+    """
+    Lee el manifiesto de la generación publicada.
+
+    Returns:
+        dict o None si no se ha publicado ninguna generación
+    """
+    try:
+        with open(os.path.join(Config.REFRESH_DIR, PUBLISHED_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_generation(manifest: Dict) -> Dict[str, pd.DataFrame]:
+    """
+    Carga los DataFrames de una generación publicada.
+
+    Los DataFrames publicados en memoria compartida se conectan a su segmento
+    (sin copiar sus columnas numéricas).
+
+    Args:
+        manifest: Manifiesto de la generación
+
+    Returns:
+        dict: Clave de caché -> DataFrame
+
+    Raises:
+        FileNotFoundError: Si la generación ya se retiró
+    """
+    with open(os.path.join(Config.REFRESH_DIR, manifest["file"]), "rb") as f:
+        frames = pickle.load(f)
+
+    attached = []
+    try:
+        for key, info in manifest.get("shared", {}).items():
+            frames[key] = attach_frame(info["segment"])
+            attached.append(info["segment"])
+    except OSError:
+        release_segments(attached)
+        raise
+    return frames
+
+
+def _page_detail(rows: int, summary) -> str:
+    """Texto de avance de una descarga con los conteos del resumen parcial"""
+    detail = f"{rows:,} registros"
+    if summary is not None and "diagnostico_principal" in summary.columns:
+        distinct = summary.distinct_count("diagnostico_principal")
+        detail += f", ~{distinct:,} diagnósticos distintos"
+    return detail
+
+
+def _carry_over(
+    previous: Dict, names: Iterable[str]
+) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str], Dict[str, float], Dict]:
+    """
+    DataFrames de la generación publicada que pasan sin cambios a la nueva.
+
+    Cada DataFrame se registra con la versión publicada (no se recalcula su
+    huella).
+
+    Args:
+        previous: Manifiesto de la generación publicada
+        names: Datasets que se conservan
+
+    Returns:
+        Tuple: (clave -> DataFrame, dataset -> versión, dataset -> momento de
+        descarga, clave -> directorio del dataset troceado)
+    """
+    published = load_generation(previous)
+    frames, versions, fetched_at, spilled = {}, {}, {}, {}
+    for name in names:
+        key, _, fingerprint = previous["versions"][name].rpartition("@")
+        frames[key] = published[key]
+        versions[name] = register_dataset(published[key], key, fingerprint)
+        fetched_at[name] = previous.get("fetched_at", {}).get(
+            name, previous["published_at"]
+        )
+        if key in previous.get("spilled", {}):
+            spilled[key] = previous["spilled"][key]
+    return frames, versions, fetched_at, spilled
+
+
+def refresh_datasets(
+    names: Optional[Iterable[str]] = None,
+    progress: Optional[Callable[..., None]] = None,
+) -> Dict:
+    """
+    Descarga algunos datasets y publica una nueva generación con ellos.
+
+    Se ejecuta fuera de las peticiones (en el proceso del trabajo en segundo
+    plano o en el hilo del planificador), con un DataLoader propio que no
+    adopta generaciones publicadas: la caché de los workers no se toca hasta
+    que adoptan la nueva. Los datasets que no se descargan pasan sin cambios
+    desde la generación publicada (se descargan también si no están en ella).
+
+    Args:
+        names: Datasets a descargar (None = todos)
+        progress: Función llamada como progress(completados, total, dataset)
+            antes de cada descarga y al terminar (dataset None), y como
+            progress(completados, total, dataset, detalle) tras cada página
+
+    Returns:
+        dict: Manifiesto publicado
+    """
+    from .data_loader import DataLoader
+
+    previous = read_published() or {}
+    published = previous.get("versions", {})
+    names = [
+        name
+        for name in DataLoader.DATASETS
+        if names is None or name in names or name not in published
+    ]
+    kept = [name for name in DataLoader.DATASETS if name not in names]
+    current = {"done": 0, "name": None}
+
+    def on_page(endpoint, rows, summary):
+        # Conteos disponibles antes de terminar la descarga del dataset
+        if progress is not None:
+            detail = _page_detail(rows, summary)
+            progress(current["done"], len(names), current["name"], detail)
+
+    loader = DataLoader(on_page=on_page, adopt_published=False)
+    versions, fetched_at = {}, {}
+    for done, name in enumerate(names):
+        current.update(done=done, name=name)
+        if progress is not None:
+            progress(done, len(names), name)
+        versions[name] = get_dataset_version(loader.fetch_dataset(name))
+        fetched_at[name] = time.time()
+
+    if progress is not None:
+        progress(len(names), len(names), None)
+
+    frames = loader.snapshot()
+    spilled = loader.spilled_directories()
+    carried = _carry_over(previous, kept) if kept else ({}, {}, {}, {})
+    for target, values in zip((frames, versions, fetched_at, spilled), carried):
+        target.update(values)
+
+    manifest = publish_generation(frames, versions, spilled, fetched_at)
+
+    # Réplica para las consultas SQL de los workers (si está activada)
+    store = get_analytical_store()
+    if store is not None:
+        store.mirror(frames)
+
+    # Los segmentos de la generación anterior se sueltan al no quedar vistas
+    del frames, carried
+    release_segments(
+        info["segment"] for info in previous.get("shared", {}).values()
+    )
+    return manifest
+
+
+def refresh_all(
+    progress: Optional[Callable[..., None]] = None,
+) -> Dict:
+    """
+    Descarga todos los datasets y publica una nueva generación.
+
+    Args:
+        progress: Función de avance (ver `refresh_datasets`)
+
+    Returns:
+        dict: Manifiesto publicado
+    """
+    return refresh_datasets(None, progress)
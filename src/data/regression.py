@@ -0,0 +1,429 @@
+"""
+Regresión de la estancia sobre el peso APR-GRD con intervalos bootstrap.
+
+Ajusta una recta por tres métodos (mínimos cuadrados, Theil–Sen y regresión
+cuantílica) y estima sus intervalos de confianza remuestreando las filas. Los
+estimadores trabajan sobre lotes de remuestreos a la vez (matrices lotes ×
+filas, sin bucles por fila) y los lotes se reparten entre los procesos de un
+pool. Los ajustes se cachean por versión de los datos.
+"""
+
+import atexit
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..utils.config import Config
+from ..utils.processes import pool_context
+from .versioning import compute_fingerprint, get_dataset_version
+
+logger = logging.getLogger(__name__)
+
+# Métodos de ajuste disponibles
+METHODS = ("ols", "theil_sen", "quantile")
+
+METHOD_LABELS = {
+    "ols": "Mínimos cuadrados",
+    "theil_sen": "Theil–Sen",
+    "quantile": "Regresión cuantílica",
+}
+
+# Remuestreos por tarea del pool
+_BATCH_SIZE = 25
+
+# Pares aleatorios por ajuste de Theil–Sen (la mediana de todos es O(n²))
+_THEIL_SEN_PAIRS = 20_000
+
+# Precisión de la pendiente cuantílica, relativa a la escala de y sobre x
+_QUANTILE_TOLERANCE = 1e-5
+
+# Caché LRU de ajustes: (versión, método, x, y, cuantil) -> RegressionFit
+_FIT_CACHE_SIZE = 16
+_fit_cache: "OrderedDict[Tuple, RegressionFit]" = OrderedDict()
+_fit_lock = threading.Lock()
+
+# Pool de procesos para el bootstrap (singleton, se crea al primer uso)
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+class RegressionFit:
+    """Recta ajustada con sus coeficientes remuestreados"""
+
+    def __init__(
+        self,
+        method: str,
+        intercept: float,
+        slope: float,
+        samples: np.ndarray,
+        rows: int,
+        quantile: Optional[float] = None,
+    ):
+        self.method = method
+        self.intercept = intercept
+        self.slope = slope
+        self.samples = samples
+        self.rows = rows
+        self.quantile = quantile
+
+    def predict(self, x) -> np.ndarray:
+        """Valores ajustados en `x`"""
+        return self.intercept + self.slope * np.asarray(x, dtype=np.float64)
+
+    def interval(self, level: float = 0.95) -> dict:
+        """
+        Intervalos de confianza percentiles de los coeficientes.
+
+        Args:
+            level: Nivel de confianza
+
+        Returns:
+            dict: {"intercept": (inferior, superior), "slope": (inferior, superior)}
+        """
+        alpha = (1 - level) / 2 * 100
+        low, high = np.percentile(self.samples, [alpha, 100 - alpha], axis=0)
+        return {
+            "intercept": (float(low[0]), float(high[0])),
+            "slope": (float(low[1]), float(high[1])),
+        }
+
+    def band(self, x, level: float = 0.95) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Banda de confianza de la recta en `x` (percentiles de las rectas
+        remuestreadas).
+
+        Args:
+            x: Puntos donde evaluar la banda
+            level: Nivel de confianza
+
+        Returns:
+            Tuple: (límite inferior, límite superior)
+        """
+        x = np.asarray(x, dtype=np.float64)
+        lines = self.samples[:, :1] + self.samples[:, 1:] * x
+        alpha = (1 - level) / 2 * 100
+        low, high = np.percentile(lines, [alpha, 100 - alpha], axis=0)
+        return low, high
+
+
+def _ols(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Mínimos cuadrados por lotes.
+
+    Args:
+        x, y: Matrices lotes × filas
+
+    Returns:
+        np.ndarray: Coeficientes (intercepto, pendiente) por lote
+    """
+    x_mean = x.mean(axis=1, keepdims=True)
+    y_mean = y.mean(axis=1, keepdims=True)
+    dx = x - x_mean
+    variance = np.einsum("ij,ij->i", dx, dx)
+    covariance = np.einsum("ij,ij->i", dx, y - y_mean)
+    slope = covariance / np.where(variance > 0, variance, np.nan)
+    return np.column_stack([y_mean[:, 0] - slope * x_mean[:, 0], slope])
+
+
+def _theil_sen(x: np.ndarray, y: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Theil–Sen por lotes: mediana de las pendientes de pares aleatorios.
+
+    Args:
+        x, y: Matrices lotes × filas
+        rng: Generador de números aleatorios
+
+    Returns:
+        np.ndarray: Coeficientes (intercepto, pendiente) por lote
+    """
+    n = x.shape[1]
+    rows = np.arange(x.shape[0])[:, None]
+    first = rng.integers(0, n, (x.shape[0], _THEIL_SEN_PAIRS))
+    second = rng.integers(0, n, (x.shape[0], _THEIL_SEN_PAIRS))
+
+    dx = x[rows, second] - x[rows, first]
+    dy = y[rows, second] - y[rows, first]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slopes = np.where(dx != 0, dy / dx, np.nan)
+    slope = np.nanmedian(slopes, axis=1)
+    intercept = np.median(y - slope[:, None] * x, axis=1)
+    return np.column_stack([intercept, slope])
+
+
+def _pinball(
+    x: np.ndarray, y: np.ndarray, slope: np.ndarray, tau: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pérdida cuantílica con la pendiente dada y el intercepto óptimo (el
+    cuantil tau de los residuos), por lote.
+    """
+    residuals = y - slope[:, None] * x
+    intercept = np.quantile(residuals, tau, axis=1, method="inverted_cdf")
+    residuals -= intercept[:, None]
+    # rho_tau(r) = tau * r - min(r, 0)
+    loss = tau * residuals.sum(axis=1) - np.minimum(residuals, 0).sum(axis=1)
+    return loss, intercept
+
+
+def _quantile(
+    x: np.ndarray, y: np.ndarray, tau: float, start: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Regresión cuantílica por lotes.
+
+    Con la pendiente fija, el intercepto óptimo es el cuantil tau de los
+    residuos, y la pérdida resultante es convexa en la pendiente, así que se
+    busca por sección áurea en todos los lotes a la vez.
+
+    Args:
+        x, y: Matrices lotes × filas
+        tau: Cuantil a ajustar
+        start: Coeficientes del ajuste original; los remuestreos bootstrap
+            buscan solo en su entorno
+
+    Returns:
+        np.ndarray: Coeficientes (intercepto, pendiente) por lote
+    """
+    ols = _ols(x, y)
+    scale = y.std(axis=1) / np.maximum(x.std(axis=1), 1e-12)
+    if start is None:
+        # Intervalo amplio alrededor de la pendiente de mínimos cuadrados
+        center = np.nan_to_num(ols[:, 1])
+        width = 4 * (np.abs(center) + scale)
+    else:
+        # Un remuestreo se aleja de la pendiente original unos pocos errores
+        # estándar: basta con un entorno de 20
+        center = np.full(x.shape[0], start[1])
+        residuals = y - ols[:, :1] - ols[:, 1:] * x
+        error = residuals.std(axis=1) / (
+            np.maximum(x.std(axis=1), 1e-12) * np.sqrt(x.shape[1])
+        )
+        width = 20 * error
+    low, high = center - width, center + width
+    tolerance = _QUANTILE_TOLERANCE * np.max(scale)
+
+    ratio = (np.sqrt(5) - 1) / 2
+    left, right = high - ratio * (high - low), low + ratio * (high - low)
+    loss_left, _ = _pinball(x, y, left, tau)
+    loss_right, _ = _pinball(x, y, right, tau)
+
+    while np.max(high - low) > tolerance:
+        move_right = loss_left > loss_right
+        low = np.where(move_right, left, low)
+        high = np.where(move_right, high, right)
+        # El punto interior que se conserva; el otro se recalcula
+        keep = np.where(move_right, right, left)
+        keep_loss = np.where(move_right, loss_right, loss_left)
+        candidate = np.where(
+            move_right, low + ratio * (high - low), high - ratio * (high - low)
+        )
+        candidate_loss, _ = _pinball(x, y, candidate, tau)
+        left = np.where(move_right, keep, candidate)
+        right = np.where(move_right, candidate, keep)
+        loss_left = np.where(move_right, keep_loss, candidate_loss)
+        loss_right = np.where(move_right, candidate_loss, keep_loss)
+
+    slope = (low + high) / 2
+    _, intercept = _pinball(x, y, slope, tau)
+    return np.column_stack([intercept, slope])
+
+
+def _estimate(
+    method: str,
+    x: np.ndarray,
+    y: np.ndarray,
+    rng: np.random.Generator,
+    tau: float,
+    start: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Aplica un método de ajuste a matrices lotes × filas"""
+    if method == "ols":
+        return _ols(x, y)
+    if method == "theil_sen":
+        return _theil_sen(x, y, rng)
+    if method == "quantile":
+        return _quantile(x, y, tau, start)
+    raise ValueError(f"Método de regresión desconocido: {method}")
+
+
+def _bootstrap_batch(
+    method: str,
+    x: np.ndarray,
+    y: np.ndarray,
+    seed,
+    size: int,
+    tau: float,
+    start: np.ndarray,
+) -> np.ndarray:
+    """
+    Ajusta un lote de remuestreos bootstrap (se ejecuta en el pool).
+
+    Args:
+        method: Método de ajuste
+        x, y: Filas originales
+        seed: Semilla del lote
+        size: Número de remuestreos
+        tau: Cuantil (regresión cuantílica)
+        start: Coeficientes del ajuste original (punto de partida iterativo)
+
+    Returns:
+        np.ndarray: Coeficientes (intercepto, pendiente) por remuestreo
+    """
+    rng = np.random.default_rng(seed)
+    index = rng.integers(0, len(x), (size, len(x)))
+    return _estimate(method, x[index], y[index], rng, tau, start)
+
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    """Pool de procesos del bootstrap (None si está desactivado)"""
+    global _executor
+
+    if Config.STATS_WORKERS <= 1:
+        return None
+
+    with _executor_lock:
+        if _executor is None:
+            # Sin fork: el worker tiene hilos (ver `pool_context`)
+            _executor = ProcessPoolExecutor(
+                max_workers=Config.STATS_WORKERS, mp_context=pool_context(__name__)
+            )
+            atexit.register(_executor.shutdown, wait=False, cancel_futures=True)
+        return _executor
+
+
+def _discard_executor():
+    """Descarta un pool roto (se vuelve a crear en el siguiente uso)"""
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _bootstrap(
+    method: str,
+    x: np.ndarray,
+    y: np.ndarray,
+    seed: int,
+    resamples: int,
+    tau: float,
+    start: np.ndarray,
+) -> np.ndarray:
+    """
+    Remuestrea por lotes, repartidos entre los procesos del pool.
+
+    Las semillas de los lotes derivan de `seed`, así que el resultado es el
+    mismo con o sin pool y en todos los workers.
+    """
+    sizes = [
+        min(_BATCH_SIZE, resamples - offset)
+        for offset in range(0, resamples, _BATCH_SIZE)
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(method, x, y, s, size, tau, start) for s, size in zip(seeds, sizes)]
+
+    executor = _get_executor()
+    if executor is not None and len(tasks) > 1:
+        try:
+            futures = [executor.submit(_bootstrap_batch, *task) for task in tasks]
+            return np.vstack([future.result() for future in futures])
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"Bootstrap pool unavailable, running inline: {e}")
+            _discard_executor()
+
+    return np.vstack([_bootstrap_batch(*task) for task in tasks])
+
+
+def _fit(
+    df: pd.DataFrame, method: str, x: str, y: str, tau: float, seed: int
+) -> RegressionFit:
+    """Ajusta un método y su bootstrap (sin caché)"""
+    data = df[[x, y]].apply(pd.to_numeric, errors="coerce").dropna()
+    values_x = data[x].to_numpy(np.float64)
+    values_y = data[y].to_numpy(np.float64)
+
+    # Muestra fija (por versión) si hay más filas de las que se ajustan
+    rng = np.random.default_rng(seed)
+    if len(values_x) > Config.REGRESSION_SAMPLE_ROWS:
+        sample = rng.choice(len(values_x), Config.REGRESSION_SAMPLE_ROWS, replace=False)
+        values_x, values_y = values_x[sample], values_y[sample]
+
+    estimate = _estimate(method, values_x[None], values_y[None], rng, tau)[0]
+    intercept, slope = estimate
+    samples = _bootstrap(
+        method, values_x, values_y, seed, Config.BOOTSTRAP_RESAMPLES, tau, estimate
+    )
+    samples = samples[~np.isnan(samples).any(axis=1)]
+
+    return RegressionFit(
+        method,
+        float(intercept),
+        float(slope),
+        samples,
+        rows=len(data),
+        quantile=tau if method == "quantile" else None,
+    )
+
+
+def fit_regression(
+    df: pd.DataFrame,
+    method: str = "theil_sen",
+    x: str = "peso_espanol_apr",
+    y: str = "estancia_dias",
+    quantile: float = 0.5,
+) -> Optional[RegressionFit]:
+    """
+    Ajusta una recta de `y` sobre `x` con intervalos bootstrap, cacheada por
+    versión.
+
+    Con más de `Config.REGRESSION_SAMPLE_ROWS` filas el ajuste y sus
+    remuestreos usan una muestra aleatoria fija. Los DataFrames sin versión
+    se ajustan sin caché.
+
+    Args:
+        df: DataFrame con filas crudas
+        method: "ols", "theil_sen" o "quantile"
+        x: Columna explicativa
+        y: Columna respuesta
+        quantile: Cuantil de la regresión cuantílica
+
+    Returns:
+        RegressionFit o None si no hay filas suficientes
+
+    Raises:
+        ValueError: Si el método no existe
+    """
+    if method not in METHODS:
+        raise ValueError(f"Método de regresión desconocido: {method}")
+    if len(df) < 3:
+        return None
+
+    # Semilla derivada del contenido: mismo resultado en todos los workers
+    version = get_dataset_version(df)
+    identity = version or compute_fingerprint(df)
+    seed = int.from_bytes(hashlib.blake2b(identity.encode(), digest_size=8).digest())
+    if version is None:
+        return _fit(df, method, x, y, quantile, seed)
+
+    key = (version, method, x, y, quantile, Config.BOOTSTRAP_RESAMPLES)
+    with _fit_lock:
+        if key in _fit_cache:
+            _fit_cache.move_to_end(key)
+            return _fit_cache[key]
+
+    result = _fit(df, method, x, y, quantile, seed)
+
+    with _fit_lock:
+        _fit_cache[key] = result
+        while len(_fit_cache) > _FIT_CACHE_SIZE:
+            _fit_cache.popitem(last=False)
+
+    return result
@@ -0,0 +1,299 @@
+"""
+Planificador de actualizaciones con un único worker elegido.
+
+Sin planificador, cada worker de gunicorn vuelve a descargar un dataset
+cuando caduca su entrada de caché (`CACHE_TIMEOUT`): cuatro workers hacen
+cuatro descargas de ORDS. Con `REFRESH_SCHEDULER` activado, cada worker
+arranca un hilo que compite por un arrendamiento (un fichero en
+`REFRESH_DIR` que se lee y se escribe bajo un cerrojo). El que lo obtiene es
+el líder: descarga los datasets vencidos y publica una nueva generación (ver
+`refresh`), que el resto adopta en su siguiente acceso a los datos. Las
+entradas publicadas no caducan en los workers; las renueva el líder.
+
+Cada dataset tiene su intervalo (`REFRESH_INTERVALS`, por defecto
+`CACHE_TIMEOUT`), contado desde su última descarga publicada y alargado o
+acortado al azar hasta `REFRESH_JITTER` para que los datasets no venzan a la
+vez. El líder renueva el arrendamiento en cada comprobación y tras cada
+página descargada; si muere o se bloquea, el arrendamiento caduca
+(`REFRESH_LEASE_SECONDS`) y otro worker toma el relevo donde lo dejó.
+"""
+
+import atexit
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ..utils.config import Config
+from .refresh import read_published, refresh_datasets
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - solo en sistemas POSIX
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Arrendamiento del líder (en REFRESH_DIR)
+LEASE_FILE = "refresh-lease.json"
+
+# Instancia global del planificador (singleton pattern)
+_scheduler_instance: Optional["RefreshScheduler"] = None
+_scheduler_lock = threading.Lock()
+
+
+class LeaseLost(Exception):
+    """El arrendamiento pasó a otro worker durante una actualización"""
+
+
+def parse_intervals(spec: str, default: float) -> Dict[str, float]:
+    """
+    Intervalos de actualización de los datasets.
+
+    Args:
+        spec: Intervalos indicados, como "dataset=segundos,..."
+        default: Intervalo de los datasets no indicados (segundos)
+
+    Returns:
+        dict: Nombre del dataset -> segundos
+
+    Raises:
+        ValueError: Si un dataset no existe o su intervalo no es positivo
+    """
+    from .data_loader import DataLoader
+
+    intervals = {name: float(default) for name in DataLoader.DATASETS}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, seconds = item.partition("=")
+        name = name.strip()
+        if name not in intervals:
+            raise ValueError(f"Dataset desconocido en REFRESH_INTERVALS: {name}")
+        intervals[name] = float(seconds)
+        if intervals[name] <= 0:
+            raise ValueError(f"Intervalo no válido para {name}: {seconds}")
+    return intervals
+
+
+class RefreshLease:
+    """
+    Arrendamiento del papel de líder entre procesos.
+
+    El fichero guarda el dueño y la caducidad, y solo se lee y se reescribe
+    bajo un cerrojo exclusivo: como mucho un proceso lo tiene a la vez.
+    """
+
+    def __init__(self, path: str, duration: float):
+        """
+        Crea el arrendamiento de este proceso.
+
+        Args:
+            path: Fichero del arrendamiento
+            duration: Segundos que dura sin renovarse
+        """
+        self.path = path
+        self.duration = duration
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    @contextmanager
+    def _locked(self) -> Iterator[Dict]:
+        """Contenido del arrendamiento, bloqueado y guardado al salir"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                with open(self.path) as f:
+                    lease = json.load(f)
+            except (OSError, ValueError):
+                lease = {}
+            yield lease
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(lease, f)
+            os.replace(tmp_path, self.path)
+
+    def acquire(self) -> bool:
+        """
+        Obtiene el arrendamiento si está libre o caducado, o lo renueva.
+
+        Returns:
+            bool: True si este proceso es el líder
+        """
+        with self._locked() as lease:
+            now = time.time()
+            owner = lease.get("owner")
+            if owner not in (None, self.owner) and lease.get("expires", 0) > now:
+                return False
+            lease.update(owner=self.owner, expires=now + self.duration)
+            return True
+
+    def release(self):
+        """Deja el arrendamiento libre (si es de este proceso)"""
+        with self._locked() as lease:
+            if lease.get("owner") == self.owner:
+                lease["expires"] = 0
+
+
+class RefreshScheduler:
+    """
+    Hilo de un worker que compite por el arrendamiento y, mientras es el
+    líder, actualiza los datasets vencidos.
+    """
+
+    def __init__(
+        self,
+        lease: RefreshLease,
+        intervals: Dict[str, float],
+        jitter: float = 0.0,
+        tick: Optional[float] = None,
+    ):
+        """
+        Crea el planificador.
+
+        Args:
+            lease: Arrendamiento de este proceso
+            intervals: Nombre del dataset -> segundos entre descargas
+            jitter: Fracción del intervalo que se suma o resta al azar
+            tick: Segundos entre comprobaciones (None = un tercio de la
+                duración del arrendamiento, para renovarlo a tiempo)
+        """
+        self.lease = lease
+        self.intervals = intervals
+        self.jitter = jitter
+        self.tick = tick if tick is not None else lease.duration / 3
+        self.leader = False
+
+        # Dataset -> (descarga publicada, vencimiento sorteado para ella)
+        self._due: Dict[str, Tuple[float, float]] = {}
+        self._random = random.Random()
+        self._retry_at = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Arranca el hilo del planificador"""
+        self._thread = threading.Thread(
+            target=self._run, name="refresh-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Detiene el planificador y deja libre el arrendamiento"""
+        self._stop.set()
+        if self.leader:
+            self.leader = False
+            self.lease.release()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Refresh scheduler error: {e}")
+            self._stop.wait(self.tick)
+
+    def _due_time(self, name: str, fetched_at: float) -> float:
+        """Vencimiento de un dataset (se sortea una vez por descarga)"""
+        due = self._due.get(name)
+        if due is None or due[0] != fetched_at:
+            spread = self._random.uniform(-self.jitter, self.jitter)
+            due = (fetched_at, fetched_at + self.intervals[name] * (1 + spread))
+            self._due[name] = due
+        return due[1]
+
+    def due_datasets(
+        self, manifest: Optional[Dict], now: Optional[float] = None
+    ) -> List[str]:
+        """
+        Datasets cuyo intervalo ha vencido.
+
+        Args:
+            manifest: Manifiesto de la generación publicada (o None)
+            now: Momento de la comprobación (None = ahora)
+
+        Returns:
+            list: Nombres de los datasets a descargar
+        """
+        now = time.time() if now is None else now
+        fetched = (manifest or {}).get("fetched_at", {})
+        return [
+            name
+            for name in self.intervals
+            if name not in fetched or self._due_time(name, fetched[name]) <= now
+        ]
+
+    def run_once(self) -> Optional[Dict]:
+        """
+        Renueva (u obtiene) el arrendamiento y, si es el líder, actualiza los
+        datasets vencidos.
+
+        Returns:
+            dict: Manifiesto publicado, o None si no se actualizó nada
+        """
+        leader = self.lease.acquire()
+        if leader != self.leader:
+            state = "acquired" if leader else "lost"
+            logger.info(f"Refresh leadership {state} by {self.lease.owner}")
+            self.leader = leader
+        if not leader or time.time() < self._retry_at:
+            return None
+
+        due = self.due_datasets(read_published())
+        if not due:
+            return None
+
+        def progress(*_):
+            # Renueva el arrendamiento en cada paso de la descarga; si lo ha
+            # perdido, otro worker ya está actualizando
+            if self._stop.is_set() or not self.lease.acquire():
+                raise LeaseLost(self.lease.owner)
+
+        logger.info(f"Scheduled refresh of {', '.join(due)}")
+        try:
+            return refresh_datasets(due, progress)
+        except LeaseLost:
+            logger.warning("Refresh leadership lost during a scheduled refresh")
+            self.leader = False
+        except Exception as e:
+            # Sin reintentos en cada comprobación mientras ORDS falle
+            logger.error(f"Scheduled refresh failed: {e}")
+            self._retry_at = time.time() + self.lease.duration
+        return None
+
+
+def start_refresh_scheduler() -> Optional[RefreshScheduler]:
+    """
+    Arranca (una vez por proceso) el planificador de actualizaciones.
+
+    Returns:
+        RefreshScheduler o None si está desactivado o no hay cerrojos de
+        ficheros
+    """
+    global _scheduler_instance
+
+    if not Config.REFRESH_SCHEDULER:
+        return None
+    if fcntl is None:
+        logger.warning("Refresh scheduler disabled: file locks are not available")
+        return None
+
+    with _scheduler_lock:
+        if _scheduler_instance is None:
+            lease = RefreshLease(
+                os.path.join(Config.REFRESH_DIR, LEASE_FILE),
+                Config.REFRESH_LEASE_SECONDS,
+            )
+            intervals = parse_intervals(Config.REFRESH_INTERVALS, Config.CACHE_TIMEOUT)
+            _scheduler_instance = RefreshScheduler(
+                lease, intervals, Config.REFRESH_JITTER
+            )
+            _scheduler_instance.start()
+            atexit.register(_scheduler_instance.stop)
+            logger.info(f"Refresh scheduler started: {intervals}")
+
+    return _scheduler_instance
@@ -0,0 +1,360 @@
+"""
+Datasets publicados en memoria compartida.
+
+Con `SHARED_DATASETS` activado, el trabajo de actualización escribe cada
+DataFrame de la generación en un segmento de `multiprocessing.shared_memory`
+con formato Arrow IPC, y el manifiesto publica el nombre de cada segmento en
+lugar de incluir el DataFrame en el fichero de la generación. Los workers se
+conectan a los segmentos sin deserializar una copia: las columnas numéricas y
+el índice son vistas de solo lectura sobre la memoria compartida (la misma
+para todos los workers) y las de texto, guardadas como diccionario, se
+reconstruyen con un puntero por fila y una cadena por valor distinto.
+
+Un registro de segmentos (un fichero JSON bajo un cerrojo) anota la
+generación de cada segmento y los procesos que lo usan. Al publicar una
+generación se retiran los segmentos de las anteriores; el último proceso que
+suelta un segmento retirado lo borra. Un worker suelta un segmento cuando ya
+no queda ningún objeto que apunte a su memoria: cerrarlo falla mientras haya
+vistas exportadas, así que se reintenta en cada acceso a los datos. Los
+procesos que mueren sin soltar sus segmentos se descartan del registro.
+"""
+
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterable, Iterator, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from ..utils.config import Config
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - solo en sistemas POSIX
+    fcntl = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - dependencia opcional
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+# Registro de segmentos publicados y su cerrojo (en REFRESH_DIR)
+REGISTRY_FILE = "segments.json"
+_LOCK_FILE = "segments.lock"
+
+# Columna auxiliar con el índice (cuando no es un RangeIndex)
+_INDEX = "__indice"
+
+# Segmentos conectados por este proceso: nombre -> SharedMemory
+_attached: Dict[str, "_Segment"] = {}
+# Segmentos sustituidos que se sueltan cuando dejan de tener vistas
+_retiring: Dict[str, "_Segment"] = {}
+_attached_lock = threading.Lock()
+
+
+def shared_available() -> bool:
+    """Indica si se pueden compartir datasets (pyarrow y cerrojos POSIX)"""
+    return pa is not None and fcntl is not None
+
+
+class _Segment(shared_memory.SharedMemory):
+    """
+    Segmento compartido conectado por este proceso.
+
+    Mientras algún DataFrame apunte a su memoria no se puede cerrar; si el
+    proceso termina así, el sistema libera la proyección al salir.
+    """
+
+    def __del__(self):
+        try:
+            self.close()
+        except (BufferError, OSError):
+            pass
+
+
+def _untrack(segment: shared_memory.SharedMemory):
+    """
+    Quita un segmento del rastreador de multiprocessing.
+
+    El rastreador borraría el segmento al terminar el proceso que lo creó o
+    se conectó a él; su vida la decide el registro.
+    """
+    resource_tracker.unregister(segment._name, "shared_memory")
+
+
+def _alive(pid: int) -> bool:
+    """Indica si un proceso sigue en marcha"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextmanager
+def _registry() -> Iterator[Dict[str, Dict]]:
+    """Registro de segmentos, bloqueado en exclusiva y guardado al salir"""
+    os.makedirs(Config.REFRESH_DIR, exist_ok=True)
+    path = os.path.join(Config.REFRESH_DIR, REGISTRY_FILE)
+    with open(os.path.join(Config.REFRESH_DIR, _LOCK_FILE), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            with open(path) as f:
+                segments = json.load(f)
+        except (OSError, ValueError):
+            segments = {}
+        yield segments
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(segments, f)
+        os.replace(tmp_path, path)
+
+
+def _unlink(name: str):
+    """Borra un segmento (si todavía existe)"""
+    try:
+        segment = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    segment.close()
+    segment.unlink()
+
+
+def _collect(segments: Dict[str, Dict]):
+    """Borra los segmentos retirados que no usa ningún proceso vivo"""
+    for name, info in list(segments.items()):
+        info["holders"] = [pid for pid in info["holders"] if _alive(pid)]
+        if info["retired"] and not info["holders"]:
+            _unlink(name)
+            del segments[name]
+
+
+def _to_table(df: pd.DataFrame) -> Optional["pa.Table"]:
+    """
+    Convierte un DataFrame en una tabla Arrow que se puede compartir.
+
+    Las columnas numéricas se guardan tal cual (NaN como valor, sin máscara
+    de nulos, para poder leerlas sin copia) y las de texto como diccionario.
+
+    Returns:
+        pa.Table o None si alguna columna no admite esa representación
+        (fechas, objetos que no son texto o nulos mezclados)
+    """
+    if _INDEX in df.columns or df.columns.has_duplicates:
+        return None
+    if not all(isinstance(name, str) for name in df.columns):
+        return None
+
+    fields, arrays = [], []
+    for name in df.columns:
+        values = df[name].to_numpy()
+        if values.dtype.kind in "biuf":
+            fields.append(pa.field(name, pa.from_numpy_dtype(values.dtype)))
+            arrays.append(pa.array(values))
+            continue
+        if values.dtype != object:
+            return None
+        try:
+            codes, uniques = pd.factorize(values)
+        except TypeError:
+            return None
+        if not all(isinstance(value, str) for value in uniques):
+            return None
+        # Los nulos vuelven como estaban: None o NaN (no ambos)
+        missing = values[codes < 0]
+        if all(value is None for value in missing):
+            na = "none"
+        elif all(isinstance(value, float) for value in missing):
+            na = "nan"
+        else:
+            return None
+        array = pa.DictionaryArray.from_arrays(
+            pa.array(codes.astype(np.int32), mask=codes < 0),
+            pa.array(uniques, type=pa.string()),
+        )
+        fields.append(pa.field(name, array.type, metadata={"na": na}))
+        arrays.append(array)
+
+    frame = {"index_name": df.index.name}
+    if isinstance(df.index, pd.RangeIndex):
+        frame["range"] = [df.index.start, df.index.stop, df.index.step]
+    elif df.index.dtype.kind in "iu":
+        fields.append(pa.field(_INDEX, pa.from_numpy_dtype(df.index.dtype)))
+        arrays.append(pa.array(df.index.to_numpy()))
+    else:
+        return None
+
+    schema = pa.schema(fields, metadata={"frame": json.dumps(frame)})
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _to_frame(table: "pa.Table") -> pd.DataFrame:
+    """DataFrame con las columnas de una tabla creada por `_to_table`"""
+    frame = json.loads(table.schema.metadata[b"frame"])
+    columns = {}
+    for field, column in zip(table.schema, table.columns):
+        array = column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+        if pa.types.is_dictionary(field.type):
+            # Los códigos nulos (-1) toman el último elemento: el nulo original
+            lookup = np.empty(len(array.dictionary) + 1, dtype=object)
+            lookup[:-1] = array.dictionary.to_numpy(zero_copy_only=False)
+            lookup[-1] = None if field.metadata[b"na"] == b"none" else np.nan
+            columns[field.name] = lookup[array.indices.fill_null(-1).to_numpy()]
+        elif pa.types.is_boolean(field.type):
+            # Arrow guarda los booleanos como bits: se copian
+            columns[field.name] = array.to_numpy(zero_copy_only=False)
+        else:
+            # Vista de solo lectura sobre el segmento compartido
+            columns[field.name] = array.to_numpy()
+
+    if "range" in frame:
+        index = pd.RangeIndex(*frame["range"])
+    else:
+        index = pd.Index(columns.pop(_INDEX), copy=False)
+    index.name = frame["index_name"]
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+def _write_segment(table: "pa.Table") -> str:
+    """Escribe una tabla en un segmento compartido nuevo; devuelve su nombre"""
+    mock = pa.MockOutputStream()
+    with pa.ipc.new_stream(mock, table.schema) as writer:
+        writer.write_table(table)
+
+    segment = shared_memory.SharedMemory(create=True, size=max(mock.size(), 1))
+    _untrack(segment)
+    try:
+        sink = pa.FixedSizeBufferWriter(pa.py_buffer(segment.buf))
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        sink.close()
+        del sink, writer
+    except BaseException:
+        segment.close()
+        segment.unlink()
+        raise
+    segment.close()
+    return segment.name
+
+
+def share_frames(frames: Dict[str, pd.DataFrame], generation: str) -> Dict[str, str]:
+    """
+    Escribe los DataFrames de una generación en segmentos compartidos.
+
+    Args:
+        frames: Clave de caché -> DataFrame
+        generation: Identificador de la generación
+
+    Returns:
+        dict: Clave de caché -> nombre del segmento, solo de los DataFrames
+        que se pueden compartir (el resto va al fichero de la generación)
+    """
+    shared = {}
+    for key, df in frames.items():
+        table = _to_table(df)
+        if table is None:
+            logger.info(f"Dataset {key} cannot be shared, publishing a copy")
+            continue
+        shared[key] = _write_segment(table)
+
+    with _registry() as segments:
+        for name in shared.values():
+            segments[name] = {"generation": generation, "holders": [], "retired": False}
+    return shared
+
+
+def retire_generations(keep: Set[str]):
+    """
+    Retira los segmentos de las generaciones que no están en `keep`.
+
+    Los que no usa ningún proceso se borran ya; el resto, cuando el último
+    worker los suelta.
+
+    Args:
+        keep: Generaciones cuyos segmentos siguen publicados
+    """
+    with _registry() as segments:
+        for info in segments.values():
+            if info["generation"] not in keep:
+                info["retired"] = True
+        _collect(segments)
+
+
+def attach_frame(name: str) -> pd.DataFrame:
+    """
+    Conecta este proceso a un segmento compartido y lee su DataFrame.
+
+    Args:
+        name: Nombre del segmento
+
+    Returns:
+        DataFrame cuyas columnas numéricas apuntan al segmento
+
+    Raises:
+        FileNotFoundError: Si el segmento ya se retiró o se borró
+    """
+    with _attached_lock:
+        segment = _attached.get(name)
+        if segment is None:
+            # El proceso se anota antes de conectarse: un segmento con
+            # procesos anotados no se borra
+            with _registry() as segments:
+                info = segments.get(name)
+                if info is None or info["retired"]:
+                    raise FileNotFoundError(f"Shared segment retired: {name}")
+                segment = _Segment(name=name)
+                _untrack(segment)
+                info["holders"].append(os.getpid())
+            _attached[name] = segment
+
+    table = pa.ipc.open_stream(pa.py_buffer(segment.buf)).read_all()
+    return _to_frame(table)
+
+
+def release_segments(names: Iterable[str]):
+    """
+    Suelta segmentos de este proceso en cuanto ningún objeto apunte a ellos.
+
+    Args:
+        names: Nombres de los segmentos que ya no se usan
+    """
+    with _attached_lock:
+        for name in names:
+            segment = _attached.pop(name, None)
+            if segment is not None:
+                _retiring[name] = segment
+    release_unused()
+
+
+def release_unused():
+    """Suelta los segmentos sustituidos que ya no tienen vistas"""
+    if not _retiring:
+        return
+
+    released = []
+    with _attached_lock:
+        for name, segment in list(_retiring.items()):
+            try:
+                segment.close()
+            except BufferError:
+                # Algún DataFrame (o vista de sus columnas) sigue en uso
+                continue
+            del _retiring[name]
+            released.append(name)
+
+    if released:
+        pid = os.getpid()
+        with _registry() as segments:
+            for name in released:
+                info = segments.get(name)
+                if info is not None and pid in info["holders"]:
+                    info["holders"].remove(pid)
+            _collect(segments)
@@ -0,0 +1,486 @@
+"""
+Modo fuera de memoria: datasets troceados en ficheros Parquet.
+
+Con `OUT_OF_CORE` activado, el DataLoader no concatena las páginas de ORDS en
+un DataFrame: las escribe, ya procesadas, en fragmentos Parquet de tamaño
+acotado y solo mantiene en memoria una muestra uniforme de filas (para los
+gráficos que dibujan puntos) con la versión del dataset completo.
+
+Las agregaciones de las secciones (cubos de conteo, cuantiles, resúmenes
+top-K, estadísticos de columna y páginas de tablas) reconocen esa versión y
+se calculan recorriendo los fragmentos de uno en uno, leyendo solo las
+columnas necesarias y combinando resultados parciales. Así, el pico de
+memoria de un worker depende del tamaño de fragmento y de la muestra, que se
+derivan de `WORKER_MEMORY_MB`, y no del tamaño del dataset.
+
+El filtro cruzado escribe las filas seleccionadas en un dataset troceado
+propio (con su muestra), sobre el que se calculan las mismas agregaciones, y
+las exportaciones recorren los fragmentos. Las filas individuales que se
+dibujan (dispersión y atípicos) se resuelven sobre la muestra residente.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+import weakref
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..utils.config import Config
+from .versioning import get_dataset_version, register_dataset
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - dependencia opcional
+    pa = None
+    pq = None
+
+# Metadatos de un dataset troceado (dentro de su directorio)
+_META_FILE = "dataset.json"
+
+# Filas por fragmento al recorrer un DataFrame en memoria
+_CHUNK_ROWS = 100_000
+
+# Datasets troceados registrados: versión -> SpilledDataset
+_spilled: Dict[str, "SpilledDataset"] = {}
+_spilled_lock = threading.Lock()
+
+# Versiones troceadas que se conservan por nombre (la actual y la anterior,
+# que algún worker puede estar leyendo todavía)
+_KEEP_VERSIONS = 2
+
+# Caché LRU de vistas filtradas: (versión, filtro canónico) -> muestra
+_VIEW_CACHE_SIZE = 16
+_views: "OrderedDict[Tuple[str, str], pd.DataFrame]" = OrderedDict()
+
+
+def spill_available() -> bool:
+    """Indica si pyarrow está instalado (necesario para trocear en disco)"""
+    return pq is not None
+
+
+class MemoryBudget:
+    """
+    Reparto del límite de memoria de datos de un worker en modo fuera de
+    memoria.
+
+    Una octava parte para la muestra residente de cada dataset y una
+    dieciseisava parte para el fragmento que se escribe o se lee (las
+    reducciones hacen unas pocas copias transitorias de sus columnas); el
+    resto queda para la página en curso y los agregados.
+    """
+
+    def __init__(self, limit_bytes: Optional[int] = None):
+        self.limit_bytes = limit_bytes or Config.WORKER_MEMORY_MB * 1024 * 1024
+        self.chunk_bytes = self.limit_bytes // 16
+        self.sample_bytes = self.limit_bytes // 8
+
+    def sample_rows(self, page: pd.DataFrame) -> int:
+        """
+        Filas de la muestra que caben en su presupuesto.
+
+        Se cuentan los datos, el índice y la clave aleatoria de cada fila.
+
+        Args:
+            page: Página de referencia (no vacía)
+
+        Returns:
+            int: Filas (al menos una)
+        """
+        page_bytes = page.memory_usage(index=True, deep=True).sum()
+        row_bytes = page_bytes / len(page) + np.dtype(np.float64).itemsize
+        return max(int(self.sample_bytes / row_bytes), 1)
+
+
+class RowSample:
+    """
+    Muestra uniforme sin reemplazo de tamaño fijo (bottom-k).
+
+    Cada fila recibe una clave aleatoria y se conservan las `capacity` filas
+    con las claves más bajas. De cada página solo se copian las filas por
+    debajo del umbral actual (cada vez menos), y al acumular un cuarto de
+    capacidad de más se recorta parte a parte, sin copiar la muestra entera.
+    """
+
+    def __init__(self, capacity: int, seed: int = 0):
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+        self.threshold = 1.0
+        self.parts: List[pd.DataFrame] = []
+        self.keys: List[np.ndarray] = []
+        self.size = 0
+
+    def update(self, page: pd.DataFrame):
+        """
+        Añade una página (con el índice de posiciones globales).
+
+        Args:
+            page: Filas procesadas
+        """
+        keys = self.rng.random(len(page))
+        keep = keys < self.threshold
+        if not keep.any():
+            return
+        self.parts.append(page[keep] if not keep.all() else page)
+        self.keys.append(keys[keep])
+        self.size += int(keep.sum())
+        if self.size > self.capacity + self.capacity // 4:
+            self._compact()
+
+    def _compact(self):
+        """Recorta la muestra a `capacity` filas con las claves más bajas"""
+        keys = np.concatenate(self.keys)
+        self.threshold = np.partition(keys, self.capacity - 1)[self.capacity - 1]
+        parts, part_keys = [], []
+        for part, values in zip(self.parts, self.keys):
+            keep = values <= self.threshold
+            if keep.any():
+                parts.append(part[keep])
+                part_keys.append(values[keep])
+        self.parts, self.keys = parts, part_keys
+        self.size = sum(len(values) for values in part_keys)
+
+    def result(self) -> pd.DataFrame:
+        """
+        Filas muestreadas en su orden original.
+
+        Las partes se liberan al concatenarlas: la muestra solo se puede
+        obtener una vez.
+        """
+        if self.size > self.capacity:
+            self._compact()
+        parts, self.parts, self.keys = self.parts, [], []
+        if not parts:
+            return pd.DataFrame()
+        return pd.concat(parts) if len(parts) > 1 else parts[0]
+
+
+class SpilledDataset:
+    """Dataset troceado en ficheros Parquet de un directorio"""
+
+    def __init__(self, directory: str, owned: bool = False):
+        """
+        Prepara un dataset troceado.
+
+        Args:
+            directory: Directorio del dataset
+            owned: Si este proceso lo creó (y debe borrarlo al descartarlo)
+        """
+        self.directory = directory
+        self.owned = owned
+        self.files: List[str] = []
+        self.rows = 0
+        self.columns: List[str] = []
+        self.fingerprint = ""
+        self._digest = hashlib.blake2b(digest_size=16)
+        self._writer = None
+        self._chunk_bytes = 0
+
+    @classmethod
+    def create(cls, name: str) -> "SpilledDataset":
+        """
+        Crea un dataset troceado vacío en `SPILL_DIR`.
+
+        Args:
+            name: Nombre del dataset (prefijo del directorio)
+
+        Returns:
+            SpilledDataset: Dataset listo para escribir
+        """
+        prefix = "".join(c if c.isalnum() else "_" for c in name)
+        directory = os.path.join(Config.SPILL_DIR, f"{prefix}-{uuid.uuid4().hex[:12]}")
+        os.makedirs(directory)
+        return cls(directory, owned=True)
+
+    @classmethod
+    def open(cls, directory: str) -> "SpilledDataset":
+        """
+        Abre un dataset troceado terminado (por ejemplo, de otro proceso).
+
+        Args:
+            directory: Directorio del dataset
+
+        Returns:
+            SpilledDataset: Dataset de solo lectura
+
+        Raises:
+            OSError: Si el directorio o sus metadatos no existen
+        """
+        with open(os.path.join(directory, _META_FILE)) as f:
+            meta = json.load(f)
+        dataset = cls(directory)
+        dataset.files = meta["files"]
+        dataset.rows = meta["rows"]
+        dataset.columns = meta["columns"]
+        dataset.fingerprint = meta["fingerprint"]
+        return dataset
+
+    # ========== Escritura ==========
+
+    def append(self, page: pd.DataFrame, chunk_bytes: int):
+        """
+        Añade una página al fragmento abierto.
+
+        Cada página se escribe al llegar como un grupo de filas; un fragmento
+        agrupa páginas hasta `chunk_bytes` en memoria (lo que ocupará al
+        leerlo) o una sola página si es mayor.
+
+        Args:
+            page: Filas procesadas
+            chunk_bytes: Tamaño objetivo de cada fragmento en memoria
+        """
+        if page.empty:
+            return
+        if not self.columns:
+            self.columns = list(map(str, page.columns))
+            self._digest.update(",".join(self.columns).encode())
+
+        hashes = pd.util.hash_pandas_object(page, index=False)
+        self._digest.update(hashes.to_numpy().tobytes())
+
+        # El fragmento abierto se cierra antes de superar su tamaño
+        page_bytes = int(page.memory_usage(index=False, deep=True).sum())
+        if self._chunk_bytes and self._chunk_bytes + page_bytes > chunk_bytes:
+            self._close_chunk()
+
+        table = None
+        if self._writer is not None:
+            try:
+                table = pa.Table.from_pandas(
+                    page, schema=self._writer.schema, preserve_index=False
+                )
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                # Tipos distintos a los del fragmento abierto (por ejemplo,
+                # una columna sin valores en esta página): fragmento nuevo
+                self._close_chunk()
+        if table is None:
+            table = pa.Table.from_pandas(page, preserve_index=False)
+        if self._writer is None:
+            filename = f"chunk-{len(self.files):05d}.parquet"
+            self._writer = pq.ParquetWriter(
+                os.path.join(self.directory, filename), table.schema
+            )
+            self.files.append(filename)
+        self._writer.write_table(table)
+        self.rows += len(page)
+        self._chunk_bytes += page_bytes
+
+    def _close_chunk(self):
+        """Cierra el fragmento abierto"""
+        if self._writer is not None:
+            self._writer.close()
+        self._writer, self._chunk_bytes = None, 0
+
+    def finish(self) -> str:
+        """
+        Cierra el último fragmento y escribe los metadatos.
+
+        Returns:
+            str: Huella del contenido (para la versión del dataset)
+        """
+        self._close_chunk()
+        self.fingerprint = self._digest.hexdigest()
+        meta = {
+            "files": self.files,
+            "rows": self.rows,
+            "columns": self.columns,
+            "fingerprint": self.fingerprint,
+        }
+        with open(os.path.join(self.directory, _META_FILE), "w") as f:
+            json.dump(meta, f)
+        return self.fingerprint
+
+    # ========== Lectura ==========
+
+    def paths(self) -> List[str]:
+        """Rutas de los fragmentos, en orden"""
+        return [os.path.join(self.directory, filename) for filename in self.files]
+
+    def iter_chunks(
+        self, columns: Optional[Sequence[str]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Recorre los fragmentos de uno en uno.
+
+        Args:
+            columns: Columnas a leer (None = todas)
+
+        Yields:
+            DataFrame de un fragmento, con índice de posiciones globales
+        """
+        if columns is not None:
+            columns = [column for column in columns if column in self.columns]
+        offset = 0
+        for path in self.paths():
+            # La tabla Arrow se libera columna a columna durante la conversión
+            table = pq.read_table(path, columns=columns)
+            chunk = table.to_pandas(split_blocks=True, self_destruct=True)
+            del table
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            yield chunk
+
+    def remove(self):
+        """Elimina los ficheros del dataset"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def register_spilled(df: pd.DataFrame, dataset: SpilledDataset):
+    """
+    Asocia un dataset troceado a la versión de su muestra residente.
+
+    Se conservan las dos últimas versiones de cada nombre; al descartar una
+    anterior se borran sus ficheros si los escribió este proceso (los de una
+    generación publicada los retira `refresh.publish_generation`).
+
+    Args:
+        df: Muestra residente (versionada con la huella del dataset completo)
+        dataset: Dataset troceado
+    """
+    version = get_dataset_version(df)
+    name = version.rsplit("@", 1)[0]
+    with _spilled_lock:
+        _spilled[version] = dataset
+        same_name = [v for v in _spilled if v.rsplit("@", 1)[0] == name]
+        for stale in same_name[:-_KEEP_VERSIONS]:
+            if _spilled[stale].owned:
+                _spilled[stale].remove()
+            del _spilled[stale]
+
+
+def get_spilled(df: pd.DataFrame) -> Optional[SpilledDataset]:
+    """
+    Obtiene el dataset troceado de una muestra residente.
+
+    Args:
+        df: DataFrame
+
+    Returns:
+        SpilledDataset o None si el DataFrame contiene todas sus filas
+    """
+    version = get_dataset_version(df)
+    if version is None:
+        return None
+    return _spilled.get(version)
+
+
+def iter_chunks(
+    df: pd.DataFrame,
+    columns: Optional[Sequence[str]] = None,
+    chunk_rows: int = _CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """
+    Recorre las filas de un dataset por fragmentos, esté en memoria o troceado.
+
+    Args:
+        df: DataFrame (o muestra residente de un dataset troceado)
+        columns: Columnas necesarias (None = todas)
+        chunk_rows: Filas por fragmento en memoria
+
+    Yields:
+        DataFrame de un fragmento
+    """
+    spilled = get_spilled(df)
+    if spilled is not None:
+        yield from spilled.iter_chunks(columns)
+        return
+
+    if columns is not None:
+        columns = [column for column in columns if column in df.columns]
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start : start + chunk_rows]
+        yield chunk if columns is None else chunk[columns]
+
+
+def dataset_rows(df: pd.DataFrame) -> int:
+    """
+    Número de filas del dataset completo.
+
+    Args:
+        df: DataFrame (o muestra residente de un dataset troceado)
+
+    Returns:
+        int: Filas
+    """
+    spilled = get_spilled(df)
+    return spilled.rows if spilled is not None else len(df)
+
+
+def _forget_view(version: str, dataset: SpilledDataset):
+    """Borra una vista filtrada cuando ya no queda ninguna referencia a ella"""
+    with _spilled_lock:
+        if _spilled.get(version) is dataset:
+            del _spilled[version]
+    dataset.remove()
+
+
+def filter_spilled(df: pd.DataFrame, filters: Dict[str, Sequence]) -> pd.DataFrame:
+    """
+    Filtra un dataset troceado fragmento a fragmento.
+
+    Las filas seleccionadas se escriben en un dataset troceado nuevo, con su
+    propia muestra residente, de modo que los conteos y estadísticos de la
+    vista se calculan sobre todas sus filas. Si caben en la muestra se
+    devuelven en memoria, sin trocear. Las vistas se cachean por versión y
+    filtro; sus ficheros se borran cuando el último DataFrame que las usa se
+    libera.
+
+    Args:
+        df: Muestra residente de un dataset troceado
+        filters: Columna -> valores admitidos (se ignoran las columnas que
+            el dataset no tiene)
+
+    Returns:
+        DataFrame con las filas de la vista (o su muestra residente)
+    """
+    spilled = get_spilled(df)
+    version = get_dataset_version(df)
+    key = (version, json.dumps(filters, sort_keys=True, default=str))
+    with _spilled_lock:
+        if key in _views:
+            _views.move_to_end(key)
+            return _views[key]
+
+    budget = MemoryBudget()
+    digest = hashlib.blake2b(key[1].encode(), digest_size=6).hexdigest()
+    name = f"{version.rsplit('@', 1)[0]}~{digest}"
+    dataset = SpilledDataset.create(name)
+    sample: Optional[RowSample] = None
+    for chunk in spilled.iter_chunks():
+        mask = np.ones(len(chunk), dtype=bool)
+        for column, values in filters.items():
+            if column in chunk.columns:
+                mask &= chunk[column].isin(values).to_numpy()
+        if not mask.any():
+            continue
+        page = chunk[mask]
+        dataset.append(page, budget.chunk_bytes)
+        if sample is None:
+            sample = RowSample(budget.sample_rows(page))
+        sample.update(page)
+    dataset.finish()
+
+    view = sample.result() if sample is not None else df.iloc[:0]
+    if len(view) == dataset.rows:
+        # Todas las filas caben en memoria: no hace falta el dataset troceado
+        dataset.remove()
+    else:
+        view_version = register_dataset(view, name, dataset.fingerprint)
+        with _spilled_lock:
+            _spilled[view_version] = dataset
+        weakref.finalize(view, _forget_view, view_version, dataset)
+
+    with _spilled_lock:
+        # Otro hilo pudo calcular la misma vista mientras tanto
+        view = _views.setdefault(key, view)
+        _views.move_to_end(key)
+        while len(_views) > _VIEW_CACHE_SIZE:
+            _views.popitem(last=False)
+    return view
@@ -0,0 +1,383 @@
+"""
+Almacén analítico embebido (DuckDB) con réplica de las vistas de ORDS.
+
+El proceso que descarga los datos (la actualización en segundo plano o el
+arranque) escribe los datasets en un fichero DuckDB nuevo y lo publica con un
+único rename. Los workers lo abren en solo lectura y resuelven con SQL los
+conteos de las secciones y las páginas de las tablas, que DuckDB calcula por
+columnas sin cargar el fichero en memoria. Los resultados se devuelven como
+tablas Arrow y solo se convierten a pandas (o a registros) en el límite con
+los gráficos y las tablas.
+
+Cada tabla guarda la versión del DataFrame del que procede: el almacén solo
+responde por un DataFrame cuya versión coincide, así que nunca mezcla datos
+de dos descargas distintas. Los datasets troceados en disco se replican desde
+sus ficheros Parquet, con todas sus filas y no solo la muestra residente. Es
+opcional (extra `store`: `uv sync --extra store`) y se activa con
+`ANALYTICAL_STORE_PATH`.
+"""
+
+import logging
+import math
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from ..utils.config import Config
+from .filter_query import filter_sql, quote_identifier
+from .spill import get_spilled
+from .versioning import get_dataset_version
+
+try:
+    import duckdb
+except ImportError:  # pragma: no cover - dependencia opcional
+    duckdb = None
+
+logger = logging.getLogger(__name__)
+
+# Tabla con la versión de cada dataset replicado
+_VERSIONS_TABLE = "_versiones"
+
+# Tipos de DuckDB que se filtran como números (el resto, como texto)
+_NUMERIC_TYPES = (
+    "TINYINT",
+    "SMALLINT",
+    "INTEGER",
+    "BIGINT",
+    "HUGEINT",
+    "UTINYINT",
+    "USMALLINT",
+    "UINTEGER",
+    "UBIGINT",
+    "UHUGEINT",
+    "FLOAT",
+    "DOUBLE",
+    "DECIMAL",
+)
+
+
+def store_available() -> bool:
+    """Indica si duckdb está instalado (necesario para el almacén analítico)"""
+    return duckdb is not None
+
+
+class AnalyticalStore:
+    """Réplica de los datasets en un fichero DuckDB compartido en solo lectura"""
+
+    def __init__(self, path: str):
+        """
+        Inicializa el almacén.
+
+        Args:
+            path: Ruta del fichero DuckDB
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = None
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._versions: Dict[str, str] = {}
+        self._numeric: Dict[str, Dict[str, bool]] = {}
+
+    # ========== Escritura ==========
+
+    def mirror(self, frames: Dict[str, pd.DataFrame]) -> bool:
+        """
+        Replica los DataFrames en un fichero nuevo y lo publica de una vez.
+
+        Solo se escriben los DataFrames con versión; si el fichero publicado
+        ya contiene exactamente esas versiones, no se reescribe.
+
+        Args:
+            frames: Clave del caché -> DataFrame versionado
+
+        Returns:
+            bool: True si se publicó un fichero nuevo
+        """
+        versions = {
+            key: version
+            for key, version in (
+                (key, get_dataset_version(df)) for key, df in frames.items()
+            )
+            if version is not None
+        }
+        if not versions or self.versions() == versions:
+            return False
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        try:
+            connection = duckdb.connect(tmp_path)
+            try:
+                connection.execute(
+                    f"CREATE TABLE {_VERSIONS_TABLE} (clave VARCHAR, version VARCHAR)"
+                )
+                for key, version in versions.items():
+                    # El orden de inserción se conserva en rowid (primera
+                    # aparición de cada categoría)
+                    table = quote_identifier(key)
+                    spilled = get_spilled(frames[key])
+                    if spilled is not None:
+                        files = ", ".join(
+                            "'" + path.replace("'", "''") + "'"
+                            for path in spilled.paths()
+                        )
+                        connection.execute(
+                            f"CREATE TABLE {table} AS "
+                            f"SELECT * FROM read_parquet([{files}])"
+                        )
+                    else:
+                        connection.register("_frame", frames[key])
+                        connection.execute(
+                            f"CREATE TABLE {table} AS SELECT * FROM _frame"
+                        )
+                        connection.unregister("_frame")
+                    connection.execute(
+                        f"INSERT INTO {_VERSIONS_TABLE} VALUES (?, ?)", [key, version]
+                    )
+                connection.execute("CHECKPOINT")
+            finally:
+                connection.close()
+            os.replace(tmp_path, self.path)
+        except (OSError, duckdb.Error) as e:
+            # Sin réplica, las consultas siguen resolviéndose con pandas
+            logger.warning(f"Could not mirror datasets into {self.path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+        logger.info(f"Mirrored {len(versions)} datasets into {self.path}")
+        return True
+
+    # ========== Lectura ==========
+
+    def _cursor(self):
+        """
+        Cursor de solo lectura sobre el fichero publicado.
+
+        La conexión se reabre cuando el fichero cambia (nuevo inodo tras el
+        rename); la anterior no se cierra explícitamente porque otros hilos
+        pueden estar usando sus cursores. Cada llamada obtiene un cursor
+        propio, seguro entre hilos.
+
+        Returns:
+            Cursor de DuckDB, o None si aún no hay fichero publicado
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        file_id = (stat.st_ino, stat.st_mtime_ns)
+
+        with self._lock:
+            if file_id != self._file_id:
+                self._connection = duckdb.connect(self.path, read_only=True)
+                self._file_id = file_id
+                self._versions = dict(
+                    self._connection.execute(
+                        f"SELECT clave, version FROM {_VERSIONS_TABLE}"
+                    ).fetchall()
+                )
+                self._numeric = {}
+            return self._connection.cursor()
+
+    def versions(self) -> Dict[str, str]:
+        """
+        Versiones de los datasets replicados.
+
+        Returns:
+            dict: Clave del caché -> versión (vacío si no hay fichero)
+        """
+        if self._cursor() is None:
+            return {}
+        return dict(self._versions)
+
+    def serves(self, df: pd.DataFrame) -> Optional[str]:
+        """
+        Indica si el almacén contiene exactamente los datos de un DataFrame.
+
+        Args:
+            df: DataFrame (la instancia versionada del caché)
+
+        Returns:
+            str: Tabla con sus datos, o None si su versión no está replicada
+        """
+        version = get_dataset_version(df)
+        if version is None:
+            return None
+        for key, stored in self.versions().items():
+            if stored == version:
+                return key
+        return None
+
+    def _numeric_columns(self, cursor, table: str) -> Dict[str, bool]:
+        """Columnas de una tabla (en orden) -> si son numéricas"""
+        if table not in self._numeric:
+            rows = cursor.execute(
+                "SELECT column_name, data_type FROM information_schema.columns "
+                "WHERE table_name = ? ORDER BY ordinal_position",
+                [table],
+            ).fetchall()
+            self._numeric[table] = {
+                name: kind.startswith(_NUMERIC_TYPES) for name, kind in rows
+            }
+        return self._numeric[table]
+
+    @staticmethod
+    def _view_clauses(
+        numeric: Dict[str, bool],
+        sort_by: Optional[List[Dict[str, str]]],
+        filter_query: Optional[str],
+    ) -> Tuple[str, list, str]:
+        """
+        Cláusulas WHERE y ORDER BY de una vista filtrada y ordenada.
+
+        Args:
+            numeric: Columnas de la tabla -> si son numéricas
+            sort_by: Ordenación de DataTable
+            filter_query: Filtro de DataTable
+
+        Returns:
+            Tuple: (WHERE con su espacio inicial o "", parámetros, ORDER BY)
+        """
+        where, params = "", []
+        condition = filter_sql(filter_query, numeric)
+        if condition is not None:
+            where, params = f" WHERE {condition[0]}", condition[1]
+
+        # Ordenación estable: las filas empatadas conservan su orden original
+        order = [
+            f"{quote_identifier(item['column_id'])} "
+            f"{'ASC' if item['direction'] == 'asc' else 'DESC'} NULLS LAST"
+            for item in sort_by or []
+            if item["column_id"] in numeric
+        ]
+        order.append("rowid")
+        return where, params, ", ".join(order)
+
+    def count_by(self, table: str, columns: List[str]):
+        """
+        Cuenta filas por combinación de categorías.
+
+        Args:
+            table: Tabla del dataset
+            columns: Columnas de agrupación (se descartan las filas con nulos)
+
+        Returns:
+            pyarrow.Table: Columnas de agrupación, count y primera (fila en
+            la que aparece la combinación por primera vez)
+        """
+        cursor = self._cursor()
+        names = ", ".join(quote_identifier(column) for column in columns)
+        not_null = " AND ".join(
+            f"{quote_identifier(column)} IS NOT NULL" for column in columns
+        )
+        return cursor.execute(
+            f"SELECT {names}, COUNT(*) AS count, MIN(rowid) AS primera "
+            f"FROM {quote_identifier(table)} WHERE {not_null} "
+            f"GROUP BY {names} ORDER BY primera"
+        ).fetch_arrow_table()
+
+    def page(
+        self,
+        table: str,
+        page_current: Optional[int],
+        page_size: int,
+        sort_by: Optional[List[Dict[str, str]]] = None,
+        filter_query: Optional[str] = None,
+    ):
+        """
+        Obtiene una página filtrada y ordenada de una tabla.
+
+        Args:
+            table: Tabla del dataset
+            page_current: Página solicitada (desde 0)
+            page_size: Filas por página
+            sort_by: Ordenación de DataTable
+            filter_query: Filtro de DataTable
+
+        Returns:
+            Tuple: (pyarrow.Table con la página, número total de páginas)
+        """
+        cursor = self._cursor()
+        numeric = self._numeric_columns(cursor, table)
+        where, params, order = self._view_clauses(numeric, sort_by, filter_query)
+
+        source = quote_identifier(table)
+        total = cursor.execute(f"SELECT COUNT(*) FROM {source}{where}", params)
+        page_count = max(1, math.ceil(total.fetchone()[0] / page_size))
+
+        columns = ", ".join(quote_identifier(column) for column in numeric)
+        page = max(page_current or 0, 0)
+        result = cursor.execute(
+            f"SELECT {columns} FROM {source}{where} ORDER BY {order} "
+            f"LIMIT {int(page_size)} OFFSET {int(page * page_size)}",
+            params,
+        ).fetch_arrow_table()
+        return result, page_count
+
+    def iter_rows(
+        self,
+        table: str,
+        sort_by: Optional[List[Dict[str, str]]] = None,
+        filter_query: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        batch_rows: int = 50000,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Recorre por bloques una vista filtrada y ordenada de una tabla.
+
+        Args:
+            table: Tabla del dataset
+            sort_by: Ordenación de DataTable
+            filter_query: Filtro de DataTable
+            columns: Columnas a leer (None = todas)
+            batch_rows: Filas por bloque
+
+        Yields:
+            DataFrame con un bloque de filas
+        """
+        cursor = self._cursor()
+        numeric = self._numeric_columns(cursor, table)
+        where, params, order = self._view_clauses(numeric, sort_by, filter_query)
+
+        selected = ", ".join(
+            quote_identifier(column) for column in columns or list(numeric)
+        )
+        reader = cursor.execute(
+            f"SELECT {selected} FROM {quote_identifier(table)}{where} "
+            f"ORDER BY {order}",
+            params,
+        ).fetch_record_batch(batch_rows)
+        for batch in reader:
+            yield batch.to_pandas()
+
+
+# Instancia global del almacén (singleton pattern); False = desactivado
+_store_instance: Any = None
+
+
+def get_analytical_store() -> Optional[AnalyticalStore]:
+    """
+    Obtiene el almacén analítico configurado.
+
+    Returns:
+        AnalyticalStore o None si está desactivado o falta duckdb
+    """
+    global _store_instance
+
+    if _store_instance is None:
+        if not Config.ANALYTICAL_STORE_PATH:
+            _store_instance = False
+        elif not store_available():
+            logger.warning('Analytical store disabled: install "duckdb" to enable it')
+            _store_instance = False
+        else:
+            _store_instance = AnalyticalStore(Config.ANALYTICAL_STORE_PATH)
+
+    return _store_instance or None
@@ -0,0 +1,189 @@
+"""
+Consultas de tablas paginadas en el servidor.
+Resuelven filtrado, ordenación y paginación de las DataTable con
+`page_action="custom"` sobre el DataFrame cacheado, de modo que cada
+interacción solo transporta las filas de la página visible. Si el dataset
+está replicado en el almacén analítico, la página se resuelve con SQL; si está
+troceado en disco, recorriendo sus fragmentos.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .filter_query import filter_mask, get_column_index
+from .spill import SpilledDataset, get_spilled
+from .store import get_analytical_store
+
+
+def _sort_positions(df: pd.DataFrame, sort_by: List[Dict[str, str]]) -> np.ndarray:
+    """
+    Calcula el orden de filas para `sort_by` (ordenación estable, multi-columna).
+
+    Args:
+        df: DataFrame a ordenar
+        sort_by: Lista de {"column_id", "direction"} de DataTable
+
+    Returns:
+        np.ndarray: Posiciones de fila ordenadas
+    """
+    columns = [item["column_id"] for item in sort_by if item["column_id"] in df.columns]
+    ascending = [
+        item["direction"] == "asc" for item in sort_by if item["column_id"] in df.columns
+    ]
+    if not columns:
+        return np.arange(len(df))
+
+    # Una sola columna numérica: permutación precalculada del índice ordenado
+    if len(columns) == 1 and pd.api.types.is_numeric_dtype(df[columns[0]]):
+        return get_column_index(df, columns[0], "sorted").ordering(ascending[0])
+
+    ordered = df[columns].reset_index(drop=True).sort_values(
+        columns, ascending=ascending, kind="stable", na_position="last"
+    )
+    return ordered.index.to_numpy()
+
+
+def select_positions(
+    df: pd.DataFrame,
+    sort_by: Optional[List[Dict[str, str]]] = None,
+    filter_query: Optional[str] = None,
+) -> Optional[np.ndarray]:
+    """
+    Calcula las posiciones de fila de una vista filtrada y ordenada.
+
+    El filtro y la ordenación se resuelven sobre posiciones del frame completo
+    (reutilizando los índices de columna), sin copiar filas.
+
+    Args:
+        df: DataFrame completo (cacheado)
+        sort_by: Ordenación de DataTable
+        filter_query: Filtro de DataTable
+
+    Returns:
+        np.ndarray con las posiciones, o None si la vista es el frame completo
+    """
+    mask = filter_mask(df, filter_query)
+    if sort_by:
+        positions = _sort_positions(df, sort_by)
+        return positions if mask is None else positions[mask[positions]]
+    if mask is not None:
+        return np.flatnonzero(mask)
+    return None
+
+
+def _query_spilled(
+    spilled: SpilledDataset,
+    page_current: Optional[int],
+    page_size: int,
+    sort_by: Optional[List[Dict[str, str]]] = None,
+    filter_query: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Obtiene una página de un dataset troceado recorriendo sus fragmentos.
+
+    Cada fragmento se filtra al leerlo; con ordenación solo se conservan las
+    filas que pueden llegar a la página pedida (las primeras `(página + 1) ×
+    tamaño` del orden), así que la memoria no depende del tamaño del dataset.
+
+    Args:
+        spilled: Dataset troceado
+        page_current: Página solicitada (desde 0)
+        page_size: Filas por página
+        sort_by: Ordenación de DataTable
+        filter_query: Filtro de DataTable
+
+    Returns:
+        Tuple: (registros de la página, número total de páginas)
+    """
+    page = max(page_current or 0, 0)
+    start, stop = page * page_size, (page + 1) * page_size
+    columns = [item["column_id"] for item in sort_by or []]
+    ascending = [item["direction"] == "asc" for item in sort_by or []]
+
+    # Sin filtro ni orden la página sale de los primeros fragmentos y el total
+    # es el del dataset: no hace falta leer el resto
+    sequential = not sort_by and not (filter_query or "").strip()
+
+    total = 0
+    kept: Optional[pd.DataFrame] = None
+    for chunk in spilled.iter_chunks():
+        if sequential and total >= stop:
+            total = spilled.rows
+            break
+        mask = filter_mask(chunk, filter_query)
+        if mask is not None:
+            chunk = chunk[mask]
+        if sort_by:
+            # Las filas conservadas preceden al fragmento: la ordenación
+            # estable mantiene el orden original de los empates
+            present = [c for c in columns if c in chunk.columns]
+            candidates = chunk if kept is None else pd.concat([kept, chunk])
+            if present:
+                candidates = candidates.sort_values(
+                    present,
+                    ascending=[a for c, a in zip(columns, ascending) if c in present],
+                    kind="stable",
+                    na_position="last",
+                )
+            kept = candidates.iloc[:stop]
+        elif total < stop and total + len(chunk) > start:
+            part = chunk.iloc[max(start - total, 0) : stop - total]
+            kept = part if kept is None else pd.concat([kept, part])
+        total += len(chunk)
+
+    page_count = max(1, math.ceil(total / page_size))
+    if kept is None:
+        return [], page_count
+    rows = kept.iloc[start:stop] if sort_by else kept
+    return rows.to_dict("records"), page_count
+
+
+def query_table(
+    df: pd.DataFrame,
+    page_current: Optional[int],
+    page_size: int,
+    sort_by: Optional[List[Dict[str, str]]] = None,
+    filter_query: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Obtiene una página de una tabla aplicando filtro y ordenación.
+
+    Args:
+        df: DataFrame completo (cacheado)
+        page_current: Página solicitada (desde 0)
+        page_size: Filas por página
+        sort_by: Ordenación de DataTable
+        filter_query: Filtro de DataTable
+
+    Returns:
+        Tuple: (registros de la página, número total de páginas)
+    """
+    if df.empty:
+        return [], 1
+
+    # Réplica en el almacén analítico: la página se resuelve con SQL
+    store = get_analytical_store()
+    table = store.serves(df) if store is not None else None
+    if table is not None:
+        page, page_count = store.page(
+            table, page_current, page_size, sort_by, filter_query
+        )
+        return page.to_pylist(), page_count
+
+    spilled = get_spilled(df)
+    if spilled is not None:
+        return _query_spilled(spilled, page_current, page_size, sort_by, filter_query)
+
+    positions = select_positions(df, sort_by, filter_query)
+    total = len(df) if positions is None else len(positions)
+    page_count = max(1, math.ceil(total / page_size))
+    page = max(page_current or 0, 0)
+    start, stop = page * page_size, (page + 1) * page_size
+
+    # Solo se materializan las filas de la página visible
+    if positions is None:
+        return df.iloc[start:stop].to_dict("records"), page_count
+    return df.iloc[positions[start:stop]].to_dict("records"), page_count
@@ -0,0 +1,82 @@
+"""
+Versionado de datasets.
+Asigna a cada DataFrame cargado una versión estable derivada de su contenido,
+que sirve como clave para las cachés de agregados y figuras.
+"""
+
+import hashlib
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+# id(DataFrame) -> (referencia débil, versión)
+_registry: Dict[int, Tuple[weakref.ref, str]] = {}
+_lock = threading.Lock()
+
+
+def compute_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Calcula una huella del contenido de un DataFrame.
+
+    Args:
+        df: DataFrame a identificar
+
+    Returns:
+        str: Huella hexadecimal (igual en todos los workers para los mismos datos)
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(",".join(map(str, df.columns)).encode())
+    if not df.empty:
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def register_dataset(
+    df: pd.DataFrame, name: str, fingerprint: Optional[str] = None
+) -> str:
+    """
+    Registra un DataFrame y le asigna una versión.
+
+    Solo el objeto registrado tiene versión: las copias o filtrados derivados
+    de él no la heredan, así que nunca comparten entradas de caché.
+
+    Args:
+        df: DataFrame a registrar
+        name: Nombre del dataset
+        fingerprint: Huella ya calculada (por ejemplo, la del dataset completo
+            troceado en disco del que `df` es una muestra); None = calcularla
+
+    Returns:
+        str: Versión asignada ("<nombre>@<huella>")
+    """
+    version = f"{name}@{fingerprint or compute_fingerprint(df)}"
+    key = id(df)
+
+    def _forget(_ref, key=key):
+        with _lock:
+            entry = _registry.get(key)
+            if entry is not None and entry[0] is _ref:
+                del _registry[key]
+
+    with _lock:
+        _registry[key] = (weakref.ref(df, _forget), version)
+
+    return version
+
+
+def get_dataset_version(df: pd.DataFrame) -> Optional[str]:
+    """
+    Obtiene la versión de un DataFrame registrado.
+
+    Args:
+        df: DataFrame
+
+    Returns:
+        str o None si el DataFrame no fue registrado
+    """
+    entry = _registry.get(id(df))
+    if entry is None or entry[0]() is not df:
+        return None
+    return entry[1]
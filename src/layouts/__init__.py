@@ -3,20 +3,44 @@ Layout modules for different dashboard sections
 """
 
 from .header import create_header, create_footer
+from .accessibility import create_accessibility_panel
+from .cross_filter import create_cross_filter_bar
+from .refresh import create_refresh_control
 from .main_metrics import create_main_metrics
 from .diagnostics import create_diagnostics_section
 from .gender_analysis import create_gender_analysis_section
 from .severity import create_severity_section
 from .weight_stay import create_weight_stay_section
 from .insights import create_insights_section
+from . import diagnostics, gender_analysis, severity, weight_stay
+
+# Gráficos del layout, en el orden en que aparecen: los callbacks de cliente
+# (tema y leyendas) se registran sobre estos ids sin construir el layout
+GRAPH_IDS = [
+    *diagnostics.GRAPH_IDS,
+    *gender_analysis.GRAPH_IDS,
+    *severity.GRAPH_IDS,
+    *weight_stay.GRAPH_IDS,
+]
+LEGEND_GRAPH_IDS = [
+    *diagnostics.LEGEND_GRAPH_IDS,
+    *gender_analysis.LEGEND_GRAPH_IDS,
+    *severity.LEGEND_GRAPH_IDS,
+    *weight_stay.LEGEND_GRAPH_IDS,
+]
 
 __all__ = [
     "create_header",
     "create_footer",
+    "create_accessibility_panel",
+    "create_cross_filter_bar",
+    "create_refresh_control",
     "create_main_metrics",
     "create_diagnostics_section",
     "create_gender_analysis_section",
     "create_severity_section",
     "create_weight_stay_section",
     "create_insights_section",
+    "GRAPH_IDS",
+    "LEGEND_GRAPH_IDS",
 ]
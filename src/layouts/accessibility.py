@@ -0,0 +1,212 @@
+"""
+Panel de accesibilidad (modo daltónico, alto contraste y tamaño de letra).
+El estado del panel es de presentación: se guarda en el navegador y se aplica
+con callbacks de cliente.
+"""
+
+from dash import dcc, html
+
+# Estado inicial de accesibilidad (persistido en localStorage)
+DEFAULT_ACCESSIBILITY = {
+    "colorblind": False,
+    "colorblindType": "protanopia",
+    "intensity": 70,
+    "highContrast": False,
+    "contrast": 80,
+    "fontSize": "normal",
+}
+
+# Tipos de daltonismo: (id, nombre, descripción)
+COLORBLIND_TYPES = [
+    ("protanopia", "Protanopía", "Rojo-Verde"),
+    ("deuteranopia", "Deuteranopía", "Rojo-Verde"),
+    ("tritanopia", "Tritanopía", "Azul-Amarillo"),
+    ("achromatopsia", "Acromatopsia", "Sin color"),
+]
+
+# Tamaños de letra: (id, nombre, tamaño del icono)
+FONT_SIZES = [
+    ("small", "Pequeño", "14px"),
+    ("normal", "Normal", "18px"),
+    ("large", "Grande", "22px"),
+    ("xlarge", "Muy Grande", "26px"),
+]
+
+
+def _toggle_switch(toggle_id: str, label: str) -> html.Div:
+    """Interruptor con etiqueta (role switch)"""
+    return html.Div(
+        [html.Span(label), html.Div(className="switch")],
+        id=toggle_id,
+        className="toggle-switch",
+        role="switch",
+        tabIndex=0,
+        **{"aria-checked": "false"},
+    )
+
+
+def _intensity_slider(
+    slider_id: str,
+    display_id: str,
+    label: str,
+    value: int,
+    info: str,
+    class_name: str = "intensity-slider",
+) -> html.Div:
+    """Control deslizante de intensidad con su valor y texto de ayuda"""
+    return html.Div(
+        [
+            html.Div(
+                [html.Span(label), html.Span(f"{value}%", id=display_id)],
+                className="intensity-value",
+            ),
+            dcc.Input(
+                id=slider_id,
+                type="range",
+                min=0,
+                max=100,
+                value=value,
+                className=class_name,
+                persistence=True,
+                persistence_type="local",
+            ),
+            html.P(info, className="info-text"),
+        ],
+        className="intensity-slider-container",
+    )
+
+
+def create_accessibility_panel() -> html.Div:
+    """
+    Crea el botón flotante y el panel de configuración de accesibilidad.
+
+    Returns:
+        html.Div: Botón, panel y estado de accesibilidad (`accessibility-store`)
+    """
+    return html.Div(
+        [
+            dcc.Store(
+                id="accessibility-store",
+                storage_type="local",
+                data=DEFAULT_ACCESSIBILITY,
+            ),
+            html.Button(
+                "🎨",
+                id="accessibility-toggle",
+                className="accessibility-button",
+                title="Configuración de accesibilidad",
+                **{"aria-expanded": "false", "aria-controls": "accessibility-panel"},
+            ),
+            html.Div(
+                [
+                    html.H3("Configuración de Accesibilidad"),
+                    html.Div(
+                        _toggle_switch("colorblind-toggle", "Modo Daltónico"),
+                        className="panel-section",
+                    ),
+                    html.Div(
+                        [
+                            html.Label("Tipo de Daltonismo"),
+                            html.Div(
+                                [
+                                    html.Div(
+                                        [
+                                            html.Span(name, className="type-label"),
+                                            html.Span(
+                                                description,
+                                                className="type-description",
+                                            ),
+                                        ],
+                                        id=f"colorblind-type-{type_id}",
+                                        className="type-option",
+                                        tabIndex=0,
+                                    )
+                                    for type_id, name, description in COLORBLIND_TYPES
+                                ],
+                                className="colorblind-type-selector",
+                            ),
+                            _intensity_slider(
+                                "intensity-slider",
+                                "intensity-display",
+                                "Intensidad del Ajuste",
+                                DEFAULT_ACCESSIBILITY["intensity"],
+                                "Ajusta la intensidad de la corrección de color "
+                                "según tus necesidades",
+                            ),
+                        ],
+                        id="colorblind-options",
+                        className="panel-section",
+                        style={"display": "none"},
+                    ),
+                    html.Div(
+                        _toggle_switch("highcontrast-toggle", "Modo Alto Contraste"),
+                        className="panel-section",
+                    ),
+                    html.Div(
+                        [
+                            html.Label("Intensidad del Contraste"),
+                            _intensity_slider(
+                                "contrast-slider",
+                                "contrast-display",
+                                "Nivel de Contraste",
+                                DEFAULT_ACCESSIBILITY["contrast"],
+                                "Aumenta el contraste entre elementos para mejorar "
+                                "la legibilidad",
+                                class_name="intensity-slider contrast-slider",
+                            ),
+                            html.Div(
+                                html.Div(
+                                    html.Span(
+                                        "Texto en alto contraste",
+                                        style={"color": "white"},
+                                    ),
+                                    className="preview-box",
+                                    style={
+                                        "background": "linear-gradient(135deg, "
+                                        "#000000, #1e293b)"
+                                    },
+                                ),
+                                className="contrast-preview",
+                            ),
+                        ],
+                        id="highcontrast-options",
+                        className="panel-section",
+                        style={"display": "none"},
+                    ),
+                    html.Div(
+                        [
+                            html.Label("Tamaño de Letra"),
+                            html.Div(
+                                [
+                                    html.Div(
+                                        [
+                                            html.Span(
+                                                "A",
+                                                className="size-icon",
+                                                style={"fontSize": icon_size},
+                                            ),
+                                            html.Span(name, className="size-label"),
+                                        ],
+                                        id=f"font-size-{size_id}",
+                                        className="size-option",
+                                        tabIndex=0,
+                                    )
+                                    for size_id, name, icon_size in FONT_SIZES
+                                ],
+                                className="font-size-selector",
+                            ),
+                            html.P(
+                                "Ajusta el tamaño del texto para mejorar la legibilidad",
+                                className="info-text",
+                            ),
+                        ],
+                        className="panel-section",
+                    ),
+                ],
+                id="accessibility-panel",
+                className="accessibility-panel",
+                role="dialog",
+                **{"aria-label": "Configuración de accesibilidad"},
+            ),
+        ]
+    )
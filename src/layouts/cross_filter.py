@@ -0,0 +1,53 @@
+"""
+Barra de filtro cruzado entre secciones
+"""
+
+from typing import Dict, Optional
+
+from dash import dcc, html
+
+
+def create_cross_filter_bar(versions: Optional[Dict[str, str]] = None) -> html.Div:
+    """
+    Crea la barra que muestra los filtros cruzados activos.
+
+    Al hacer clic en una categoría de un gráfico (diagnóstico, edad, mes, sexo,
+    severidad o mortalidad) se filtran el resto de secciones; la barra muestra
+    el filtro y permite quitarlo.
+
+    Args:
+        versions: Versión de cada dataset con la que se ha generado el layout
+            (permite enviar la primera actualización como parche)
+
+    Returns:
+        html.Div: Barra de filtros con su estado (`cross-filter-store`)
+    """
+    return html.Div(
+        [
+            # Columna -> valores seleccionados
+            dcc.Store(id="cross-filter-store", data={}),
+            # Filtro y versiones de lo que muestra el cliente
+            dcc.Store(
+                id="cross-filter-applied",
+                data={"filters": {}, "versions": versions or {}},
+            ),
+            html.Span("Filtros:", className="control-label"),
+            html.Div(
+                html.Span(
+                    "Haz clic en un gráfico para filtrar el resto de secciones",
+                    className="cross-filter-empty",
+                ),
+                id="cross-filter-chips",
+                style={"display": "flex", "flexWrap": "wrap", "gap": "8px"},
+            ),
+            html.Button(
+                "Quitar filtros",
+                id="cross-filter-clear",
+                className="cross-filter-clear",
+                title="Quitar todos los filtros cruzados",
+            ),
+        ],
+        className="cross-filter-bar",
+        role="status",
+        **{"aria-live": "polite"},
+    )
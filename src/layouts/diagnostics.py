@@ -9,40 +9,42 @@ from ..components import (
     create_bar_chart,
     create_pie_chart,
     create_line_chart,
+    create_section_toggle,
+    section_id,
+    create_legend_toggle,
 )
-from ..utils.helpers import format_number, get_mode_value
+from ..data.aggregations import count_cube
+from ..data.sketches import distinct_count, top_counts
+from ..data.spill import dataset_rows
+from ..utils.helpers import format_number
 
 
-from typing import Union
+from typing import Dict, Union
 
 
-def create_diagnostics_section(
+# Ids de los gráficos de la sección y de los que llevan botón de leyenda
+GRAPH_IDS = ["grafico-diagnosticos", "grafico-edad", "grafico-temporal"]
+LEGEND_GRAPH_IDS = ["grafico-edad"]
+
+
+def create_diagnostics_figures(
     df: pd.DataFrame, theme: str = "light"
-) -> Union[html.Div, html.Section]:
+) -> Dict[str, dict]:
     """
-    Crea la sección completa de análisis de diagnósticos y demografía.
+    Construye las figuras de la sección de diagnósticos.
+
+    Se usa tanto al montar el layout como al recalcular la sección con un
+    filtro cruzado.
 
     Args:
-        df: DataFrame con los datos de diagnósticos
+        df: DataFrame con los datos de diagnósticos (completo o filtrado)
         theme: Tema (dark/light)
 
     Returns:
-        html.Section: Sección de diagnósticos
+        Dict: Id del gráfico -> figura
     """
-    # Preparar datos
-    total_registros = len(df) if not df.empty else 0
-    diagnosticos_unicos = df["diagnostico_principal"].nunique() if not df.empty else 0
-    rango_edad_comun = get_mode_value(df["rango_de_edad"]) if not df.empty else "N/A"
-    diagnostico_frecuente = (
-        get_mode_value(df["diagnostico_principal"]) if not df.empty else "N/A"
-    )
-
     # Gráfico 1: Top 10 diagnósticos
-    df_top_diagnosticos = (
-        df["diagnostico_principal"].value_counts().head(10).reset_index()
-        if not df.empty
-        else pd.DataFrame()
-    )
+    df_top_diagnosticos = top_counts(df, "diagnostico_principal", 10)
 
     fig_diagnosticos = create_bar_chart(
         df=df_top_diagnosticos,
@@ -56,11 +58,14 @@ def create_diagnostics_section(
         color_continuous_scale="Blues",
         height=400,
         theme=theme,
+        # Una sola traza: el filtro cruzado la actualiza con un parche aunque
+        # cambien los diagnósticos del top
+        single_trace=True,
     )
 
     # Gráfico 2: Distribución por edad
     df_edad = (
-        df["rango_de_edad"].value_counts().reset_index()
+        count_cube(df, "rango_de_edad").value_counts()
         if not df.empty
         else pd.DataFrame()
     )
@@ -121,7 +126,7 @@ def create_diagnostics_section(
 
     # Gráfico 3: Ingresos por mes
     df_temporal = (
-        df["mes_de_ingreso"].value_counts().sort_index().reset_index()
+        count_cube(df, "mes_de_ingreso").value_counts(by_category=True)
         if not df.empty
         else pd.DataFrame()
     )
@@ -138,6 +143,38 @@ def create_diagnostics_section(
         theme=theme,
     )
 
+    return {
+        "grafico-diagnosticos": fig_diagnosticos,
+        "grafico-edad": fig_edad,
+        "grafico-temporal": fig_temporal,
+    }
+
+
+def create_diagnostics_section(
+    df: pd.DataFrame, theme: str = "light"
+) -> Union[html.Div, html.Section]:
+    """
+    Crea la sección completa de análisis de diagnósticos y demografía.
+
+    Args:
+        df: DataFrame con los datos de diagnósticos
+        theme: Tema (dark/light)
+
+    Returns:
+        html.Section: Sección de diagnósticos
+    """
+    # Preparar datos
+    total_registros = dataset_rows(df) if not df.empty else 0
+    diagnosticos_unicos = distinct_count(df, "diagnostico_principal")
+    rango_edad_comun = (
+        count_cube(df, "rango_de_edad").mode() if not df.empty else "N/A"
+    )
+    diagnostico_frecuente = (
+        count_cube(df, "diagnostico_principal").mode() if not df.empty else "N/A"
+    )
+
+    figures = create_diagnostics_figures(df, theme=theme)
+
     return html.Div(
         [
             html.Div(
@@ -151,7 +188,9 @@ def create_diagnostics_section(
                         "Distribución de diagnósticos principales, tendencias temporales y análisis demográfico",
                         className="section-subtitle",
                     ),
+                    create_section_toggle("diagnosticos"),
                 ],
+                className="section-header",
                 style={"marginBottom": "32px"},
             ),
             # Gráficos en grid
@@ -172,7 +211,7 @@ def create_diagnostics_section(
                             dcc.Graph(
                                 id="grafico-diagnosticos",
                                 config={"displayModeBar": False},
-                                figure=fig_diagnosticos,
+                                figure=figures["grafico-diagnosticos"],
                             ),
                         ],
                         className="chart-card chart-large",
@@ -189,10 +228,11 @@ def create_diagnostics_section(
                                 className="sr-only",
                                 id="chart-desc-edad",
                             ),
+                            create_legend_toggle("grafico-edad"),
                             dcc.Graph(
                                 id="grafico-edad",
                                 config={"displayModeBar": False},
-                                figure=fig_edad,
+                                figure=figures["grafico-edad"],
                             ),
                         ],
                         className="chart-card chart-small",
@@ -215,7 +255,7 @@ def create_diagnostics_section(
                             dcc.Graph(
                                 id="grafico-temporal",
                                 config={"displayModeBar": False},
-                                figure=fig_temporal,
+                                figure=figures["grafico-temporal"],
                             ),
                         ],
                         className="chart-card",
@@ -226,5 +266,6 @@ def create_diagnostics_section(
             ),
         ],
         className="section-container",
+        id=section_id("diagnosticos"),
         role="region",
     )
@@ -2,45 +2,41 @@
 Sección de análisis por sexo/género
 """
 
-from dash import html, dcc
+from dash import dash_table, html, dcc
 import pandas as pd
+from typing import Dict
 
 from ..components import (
     create_pie_chart,
     create_histogram,
     create_comparison_table,
+    create_section_toggle,
+    section_id,
+    create_legend_toggle,
 )
+from ..data.aggregations import count_cube
 from ..utils.helpers import format_number
 
 
-def create_gender_analysis_section(df: pd.DataFrame, theme: str = "light") -> html.Div:
+# Ids de los gráficos de la sección y de los que llevan botón de leyenda
+GRAPH_IDS = ["grafico-sexo-general", "grafico-diagnosticos-sexo"]
+LEGEND_GRAPH_IDS = ["grafico-sexo-general", "grafico-diagnosticos-sexo"]
+
+
+def create_gender_figures(df: pd.DataFrame, theme: str = "light") -> Dict[str, dict]:
     """
-    Crea la sección completa de análisis por sexo.
+    Construye las figuras de la sección de análisis por sexo.
 
     Args:
-        df: DataFrame con los datos de diagnóstico por sexo
+        df: DataFrame con los datos de diagnóstico por sexo (completo o filtrado)
         theme: Tema (dark/light)
 
     Returns:
-        html.Div: Sección de análisis por género
+        Dict: Id del gráfico -> figura
     """
-    # Estadísticas
-    total_masculino = len(df[df["sexo_label"] == "Masculino"]) if not df.empty else 0
-    total_femenino = len(df[df["sexo_label"] == "Femenino"]) if not df.empty else 0
-    diagnosticos_masculino = (
-        df[df["sexo_label"] == "Masculino"]["diagnostico_principal"].nunique()
-        if not df.empty
-        else 0
-    )
-    diagnosticos_femenino = (
-        df[df["sexo_label"] == "Femenino"]["diagnostico_principal"].nunique()
-        if not df.empty
-        else 0
-    )
-
     # Gráfico 1: Distribución general por sexo
     df_sexo = (
-        df["sexo_label"].value_counts().reset_index()
+        count_cube(df, "sexo_label").value_counts()
         if not df.empty
         else pd.DataFrame()
     )
@@ -58,21 +54,17 @@ def create_gender_analysis_section(df: pd.DataFrame, theme: str = "light") -> ht
         theme=theme,
     )
 
-    # Gráfico 2: Top diagnósticos por sexo
-    df_top_sexo = (
-        df[
-            df["diagnostico_principal"].isin(
-                df["diagnostico_principal"].value_counts().head(10).index
-            )
-        ]
-        if not df.empty
-        else pd.DataFrame()
+    # Gráfico 2: Top diagnósticos por sexo (conteos del dataset completo,
+    # limitados a los diez diagnósticos más frecuentes)
+    top_diagnosticos = (
+        count_cube(df, "diagnostico_principal").top_rows(10) if not df.empty else []
     )
 
     fig_diagnosticos_sexo = create_histogram(
-        df=df_top_sexo,
+        df=df if not df.empty else pd.DataFrame(),
         x="diagnostico_principal",
         color="sexo_label",
+        categories=top_diagnosticos,
         barmode="group",
         labels={
             "diagnostico_principal": "Diagnóstico",
@@ -83,12 +75,31 @@ def create_gender_analysis_section(df: pd.DataFrame, theme: str = "light") -> ht
             "Masculino": "#3b82f6",
             "Femenino": "#ec4899",
         },
+        category_orders={"sexo_label": ["Masculino", "Femenino"]},
         height=400,
         theme=theme,
     )
 
-    # Tabla comparativa
-    table_sexo = create_comparison_table(
+    return {
+        "grafico-sexo-general": fig_sexo,
+        "grafico-diagnosticos-sexo": fig_diagnosticos_sexo,
+    }
+
+
+def create_gender_table(
+    df: pd.DataFrame, theme: str = "light"
+) -> dash_table.DataTable:
+    """
+    Construye la tabla comparativa de diagnósticos por sexo.
+
+    Args:
+        df: DataFrame con los datos de diagnóstico por sexo (completo o filtrado)
+        theme: Tema (dark/light)
+
+    Returns:
+        dash_table.DataTable: Tabla comparativa
+    """
+    return create_comparison_table(
         df=df if not df.empty else pd.DataFrame(),
         index_col="diagnostico_principal",
         value_col="sexo_label",
@@ -96,8 +107,38 @@ def create_gender_analysis_section(df: pd.DataFrame, theme: str = "light") -> ht
         top_n=20,
         header_color="#6366f1",
         theme=theme,
+        id="tabla-comparativa-sexo",
     )
 
+
+def create_gender_analysis_section(df: pd.DataFrame, theme: str = "light") -> html.Div:
+    """
+    Crea la sección completa de análisis por sexo.
+
+    Args:
+        df: DataFrame con los datos de diagnóstico por sexo
+        theme: Tema (dark/light)
+
+    Returns:
+        html.Div: Sección de análisis por género
+    """
+    # Estadísticas
+    cube = (
+        count_cube(df, "diagnostico_principal", "sexo_label") if not df.empty else None
+    )
+    sexo = count_cube(df, "sexo_label") if not df.empty else None
+    total_masculino = (
+        sexo.count_where(lambda value: value == "Masculino") if sexo is not None else 0
+    )
+    total_femenino = (
+        sexo.count_where(lambda value: value == "Femenino") if sexo is not None else 0
+    )
+    diagnosticos_masculino = cube.distinct_rows("Masculino") if cube is not None else 0
+    diagnosticos_femenino = cube.distinct_rows("Femenino") if cube is not None else 0
+
+    figures = create_gender_figures(df, theme=theme)
+    table_sexo = create_gender_table(df, theme=theme)
+
     return html.Div(
         [
             html.Div(
@@ -110,7 +151,9 @@ def create_gender_analysis_section(df: pd.DataFrame, theme: str = "light") -> ht
                         "Distribución de diagnósticos y patrones diferenciados por sexo del paciente",
                         className="section-subtitle",
                     ),
+                    create_section_toggle("sexo"),
                 ],
+                className="section-header",
                 style={"marginBottom": "32px"},
             ),
             # Gráficos en grid
@@ -120,10 +163,11 @@ def create_gender_analysis_section(df: pd.DataFrame, theme: str = "light") -> ht
                     html.Div(
                         [
                             html.H4("Distribución General por Sexo"),
+                            create_legend_toggle("grafico-sexo-general"),
                             dcc.Graph(
                                 id="grafico-sexo-general",
                                 config={"displayModeBar": False},
-                                figure=fig_sexo,
+                                figure=figures["grafico-sexo-general"],
                             ),
                         ],
                         className="chart-card chart-small",
@@ -132,10 +176,11 @@ def create_gender_analysis_section(df: pd.DataFrame, theme: str = "light") -> ht
                     html.Div(
                         [
                             html.H4("Top 10 Diagnósticos por Sexo"),
+                            create_legend_toggle("grafico-diagnosticos-sexo"),
                             dcc.Graph(
                                 id="grafico-diagnosticos-sexo",
                                 config={"displayModeBar": False},
-                                figure=fig_diagnosticos_sexo,
+                                figure=figures["grafico-diagnosticos-sexo"],
                             ),
                         ],
                         className="chart-card chart-large",
@@ -158,5 +203,6 @@ def create_gender_analysis_section(df: pd.DataFrame, theme: str = "light") -> ht
             ),
         ],
         className="section-container",
+        id=section_id("sexo"),
         role="region",
     )
@@ -2,7 +2,10 @@
 Componente de encabezado del dashboard
 """
 
-from dash import html
+from dash import dcc, html
+
+from ..utils.config import Config
+from ..utils.themes import get_theme_templates
 
 
 def create_header() -> html.Div:
@@ -62,6 +65,16 @@ def create_header() -> html.Div:
                 className="dark-mode-toggle",
                 title="Cambiar tema",
             ),
+            # Estado del tema en el navegador: el servidor solo construye las
+            # figuras del tema por defecto y el cliente intercambia el template
+            dcc.Store(id="theme-store", storage_type="local", data=Config.DEFAULT_THEME),
+            dcc.Store(
+                id="theme-templates",
+                data={
+                    "default": Config.DEFAULT_THEME,
+                    "templates": get_theme_templates(),
+                },
+            ),
         ]
     )
 
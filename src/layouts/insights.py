@@ -5,7 +5,10 @@ Sección de insights y conclusiones
 from dash import html
 import pandas as pd
 
-from ..utils.helpers import calculate_percentage, format_number, get_mode_value
+from ..data.aggregations import column_stats, count_cube
+from ..data.sketches import distinct_count
+from ..data.spill import dataset_rows
+from ..utils.helpers import calculate_percentage, format_number
 
 
 def create_insights_section(
@@ -23,27 +26,27 @@ def create_insights_section(
         html.Div: Sección de insights
     """
     # Calcular insights
-    diagnosticos_unicos = (
-        df_diagnosticos["diagnostico_principal"].nunique()
-        if not df_diagnosticos.empty
-        else 0
-    )
+    diagnosticos_unicos = distinct_count(df_diagnosticos, "diagnostico_principal")
 
     casos_graves = (
-        (df_severidad["nivel_severidad_apr"] >= 3).sum()
+        count_cube(df_severidad, "nivel_severidad_apr").count_where(
+            lambda nivel: nivel >= 3
+        )
         if not df_severidad.empty
         else 0
     )
-    total_severidad = len(df_severidad) if not df_severidad.empty else 1
+    total_severidad = dataset_rows(df_severidad) if not df_severidad.empty else 1
     porcentaje_graves = calculate_percentage(casos_graves, total_severidad)
 
     rango_edad_predominante = (
-        get_mode_value(df_diagnosticos["rango_de_edad"])
+        count_cube(df_diagnosticos, "rango_de_edad").mode()
         if not df_diagnosticos.empty
         else "N/A"
     )
 
-    estancia_promedio = df_peso["estancia_dias"].mean() if not df_peso.empty else 0
+    estancia_promedio = (
+        column_stats(df_peso, "estancia_dias")["mean"] if not df_peso.empty else 0
+    )
 
     return html.Div(
         [
@@ -4,73 +4,99 @@ Componente de métricas principales (KPIs) del dashboard
 
 from dash import html
 import pandas as pd
+from typing import Dict
 
 from ..components import create_metrics_grid, get_metric_colors
+from ..data.aggregations import column_stats, count_cube
+from ..data.sketches import distinct_count
+from ..data.spill import dataset_rows
 from ..utils.helpers import format_number
 
 
-def create_main_metrics(
+# KPIs: (id del valor, título, subtítulo, icono, color)
+MAIN_METRICS = [
+    ("kpi-total-casos", "Total de Casos", "Registros analizados", "📊", "blue"),
+    ("kpi-estancia-media", "Estancia Media", "Días promedio", "⚕️", "green"),
+    ("kpi-casos-graves", "Casos Graves", "Severidad grave/extrema", "🔴", "red"),
+    ("kpi-diagnosticos", "Diagnósticos", "Condiciones únicas", "🏥", "purple"),
+]
+
+
+def compute_main_metric_values(
     df_diagnosticos: pd.DataFrame,
     df_peso_estancia: pd.DataFrame,
     df_severidad: pd.DataFrame,
-) -> html.Main:
+) -> Dict[str, str]:
     """
-    Crea el grid de métricas principales del dashboard.
+    Calcula los valores (ya formateados) de las métricas principales.
+
+    Se usa al montar el layout y al aplicar un filtro cruzado, que solo
+    actualiza estos textos.
 
     Args:
-        df_diagnosticos: DataFrame de diagnósticos
+        df_diagnosticos: DataFrame de diagnósticos (completo o filtrado)
         df_peso_estancia: DataFrame de peso y estancia
-        df_severidad: DataFrame de severidad y mortalidad
+        df_severidad: DataFrame de severidad y mortalidad (completo o filtrado)
 
     Returns:
-        html.Div: Grid de métricas principales
+        Dict: Id del valor -> texto
     """
-    # Calcular valores
-    total_casos = len(df_diagnosticos) if not df_diagnosticos.empty else 0
+    total_casos = dataset_rows(df_diagnosticos) if not df_diagnosticos.empty else 0
     estancia_media = (
-        df_peso_estancia["estancia_dias"].mean() if not df_peso_estancia.empty else 0
+        column_stats(df_peso_estancia, "estancia_dias")["mean"]
+        if not df_peso_estancia.empty
+        else 0
     )
     casos_graves = (
-        (df_severidad["nivel_severidad_apr"] >= 3).sum()
+        count_cube(df_severidad, "nivel_severidad_apr").count_where(
+            lambda nivel: nivel >= 3
+        )
         if not df_severidad.empty
         else 0
     )
-    diagnosticos_unicos = (
-        df_diagnosticos["diagnostico_principal"].nunique()
-        if not df_diagnosticos.empty
-        else 0
+    diagnosticos_unicos = distinct_count(df_diagnosticos, "diagnostico_principal")
+
+    return {
+        "kpi-total-casos": format_number(total_casos),
+        "kpi-estancia-media": (
+            f"{estancia_media:.1f}" if estancia_media > 0 else "N/A"
+        ),
+        "kpi-casos-graves": format_number(casos_graves),
+        "kpi-diagnosticos": format_number(diagnosticos_unicos),
+    }
+
+
+def create_main_metrics(
+    df_diagnosticos: pd.DataFrame,
+    df_peso_estancia: pd.DataFrame,
+    df_severidad: pd.DataFrame,
+) -> html.Main:
+    """
+    Crea el grid de métricas principales del dashboard.
+
+    Args:
+        df_diagnosticos: DataFrame de diagnósticos
+        df_peso_estancia: DataFrame de peso y estancia
+        df_severidad: DataFrame de severidad y mortalidad
+
+    Returns:
+        html.Div: Grid de métricas principales
+    """
+    values = compute_main_metric_values(
+        df_diagnosticos, df_peso_estancia, df_severidad
     )
 
     # Definir métricas
     metrics = [
         {
-            "title": "Total de Casos",
-            "value": format_number(total_casos),
-            "subtitle": "Registros analizados",
-            "icon": "📊",
-            **get_metric_colors("blue"),
-        },
-        {
-            "title": "Estancia Media",
-            "value": f"{estancia_media:.1f}" if estancia_media > 0 else "N/A",
-            "subtitle": "Días promedio",
-            "icon": "⚕️",
-            **get_metric_colors("green"),
-        },
-        {
-            "title": "Casos Graves",
-            "value": format_number(casos_graves),
-            "subtitle": "Severidad grave/extrema",
-            "icon": "🔴",
-            **get_metric_colors("red"),
-        },
-        {
-            "title": "Diagnósticos",
-            "value": format_number(diagnosticos_unicos),
-            "subtitle": "Condiciones únicas",
-            "icon": "🏥",
-            **get_metric_colors("purple"),
-        },
+            "title": title,
+            "value": values[value_id],
+            "subtitle": subtitle,
+            "icon": icon,
+            "value_id": value_id,
+            **get_metric_colors(color),
+        }
+        for value_id, title, subtitle, icon, color in MAIN_METRICS
     ]
 
     return html.Main(
@@ -0,0 +1,48 @@
+"""
+Control de actualización de datos en segundo plano
+"""
+
+from dash import html
+
+from ..data import DataLoader
+from ..utils.jobs import get_background_manager
+
+
+def create_refresh_control() -> html.Div:
+    """
+    Crea el botón de actualización de datos con su barra de progreso.
+
+    La descarga se ejecuta como trabajo en segundo plano y muestra el avance
+    por dataset; si el gestor de trabajos no está disponible, el botón se
+    muestra deshabilitado.
+
+    Returns:
+        html.Div: Control de actualización
+    """
+    available = get_background_manager() is not None
+    return html.Div(
+        [
+            html.Button(
+                "Actualizar datos",
+                id="refresh-button",
+                className="refresh-button",
+                disabled=not available,
+                title=(
+                    "Descargar de nuevo todos los datos"
+                    if available
+                    else "Requiere instalar dash[diskcache]"
+                ),
+            ),
+            html.Progress(
+                id="refresh-progress",
+                value="0",
+                max=str(len(DataLoader.DATASETS)),
+                className="refresh-progress",
+            ),
+            html.Span(id="refresh-progress-label", className="refresh-label"),
+            html.Span(id="refresh-status", className="refresh-label"),
+        ],
+        className="refresh-control",
+        role="status",
+        **{"aria-live": "polite"},
+    )
@@ -2,58 +2,63 @@
 Sección de análisis de severidad y mortalidad APR
 """
 
-from dash import html, dcc
+from dash import dash_table, html, dcc
 import pandas as pd
+from typing import Dict
 
 from ..components import (
     create_pie_chart,
     create_histogram,
     create_heatmap,
     create_crosstab_table,
+    create_section_toggle,
+    section_id,
+    create_legend_toggle,
 )
-from ..utils.helpers import format_number, get_mode_value
+from ..data.aggregations import count_cube
+from ..data.spill import dataset_rows
+from ..utils.helpers import format_number
 
 
-def create_severity_section(df: pd.DataFrame, theme: str = "light") -> html.Div:
+# Ids de los gráficos de la sección y de los que llevan botón de leyenda
+GRAPH_IDS = [
+    "grafico-severidad-dist",
+    "grafico-mortalidad-dist",
+    "grafico-severidad-mortalidad-heatmap",
+]
+LEGEND_GRAPH_IDS = ["grafico-severidad-dist", "grafico-mortalidad-dist"]
+
+
+# Mapeo de colores
+COLOR_MAP_SEVERIDAD = {
+    "Leve": "#22c55e",
+    "Moderado": "#eab308",
+    "Grave": "#f97316",
+    "Extremo": "#dc2626",
+}
+
+COLOR_MAP_MORTALIDAD = {
+    "Bajo": "#22c55e",
+    "Moderado": "#eab308",
+    "Alto": "#f97316",
+    "Extremo": "#dc2626",
+}
+
+
+def create_severity_figures(df: pd.DataFrame, theme: str = "light") -> Dict[str, dict]:
     """
-    Crea la sección completa de análisis de severidad y mortalidad.
+    Construye las figuras de la sección de severidad y mortalidad.
 
     Args:
-        df: DataFrame con los datos de severidad y mortalidad
+        df: DataFrame con los datos de severidad y mortalidad (completo o filtrado)
         theme: Tema (dark/light)
 
     Returns:
-        html.Div: Sección de severidad
+        Dict: Id del gráfico -> figura
     """
-    # Estadísticas
-    total_casos = len(df) if not df.empty else 0
-    severidad_comun = get_mode_value(df["severidad_label"]) if not df.empty else "N/A"
-    mortalidad_comun = get_mode_value(df["mortalidad_label"]) if not df.empty else "N/A"
-    casos_extremos_severidad = (
-        len(df[df["severidad_label"] == "Extremo"]) if not df.empty else 0
-    )
-    casos_extremos_mortalidad = (
-        len(df[df["mortalidad_label"] == "Extremo"]) if not df.empty else 0
-    )
-
-    # Mapeo de colores
-    color_map_severidad = {
-        "Leve": "#22c55e",
-        "Moderado": "#eab308",
-        "Grave": "#f97316",
-        "Extremo": "#dc2626",
-    }
-
-    color_map_mortalidad = {
-        "Bajo": "#22c55e",
-        "Moderado": "#eab308",
-        "Alto": "#f97316",
-        "Extremo": "#dc2626",
-    }
-
     # Gráfico 1: Distribución de severidad
     df_severidad = (
-        df["severidad_label"].value_counts().reset_index()
+        count_cube(df, "severidad_label").value_counts()
         if not df.empty
         else pd.DataFrame()
     )
@@ -63,7 +68,7 @@ def create_severity_section(df: pd.DataFrame, theme: str = "light") -> html.Div:
         values="count",
         names="severidad_label",
         color_discrete_sequence=[
-            color_map_severidad.get(cat, "#94a3b8")
+            COLOR_MAP_SEVERIDAD.get(cat, "#94a3b8")
             for cat in ["Leve", "Moderado", "Grave", "Extremo"]
         ],
         height=400,
@@ -72,7 +77,7 @@ def create_severity_section(df: pd.DataFrame, theme: str = "light") -> html.Div:
 
     # Gráfico 2: Distribución de mortalidad
     df_mortalidad = (
-        df["mortalidad_label"].value_counts().reset_index()
+        count_cube(df, "mortalidad_label").value_counts()
         if not df.empty
         else pd.DataFrame()
     )
@@ -82,7 +87,7 @@ def create_severity_section(df: pd.DataFrame, theme: str = "light") -> html.Div:
         values="count",
         names="mortalidad_label",
         color_discrete_sequence=[
-            color_map_mortalidad.get(cat, "#94a3b8")
+            COLOR_MAP_MORTALIDAD.get(cat, "#94a3b8")
             for cat in ["Bajo", "Moderado", "Alto", "Extremo"]
         ],
         height=400,
@@ -107,6 +112,67 @@ def create_severity_section(df: pd.DataFrame, theme: str = "light") -> html.Div:
         theme=theme,
     )
 
+    return {
+        "grafico-severidad-dist": fig_severidad,
+        "grafico-mortalidad-dist": fig_mortalidad,
+        "grafico-severidad-mortalidad-heatmap": fig_heatmap,
+    }
+
+
+def create_severity_table(
+    df: pd.DataFrame, theme: str = "light"
+) -> dash_table.DataTable:
+    """
+    Construye la tabla de contingencia severidad × mortalidad.
+
+    Args:
+        df: DataFrame con los datos de severidad y mortalidad (completo o filtrado)
+        theme: Tema (dark/light)
+
+    Returns:
+        dash_table.DataTable: Tabla de contingencia
+    """
+    return create_crosstab_table(
+        df=df if not df.empty else pd.DataFrame(),
+        row_col="severidad_label",
+        col_col="mortalidad_label",
+        margins=True,
+        margins_name="Total",
+        theme=theme,
+        id="tabla-contingencia-severidad",
+    )
+
+
+def create_severity_section(df: pd.DataFrame, theme: str = "light") -> html.Div:
+    """
+    Crea la sección completa de análisis de severidad y mortalidad.
+
+    Args:
+        df: DataFrame con los datos de severidad y mortalidad
+        theme: Tema (dark/light)
+
+    Returns:
+        html.Div: Sección de severidad
+    """
+    # Estadísticas
+    total_casos = dataset_rows(df) if not df.empty else 0
+    severidad = count_cube(df, "severidad_label") if not df.empty else None
+    mortalidad = count_cube(df, "mortalidad_label") if not df.empty else None
+    severidad_comun = severidad.mode() if severidad is not None else "N/A"
+    mortalidad_comun = mortalidad.mode() if mortalidad is not None else "N/A"
+    casos_extremos_severidad = (
+        severidad.count_where(lambda value: value == "Extremo")
+        if severidad is not None
+        else 0
+    )
+    casos_extremos_mortalidad = (
+        mortalidad.count_where(lambda value: value == "Extremo")
+        if mortalidad is not None
+        else 0
+    )
+
+    figures = create_severity_figures(df, theme=theme)
+
     # Gráfico 4: Barras agrupadas
     fig_bars = create_histogram(
         df=df if not df.empty else pd.DataFrame(),
@@ -118,7 +184,7 @@ def create_severity_section(df: pd.DataFrame, theme: str = "light") -> html.Div:
             "mortalidad_label": "Riesgo de Mortalidad",
             "count": "Número de Casos",
         },
-        color_discrete_map=color_map_mortalidad,
+        color_discrete_map=COLOR_MAP_MORTALIDAD,
         category_orders={
             "severidad_label": ["Leve", "Moderado", "Grave", "Extremo"],
             "mortalidad_label": ["Bajo", "Moderado", "Alto", "Extremo"],
@@ -127,15 +193,7 @@ def create_severity_section(df: pd.DataFrame, theme: str = "light") -> html.Div:
         theme=theme,
     )
 
-    # Tabla de contingencia
-    table_crosstab = create_crosstab_table(
-        df=df if not df.empty else pd.DataFrame(),
-        row_col="severidad_label",
-        col_col="mortalidad_label",
-        margins=True,
-        margins_name="Total",
-        theme=theme,
-    )
+    table_crosstab = create_severity_table(df, theme=theme)
 
     return html.Div(
         [
@@ -149,7 +207,9 @@ def create_severity_section(df: pd.DataFrame, theme: str = "light") -> html.Div:
                         "Evaluación de la gravedad clínica y correlación con el riesgo de mortalidad",
                         className="section-subtitle",
                     ),
+                    create_section_toggle("severidad"),
                 ],
+                className="section-header",
                 style={"marginBottom": "32px"},
             ),
             # Gráficos en grid
@@ -158,10 +218,11 @@ def create_severity_section(df: pd.DataFrame, theme: str = "light") -> html.Div:
                     html.Div(
                         [
                             html.H4("Distribución de Niveles de Severidad"),
+                            create_legend_toggle("grafico-severidad-dist"),
                             dcc.Graph(
                                 id="grafico-severidad-dist",
                                 config={"displayModeBar": False},
-                                figure=fig_severidad,
+                                figure=figures["grafico-severidad-dist"],
                             ),
                         ],
                         className="chart-card chart-small",
@@ -169,10 +230,11 @@ def create_severity_section(df: pd.DataFrame, theme: str = "light") -> html.Div:
                     html.Div(
                         [
                             html.H4("Distribución de Riesgo de Mortalidad"),
+                            create_legend_toggle("grafico-mortalidad-dist"),
                             dcc.Graph(
                                 id="grafico-mortalidad-dist",
                                 config={"displayModeBar": False},
-                                figure=fig_mortalidad,
+                                figure=figures["grafico-mortalidad-dist"],
                             ),
                         ],
                         className="chart-card chart-small",
@@ -191,7 +253,7 @@ def create_severity_section(df: pd.DataFrame, theme: str = "light") -> html.Div:
                             dcc.Graph(
                                 id="grafico-severidad-mortalidad-heatmap",
                                 config={"displayModeBar": False},
-                                figure=fig_heatmap,
+                                figure=figures["grafico-severidad-mortalidad-heatmap"],
                             ),
                         ],
                         className="chart-card",
@@ -214,5 +276,6 @@ def create_severity_section(df: pd.DataFrame, theme: str = "light") -> html.Div:
             ),
         ],
         className="section-container",
+        id=section_id("severidad"),
         role="region",
     )
@@ -5,9 +5,193 @@ Sección de análisis de peso APR-GRD y estancia hospitalaria
 from dash import html, dcc
 import pandas as pd
 
-from ..components import create_scatter_chart, create_data_table
+from ..components import (
+    create_scatter_chart,
+    create_trendline_traces,
+    create_quantile_box_chart,
+    create_data_table,
+    create_section_toggle,
+    section_id,
+)
+from ..data.aggregations import column_stats
+from ..data.outliers import OUTLIER_METHOD_LABELS, detect_outliers
+from ..data.quantiles import WEIGHT_BAND_LABELS, WEIGHT_BANDS, stay_by_weight_band
+from ..data.regression import METHOD_LABELS, METHODS, fit_regression
+from ..data.spill import dataset_rows
 from ..utils.helpers import format_number
 
+# Posición de la capa de estancias atípicas en el gráfico de dispersión (justo
+# después de los puntos; los callbacks la sustituyen con un parche)
+OUTLIER_LAYER_INDEX = 1
+
+# Puntos de la capa de atípicos (los más extremos)
+_OUTLIER_LAYER_POINTS = 2000
+
+# Criterio de atípicos inicial
+DEFAULT_OUTLIER_METHOD = "mad"
+
+# Método de la recta del gráfico de dispersión
+TRENDLINE_METHOD = "theil_sen"
+
+
+# Ids de los gráficos de la sección y de los que llevan botón de leyenda
+GRAPH_IDS = ["grafico-peso-estancia", "grafico-estancia-percentiles"]
+LEGEND_GRAPH_IDS = []
+
+
+def create_stay_percentiles_table(df: pd.DataFrame, theme: str = "light"):
+    """
+    Crea la tabla de percentiles de estancia por banda de peso.
+
+    Args:
+        df: DataFrame con los datos de peso y estancia
+        theme: Tema (dark/light)
+
+    Returns:
+        dash_table.DataTable: Casos, media y p50/p90/p99 de estancia por banda
+    """
+    summary = (
+        stay_by_weight_band(df).summary(order=WEIGHT_BAND_LABELS)
+        if not df.empty
+        else pd.DataFrame()
+    )
+    if not summary.empty:
+        summary = summary[["grupo", "casos", "media", "p50", "p90", "p99"]].round(1)
+
+    return create_data_table(
+        df=summary,
+        id="tabla-estancia-percentiles",
+        columns=[
+            {"name": "Peso APR-GRD", "id": "grupo"},
+            {"name": "Casos", "id": "casos"},
+            {"name": "Media (días)", "id": "media"},
+            {"name": "P50", "id": "p50"},
+            {"name": "P90", "id": "p90"},
+            {"name": "P99", "id": "p99"},
+        ],
+        page_size=len(WEIGHT_BAND_LABELS),
+        page_action="none",
+        theme=theme,
+    )
+
+
+def create_outlier_layer(df: pd.DataFrame, method: str) -> dict:
+    """
+    Crea la capa que resalta las estancias atípicas en el gráfico de
+    dispersión.
+
+    Args:
+        df: DataFrame con los datos de peso y estancia
+        method: Criterio de atípicos
+
+    Returns:
+        dict: Traza con las estancias más extremas del criterio
+    """
+    outliers = detect_outliers(df, method).head(_OUTLIER_LAYER_POINTS)
+    return {
+        "type": "scattergl",
+        "mode": "markers",
+        "name": "Estancias atípicas",
+        "x": outliers["peso_espanol_apr"].to_numpy(),
+        "y": outliers["estancia_dias"].to_numpy(),
+        "customdata": outliers[["esperado", "puntuacion"]].to_numpy(),
+        "marker": {
+            "symbol": "circle-open",
+            "size": 9,
+            "color": "#ef4444",
+            "line": {"width": 2},
+        },
+        "hovertemplate": (
+            "Peso: %{x:.3f}<br>Estancia: %{y} días<br>"
+            "Esperado: %{customdata[0]} días<br>"
+            "Puntuación: %{customdata[1]}<extra>Atípica</extra>"
+        ),
+    }
+
+
+def create_outlier_table(df: pd.DataFrame, method: str, theme: str = "light"):
+    """
+    Crea la tabla de estancias atípicas (paginada y filtrada en el servidor).
+
+    Args:
+        df: DataFrame con los datos de peso y estancia
+        method: Criterio de atípicos
+        theme: Tema (dark/light)
+
+    Returns:
+        dash_table.DataTable: Estancias marcadas, de más a menos extremas
+    """
+    return create_data_table(
+        df=detect_outliers(df, method) if not df.empty else pd.DataFrame(),
+        id="tabla-estancias-atipicas",
+        columns=[
+            {"name": "Banda de peso", "id": "banda"},
+            {"name": "Peso APR-GRD", "id": "peso_espanol_apr"},
+            {"name": "Estancia (días)", "id": "estancia_dias"},
+            {"name": "Esperado (días)", "id": "esperado"},
+            {"name": "Límite (días)", "id": "limite"},
+            {"name": "Exceso (días)", "id": "exceso"},
+            {"name": "Puntuación", "id": "puntuacion"},
+        ],
+        page_size=10,
+        page_action="custom",
+        sort_action="custom",
+        filter_action="custom",
+        theme=theme,
+    )
+
+
+def create_trendline(df: pd.DataFrame) -> list:
+    """
+    Crea la recta ajustada del gráfico de dispersión (se añade con un parche
+    tras cargar la página, ver `create_regression_summary`).
+
+    Args:
+        df: DataFrame con los datos de peso y estancia
+
+    Returns:
+        list: Trazas de la recta y su banda de confianza del 95%
+    """
+    return create_trendline_traces(
+        df, TRENDLINE_METHOD, "peso_espanol_apr", "estancia_dias"
+    )
+
+
+def create_regression_summary(df: pd.DataFrame) -> html.P:
+    """
+    Crea el resumen de las rectas ajustadas de estancia sobre peso.
+
+    Los ajustes (con su bootstrap) no se calculan al construir el layout: un
+    callback rellena el resumen y añade la recta al gráfico al cargar la
+    página, y los ajustes quedan cacheados por versión de los datos.
+
+    Args:
+        df: DataFrame con los datos de peso y estancia
+
+    Returns:
+        html.P: Pendiente e intervalo de confianza del 95% por método
+    """
+    parts = []
+    for method in METHODS:
+        fit = fit_regression(df, method) if not df.empty else None
+        if fit is None:
+            continue
+        low, high = fit.interval()["slope"]
+        parts.append(
+            f"{METHOD_LABELS[method]}: {fit.slope:.2f} "
+            f"(IC 95%: {low:.2f} – {high:.2f})"
+        )
+
+    if not parts:
+        return html.P(
+            "Sin datos suficientes para ajustar la recta", className="chart-note"
+        )
+
+    return html.P(
+        "Días de estancia por punto de peso APR-GRD · " + " · ".join(parts),
+        className="chart-note",
+    )
+
 
 def create_weight_stay_section(df: pd.DataFrame, theme: str = "light") -> html.Div:
     """
@@ -21,11 +205,13 @@ def create_weight_stay_section(df: pd.DataFrame, theme: str = "light") -> html.D
         html.Div: Sección de peso y estancia
     """
     # Estadísticas
-    total_registros = len(df) if not df.empty else 0
-    peso_promedio = df["peso_espanol_apr"].mean() if not df.empty else 0
-    estancia_promedio = df["estancia_dias"].mean() if not df.empty else 0
-    estancia_max = df["estancia_dias"].max() if not df.empty else 0
-    estancia_min = df["estancia_dias"].min() if not df.empty else 0
+    peso = column_stats(df, "peso_espanol_apr") if not df.empty else None
+    estancia = column_stats(df, "estancia_dias") if not df.empty else None
+    total_registros = dataset_rows(df) if not df.empty else 0
+    peso_promedio = peso["mean"] if peso is not None else 0
+    estancia_promedio = estancia["mean"] if estancia is not None else 0
+    estancia_max = estancia["max"] if estancia is not None else 0
+    estancia_min = estancia["min"] if estancia is not None else 0
 
     # Gráfico de dispersión
     fig_scatter = create_scatter_chart(
@@ -47,15 +233,40 @@ def create_weight_stay_section(df: pd.DataFrame, theme: str = "light") -> html.D
         height=400,
         theme=theme,
     )
+    if not df.empty:
+        # Copia: la figura puede venir de la caché de figuras
+        data = list(fig_scatter["data"])
+        layer = create_outlier_layer(df, DEFAULT_OUTLIER_METHOD)
+        data.insert(OUTLIER_LAYER_INDEX, layer)
+        fig_scatter = {**fig_scatter, "data": data}
 
-    # Tabla de datos
+    # Distribución de la estancia por banda de peso (resúmenes t-digest)
+    fig_percentiles = create_quantile_box_chart(
+        df=df if not df.empty else pd.DataFrame(),
+        value="estancia_dias",
+        group="peso_espanol_apr",
+        bins=WEIGHT_BANDS,
+        bin_labels=WEIGHT_BAND_LABELS,
+        labels={
+            "peso_espanol_apr": "Peso APR-GRD Español",
+            "estancia_dias": "Días de Estancia",
+        },
+        height=400,
+        theme=theme,
+    )
+
+    # Tabla de datos (paginada, ordenada y filtrada en el servidor)
     table_peso = create_data_table(
         df=df if not df.empty else pd.DataFrame(),
+        id="tabla-peso-estancia",
         columns=[
             {"name": "Peso APR-GRD Español", "id": "peso_espanol_apr"},
             {"name": "Estancia (días)", "id": "estancia_dias"},
         ],
         page_size=10,
+        page_action="custom",
+        sort_action="custom",
+        filter_action="custom",
         theme=theme,
         style_header={
             "backgroundColor": "#2563eb",
@@ -78,7 +289,9 @@ def create_weight_stay_section(df: pd.DataFrame, theme: str = "light") -> html.D
                         "Correlación entre el peso APR-GRD español y los días de estancia hospitalaria",
                         className="section-subtitle",
                     ),
+                    create_section_toggle("peso_estancia"),
                 ],
+                className="section-header",
                 style={"marginBottom": "32px"},
             ),
             # Gráfico de dispersión
@@ -94,6 +307,77 @@ def create_weight_stay_section(df: pd.DataFrame, theme: str = "light") -> html.D
                                 config={"displayModeBar": False},
                                 figure=fig_scatter,
                             ),
+                            html.Div(
+                                html.P(
+                                    "Ajustando la recta de estancia sobre peso…",
+                                    className="chart-note",
+                                ),
+                                id="resumen-regresion",
+                                **{"aria-live": "polite"},
+                            ),
+                        ],
+                        className="chart-card",
+                    )
+                ],
+                style={"margin": "0 24px 32px 24px"},
+            ),
+            # Distribución de la estancia por banda de peso
+            html.Div(
+                [
+                    html.Div(
+                        [
+                            html.H4("Distribución de la Estancia por Peso APR-GRD"),
+                            html.Div(
+                                "Diagrama de cajas de los días de estancia por banda "
+                                "de peso: caja entre los percentiles 25 y 75, mediana, "
+                                "bigotes en los percentiles 1 y 99 y marcador en el "
+                                "percentil 90",
+                                className="sr-only",
+                            ),
+                            dcc.Graph(
+                                id="grafico-estancia-percentiles",
+                                config={"displayModeBar": False},
+                                figure=fig_percentiles,
+                            ),
+                        ],
+                        className="chart-card",
+                    ),
+                    html.Div(
+                        [
+                            html.H4("Percentiles de Estancia por Peso APR-GRD"),
+                            create_stay_percentiles_table(df, theme=theme),
+                        ],
+                        className="chart-card",
+                    ),
+                ],
+                className="charts-grid",
+                style={"margin": "0 24px 32px 24px"},
+            ),
+            # Estancias atípicas
+            html.Div(
+                [
+                    html.Div(
+                        [
+                            html.H4("Estancias Atípicas"),
+                            dcc.RadioItems(
+                                id="metodo-atipicos",
+                                options=[
+                                    {"label": label, "value": method}
+                                    for method, label in OUTLIER_METHOD_LABELS.items()
+                                ],
+                                value=DEFAULT_OUTLIER_METHOD,
+                                inline=True,
+                                className="outlier-method",
+                            ),
+                            html.P(
+                                "Estancias muy por encima de lo esperado para su "
+                                "peso APR-GRD, resaltadas en el gráfico de "
+                                "dispersión",
+                                className="chart-note",
+                            ),
+                            create_outlier_table(
+                                df, DEFAULT_OUTLIER_METHOD, theme=theme
+                            ),
                         ],
                         className="chart-card",
                     )
@@ -115,5 +399,6 @@ def create_weight_stay_section(df: pd.DataFrame, theme: str = "light") -> html.D
             ),
         ],
         className="section-container",
+        id=section_id("peso_estancia"),
         role="region",
     )
@@ -0,0 +1,7 @@
+"""
+HTTP routes registered on the Flask server (app.server)
+"""
+
+from .exports import setup_export_routes
+
+__all__ = ["setup_export_routes"]
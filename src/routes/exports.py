@@ -0,0 +1,169 @@
+"""
+Rutas de exportación de datasets (CSV y Parquet en streaming).
+
+    GET /api/export/<dataset>.<formato>?filter=...&sort=...&columns=...
+
+- `dataset`: nombre público del dataset (`DataLoader.DATASETS`)
+- `formato`: csv o parquet
+- `filter`: expresión `filter_query` de DataTable (opcional; si no es válida,
+  la respuesta es un 400 en lugar del dataset sin filtrar)
+- `sort`: ordenación `columna:asc,columna:desc` (opcional)
+- `columns`: columnas separadas por comas (opcional)
+
+La respuesta se genera por bloques desde el DataFrame cacheado (o, en modo
+fuera de memoria, desde los fragmentos del dataset completo). Incluye ETag
+(versión de los datos + parámetros), admite `If-None-Match` y comprime en gzip
+el CSV cuando el cliente lo acepta. El tamaño de cada exportación se recuerda
+al terminar de enviarla, así que las descargas repetidas llevan
+`Content-Length`.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from ..data import get_data_loader
+from ..data.exports import (
+    EXPORT_FORMATS,
+    gzip_stream,
+    iter_csv,
+    iter_parquet,
+    iter_view,
+    parquet_available,
+)
+from ..data.filter_query import compile_filter_query
+from ..data.versioning import compute_fingerprint, get_dataset_version
+from ..utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+# ETag -> tamaño en bytes de la respuesta completa (para Content-Length)
+_EXPORT_SIZES_MAX = 256
+_export_sizes: "OrderedDict[str, int]" = OrderedDict()
+_sizes_lock = threading.Lock()
+
+
+def _parse_sort(sort: Optional[str]) -> List[Dict[str, str]]:
+    """
+    Convierte `columna:asc,columna:desc` al formato `sort_by` de DataTable.
+
+    Args:
+        sort: Parámetro de ordenación
+
+    Returns:
+        list: Lista de {"column_id", "direction"}
+    """
+    sort_by = []
+    for item in (sort or "").split(","):
+        if not item.strip():
+            continue
+        column, _, direction = item.strip().partition(":")
+        sort_by.append(
+            {"column_id": column, "direction": "desc" if direction == "desc" else "asc"}
+        )
+    return sort_by
+
+
+def _make_etag(version: str, **params) -> str:
+    """Calcula el ETag de una exportación a partir de la versión y los parámetros"""
+    payload = json.dumps({"version": version, **params}, sort_keys=True)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def _remember_size(etag: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Reenvía los fragmentos y, si el envío termina, guarda el tamaño total"""
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+        yield chunk
+
+    with _sizes_lock:
+        _export_sizes[etag] = size
+        while len(_export_sizes) > _EXPORT_SIZES_MAX:
+            _export_sizes.popitem(last=False)
+
+
+def setup_export_routes(server):
+    """
+    Configura las rutas de exportación en el servidor Flask.
+
+    Args:
+        server: Instancia del servidor Flask (app.server en Dash)
+    """
+    from flask import Response, abort, request, stream_with_context
+
+    @server.route("/api/export/<dataset>.<fmt>", methods=["GET"])
+    def export_dataset(dataset: str, fmt: str):
+        """Descarga un dataset (o una vista filtrada) en CSV o Parquet"""
+        if fmt not in EXPORT_FORMATS:
+            abort(404)
+        if fmt == "parquet" and not parquet_available():
+            abort(501, description="La exportación a Parquet requiere pyarrow")
+
+        try:
+            df = get_data_loader().fetch_dataset(dataset)
+        except KeyError:
+            abort(404)
+
+        filter_query = request.args.get("filter", "")
+        sort_by = _parse_sort(request.args.get("sort"))
+        columns = [c for c in request.args.get("columns", "").split(",") if c]
+        requested = columns + [item["column_id"] for item in sort_by]
+        unknown = [c for c in requested if c not in df.columns]
+        if unknown:
+            abort(400, description=f"Columnas desconocidas: {', '.join(unknown)}")
+        # Un filtro no válido es un error: DataTable lo ignora, pero exportar el
+        # dataset completo en su lugar no es lo que se ha pedido
+        if filter_query.strip():
+            try:
+                compile_filter_query(filter_query.strip())
+            except ValueError as e:
+                abort(400, description=f"Filtro no válido: {e}")
+
+        use_gzip = fmt == "csv" and "gzip" in request.accept_encodings
+        etag = _make_etag(
+            get_dataset_version(df) or compute_fingerprint(df),
+            fmt=fmt,
+            filter=filter_query,
+            sort=sort_by,
+            columns=columns,
+            gzip=use_gzip,
+        )
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+        try:
+            rows = iter_view(
+                df, sort_by, filter_query, columns or None, Config.EXPORT_CHUNK_ROWS
+            )
+        except ValueError as e:
+            abort(501, description=str(e))
+        writer = iter_csv if fmt == "csv" else iter_parquet
+        chunks = writer(df, rows, columns or None)
+        if use_gzip:
+            chunks = gzip_stream(chunks)
+
+        with _sizes_lock:
+            size = _export_sizes.get(etag)
+
+        response = Response(
+            stream_with_context(_remember_size(etag, chunks)),
+            content_type=EXPORT_FORMATS[fmt],
+        )
+        response.set_etag(etag)
+        response.headers["Content-Disposition"] = (
+            f'attachment; filename="{dataset}.{fmt}"'
+        )
+        response.headers["Vary"] = "Accept-Encoding"
+        if use_gzip:
+            response.headers["Content-Encoding"] = "gzip"
+        if size is not None:
+            response.content_length = size
+
+        logger.info(f"Export {dataset}.{fmt}: filter={filter_query!r}, sort={sort_by}")
+        return response
@@ -3,13 +3,14 @@ Utility functions and configuration
 """
 
 from .config import Config
-from .themes import apply_theme, get_theme_colors
+from .themes import apply_theme, get_theme_colors, get_theme_templates
 from .helpers import format_number, safe_division, get_mode_value
 
 __all__ = [
     "Config",
     "apply_theme",
     "get_theme_colors",
+    "get_theme_templates",
     "format_number",
     "safe_division",
     "get_mode_value",
@@ -4,6 +4,7 @@ Carga y valida las variables de entorno necesarias.
 """
 
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Cargar variables de entorno
@@ -26,6 +27,64 @@ class Config:
     # Data Configuration
     DEFAULT_LIMIT = int(os.getenv("DEFAULT_LIMIT", "20000"))
     CACHE_TIMEOUT = int(os.getenv("CACHE_TIMEOUT", "300"))  # 5 minutes default
+    PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "2"))  # procesos de decodificación
+
+    # Sketch Configuration
+    SKETCH_CAPACITY = int(os.getenv("SKETCH_CAPACITY", "1024"))  # top-K counters
+
+    # Statistics Configuration
+    BOOTSTRAP_RESAMPLES = int(os.getenv("BOOTSTRAP_RESAMPLES", "200"))
+    REGRESSION_SAMPLE_ROWS = int(os.getenv("REGRESSION_SAMPLE_ROWS", "20000"))
+    STATS_WORKERS = int(os.getenv("STATS_WORKERS", "2"))  # procesos del bootstrap
+    OUTLIER_IQR_FACTOR = float(os.getenv("OUTLIER_IQR_FACTOR", "1.5"))  # Q3 + k·IQR
+    OUTLIER_Z_THRESHOLD = float(os.getenv("OUTLIER_Z_THRESHOLD", "3.5"))  # z robusta
+
+    # Figure Cache Configuration
+    FIGURE_CACHE_MAX_ENTRIES = int(os.getenv("FIGURE_CACHE_MAX_ENTRIES", "256"))
+    FIGURE_CACHE_MAX_BYTES = int(
+        os.getenv("FIGURE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+    )  # 64 MB default
+    CALLBACK_CACHE_TTL = int(os.getenv("CALLBACK_CACHE_TTL", "300"))  # 5 minutes default
+
+    # Background Refresh Configuration
+    REFRESH_DIR = os.getenv(
+        "REFRESH_DIR", os.path.join(tempfile.gettempdir(), "hospital-dashboard")
+    )  # generaciones publicadas y trabajos en segundo plano
+    SHARED_DATASETS = (
+        os.getenv("SHARED_DATASETS", "False").lower() == "true"
+    )  # generaciones en memoria compartida (los workers no copian las columnas)
+    REFRESH_SCHEDULER = (
+        os.getenv("REFRESH_SCHEDULER", "False").lower() == "true"
+    )  # un worker elegido actualiza los datos y el resto adopta su generación
+    REFRESH_INTERVALS = os.getenv(
+        "REFRESH_INTERVALS", ""
+    )  # "dataset=segundos,..." (los no indicados usan CACHE_TIMEOUT)
+    REFRESH_JITTER = float(os.getenv("REFRESH_JITTER", "0.1"))  # fracción al azar
+    REFRESH_LEASE_SECONDS = int(
+        os.getenv("REFRESH_LEASE_SECONDS", "60")
+    )  # caducidad del arrendamiento del worker que actualiza
+
+    # Analytical Store Configuration
+    ANALYTICAL_STORE_PATH = os.getenv(
+        "ANALYTICAL_STORE_PATH", ""
+    )  # fichero DuckDB con la réplica de las vistas (vacío = desactivado)
+
+    # Compute Backend Configuration
+    COMPUTE_BACKEND = os.getenv(
+        "COMPUTE_BACKEND", "pandas"
+    ).lower()  # motor de carga y agregación: pandas, arrow o polars
+
+    # Out-of-Core Configuration
+    OUT_OF_CORE = (
+        os.getenv("OUT_OF_CORE", "False").lower() == "true"
+    )  # páginas troceadas en disco; en memoria solo muestra y agregados
+    WORKER_MEMORY_MB = int(os.getenv("WORKER_MEMORY_MB", "512"))  # límite por worker
+    SPILL_DIR = os.getenv(
+        "SPILL_DIR", os.path.join(REFRESH_DIR, "spill")
+    )  # fragmentos Parquet de los datasets fuera de memoria
+
+    # Export Configuration
+    EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "50000"))
 
     # Theme Configuration
     DEFAULT_THEME = os.getenv("DEFAULT_THEME", "light")  # "dark" or "light"
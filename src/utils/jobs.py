@@ -0,0 +1,41 @@
+"""
+Gestor de trabajos en segundo plano para los callbacks de Dash.
+Los trabajos se ejecutan en procesos aparte con resultados en diskcache
+(incluido en las dependencias del proyecto como `dash[diskcache]`).
+"""
+
+import logging
+import os
+from typing import Optional
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+# Instancia global del gestor (singleton pattern); False = no disponible
+_manager_instance = None
+
+
+def get_background_manager() -> Optional[object]:
+    """
+    Obtiene el gestor de callbacks en segundo plano.
+
+    Returns:
+        DiskcacheManager o None si faltan las dependencias de diskcache
+    """
+    global _manager_instance
+
+    if _manager_instance is None:
+        try:
+            import diskcache
+            from dash import DiskcacheManager
+
+            cache = diskcache.Cache(os.path.join(Config.REFRESH_DIR, "jobs"))
+            _manager_instance = DiskcacheManager(cache)
+        except ImportError:
+            logger.warning(
+                'Background jobs disabled: install "dash[diskcache]" to enable them'
+            )
+            _manager_instance = False
+
+    return _manager_instance or None
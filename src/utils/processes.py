@@ -0,0 +1,37 @@
+"""
+Contexto de arranque de los pools de procesos (decodificación y bootstrap).
+
+Los workers de gunicorn tienen hilos (el planificador, los de las peticiones
+y los del propio pool), y hacer fork de un proceso con hilos copia cerrojos
+que quizá otro hilo tenía tomados. Los pools arrancan sus procesos con
+forkserver: un proceso limpio, lanzado al crear el primer pool, que importa
+de antemano los módulos de las tareas y del que se bifurcan los procesos del
+pool. Donde no hay forkserver se usa spawn.
+
+Con forkserver o spawn, los procesos importan el script principal como
+`__mp_main__`: con gunicorn es el de gunicorn, y al ejecutar `app.py`
+directamente la aplicación no carga datos ni registra nada en ellos (ver
+`app.py`).
+"""
+
+import multiprocessing
+from multiprocessing.context import BaseContext
+
+
+def pool_context(*preload: str) -> BaseContext:
+    """
+    Contexto de arranque para un `ProcessPoolExecutor`.
+
+    Args:
+        *preload: Módulos con las funciones de las tareas; el forkserver los
+            importa una vez y los procesos del pool parten de ellos ya
+            importados (solo se aplican si el forkserver aún no ha arrancado)
+
+    Returns:
+        BaseContext: Contexto forkserver, o spawn si no está disponible
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["__main__", *preload])
+    return context
@@ -3,6 +3,7 @@ Funciones para aplicar temas (claro/oscuro) a los gráficos de Plotly
 """
 
 import plotly.graph_objects as go
+import plotly.io as pio
 
 
 # Definición de colores para cada tema
@@ -13,6 +14,11 @@ THEME_COLORS = {
         "text": "#cbd5e1",  # Light gray text
         "title": "#f1f5f9",  # Very light gray for titles
         "grid": "rgba(71, 85, 105, 0.3)",  # Subtle dark grid
+        "hover_bg": "#1e293b",
+        "hover_text": "#e2e8f0",
+        "legend_bg": "rgba(30, 41, 59, 0.9)",
+        "legend_border": "#475569",
+        "legend_text": "#e2e8f0",
     },
     "light": {
         "background": "rgba(255,255,255,0)",
@@ -20,9 +26,36 @@ THEME_COLORS = {
         "text": "#1e293b",
         "title": "#0f172a",
         "grid": "#e2e8f0",
+        "hover_bg": "white",
+        "hover_text": "#1e293b",
+        "legend_bg": "rgba(255,255,255,0.9)",
+        "legend_border": "#e2e8f0",
+        "legend_text": "#1e293b",
     },
 }
 
+# Templates de plotly registrados para cada tema (base de plotly, nombre propio)
+THEME_TEMPLATES = {
+    "dark": ("plotly_dark", "hospital_dark"),
+    "light": ("plotly_white", "hospital_light"),
+}
+
+# Tipos de traza que usa el dashboard: el resto se descarta del template para
+# no repetir sus valores por defecto en el JSON de cada figura
+_TEMPLATE_TRACE_TYPES = (
+    "bar",
+    "box",
+    "heatmap",
+    "histogram",
+    "pie",
+    "scatter",
+    "scattergl",
+    "violin",
+)
+_TEMPLATE_UNUSED_LAYOUT = ("geo", "mapbox", "polar", "scene", "ternary")
+
+FONT_FAMILY = "system-ui, -apple-system, sans-serif"
+
 
 def get_theme_colors(theme: str = "dark") -> dict:
     """
@@ -37,48 +70,119 @@ def get_theme_colors(theme: str = "dark") -> dict:
     return THEME_COLORS.get(theme, THEME_COLORS["dark"])
 
 
-def apply_theme(fig: go.Figure, theme: str = "light") -> go.Figure:
+def _build_template(theme: str) -> go.layout.Template:
     """
-    Aplica el tema (claro/oscuro) consistente a las figuras de Plotly.
+    Compila el template de plotly de un tema a partir de su template base.
+
+    Incluye los colores, fuentes, rejilla y leyenda que antes se aplicaban a
+    cada figura con `update_layout`.
 
     Args:
-        fig: Figura de Plotly
-        theme: "dark" o "light" (default: "light")
+        theme: "dark" o "light"
 
     Returns:
-        fig: Figura con el tema aplicado
+        go.layout.Template: Template compilado
     """
     colors = get_theme_colors(theme)
-    template = "plotly_dark" if theme == "dark" else "plotly_white"
-
-    fig.update_layout(
-        template=template,
+    base_name, _ = THEME_TEMPLATES[theme]
+    base = pio.templates[base_name].to_plotly_json()
+
+    data = {
+        trace_type: traces
+        for trace_type, traces in base.get("data", {}).items()
+        if trace_type in _TEMPLATE_TRACE_TYPES
+    }
+    layout = {
+        key: value
+        for key, value in base.get("layout", {}).items()
+        if key not in _TEMPLATE_UNUSED_LAYOUT
+    }
+
+    template = go.layout.Template(data=data, layout=layout)
+    axis_style = dict(
+        showgrid=True,
+        gridwidth=1,
+        gridcolor=colors["grid"],
+        color=colors["text"],
+        tickfont=dict(size=10),
+    )
+    template.layout.update(
         paper_bgcolor=colors["background"],
         plot_bgcolor=colors["plot_bg"],
-        font=dict(
-            color=colors["text"], family="system-ui, -apple-system, sans-serif", size=11
-        ),
-        title_font=dict(
-            color=colors["title"],
-            size=14,
-            family="system-ui, -apple-system, sans-serif",
-        ),
+        font=dict(color=colors["text"], family=FONT_FAMILY, size=11),
+        title_font=dict(color=colors["title"], size=14, family=FONT_FAMILY),
         hoverlabel=dict(
-            bgcolor="#1e293b" if theme == "dark" else "white",
-            font_color="#e2e8f0" if theme == "dark" else "#1e293b",
+            bgcolor=colors["hover_bg"],
+            font_color=colors["hover_text"],
             font_size=11,
-            font_family="system-ui, -apple-system, sans-serif",
+            font_family=FONT_FAMILY,
         ),
-        xaxis=dict(
-            gridcolor=colors["grid"],
-            color=colors["text"],
-        ),
-        yaxis=dict(
-            gridcolor=colors["grid"],
-            color=colors["text"],
+        legend=dict(
+            bgcolor=colors["legend_bg"],
+            bordercolor=colors["legend_border"],
+            font=dict(color=colors["legend_text"]),
         ),
+        xaxis=axis_style,
+        yaxis=axis_style,
     )
 
+    return template
+
+
+def register_templates():
+    """Compila y registra en `plotly.io` los templates de todos los temas"""
+    for theme, (_, name) in THEME_TEMPLATES.items():
+        pio.templates[name] = _build_template(theme)
+
+
+def get_template_name(theme: str = "light") -> str:
+    """
+    Obtiene el nombre del template registrado para un tema.
+
+    Args:
+        theme: "dark" o "light"
+
+    Returns:
+        str: Nombre del template en `plotly.io.templates`
+    """
+    _, name = THEME_TEMPLATES.get(theme, THEME_TEMPLATES["light"])
+    return name
+
+
+def get_theme_templates() -> dict:
+    """
+    Obtiene los templates compilados de todos los temas en formato JSON.
+
+    Se envían una sola vez al navegador, donde el motor de temas del cliente
+    los intercambia en las figuras sin volver a pedirlas al servidor.
+
+    Returns:
+        dict: Tema -> template serializable (`to_plotly_json`)
+    """
+    return {
+        theme: pio.templates[name].to_plotly_json()
+        for theme, (_, name) in THEME_TEMPLATES.items()
+    }
+
+
+def apply_theme(fig: go.Figure, theme: str = "light") -> go.Figure:
+    """
+    Aplica el tema (claro/oscuro) consistente a las figuras de Plotly.
+
+    El tema es un template precompilado: la figura solo lo referencia, sin
+    repetir colores, fuentes ni estilos de rejilla en su propio layout.
+
+    Args:
+        fig: Figura de Plotly
+        theme: "dark" o "light" (default: "light")
+
+    Returns:
+        fig: Figura con el tema aplicado
+    """
+    # Se asigna el objeto del template (no su nombre) para que también se
+    # resuelva en figuras construidas sin validación
+    fig.update_layout(template=pio.templates[get_template_name(theme)])
+
     return fig
 
 
@@ -108,3 +212,7 @@ def apply_light_theme(fig: go.Figure) -> go.Figure:
         fig: Figura con el tema claro aplicado
     """
     return apply_theme(fig, theme="light")
+
+
+# Compilar los templates una única vez al importar el módulo
+register_templates()